@@ -5,7 +5,14 @@ Aggregate Stats Analyzer
 from typing import Dict, Any, List
 from collections import defaultdict, Counter
 
+from .contracts import reads
+from .team_record import TeamMatchRecord
 
+
+@reads(
+    shot_fields=('result', 'shot_type', 'goal_time', 'in_penalty', 'assist_spid', 'shooter_spid'),
+    raw_sections=('matchInfo',),  # pass type distribution from TeamMatchRecord
+)
 class AggregateStatsAnalyzer:
     """
     전체 경기 통합 통계 분석기
@@ -238,17 +245,17 @@ class AggregateStatsAnalyzer:
         }
 
     @classmethod
-    def analyze_pass_type_distribution(cls, matches_data: List[Dict]) -> Dict[str, Any]:
+    def analyze_pass_type_distribution(cls, records: List[TeamMatchRecord]) -> Dict[str, Any]:
         """
         패스 타입 평균 분포
 
         Args:
-            matches_data: 모든 경기의 raw_data
+            records: 모든 경기의 유저 TeamMatchRecord
 
         Returns:
             패스 타입 평균 분포
         """
-        total_matches = len(matches_data)
+        total_matches = len(records)
         if total_matches == 0:
             return {
                 'avg_short_pass_rate': 0,
@@ -261,13 +268,8 @@ class AggregateStatsAnalyzer:
         long_pass_rates = []
         through_pass_rates = []
 
-        for match_data in matches_data:
-            match_info = match_data.get('matchInfo', [])
-            if not match_info:
-                continue
-
-            user_info = match_info[0]
-            pass_data = user_info.get('pass', {})
+        for record in records:
+            pass_data = record.passes
 
             if not pass_data:
                 continue
@@ -15,6 +15,8 @@
 import math
 from typing import Dict, List, Any, Tuple
 
+from .team_record import TeamMatchRecord
+
 
 # 리그 평균 득점 (FC Online 공식경기 기준 — 실축구보다 득점 많음)
 LEAGUE_AVG_GOALS = 2.8
@@ -60,11 +62,9 @@ class BattlePredictor:
     # ── 실제 성과 지표 추출 ────────────────────────────────────────────────
 
     @classmethod
-    def extract_performance(
-        cls, matches_raw: List[Dict], player_ouid: str
-    ) -> Dict[str, Any]:
+    def extract_performance(cls, records: List[TeamMatchRecord]) -> Dict[str, Any]:
         """
-        매치 원시 데이터에서 핵심 성과 지표 추출.
+        플레이어의 경기별 TeamMatchRecord에서 핵심 성과 지표 추출.
         matchResult: '승'/'패'/'무' 또는 숫자(1/2/3).
         """
         wins = draws = losses = 0
@@ -73,17 +73,9 @@ class BattlePredictor:
         passes_try = passes_success = 0
         tackles_total = blocks_total = 0
 
-        for raw in matches_raw:
-            match_info_list = raw.get('matchInfo', [])
-            my_info = next(
-                (m for m in match_info_list if m.get('ouid') == player_ouid), None
-            )
-            if not my_info:
-                continue
-
+        for record in records:
             # 승/무/패
-            match_detail = my_info.get('matchDetail') or {}
-            result = match_detail.get('matchResult', '')
+            result = record.match_detail.get('matchResult', '')
             if result in ('승', 1, '1'):
                 wins += 1
             elif result in ('무', 2, '2'):
@@ -92,28 +84,24 @@ class BattlePredictor:
                 losses += 1
 
             # 내 득점 / 슈팅
-            my_shoot = my_info.get('shoot') or {}
+            my_shoot = record.shoot
             goals_for      += my_shoot.get('goalTotalDisplay', 0) or 0
             shots_total    += my_shoot.get('shootTotal', 0) or 0
             shots_effective += my_shoot.get('effectiveShootTotal', 0) or 0
 
             # 패스
-            my_pass = my_info.get('pass') or {}
+            my_pass = record.passes
             passes_try     += my_pass.get('passTry', 0) or 0
             passes_success += my_pass.get('passSuccess', 0) or 0
 
             # 수비 지표
-            my_defence = my_info.get('defence') or {}
+            my_defence = record.defence
             tackles_total += my_defence.get('tackleTry', 0) or 0
             blocks_total  += my_defence.get('blockTry', 0) or 0
 
             # 상대 득점 = 내 실점
-            opp_info = next(
-                (m for m in match_info_list if m.get('ouid') != player_ouid), None
-            )
-            if opp_info:
-                opp_shoot = opp_info.get('shoot') or {}
-                goals_against += opp_shoot.get('goalTotalDisplay', 0) or 0
+            if record.opponent is not None:
+                goals_against += record.opponent.shoot.get('goalTotalDisplay', 0) or 0
 
         total = wins + draws + losses
         if total == 0:
@@ -451,18 +439,16 @@ class BattlePredictor:
         cls,
         my_indices: Dict,
         opp_indices: Dict,
-        my_matches_raw: List[Dict],
-        opp_matches_raw: List[Dict],
-        my_ouid: str,
-        opp_ouid: str,
+        my_records: List[TeamMatchRecord],
+        opp_records: List[TeamMatchRecord],
         my_nickname: str = '',
         opp_nickname: str = '',
     ) -> Dict[str, Any]:
         """나와의 승부 예측 메인"""
 
         # 1. 실제 성과 지표 추출
-        my_perf  = cls.extract_performance(my_matches_raw, my_ouid)
-        opp_perf = cls.extract_performance(opp_matches_raw, opp_ouid)
+        my_perf  = cls.extract_performance(my_records)
+        opp_perf = cls.extract_performance(opp_records)
 
         # 2. xG 계산 (Dixon-Coles 단순화 버전)
         #    내 공격력 × 상대 수비 취약성 / 리그 평균
@@ -0,0 +1,87 @@
+"""
+Analyzer Input Contracts
+
+Each analyzer declares the data it reads with `@reads(...)`:
+
+- match_fields: Match columns of the recent-match window
+- shot_fields / performance_fields: ShotDetail / PlayerPerformance columns
+- raw_sections: top-level keys of Match.raw_data (empty: raw_data is not loaded)
+- external: upstream Nexon calls (e.g. 'user_trade', 'ranker_stats')
+
+`FetchPlan` merges the contracts of the analyzers a view runs and fetches
+only what they declare: values() rows with the declared columns, raw_data
+only when a section is read, and upstream calls only when listed (`needs()`).
+A contract is the analyzer's promise about what it reads; when an analyzer
+starts reading a new field, its contract has to list it.
+
+    plan = FetchPlan(FormCycleAnalyzer)
+    rows = plan.match_rows(MatchWindow(user, matchtype, limit))
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, Tuple
+
+if TYPE_CHECKING:  # analyzers stay importable without Django models
+    from api.utils.match_window import MatchWindow
+
+
+@dataclass(frozen=True)
+class AnalyzerInputs:
+    """What one analyzer reads"""
+    match_fields: Tuple[str, ...] = ()
+    shot_fields: Tuple[str, ...] = ()
+    performance_fields: Tuple[str, ...] = ()
+    raw_sections: Tuple[str, ...] = ()
+    external: Tuple[str, ...] = ()
+
+
+REGISTRY: Dict[str, AnalyzerInputs] = {}
+
+
+def reads(**fields: Iterable[str]):
+    """Class decorator declaring an analyzer's inputs (see AnalyzerInputs)"""
+    inputs = AnalyzerInputs(**{name: tuple(values) for name, values in fields.items()})
+
+    def register(cls):
+        cls.INPUTS = inputs
+        REGISTRY[cls.__name__] = inputs
+        return cls
+    return register
+
+
+def _merge(*groups: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(field for group in groups for field in group))
+
+
+class FetchPlan:
+    """Minimal fetch for a set of analyzers, from their declared inputs"""
+
+    def __init__(self, *analyzers):
+        contracts = [analyzer.INPUTS for analyzer in analyzers]
+        self.match_fields = _merge(*(c.match_fields for c in contracts))
+        self.shot_fields = _merge(*(c.shot_fields for c in contracts))
+        self.performance_fields = _merge(*(c.performance_fields for c in contracts))
+        self.raw_sections = _merge(*(c.raw_sections for c in contracts))
+        self.external = _merge(*(c.external for c in contracts))
+
+    def needs(self, call: str) -> bool:
+        """Whether any analyzer consumes the upstream call"""
+        return call in self.external
+
+    @property
+    def defer_raw_data(self) -> bool:
+        return not self.raw_sections
+
+    def match_rows(self, window: 'MatchWindow'):
+        """Window matches (newest first) as dicts of the declared columns"""
+        fields = self.match_fields + (() if self.defer_raw_data else ('raw_data',))
+        return window.matches().values(*fields)
+
+    def shot_rows(self, window: 'MatchWindow'):
+        return window.shots().values(*self.shot_fields)
+
+    def performance_rows(self, window: 'MatchWindow', named: bool = False, **filters):
+        """Window performances as dicts (named tuples with named=True); filters go to MatchWindow.performances"""
+        performances = window.performances(**filters)
+        if named:
+            return performances.values_list(*self.performance_fields, named=True)
+        return performances.values(*self.performance_fields)
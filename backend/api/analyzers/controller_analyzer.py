@@ -15,13 +15,12 @@ class ControllerAnalyzer:
     """
 
     @classmethod
-    def analyze_controller_performance(cls, matches: List[Dict[str, Any]], ouid: str = None) -> Dict[str, Any]:
+    def analyze_controller_performance(cls, matches: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         컨트롤러별 성적 및 플레이 스타일 분석
 
         Args:
-            matches: List of match data with raw_data
-            ouid: 유저 ouid (matchInfo에서 유저 정보 찾기 위해 필요)
+            matches: List of match data with the user's TeamMatchRecord as 'record'
 
         Returns:
             컨트롤러 분석 결과
@@ -30,7 +29,7 @@ class ControllerAnalyzer:
             return cls._empty_analysis()
 
         # 컨트롤러별 데이터 수집
-        controller_stats = cls._collect_controller_stats(matches, ouid)
+        controller_stats = cls._collect_controller_stats(matches)
 
         # 컨트롤러별 승률 계산
         performance_comparison = cls._calculate_performance(controller_stats)
@@ -63,7 +62,7 @@ class ControllerAnalyzer:
         }
 
     @classmethod
-    def _collect_controller_stats(cls, matches: List[Dict], ouid: str = None) -> Dict[str, Dict]:
+    def _collect_controller_stats(cls, matches: List[Dict]) -> Dict[str, Dict]:
         """컨트롤러별 통계 수집"""
         stats = defaultdict(lambda: {
             'matches': 0,
@@ -79,26 +78,11 @@ class ControllerAnalyzer:
         })
 
         for match in matches:
-            # Get controller from raw_data
-            if not match.get('raw_data'):
+            record = match.get('record')
+            if record is None:
                 continue
 
-            match_info = match['raw_data'].get('matchInfo', [])
-            if not match_info:
-                continue
-
-            # Find user's matchInfo entry using ouid — fallback to first entry
-            user_info = None
-            if ouid:
-                for entry in match_info:
-                    if entry.get('ouid') == ouid:
-                        user_info = entry
-                        break
-            if user_info is None:
-                user_info = match_info[0]
-
-            match_detail = user_info.get('matchDetail', {})
-            controller = match_detail.get('controller')
+            controller = record.match_detail.get('controller')
 
             if not controller:
                 continue
@@ -4,6 +4,8 @@ Analyzes defensive performance, tackling, blocking, and pressing intensity
 """
 from typing import Dict, Any, List
 
+from .team_record import TeamMatchRecord
+
 
 class DefenseAnalyzer:
     """
@@ -15,12 +17,12 @@ class DefenseAnalyzer:
     """
 
     @classmethod
-    def analyze_defense(cls, matches_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_defense(cls, records: List[TeamMatchRecord]) -> Dict[str, Any]:
         """
         Comprehensive defensive analysis across multiple matches
 
         Args:
-            matches_data: List of match raw_data dictionaries
+            records: The user's TeamMatchRecord per match
 
         Returns:
             Dictionary with defensive analysis
@@ -30,15 +32,10 @@ class DefenseAnalyzer:
         total_tackle_success = 0
         total_block_try = 0
         total_block_success = 0
-        total_matches = len(matches_data)
-
-        for match_data in matches_data:
-            if not match_data or 'matchInfo' not in match_data:
-                continue
+        total_matches = len(records)
 
-            # Get user's match info
-            match_info = match_data['matchInfo'][0]
-            defence_data = match_info.get('defence') or {}  # Handle None case
+        for record in records:
+            defence_data = record.defence
 
             total_tackle_try += defence_data.get('tackleTry') or 0
             total_tackle_success += defence_data.get('tackleSuccess') or 0
@@ -7,7 +7,16 @@ import math
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+import numpy as np
 
+from .contracts import reads
+from .metrics.rolling import RollingWindows, runs
+
+
+@reads(match_fields=(
+    'match_date', 'result', 'goals_for', 'goals_against',
+    'possession', 'shots', 'shots_on_target', 'pass_success_rate',
+))
 class FormCycleAnalyzer:
     """폼 사이클 분석기 — 핫/콜드 스트릭 탐지"""
 
@@ -49,24 +58,32 @@ class FormCycleAnalyzer:
         return max(0.0, min(10.0, score))
 
     @classmethod
-    def _compute_rolling_form(cls, matches: List[Dict], window: int) -> List[Dict]:
-        """롤링 폼 지수 계산 (오래된 순 정렬된 matches 필요)"""
-        rolling = []
-        for i in range(len(matches)):
-            if i < window - 1:
-                rolling.append(None)
-                continue
-
-            window_matches = matches[i - window + 1: i + 1]
-            perf_scores = [cls._match_performance_score(m) for m in window_matches]
-            win_count = sum(1 for m in window_matches if m.get('result') == 'win')
-            draw_count = sum(1 for m in window_matches if m.get('result') == 'draw')
-            loss_count = sum(1 for m in window_matches if m.get('result') == 'lose')
+    def _rolling_engine(cls, matches: List[Dict]) -> RollingWindows:
+        """경기별 점수를 한 번만 계산한 롤링 엔진"""
+        return RollingWindows(
+            [cls._match_performance_score(m) for m in matches],
+            [m.get('result') for m in matches],
+        )
 
-            avg_score = sum(perf_scores) / len(perf_scores)
+    @classmethod
+    def _compute_rolling_form(
+        cls, matches: List[Dict], window: int, engine: Optional[RollingWindows] = None,
+    ) -> List[Optional[Dict]]:
+        """롤링 폼 지수 계산 (오래된 순 정렬된 matches 필요)"""
+        engine = engine or cls._rolling_engine(matches)
+        if len(matches) < window:
+            return [None] * len(matches)
+
+        rolling: List[Optional[Dict]] = [None] * (window - 1)
+        columns = zip(
+            engine.means(window).tolist(),
+            engine.counts('win', window).tolist(),
+            engine.counts('draw', window).tolist(),
+            engine.counts('lose', window).tolist(),
+        )
+        for avg_score, win_count, draw_count, loss_count in columns:
             # Win rate weighted form (0-100)
             form_index = (avg_score / 10.0) * 100
-
             rolling.append({
                 'form_index': round(form_index, 1),
                 'avg_score': round(avg_score, 2),
@@ -83,62 +100,34 @@ class FormCycleAnalyzer:
         핫/콜드 스트릭 탐지.
         Rolling 5-game form index가 임계값 초과/미달인 구간을 감지.
         """
-        streaks = []
         HOT_THRESHOLD = 70.0
         COLD_THRESHOLD = 40.0
         MIN_STREAK_LEN = 3
 
-        current_type = None
-        streak_start = None
+        # 롤링 값은 앞쪽 (window - 1)경기만 None
+        offset = next((i for i, r in enumerate(rolling_5) if r is not None), len(rolling_5))
+        form = np.array([r['form_index'] for r in rolling_5[offset:]], dtype=float)
+        phases = np.where(form >= HOT_THRESHOLD, 'hot', np.where(form <= COLD_THRESHOLD, 'cold', 'neutral'))
 
-        for i, rolling in enumerate(rolling_5):
-            if rolling is None:
+        streaks = []
+        for phase, start, length in runs(phases):
+            if phase == 'neutral' or length < MIN_STREAK_LEN:
                 continue
-
-            fi = rolling['form_index']
-
-            if fi >= HOT_THRESHOLD:
-                phase = 'hot'
-            elif fi <= COLD_THRESHOLD:
-                phase = 'cold'
-            else:
-                phase = 'neutral'
-
-            if phase != current_type:
-                # End previous streak
-                if current_type in ('hot', 'cold') and streak_start is not None:
-                    streak_len = i - streak_start
-                    if streak_len >= MIN_STREAK_LEN:
-                        streaks.append({
-                            'type': current_type,
-                            'start_idx': streak_start,
-                            'end_idx': i - 1,
-                            'length': streak_len,
-                            'match_date': matches[streak_start].get('match_date', ''),
-                        })
-
-                current_type = phase if phase in ('hot', 'cold') else None
-                streak_start = i if current_type else None
-
-        # Close last streak
-        if current_type in ('hot', 'cold') and streak_start is not None:
-            streak_len = len(rolling_5) - streak_start
-            if streak_len >= MIN_STREAK_LEN:
-                streaks.append({
-                    'type': current_type,
-                    'start_idx': streak_start,
-                    'end_idx': len(rolling_5) - 1,
-                    'length': streak_len,
-                    'match_date': matches[streak_start].get('match_date', ''),
-                })
-
+            start += offset
+            streaks.append({
+                'type': str(phase),
+                'start_idx': start,
+                'end_idx': start + length - 1,
+                'length': length,
+                'match_date': matches[start].get('match_date', ''),
+            })
         return streaks
 
     @staticmethod
     def _session_length_analysis(matches: List[Dict]) -> Dict[str, Any]:
         """
         하루 내 경기 번호별 성적 분석.
-        match_date로 같은 날 몇 번째 경기인지 판단.
+        match_date로 같은 날 몇 번째 경기인지 판단 (match_date는 현지 시각 문자열).
         """
         session_stats: Dict[int, Dict] = {}
 
@@ -171,6 +160,11 @@ class FormCycleAnalyzer:
                 else:
                     session_stats[session_num]['draws'] += 1
 
+        return FormCycleAnalyzer._summarize_sessions(session_stats)
+
+    @staticmethod
+    def _summarize_sessions(session_stats: Dict[int, Dict]) -> Dict[str, Any]:
+        """경기 번호별 {wins, total} 집계 → 승률 / 최적 세션"""
         # Compute win rates per session
         session_winrates = []
         for session_num in sorted(session_stats.keys()):
@@ -227,12 +221,13 @@ class FormCycleAnalyzer:
 
         sorted_matches = sorted(matches, key=parse_date)
 
-        # Compute performance scores for each match
-        match_scores = [cls._match_performance_score(m) for m in sorted_matches]
+        # Performance scores computed once; rolling windows reuse their prefix sums
+        engine = cls._rolling_engine(sorted_matches)
+        match_scores = engine.values.tolist()
 
         # Rolling 5-game and 10-game form indices
-        rolling_5 = cls._compute_rolling_form(sorted_matches, 5)
-        rolling_10 = cls._compute_rolling_form(sorted_matches, 10)
+        rolling_5 = cls._compute_rolling_form(sorted_matches, 5, engine)
+        rolling_10 = cls._compute_rolling_form(sorted_matches, 10, engine)
 
         # Build timeline data (for visualization)
         timeline = []
@@ -272,7 +267,7 @@ class FormCycleAnalyzer:
 
         # Generate insights
         insights = cls._generate_insights(
-            sorted_matches, streaks, current_form_5, session_analysis
+            total, streaks, current_form_5, session_analysis
         )
 
         hot_streaks = [s for s in streaks if s['type'] == 'hot']
@@ -302,6 +297,102 @@ class FormCycleAnalyzer:
             'insights': insights,
         }
 
+    @staticmethod
+    def _history_form(form: Optional[float], results: List[str]) -> Optional[Dict]:
+        """SQL 롤링 평균 점수 → 롤링 폼 항목 (analyze_form_cycle과 같은 형태)"""
+        if form is None:
+            return None
+        wins = results.count('win')
+        return {
+            'form_index': round(form / 10.0 * 100, 1),
+            'avg_score': round(form, 2),
+            'wins': wins,
+            'draws': results.count('draw'),
+            'losses': results.count('lose'),
+            'win_rate': round(wins / len(results) * 100, 1),
+        }
+
+    @classmethod
+    def analyze_form_history(cls, history: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        전체 이력 폼 사이클 분석 (FormHistory.summarize()의 요약 시계열).
+
+        경기 단위 대신 일 단위 타임라인을 반환하며, 스트릭/세션/현재 폼은
+        DB 윈도 함수가 계산한 값을 그대로 사용.
+        """
+        daily = history['daily']
+        if not daily:
+            return cls._empty_result()
+
+        timeline = []
+        match_index = 0
+        for day in daily:
+            match_index += day['matches']
+            if day['wins'] > day['losses']:
+                result = 'win'
+            elif day['wins'] < day['losses']:
+                result = 'lose'
+            else:
+                result = 'draw'
+            timeline.append({
+                'match_index': match_index,
+                'match_date': day['date'],
+                'result': result,
+                'matches': day['matches'],
+                'wins': day['wins'],
+                'goals_for': day['goals_for'],
+                'goals_against': day['goals_against'],
+                'perf_score': round(day['avg_score'], 2),
+                'form_5': round(day['form_5'] * 10, 1) if day['form_5'] is not None else None,
+                'form_10': round(day['form_10'] * 10, 1) if day['form_10'] is not None else None,
+            })
+
+        streaks = [
+            {**streak, 'end_idx': streak['start_idx'] + streak['length'] - 1}
+            for streak in history['streaks']
+        ]
+        hot_streaks = [s for s in streaks if s['type'] == 'hot']
+        cold_streaks = [s for s in streaks if s['type'] == 'cold']
+
+        recent = history['recent']  # 최신 경기 먼저
+        recent_results = [r['result'] for r in recent]
+        current_form_5 = cls._history_form(recent[0]['form_5'], recent_results[:5]) if recent else None
+        current_form_10 = cls._history_form(recent[0]['form_10'], recent_results[:10]) if recent else None
+
+        session_analysis = cls._summarize_sessions({s['session']: s for s in history['sessions']})
+
+        total = match_index
+        wins = sum(day['wins'] for day in daily)
+        form_count = sum(day['form_index_count'] for day in daily)
+        avg_form_5 = (
+            round(sum(day['form_index_sum'] for day in daily) / form_count, 1) if form_count else None
+        )
+
+        return {
+            'mode': 'history',
+            'total_matches': total,
+            'win_rate': round(wins / total * 100, 1) if total > 0 else 0,
+            'form_timeline': timeline,
+            'rolling_5': [],
+            'rolling_10': [],
+            'streaks': {
+                'all': streaks,
+                'hot': hot_streaks,
+                'cold': cold_streaks,
+                'longest_hot': max((s['length'] for s in hot_streaks), default=0),
+                'longest_cold': max((s['length'] for s in cold_streaks), default=0),
+            },
+            'current_form': {
+                'last_5_results': recent_results[:5][::-1],
+                'form_5': current_form_5,
+                'form_10': current_form_10,
+                'status': cls._form_status(current_form_5),
+            },
+            'avg_form_index': avg_form_5,
+            'session_analysis': session_analysis,
+            'insights': cls._generate_insights(total, streaks, current_form_5, session_analysis),
+        }
+
     @staticmethod
     def _form_status(rolling: Optional[Dict]) -> str:
         if not rolling:
@@ -320,14 +411,13 @@ class FormCycleAnalyzer:
 
     @staticmethod
     def _generate_insights(
-        matches: List[Dict],
+        total: int,
         streaks: List[Dict],
         current_form: Optional[Dict],
         session_analysis: Dict,
     ) -> List[str]:
         insights = []
 
-        total = len(matches)
         if total < 5:
             insights.append('⚠️ 폼 사이클 분석에는 최소 5경기 이상이 필요합니다.')
             return insights
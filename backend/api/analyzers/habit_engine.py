@@ -0,0 +1,177 @@
+"""
+Habit Engine
+Per-user n-gram counts of habit symbol streams, derived once per match
+
+HabitLoopAnalyzer used to re-read every match's raw_data on each request,
+collapse it to one pass-type symbol and count first-order transitions in
+nested dicts. The engine turns a match into symbols once (at ingest, see
+api.utils.habit_store) and keeps the n-gram counts of orders 0..MAX_ORDER as
+small uint32 arrays indexed by symbol, so dominant chains and entropies are
+answered from the counts and a new match is a handful of increments.
+
+Streams:
+- 'pass': one symbol per match (dominant pass type), chained across matches
+  in match-date order; the last MAX_ORDER symbols are the next match's context.
+- 'shot': one symbol per shot (in the box or not × central or wide), in
+  goalTime order, chained within a match only.
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .team_record import TeamMatchRecord
+
+MAX_ORDER = 2
+
+PASS_SYMBOLS = ('short', 'long', 'through')
+SHOT_SYMBOLS = ('box_center', 'box_wide', 'out_center', 'out_wide')
+
+
+def pass_symbol(record: TeamMatchRecord) -> Optional[str]:
+    """매치의 주요 패스 유형 (시도가 가장 많은 타입, 패스가 없으면 None)"""
+    tries = {
+        'short': record.passes.get('shortPassTry', 0) or 0,
+        'long': record.passes.get('longPassTry', 0) or 0,
+        'through': record.passes.get('throughPassTry', 0) or 0,
+    }
+    if sum(tries.values()) == 0:
+        return None
+    return max(tries, key=tries.get)
+
+
+def shot_symbols(record: TeamMatchRecord) -> List[str]:
+    """경기 내 슛 순서대로 슛 위치 심볼 (박스 안/밖 × 중앙/측면)"""
+    symbols = []
+    for shot in sorted(record.shoot_detail, key=lambda s: s.get('goalTime') or 0):
+        try:
+            y = float(shot.get('y', 0.5))
+        except (TypeError, ValueError):
+            y = 0.5
+        area = 'box' if shot.get('inPenalty') else 'out'
+        side = 'center' if 0.35 <= y <= 0.65 else 'wide'
+        symbols.append(f'{area}_{side}')
+    return symbols
+
+
+class NgramCounts:
+    """n-gram counts of one symbol stream; arrays[k] holds the (k+1)-grams"""
+
+    def __init__(self, symbols: Sequence[str], max_order: int = MAX_ORDER,
+                 arrays: Optional[List[np.ndarray]] = None):
+        self.symbols = tuple(symbols)
+        self.max_order = max_order
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        size = len(self.symbols)
+        self.arrays = arrays or [
+            np.zeros((size,) * (order + 1), dtype=np.uint32) for order in range(max_order + 1)
+        ]
+
+    def add(self, symbols: Iterable[str], context: Sequence[str] = ()) -> List[str]:
+        """
+        Count `symbols` as the continuation of `context` (symbols already
+        counted in the same chain). Returns the chain's last max_order
+        symbols, the context of its next continuation.
+        """
+        known = [self._index[s] for s in context if s in self._index]
+        chain = known[len(known) - self.max_order:] if self.max_order else []
+        start = len(chain)
+        chain += [self._index[s] for s in symbols if s in self._index]
+
+        for pos in range(start, len(chain)):
+            for order in range(min(pos, self.max_order) + 1):
+                self.arrays[order][tuple(chain[pos - order:pos + 1])] += 1
+
+        tail = chain[len(chain) - self.max_order:] if self.max_order else []
+        return [self.symbols[i] for i in tail]
+
+    def total(self, order: int = 0) -> int:
+        return int(self.arrays[order].sum())
+
+    def _rows(self, order: int) -> np.ndarray:
+        """(contexts × next symbol) count matrix of `order`"""
+        return self.arrays[order].reshape(-1, len(self.symbols)).astype(np.float64)
+
+    def _context(self, row: int, order: int) -> Tuple[str, ...]:
+        if order == 0:
+            return ()
+        index = np.unravel_index(row, (len(self.symbols),) * order)
+        return tuple(self.symbols[int(i)] for i in index)
+
+    def transitions(self, order: int = 1) -> Dict[Tuple[str, ...], Dict[str, float]]:
+        """P(next | previous `order` symbols), for contexts that were observed"""
+        counts = self._rows(order)
+        totals = counts.sum(axis=1)
+        return {
+            self._context(row, order): {
+                self.symbols[col]: counts[row, col] / totals[row] for col in np.flatnonzero(counts[row])
+            }
+            for row in np.flatnonzero(totals)
+        }
+
+    def chains(self, order: int = 1, threshold: float = 0.4, min_support: int = 1) -> List[Dict]:
+        """
+        Transitions with P(next | context) >= threshold among contexts seen at
+        least `min_support` times, most probable first.
+        """
+        counts = self._rows(order)
+        totals = counts.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            probs = np.where(totals > 0, counts / totals, 0.0)
+        rows, cols = np.nonzero((probs >= threshold) & (counts > 0) & (totals >= min_support))
+
+        chains = [{
+            'context': self._context(row, order),
+            'next': self.symbols[col],
+            'probability': float(probs[row, col]),
+            'count': int(counts[row, col]),
+            'support': int(totals[row, 0]),
+        } for row, col in zip(rows, cols)]
+        chains.sort(key=lambda c: (c['probability'], c['support']), reverse=True)
+        return chains
+
+    def entropy(self, order: int = 0) -> Optional[float]:
+        """
+        Normalized entropy of the next symbol given `order` previous symbols
+        (0 = always the same, 1 = uniform). None without observations.
+        """
+        size = len(self.symbols)
+        counts = self._rows(order)
+        total = counts.sum()
+        if total == 0 or size < 2:
+            return None
+        totals = counts.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            logs = np.where(counts > 0, np.log2(counts / totals), 0.0)
+        return float(-(counts * logs).sum() / total / math.log2(size))
+
+    def to_bytes(self) -> bytes:
+        return b''.join(array.astype('<u4').tobytes() for array in self.arrays)
+
+    @classmethod
+    def from_bytes(cls, symbols: Sequence[str], data: bytes, max_order: int = MAX_ORDER) -> 'NgramCounts':
+        """Counts stored by to_bytes(); ValueError when the layout (symbols, order) differs"""
+        size = len(symbols)
+        lengths = [size ** (order + 1) for order in range(max_order + 1)]
+        flat = np.frombuffer(data, dtype='<u4')
+        if flat.size != sum(lengths):
+            raise ValueError(f'expected {sum(lengths)} counts, got {flat.size}')
+        arrays, offset = [], 0
+        for order, length in enumerate(lengths):
+            arrays.append(flat[offset:offset + length].astype(np.uint32).reshape((size,) * (order + 1)))
+            offset += length
+        return cls(symbols, max_order, arrays)
+
+    @classmethod
+    def from_records(cls, records: Iterable[TeamMatchRecord]) -> Dict[str, 'NgramCounts']:
+        """Counts of both streams for records in chronological order (not stored)"""
+        streams = {'pass': cls(PASS_SYMBOLS), 'shot': cls(SHOT_SYMBOLS)}
+        tail: List[str] = []
+        for record in records:
+            if record is None:
+                continue
+            symbol = pass_symbol(record)
+            if symbol:
+                tail = streams['pass'].add([symbol], context=tail)
+            streams['shot'].add(shot_symbols(record))
+        return streams
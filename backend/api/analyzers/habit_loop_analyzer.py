@@ -2,10 +2,21 @@
 Habit Loop Detector — B1
 무의식적으로 반복하는 전술 습관 수치화.
 마르코프 체인 기반 패스 시퀀스 분석 + 압박 반응 패턴.
+
+패스/슛 시퀀스는 습관 엔진(habit_engine)의 n-gram 카운트로 분석한다.
+저장된 유저 카운트(전체 기록)가 주어지면 그대로 쓰고, 없으면 분석 구간의
+경기에서 즉석으로 센다. 시퀀스 필드(pass_*, transition_matrix, 체인/루프,
+shot_sequence, good/bad_habits)의 범위는 sequence_scope('history' 또는
+'window')로 표시하며, 나머지 필드는 항상 분석 구간(matches_analyzed) 기준이다.
 """
 import math
-from collections import defaultdict
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from .habit_engine import NgramCounts
+from .pitch_grid import PitchGrid
+from .team_record import TeamMatchRecord
 
 
 class HabitLoopAnalyzer:
@@ -18,126 +29,73 @@ class HabitLoopAnalyzer:
         'lob': '로브패스',
     }
 
-    @staticmethod
-    def _extract_pass_type(match_info: Dict) -> Optional[str]:
-        """매치에서 주요 패스 유형 추출 (압도적으로 많은 타입)"""
-        pass_data = match_info.get('pass') or {}
-        if not isinstance(pass_data, dict):
-            return None
-
-        short = pass_data.get('shortPassTry', 0) or 0
-        long_ = pass_data.get('longPassTry', 0) or 0
-        through = pass_data.get('throughPassTry', 0) or 0
-
-        total = short + long_ + through
-        if total == 0:
-            return None
-
-        ratios = {'short': short / total, 'long': long_ / total, 'through': through / total}
-        return max(ratios, key=ratios.get)
+    SHOT_SYMBOL_LABELS = {
+        'box_center': '박스 중앙',
+        'box_wide': '박스 측면',
+        'out_center': '중거리 중앙',
+        'out_wide': '중거리 측면',
+    }
 
     @staticmethod
-    def _build_pass_sequence(matches_raw: List[Dict], user_ouid: str) -> List[str]:
+    def _transition_matrix(counts: NgramCounts) -> Dict[str, Dict[str, float]]:
         """
-        경기별 주요 패스 유형 시퀀스 생성.
-        각 경기를 하나의 심볼로 인코딩.
+        마르코프 체인 전이 행렬.
+        P(next_type | current_type), 습관 엔진의 1차 카운트에서 계산.
         """
-        sequence = []
-        for raw in matches_raw:
-            match_info_list = raw.get('matchInfo', [])
-            for info in match_info_list:
-                if info.get('ouid') == user_ouid:
-                    pass_type = HabitLoopAnalyzer._extract_pass_type(info)
-                    if pass_type:
-                        sequence.append(pass_type)
-                    break
-        return sequence
+        return {
+            context[0]: {to_type: round(prob, 3) for to_type, prob in to_probs.items()}
+            for context, to_probs in counts.transitions(order=1).items()
+        }
 
-    @staticmethod
-    def _compute_markov_transition_matrix(sequence: List[str]) -> Dict[str, Dict[str, float]]:
+    @classmethod
+    def _detect_dominant_chains(cls, counts: NgramCounts, threshold: float = 0.4) -> List[Dict]:
         """
-        마르코프 체인 전이 행렬 계산.
-        P(next_type | current_type) 계산.
+        지배적 패스 시퀀스 탐지.
+        전이 확률이 threshold 이상인 경우 습관으로 간주.
         """
-        if len(sequence) < 2:
-            return {}
-
-        # Count transitions
-        transitions: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-        for i in range(len(sequence) - 1):
-            current = sequence[i]
-            next_ = sequence[i + 1]
-            transitions[current][next_] += 1
-
-        # Convert to probabilities
-        matrix = {}
-        for from_type, to_counts in transitions.items():
-            total = sum(to_counts.values())
-            matrix[from_type] = {
-                to_type: round(count / total, 3)
-                for to_type, count in to_counts.items()
-            }
+        return [{
+            'from': chain['context'][0],
+            'from_label': cls.PASS_TYPES.get(chain['context'][0], chain['context'][0]),
+            'to': chain['next'],
+            'to_label': cls.PASS_TYPES.get(chain['next'], chain['next']),
+            'probability': round(chain['probability'] * 100, 1),
+            'count': chain['count'],
+            'is_predictable': chain['probability'] >= 0.6,
+            'habit_strength': 'strong' if chain['probability'] >= 0.6 else 'moderate',
+        } for chain in counts.chains(order=1, threshold=threshold)]
 
-        return matrix
-
-    @staticmethod
-    def _detect_dominant_chains(
-        matrix: Dict[str, Dict[str, float]],
-        threshold: float = 0.4,
-    ) -> List[Dict]:
+    @classmethod
+    def _detect_chain_loops(cls, counts: NgramCounts, labels: Dict[str, str],
+                            threshold: float = 0.6, min_support: int = 3) -> List[Dict]:
         """
-        지배적 패스 시퀀스 탐지.
-        전이 확률이 threshold 이상인 경우 습관으로 간주.
+        2차 체인 (A → B → C).
+        직전 두 심볼이 같을 때 다음 심볼이 threshold 이상 반복되면 루프로 간주.
         """
-        habits = []
-        for from_type, to_probs in matrix.items():
-            for to_type, prob in to_probs.items():
-                if prob >= threshold:
-                    habits.append({
-                        'from': from_type,
-                        'from_label': HabitLoopAnalyzer.PASS_TYPES.get(from_type, from_type),
-                        'to': to_type,
-                        'to_label': HabitLoopAnalyzer.PASS_TYPES.get(to_type, to_type),
-                        'probability': round(prob * 100, 1),
-                        'is_predictable': prob >= 0.6,
-                        'habit_strength': 'strong' if prob >= 0.6 else 'moderate',
-                    })
-
-        habits.sort(key=lambda x: x['probability'], reverse=True)
-        return habits
+        return [{
+            'sequence': [*chain['context'], chain['next']],
+            'labels': [labels.get(s, s) for s in (*chain['context'], chain['next'])],
+            'probability': round(chain['probability'] * 100, 1),
+            'support': chain['support'],
+        } for chain in counts.chains(order=2, threshold=threshold, min_support=min_support)[:5]]
 
     @staticmethod
-    def _compute_shot_zone_entropy(shot_details: List[Dict]) -> Optional[float]:
+    def _round(value: Optional[float]) -> Optional[float]:
+        return round(value, 3) if value is not None else None
+
+    @staticmethod
+    def _compute_shot_zone_entropy(shot_grid: PitchGrid) -> Optional[float]:
         """
-        슛 존 고착화 스코어 = 슛 x,y 좌표의 엔트로피.
+        슛 존 고착화 스코어 = 슛 x,y 좌표의 엔트로피 (3x3 존).
         낮을수록 예측 가능한 슈터 (항상 같은 위치에서 슛).
         """
-        if len(shot_details) < 5:
+        total = shot_grid.total
+        if total < 5:
             return None
 
-        # Zone classification
-        zones = []
-        for shot in shot_details:
-            x = float(shot.get('x', 0.5))
-            y = float(shot.get('y', 0.5))
-
-            # Grid 3x3 zone
-            x_zone = 0 if x < 0.33 else (1 if x < 0.66 else 2)
-            y_zone = 0 if y < 0.33 else (1 if y < 0.66 else 2)
-            zones.append(f"{x_zone}_{y_zone}")
-
-        if not zones:
-            return None
-
-        from collections import Counter
-        counts = Counter(zones)
-        total = len(zones)
+        counts = shot_grid.zones(x_edges=(0.33, 0.66), y_edges=(0.33, 0.66)).ravel()
+        probs = counts[counts > 0] / total
         max_entropy = math.log2(9)  # 9 zones max
-
-        entropy = -sum(
-            (c / total) * math.log2(c / total)
-            for c in counts.values() if c > 0
-        )
+        entropy = float(-(probs * np.log2(probs)).sum())
 
         # Normalize 0-1 (0 = always same zone = predictable, 1 = perfectly spread)
         normalized = entropy / max_entropy if max_entropy > 0 else 0
@@ -155,17 +113,14 @@ class HabitLoopAnalyzer:
         def avg_long_pass_ratio(match_list):
             ratios = []
             for m in match_list:
-                raw = m.get('raw_data') or {}
-                match_info_list = raw.get('matchInfo', [])
-                for info in match_info_list:
-                    pass_data = info.get('pass') or {}
-                    if isinstance(pass_data, dict):
-                        short = pass_data.get('shortPassTry', 0) or 0
-                        long_ = pass_data.get('longPassTry', 0) or 0
-                        total = short + long_
-                        if total > 0:
-                            ratios.append(long_ / total)
-                            break
+                record = m.get('record')
+                if record is None:
+                    continue
+                short = record.passes.get('shortPassTry', 0) or 0
+                long_ = record.passes.get('longPassTry', 0) or 0
+                total = short + long_
+                if total > 0:
+                    ratios.append(long_ / total)
             return sum(ratios) / len(ratios) if ratios else None
 
         low_poss_ratio = avg_long_pass_ratio(low_poss_matches)
@@ -193,40 +148,46 @@ class HabitLoopAnalyzer:
     @classmethod
     def analyze_habit_loops(
         cls,
-        matches_raw: List[Dict],
-        user_ouid: str,
-        shot_details: List[Dict],
+        records: List[TeamMatchRecord],
+        shot_grid: PitchGrid,
         matches: List[Dict],
+        habit_counts: Optional[Dict[str, NgramCounts]] = None,
     ) -> Dict[str, Any]:
         """
         습관 루프 분석 메인.
 
         Args:
-            matches_raw: Match.raw_data 목록
-            user_ouid: 사용자 OUID
-            shot_details: ShotDetail 딕셔너리 목록
-            matches: Match 딕셔너리 목록 (raw_data 포함)
+            records: 경기별 유저 TeamMatchRecord 목록 (최신 경기 먼저)
+            shot_grid: 분석 구간 슛 위치 그리드 (MatchGrids.window)
+            matches: Match 딕셔너리 목록 ('record' 포함)
+            habit_counts: 저장된 습관 엔진 카운트 {'pass', 'shot'} (없으면 records로 계산)
 
         Returns:
-            {pass_habits, shot_zone_habit, stress_response, good_habits, bad_habits, insights}
+            {pass_habits, shot_zone_habit, stress_response, good_habits, bad_habits, insights,
+             sequence_scope}
         """
-        if len(matches_raw) < 10:
+        if len(records) < 10:
             return {
                 **cls._empty_result(),
                 'insights': ['습관 루프 탐지에는 최소 10경기 이상의 데이터가 필요합니다.'],
             }
 
+        sequence_scope = 'history' if habit_counts is not None else 'window'
+        if habit_counts is None:
+            habit_counts = NgramCounts.from_records(reversed(records))
+        pass_counts = habit_counts['pass']
+        shot_counts = habit_counts['shot']
+
         # 1. 패스 시퀀스 마르코프 체인
-        pass_sequence = cls._build_pass_sequence(matches_raw, user_ouid)
-        transition_matrix = cls._compute_markov_transition_matrix(pass_sequence)
-        dominant_chains = cls._detect_dominant_chains(transition_matrix)
+        transition_matrix = cls._transition_matrix(pass_counts)
+        dominant_chains = cls._detect_dominant_chains(pass_counts)
 
         # 분류: 좋은 습관 vs 나쁜 습관
         good_chains = [c for c in dominant_chains if not c['is_predictable']]
         bad_chains = [c for c in dominant_chains if c['is_predictable']]
 
         # 2. 슛 존 고착화
-        shot_entropy = cls._compute_shot_zone_entropy(shot_details)
+        shot_entropy = cls._compute_shot_zone_entropy(shot_grid)
         shot_habit = cls._classify_shot_zone_habit(shot_entropy)
 
         # 3. 압박 반응 패턴
@@ -239,10 +200,20 @@ class HabitLoopAnalyzer:
         insights = cls._generate_insights(dominant_chains, shot_habit, stress_response, post_goal_pattern)
 
         return {
-            'matches_analyzed': len(matches_raw),
-            'pass_sequence_length': len(pass_sequence),
+            'matches_analyzed': len(records),
+            # 시퀀스 필드의 범위: 'history' = 저장된 전체 기록, 'window' = 분석 구간
+            'sequence_scope': sequence_scope,
+            'pass_sequence_length': pass_counts.total(0),
             'transition_matrix': transition_matrix,
             'dominant_pass_chains': dominant_chains,
+            'pass_chain_loops': cls._detect_chain_loops(pass_counts, cls.PASS_TYPES),
+            'pass_entropy': cls._round(pass_counts.entropy(1)),
+            'shot_sequence': {
+                'shots': shot_counts.total(0),
+                'entropy': cls._round(shot_counts.entropy(0)),
+                'conditional_entropy': cls._round(shot_counts.entropy(1)),
+                'loops': cls._detect_chain_loops(shot_counts, cls.SHOT_SYMBOL_LABELS),
+            },
             'good_habits': good_chains[:3],
             'bad_habits': bad_chains[:3],
             'shot_zone_habit': shot_habit,
@@ -384,9 +355,13 @@ class HabitLoopAnalyzer:
     def _empty_result() -> Dict[str, Any]:
         return {
             'matches_analyzed': 0,
+            'sequence_scope': None,
             'pass_sequence_length': 0,
             'transition_matrix': {},
             'dominant_pass_chains': [],
+            'pass_chain_loops': [],
+            'pass_entropy': None,
+            'shot_sequence': {'shots': 0, 'entropy': None, 'conditional_entropy': None, 'loops': []},
             'good_habits': [],
             'bad_habits': [],
             'shot_zone_habit': {'entropy': None, 'level': 'unknown', 'label': '데이터 부족'},
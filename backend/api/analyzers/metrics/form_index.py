@@ -6,6 +6,8 @@ Form Index: 0-100 scale where 100 = peak form, 0 = worst form
 from typing import List, Dict, Any
 from decimal import Decimal
 
+from .rolling import RollingWindows
+
 
 class FormIndexCalculator:
     """Calculate player form index based on recent performances"""
@@ -206,14 +208,10 @@ class FormIndexCalculator:
             return 'stable'
 
         mid_point = len(performances) // 2
-        first_half = performances[:mid_point]
-        second_half = performances[mid_point:]
-
-        # Calculate average ratings for each half
-        first_avg = sum(float(p.get('rating', 0)) for p in first_half) / len(first_half)
-        second_avg = sum(float(p.get('rating', 0)) for p in second_half) / len(second_half)
+        ratings = RollingWindows([float(p.get('rating', 0)) for p in performances])
 
-        difference = second_avg - first_avg
+        # Average ratings of each half, from the shared prefix sums
+        difference = ratings.range_mean(mid_point, ratings.n) - ratings.range_mean(0, mid_point)
 
         if difference > 0.5:
             return 'improving'
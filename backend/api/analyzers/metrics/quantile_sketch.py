@@ -0,0 +1,123 @@
+"""
+Quantile Sketch
+KLL streaming quantile sketch (Karnin, Lang, Liberty 2016).
+
+Values are appended to level 0; a level that reaches its capacity is sorted
+and every other item (random offset) is promoted to the level above, where
+it stands for twice as many values. Capacities shrink by 2/3 per level below
+the top, so the sketch holds O(k) items for any stream length, with rank
+error about 1.7 / k (≈1% at k=200). Sketches merge by concatenating levels,
+so per-process buffers and stored snapshots combine freely.
+
+Queries go through `cdf()`: the items sorted once with cumulative weights,
+after which a rank or quantile is one bisect (O(log k)).
+"""
+import math
+import random
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class QuantileCdf:
+    """Sorted sketch items with cumulative weights; O(log k) rank / quantile"""
+
+    def __init__(self, values: List[float], cumulative: List[int]):
+        self.values = values
+        self.cumulative = cumulative
+        self.n = cumulative[-1] if cumulative else 0
+
+    def _weight_below(self, index: int) -> int:
+        return self.cumulative[index - 1] if index > 0 else 0
+
+    def percentile(self, value: float) -> Optional[float]:
+        """Share of the stream below `value` (ties count half), 0-100"""
+        if not self.n:
+            return None
+        below = self._weight_below(bisect_left(self.values, value))
+        at_or_below = self._weight_below(bisect_right(self.values, value))
+        return 100.0 * (below + at_or_below) / (2 * self.n)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Smallest item whose cumulative weight reaches q (0-1) of the stream"""
+        if not self.n:
+            return None
+        index = bisect_left(self.cumulative, q * self.n)
+        return self.values[min(index, len(self.values) - 1)]
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch"""
+
+    def __init__(self, k: int = 200, rng: Optional[random.Random] = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[List[float]] = [[]]
+        self._rng = rng or random.Random()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _compress(self) -> None:
+        while self._size() > self._max_size():
+            for h, items in enumerate(self.levels):
+                if len(items) >= self._capacity(h):
+                    break
+            if h + 1 == len(self.levels):
+                self.levels.append([])
+            items = sorted(self.levels[h])
+            # An odd item out stays at this level so total weight is preserved
+            keep = [items.pop()] if len(items) % 2 else []
+            self.levels[h + 1].extend(items[self._rng.randint(0, 1)::2])
+            self.levels[h] = keep
+
+    def update(self, value: float) -> None:
+        self.levels[0].append(float(value))
+        self.n += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def update_many(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.levels[0].append(float(value))
+            self.n += 1
+        self._compress()
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def cdf(self) -> QuantileCdf:
+        weighted = sorted(
+            (value, 1 << h) for h, items in enumerate(self.levels) for value in items
+        )
+        return QuantileCdf(
+            [value for value, _ in weighted],
+            list(accumulate(weight for _, weight in weighted)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'k': self.k,
+            'n': self.n,
+            'levels': [[round(v, 4) for v in items] for items in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'KLLSketch':
+        sketch = cls(k=data.get('k', 200))
+        sketch.n = int(data.get('n', 0))
+        sketch.levels = [list(items) for items in data.get('levels', [])] or [[]]
+        return sketch
@@ -0,0 +1,61 @@
+"""
+Rolling Windows
+Rolling sums / means / label counts over a per-match series, from prefix sums.
+
+Every window of every size is a difference of two prefix sums, so a series
+of n matches costs O(n) once and O(n) per window size, instead of
+re-scoring and re-summing each window (O(n * window)). Per-match scores are
+computed once by the caller and passed in as `values`.
+
+Arrays returned for a window of size w have n - w + 1 entries; entry k is
+the window ending at match k + w - 1 (oldest first).
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class RollingWindows:
+    """Prefix-sum rolling aggregates of one series (and optional outcome labels)"""
+
+    def __init__(self, values: Sequence[float], labels: Optional[Sequence[Any]] = None):
+        self.values = np.asarray(values, dtype=float)
+        self.n = len(self.values)
+        self._prefix = np.concatenate(([0.0], np.cumsum(self.values)))
+        self._labels = None if labels is None else np.asarray(labels, dtype=object)
+        self._label_prefix: Dict[Any, np.ndarray] = {}
+
+    def sums(self, window: int) -> np.ndarray:
+        if window <= 0 or window > self.n:
+            return np.empty(0)
+        return self._prefix[window:] - self._prefix[:-window]
+
+    def means(self, window: int) -> np.ndarray:
+        return self.sums(window) / window if window > 0 else np.empty(0)
+
+    def counts(self, label: Any, window: int) -> np.ndarray:
+        """Occurrences of `label` per window"""
+        if window <= 0 or window > self.n:
+            return np.empty(0, dtype=int)
+        prefix = self._label_prefix.get(label)
+        if prefix is None:
+            prefix = np.concatenate(([0], np.cumsum(self._labels == label)))
+            self._label_prefix[label] = prefix
+        return prefix[window:] - prefix[:-window]
+
+    def range_mean(self, start: int, stop: int) -> float:
+        """Mean of values[start:stop]"""
+        if stop <= start:
+            return 0.0
+        return float(self._prefix[stop] - self._prefix[start]) / (stop - start)
+
+
+def runs(labels: Sequence[Any]) -> List[Tuple[Any, int, int]]:
+    """Consecutive runs of equal labels as (label, start, length)"""
+    labels = np.asarray(labels, dtype=object)
+    if not len(labels):
+        return []
+    change = np.flatnonzero(labels[1:] != labels[:-1]) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [len(labels)]))
+    return [(labels[s], int(s), int(e - s)) for s, e in zip(starts, ends)]
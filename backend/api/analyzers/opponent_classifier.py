@@ -1,12 +1,20 @@
 """
 Opponent Type Classifier & Win Rate Map — D2
-내 매치 기록 안에 있는 상대팀 데이터를 K-means로 6개 유형으로 분류.
+내 매치 기록 안에 있는 상대팀 데이터를 6개 유형 중심점으로 분류.
 유형별 내 승률/성적/취약점 분석.
+
+중심점은 도메인 지식 기반 기본값, 또는 저장된 전체 상대 데이터로
+mini-batch k-means 학습한 값 (opponent_clustering, 오프라인 갱신).
 """
-import math
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from collections import defaultdict
 
+import numpy as np
+from django.conf import settings
+
+from .opponent_clustering import load_centroids
+from .team_record import TeamMatchRecord
+
 
 class OpponentClassifier:
     """상대 유형 분류기"""
@@ -63,132 +71,105 @@ class OpponentClassifier:
         },
     ]
 
+    # 특성 벡터 열 순서 (feature matrix / centroid matrix 공통)
+    FEATURES = (
+        'possession', 'short_ratio', 'long_ratio', 'through_ratio',
+        'pass_accuracy', 'attack_width', 'total_shots', 'defensive_actions',
+    )
+
+    # 6개 유형의 중심점 (도메인 지식 기반, ARCHETYPES 순서) — 학습된 중심점이 없을 때 사용
+    DEFAULT_CENTROIDS = np.array([
+        [0.60, 0.55, 0.20, 0.08, 0.88, 0.12, 0.50, 0.40],  # 0: 점유형
+        [0.40, 0.35, 0.45, 0.06, 0.75, 0.13, 0.65, 0.35],  # 1: 직접형 카운터
+        [0.50, 0.45, 0.30, 0.05, 0.80, 0.22, 0.60, 0.38],  # 2: 측면 과부하형
+        [0.48, 0.40, 0.35, 0.04, 0.78, 0.14, 0.45, 0.50],  # 3: 세트피스 의존형
+        [0.50, 0.45, 0.30, 0.08, 0.82, 0.15, 0.55, 0.45],  # 4: 균형형
+        [0.52, 0.48, 0.25, 0.10, 0.83, 0.15, 0.58, 0.70],  # 5: 고압박형
+    ])
+
     @staticmethod
-    def _extract_opponent_features(raw_data: Dict, user_ouid: str) -> Optional[Dict[str, float]]:
+    def _extract_opponent_features(record: TeamMatchRecord) -> Optional[List[float]]:
         """
-        매치 raw_data에서 상대방 특성 추출.
-        상대방 matchInfo를 찾아 분석.
+        유저 TeamMatchRecord의 상대방 섹션에서 특성 추출 (FEATURES 순서의 행).
         """
-        match_info_list = raw_data.get('matchInfo', [])
-        opponent_info = None
-
-        for info in match_info_list:
-            if info.get('ouid') != user_ouid:
-                opponent_info = info
-                break
-
-        if not opponent_info:
+        opponent = record.opponent
+        if opponent is None:
             return None
 
         # Possession
-        match_detail = opponent_info.get('matchDetail') or {}
-        possession = float(match_detail.get('possession', 50) or 50)
+        possession = float(opponent.match_detail.get('possession', 50) or 50)
 
         # Pass data
-        pass_data = opponent_info.get('pass') or {}
-        if isinstance(pass_data, dict):
-            pass_try = float(pass_data.get('passTry', 1) or 1)
-            short_pass = float(pass_data.get('shortPassTry', 0) or 0)
-            long_pass = float(pass_data.get('longPassTry', 0) or 0)
-            through_pass = float(pass_data.get('throughPassTry', 0) or 0)
-            pass_success = float(pass_data.get('passSuccess', 0) or 0)
-        else:
-            pass_try = 1
-            short_pass = long_pass = through_pass = pass_success = 0
-
-        short_ratio = short_pass / max(pass_try, 1)
-        long_ratio = long_pass / max(pass_try, 1)
-        through_ratio = through_pass / max(pass_try, 1)
-        pass_accuracy = pass_success / max(pass_try, 1)
+        pass_data = opponent.passes
+        pass_try = max(float(pass_data.get('passTry', 1) or 1), 1)
+        short_pass = float(pass_data.get('shortPassTry', 0) or 0)
+        long_pass = float(pass_data.get('longPassTry', 0) or 0)
+        through_pass = float(pass_data.get('throughPassTry', 0) or 0)
+        pass_success = float(pass_data.get('passSuccess', 0) or 0)
 
         # Shooting
-        shoot_data = opponent_info.get('shoot') or {}
-        total_shots = float(shoot_data.get('shootTotal', 0) or 0)
-
-        # Get shot x-coord std (attack width) from shootDetail
-        shoot_detail = raw_data.get('shootDetail') or []
-        # Filter to opponent shots (heuristic: all shots in raw or filter by team)
-        x_coords = [float(s.get('x', 0.5)) for s in shoot_detail if s.get('x') is not None]
-        if len(x_coords) >= 3:
-            mean_x = sum(x_coords) / len(x_coords)
-            variance = sum((x - mean_x) ** 2 for x in x_coords) / len(x_coords)
-            attack_width = math.sqrt(variance)
-        else:
-            attack_width = 0.15  # default
+        total_shots = float(opponent.shoot.get('shootTotal', 0) or 0)
 
-        # Defense data
-        defence_data = opponent_info.get('defence') or {}
-        if isinstance(defence_data, dict):
-            tackle_try = float(defence_data.get('tackleTry', 0) or 0)
-            block = float(defence_data.get('block', 0) or 0)
-        else:
-            tackle_try = block = 0
+        # Get shot x-coord std (attack width) from the opponent's shootDetail
+        x_coords = [float(s['x']) for s in opponent.shoot_detail if s.get('x') is not None]
+        attack_width = float(np.std(x_coords)) if len(x_coords) >= 3 else 0.15  # default
 
-        defensive_actions = tackle_try + block
+        # Defense data
+        tackle_try = float(opponent.defence.get('tackleTry', 0) or 0)
+        block = float(opponent.defence.get('block', 0) or 0)
 
-        return {
-            'possession': possession / 100,          # 0-1
-            'short_ratio': short_ratio,              # 0-1
-            'long_ratio': long_ratio,                # 0-1
-            'through_ratio': through_ratio,          # 0-1
-            'pass_accuracy': pass_accuracy,          # 0-1
-            'attack_width': attack_width,            # 0-0.3+
-            'total_shots': min(total_shots / 20, 1), # normalized
-            'defensive_actions': min(defensive_actions / 30, 1),  # normalized
-        }
+        return [
+            possession / 100,                        # 0-1
+            short_pass / pass_try,                   # 0-1
+            long_pass / pass_try,                    # 0-1
+            through_pass / pass_try,                 # 0-1
+            pass_success / pass_try,                 # 0-1
+            attack_width,                            # 0-0.3+
+            min(total_shots / 20, 1),                # normalized
+            min((tackle_try + block) / 30, 1),       # normalized
+        ]
 
-    @staticmethod
-    def _euclidean_distance(a: Dict[str, float], b: Dict[str, float]) -> float:
-        """두 특성 벡터 간의 유클리드 거리"""
-        keys = set(a.keys()) & set(b.keys())
-        return math.sqrt(sum((a[k] - b[k]) ** 2 for k in keys))
+    @classmethod
+    def feature_matrix(cls, records: Iterable[Optional[TeamMatchRecord]]) -> Tuple[np.ndarray, List[int]]:
+        """(경기 수 × 8) 특성 행렬과 행별 원본 인덱스 (상대 데이터 없는 경기 제외)"""
+        rows, kept = [], []
+        for i, record in enumerate(records):
+            row = cls._extract_opponent_features(record) if record is not None else None
+            if row is not None:
+                rows.append(row)
+                kept.append(i)
+        return np.array(rows, dtype=float).reshape(-1, len(cls.FEATURES)), kept
 
-    @staticmethod
-    def _get_archetype_centroids() -> List[Dict[str, float]]:
+    @classmethod
+    def centroids(cls) -> np.ndarray:
         """
-        6개 유형의 중심점 (도메인 지식 기반 초기화).
-        실제 K-means 대신 도메인 지식 기반 분류 사용 (scikit-learn 불필요).
+        분류에 쓸 중심점 행렬 (6 × 8).
+        OPPONENT_LEARNED_CENTROIDS가 켜져 있고 `manage.py fit_opponent_centroids`로
+        학습된 파일이 있으면 그 값을, 아니면 도메인 기본값을 사용 (프로세스 캐시).
         """
-        return [
-            # 0: 점유형
-            {'possession': 0.60, 'short_ratio': 0.55, 'long_ratio': 0.20, 'through_ratio': 0.08,
-             'pass_accuracy': 0.88, 'attack_width': 0.12, 'total_shots': 0.50, 'defensive_actions': 0.40},
-            # 1: 직접형 카운터
-            {'possession': 0.40, 'short_ratio': 0.35, 'long_ratio': 0.45, 'through_ratio': 0.06,
-             'pass_accuracy': 0.75, 'attack_width': 0.13, 'total_shots': 0.65, 'defensive_actions': 0.35},
-            # 2: 측면 과부하형
-            {'possession': 0.50, 'short_ratio': 0.45, 'long_ratio': 0.30, 'through_ratio': 0.05,
-             'pass_accuracy': 0.80, 'attack_width': 0.22, 'total_shots': 0.60, 'defensive_actions': 0.38},
-            # 3: 세트피스 의존형
-            {'possession': 0.48, 'short_ratio': 0.40, 'long_ratio': 0.35, 'through_ratio': 0.04,
-             'pass_accuracy': 0.78, 'attack_width': 0.14, 'total_shots': 0.45, 'defensive_actions': 0.50},
-            # 4: 균형형
-            {'possession': 0.50, 'short_ratio': 0.45, 'long_ratio': 0.30, 'through_ratio': 0.08,
-             'pass_accuracy': 0.82, 'attack_width': 0.15, 'total_shots': 0.55, 'defensive_actions': 0.45},
-            # 5: 고압박형
-            {'possession': 0.52, 'short_ratio': 0.48, 'long_ratio': 0.25, 'through_ratio': 0.10,
-             'pass_accuracy': 0.83, 'attack_width': 0.15, 'total_shots': 0.58, 'defensive_actions': 0.70},
-        ]
+        if not settings.OPPONENT_LEARNED_CENTROIDS:
+            return cls.DEFAULT_CENTROIDS
+        learned = load_centroids(settings.OPPONENT_CENTROIDS_PATH, cls.FEATURES)
+        return cls.DEFAULT_CENTROIDS if learned is None else learned
 
-    @classmethod
-    def _classify_opponent(cls, features: Dict[str, float]) -> int:
-        """특성 벡터를 가장 가까운 유형 중심점으로 분류"""
-        centroids = cls._get_archetype_centroids()
-        distances = [cls._euclidean_distance(features, c) for c in centroids]
-        return distances.index(min(distances))
+    @staticmethod
+    def classify_matrix(features: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """모든 행을 한 번의 브로드캐스트 거리 계산으로 가장 가까운 중심점에 배정"""
+        if not len(features):
+            return np.empty(0, dtype=int)
+        distances = ((features[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
 
     @classmethod
     def classify_opponents(
         cls,
-        matches: List[Dict],  # Match objects with raw_data
-        user_ouid: str,
+        matches: List[Dict],
     ) -> Dict[str, Any]:
         """
         상대 유형 분류 및 유형별 승률 분석.
 
         Args:
-            matches: Match 딕셔너리 목록 (raw_data 포함)
-            user_ouid: 사용자 OUID
+            matches: Match 딕셔너리 목록 (유저 TeamMatchRecord를 'record'로 포함)
 
         Returns:
             {archetype_summary, win_rate_map, nemesis_type, insights}
@@ -206,17 +187,12 @@ class OpponentClassifier:
             'matches': []
         } for i in range(6)}
 
-        classified_count = 0
-        for match in matches:
-            raw_data = match.get('raw_data') or {}
-            if not raw_data:
-                continue
-
-            features = cls._extract_opponent_features(raw_data, user_ouid)
-            if features is None:
-                continue
+        features, kept = cls.feature_matrix(match.get('record') for match in matches)
+        labels = cls.classify_matrix(features, cls.centroids())
 
-            archetype_idx = cls._classify_opponent(features)
+        classified_count = len(kept)
+        for match_idx, archetype_idx in zip(kept, labels.tolist()):
+            match = matches[match_idx]
             result = match.get('result', 'lose')
             goals_for = match.get('goals_for', 0)
             goals_against = match.get('goals_against', 0)
@@ -232,8 +208,6 @@ class OpponentClassifier:
             else:
                 stats['draws'] += 1
 
-            classified_count += 1
-
         # Build summary
         archetype_summary = []
         for idx, archetype_info in enumerate(cls.ARCHETYPES):
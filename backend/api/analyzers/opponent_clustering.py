@@ -0,0 +1,94 @@
+"""
+Opponent Clustering
+Mini-batch k-means for OpponentClassifier centroids, fitted offline.
+
+`manage.py fit_opponent_centroids` streams every stored match's opponent
+features through `MiniBatchKMeans.partial_fit` and saves the centroids as
+JSON (OPPONENT_CENTROIDS_PATH). Clusters are initialized from the domain
+centroids, so cluster i keeps archetype i's label while its position moves
+to where real opponents are. Workers load the file once per process (and
+again when it is replaced) when OPPONENT_LEARNED_CENTROIDS is on.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+class MiniBatchKMeans:
+    """Mini-batch k-means (Sculley 2010): centers are running means with rate 1 / assigned count"""
+
+    def __init__(self, init: np.ndarray):
+        self.centroids = np.array(init, dtype=float)
+        self.counts = np.zeros(len(self.centroids))
+        self.samples = 0
+
+    def assign(self, batch: np.ndarray) -> np.ndarray:
+        distances = ((batch[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
+
+    def partial_fit(self, batch: np.ndarray) -> 'MiniBatchKMeans':
+        """One update step with a (n × features) batch"""
+        if not len(batch):
+            return self
+        labels = self.assign(batch)
+        for k in np.unique(labels):
+            members = batch[labels == k]
+            self.counts[k] += len(members)
+            # Running mean of everything assigned so far: c += sum(x - c) / count
+            self.centroids[k] += (members - self.centroids[k]).sum(axis=0) / self.counts[k]
+        self.samples += len(batch)
+        return self
+
+    def inertia(self, data: np.ndarray) -> float:
+        """Sum of squared distances to the nearest center"""
+        if not len(data):
+            return 0.0
+        distances = ((data[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return float(distances.min(axis=1).sum())
+
+
+def save_centroids(path, centroids: np.ndarray, features: Sequence[str], samples: int) -> None:
+    """Write centroids atomically (temp file + rename) so workers never read a partial file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'features': list(features),
+        'centroids': np.round(centroids, 6).tolist(),
+        'samples': int(samples),
+        'fitted_at': datetime.now(timezone.utc).isoformat(),
+    }
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    tmp_path.write_text(json.dumps(payload))
+    os.replace(tmp_path, path)
+
+
+_cache: Dict[str, tuple] = {}
+_cache_lock = threading.Lock()
+
+
+def load_centroids(path, features: Sequence[str]) -> Optional[np.ndarray]:
+    """Saved centroid matrix (cached per file mtime), None if missing or for other features"""
+    path = str(path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[2] if cached[1] == list(features) else None
+
+    with _cache_lock:
+        try:
+            with open(path) as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        centroids = np.array(payload['centroids'], dtype=float)
+        _cache[path] = (mtime, payload.get('features'), centroids)
+        return centroids if payload.get('features') == list(features) else None
@@ -12,6 +12,8 @@ import math
 from typing import List, Dict, Any, Optional
 from collections import Counter
 
+from .pitch_grid import PitchGrid
+
 
 class OpponentDNAAnalyzer:
     """상대 전술 DNA 프로파일 분석기 (개선판)"""
@@ -72,22 +74,13 @@ class OpponentDNAAnalyzer:
     @staticmethod
     def _compute_attack_width(shoot_detail: List[Dict]) -> Optional[float]:
         """
-        공격 폭 지수 = 슛 x좌표의 표준편차.
+        공격 폭 지수 = 슛 x좌표의 표준편차 (0.01 그리드 기준).
         반드시 opponent_match_info.get('shootDetail', []) 를 전달해야 함.
         """
-        x_coords = []
-        for s in shoot_detail:
-            x = s.get('x')
-            if x is not None:
-                try:
-                    x_coords.append(float(x))
-                except (TypeError, ValueError):
-                    pass
-        if len(x_coords) < 3:
+        grid = PitchGrid.from_points(shoot_detail)
+        if grid.total < 3:
             return None
-        mean_x = sum(x_coords) / len(x_coords)
-        variance = sum((x - mean_x) ** 2 for x in x_coords) / len(x_coords)
-        return round(math.sqrt(variance), 3)
+        return round(grid.std('x'), 3)
 
     @staticmethod
     def _compute_setpiece_dependency(match_info: Dict) -> float:
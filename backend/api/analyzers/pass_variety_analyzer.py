@@ -4,6 +4,8 @@ Analyzes different types of passes and attacking build-up style
 """
 from typing import Dict, Any, List
 
+from .team_record import TeamMatchRecord
+
 
 class PassVarietyAnalyzer:
     """
@@ -15,12 +17,12 @@ class PassVarietyAnalyzer:
     """
 
     @classmethod
-    def analyze_pass_variety(cls, matches_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_pass_variety(cls, records: List[TeamMatchRecord]) -> Dict[str, Any]:
         """
         Comprehensive pass variety analysis across multiple matches
 
         Args:
-            matches_data: List of match raw_data dictionaries
+            records: The user's TeamMatchRecord per match
 
         Returns:
             Dictionary with pass variety analysis
@@ -38,15 +40,10 @@ class PassVarietyAnalyzer:
         total_driven_ground_success = 0
         total_pass_try = 0
         total_pass_success = 0
-        total_matches = len(matches_data)
-
-        for match_data in matches_data:
-            if not match_data or 'matchInfo' not in match_data:
-                continue
+        total_matches = len(records)
 
-            # Get user's match info
-            match_info = match_data['matchInfo'][0]
-            pass_data = match_info.get('pass') or {}  # Handle None case
+        for record in records:
+            pass_data = record.passes
 
             # Short passes (handle None values)
             total_short_pass_try += pass_data.get('shortPassTry') or 0
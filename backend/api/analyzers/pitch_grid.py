@@ -0,0 +1,146 @@
+"""
+Pitch Grid
+Quantized 2D histogram of pitch positions (shots, assist origins)
+
+Shot zones, heatmaps, attack width and wing/central splits each looped over
+raw x/y per shot in Python. A PitchGrid bins positions once into a fixed
+GRID_SIZE × GRID_SIZE grid over the normalized pitch (x: 0 → 1 towards the
+opponent goal, y: 0 → 1 across), indexed [x cell, y cell]. Per-match grids
+are stored at ingest (MatchGrid, api.utils.match_grids); a window's grid is
+their sum, and the queries below are array reductions.
+
+Cells are 0.01 wide, so the two-decimal thresholds analyzers use (0.25, 0.33,
+0.35, 0.65, 0.95, ...) fall on cell edges: a region [a, b) counts exactly the
+points with a <= v < b. Moments (mean, std) use cell centers, at most 0.005
+from the raw coordinate.
+
+Serialized grids are sparse (a match has a handful of shots): the non-empty
+flat cell indices, then their counts, as little-endian uint16 arrays.
+"""
+import math
+from itertools import repeat
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+GRID_SIZE = 100
+
+_DTYPE = '<u2'
+_MAX_COUNT = np.iinfo(np.uint16).max
+
+
+def _coordinate(value: Any) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+class PitchGrid:
+    """Point counts per 0.01 × 0.01 pitch cell"""
+
+    def __init__(self, cells: Optional[np.ndarray] = None):
+        self.cells = cells if cells is not None else np.zeros((GRID_SIZE, GRID_SIZE), dtype=np.int64)
+
+    @staticmethod
+    def _index(values: np.ndarray) -> np.ndarray:
+        # The epsilon keeps edge values (0.29 * 100 = 28.999...) in the cell they start
+        return np.clip(np.floor(values * GRID_SIZE + 1e-9).astype(np.int64), 0, GRID_SIZE - 1)
+
+    @classmethod
+    def from_xy(cls, points: Iterable[Tuple[Any, Any]], weights: Optional[Iterable[int]] = None) -> 'PitchGrid':
+        """
+        Grid of (x, y) pairs, each adding 1 (or its integer weight) to its cell.
+        Pairs without a numeric coordinate are skipped.
+        """
+        weights = repeat(1) if weights is None else weights
+        rows = []
+        for (x, y), weight in zip(points, weights):
+            x, y = _coordinate(x), _coordinate(y)
+            if x is not None and y is not None:
+                rows.append((x, y, weight))
+        grid = cls()
+        if rows:
+            xyw = np.asarray(rows, dtype=np.float64)
+            np.add.at(grid.cells, (cls._index(xyw[:, 0]), cls._index(xyw[:, 1])), xyw[:, 2].astype(np.int64))
+        return grid
+
+    @classmethod
+    def from_points(cls, points: Iterable[dict], x_key: str = 'x', y_key: str = 'y') -> 'PitchGrid':
+        """Grid of dict points (shot details / shootDetail entries)"""
+        return cls.from_xy((p.get(x_key), p.get(y_key)) for p in points)
+
+    @classmethod
+    def sum(cls, grids: Iterable['PitchGrid']) -> 'PitchGrid':
+        total = cls()
+        for grid in grids:
+            total.cells += grid.cells
+        return total
+
+    def __add__(self, other: 'PitchGrid') -> 'PitchGrid':
+        return PitchGrid(self.cells + other.cells)
+
+    @property
+    def total(self) -> int:
+        return int(self.cells.sum())
+
+    @staticmethod
+    def _edge(value: float) -> int:
+        return min(max(int(round(value * GRID_SIZE)), 0), GRID_SIZE)
+
+    def count(self, x: Tuple[float, float] = (0.0, 1.0), y: Tuple[float, float] = (0.0, 1.0)) -> int:
+        """Points with x[0] <= x < x[1] and y[0] <= y < y[1] (an upper bound of 1.0 includes 1.0)"""
+        return int(self.cells[self._edge(x[0]):self._edge(x[1]), self._edge(y[0]):self._edge(y[1])].sum())
+
+    def zones(self, x_edges: Sequence[float] = (), y_edges: Sequence[float] = ()) -> np.ndarray:
+        """Counts per zone split at the inner edges, shape (len(x_edges) + 1, len(y_edges) + 1)"""
+        x_starts = [0] + [self._edge(e) for e in x_edges]
+        y_starts = [0] + [self._edge(e) for e in y_edges]
+        return np.add.reduceat(np.add.reduceat(self.cells, x_starts, axis=0), y_starts, axis=1)
+
+    @staticmethod
+    def valid_bins(n: int) -> bool:
+        """Whether n bins split the grid into equal-width bins (n divides GRID_SIZE)"""
+        return 1 <= n <= GRID_SIZE and GRID_SIZE % n == 0
+
+    def rebin(self, nx: int, ny: int) -> np.ndarray:
+        """Counts on a coarser nx × ny grid of equal bins; nx and ny must divide GRID_SIZE"""
+        if not (self.valid_bins(nx) and self.valid_bins(ny)):
+            raise ValueError(f'bins must divide {GRID_SIZE}')
+        return self.cells.reshape(nx, GRID_SIZE // nx, ny, GRID_SIZE // ny).sum(axis=(1, 3))
+
+    def _marginal(self, axis: str) -> Tuple[np.ndarray, np.ndarray]:
+        weights = self.cells.sum(axis=1 if axis == 'x' else 0).astype(np.float64)
+        centers = (np.arange(GRID_SIZE) + 0.5) / GRID_SIZE
+        return centers, weights
+
+    def mean(self, axis: str = 'x') -> Optional[float]:
+        centers, weights = self._marginal(axis)
+        total = weights.sum()
+        return float((centers * weights).sum() / total) if total else None
+
+    def std(self, axis: str = 'x') -> Optional[float]:
+        """Population standard deviation of the points' `axis` coordinate"""
+        centers, weights = self._marginal(axis)
+        total = weights.sum()
+        if not total:
+            return None
+        mean = (centers * weights).sum() / total
+        return float(math.sqrt(((centers - mean) ** 2 * weights).sum() / total))
+
+    def to_bytes(self) -> bytes:
+        flat = self.cells.ravel()
+        index = np.flatnonzero(flat)
+        counts = np.minimum(flat[index], _MAX_COUNT)
+        return index.astype(_DTYPE).tobytes() + counts.astype(_DTYPE).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PitchGrid':
+        values = np.frombuffer(data, dtype=_DTYPE)
+        if values.size % 2:
+            raise ValueError('truncated grid')
+        half = values.size // 2
+        grid = cls()
+        grid.cells.ravel()[values[:half].astype(np.int64)] = values[half:]
+        return grid
@@ -6,12 +6,26 @@ from typing import List, Dict, Any, Optional
 from decimal import Decimal
 import math
 
+from api.analyzers.contracts import reads
 from api.analyzers.metrics.form_index import FormIndexCalculator
 from api.analyzers.metrics.impact_score import ImpactScoreCalculator
 from api.analyzers.position_evaluation_system import PositionEvaluationSystem
 from api.analyzers.metrics.position_specific_evaluator import PositionSpecificEvaluator
 
 
+@reads(performance_fields=(
+    'spid', 'player_name', 'season_id', 'position', 'grade', 'rating', 'goals', 'assists',
+    'shots', 'shots_on_target', 'shot_accuracy',
+    'pass_attempts', 'pass_success', 'pass_success_rate',
+    'short_pass_attempts', 'short_pass_success', 'long_pass_attempts', 'long_pass_success',
+    'through_pass_attempts', 'through_pass_success',
+    'dribble_attempts', 'dribble_success', 'dribble_success_rate',
+    'tackle_attempts', 'tackle_success', 'interceptions', 'blocks', 'block_attempts',
+    'aerial_success', 'key_passes', 'fouls', 'yellow_cards', 'red_cards',
+    'saves', 'opponent_shots', 'goals_conceded', 'xg', 'xg_against',
+    # match result / score of each performance, for the impact score contexts
+    'match__result', 'match__goals_for', 'match__goals_against',
+))
 class PlayerPowerRanking:
     """
     Advanced player evaluation system combining multiple metrics:
@@ -52,7 +66,8 @@ class PlayerPowerRanking:
     def calculate_power_ranking(cls,
                                 player_performances: List[Dict[str, Any]],
                                 match_contexts: Optional[List[Dict[str, Any]]] = None,
-                                position: Optional[int] = None) -> Dict[str, Any]:
+                                position: Optional[int] = None,
+                                division: Optional[int] = None) -> Dict[str, Any]:
         """
         Calculate comprehensive power ranking for a player
 
@@ -60,6 +75,7 @@ class PlayerPowerRanking:
             player_performances: List of recent PlayerPerformance data (last 10 games)
             match_contexts: Optional list of match context data for impact calculation
             position: Player position code for position-specific ratings
+            division: Owner's division (User.max_division) for the percentile population
 
         Returns:
             Dictionary with complete power ranking analysis
@@ -131,7 +147,7 @@ class PlayerPowerRanking:
             'impact_analysis': impact_analysis,
             'position_rating': position_rating,
             'radar_data': radar_data,
-            'percentile_rank': cls._calculate_percentile_rank(power_score)
+            'percentile_rank': cls._calculate_percentile_rank(power_score, position_group, division)
         }
 
     # ---------------------------------------------------------------------------
@@ -882,12 +898,21 @@ class PlayerPowerRanking:
             }
 
     @classmethod
-    def _calculate_percentile_rank(cls, power_score: float) -> int:
+    def _calculate_percentile_rank(cls, power_score: float,
+                                   position_group: Optional[str] = None,
+                                   division: Optional[int] = None) -> int:
         """
-        Estimate percentile rank (assumes normal distribution)
-        This is a simplified estimation; ideally compare against all users
+        Percentile rank among our users' power scores (same position group / division
+        when enough samples, see DistributionService). Until the population has
+        DISTRIBUTION_MIN_SAMPLES scores, estimate assuming a normal distribution.
         """
-        # Assume mean=65, std_dev=15
+        from api.utils.distributions import DistributionService
+
+        percentile = DistributionService.percentile('power_score', power_score, position_group, division)
+        if percentile is not None:
+            return int(round(percentile))
+
+        # Fallback: assume mean=65, std_dev=15
         z_score = (power_score - 65) / 15
 
         # Convert z-score to percentile (simplified)
@@ -6,7 +6,15 @@ Ranker Gap Dashboard — D1
 import math
 from typing import List, Dict, Any, Optional
 
+from .contracts import reads
 
+
+@reads(
+    match_fields=('result', 'goals_for', 'shots', 'shots_on_target', 'pass_success_rate'),
+    # spid / position pick the cards whose ranker stats are fetched
+    performance_fields=('spid', 'position', 'rating', 'dribble_attempts', 'dribble_success'),
+    external=('ranker_stats',),
+)
 class RankerGapAnalyzer:
     """랭커 격차 대시보드 분석기"""
 
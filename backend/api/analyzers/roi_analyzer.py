@@ -11,6 +11,8 @@ Player Contribution Analyzer — C1 (v3)
 import math
 from typing import List, Dict, Any, Optional
 
+from .contracts import reads
+
 
 # ── 포지션 그룹 매핑 ──────────────────────────────────────────────────────────
 POSITION_GROUP_MAP: Dict[int, str] = {
@@ -95,6 +97,14 @@ CONTRIBUTION_TIERS = [
 ]
 
 
+@reads(
+    performance_fields=(
+        'spid', 'player_name', 'position', 'rating', 'goals', 'assists',
+        'shots_on_target', 'pass_attempts', 'pass_success',
+        'dribble_success', 'tackle_success', 'blocks',
+    ),
+    # trade_history is accepted but unused, so 'user_trade' is not declared
+)
 class ROIAnalyzer:
     """선수 기여도 분석기 — 포지션 맞춤 기여도 점수 산출"""
 
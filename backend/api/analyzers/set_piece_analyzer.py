@@ -5,7 +5,11 @@ Analyzes free kick, penalty kick, and corner kick efficiency
 from typing import Dict, Any, List
 from decimal import Decimal
 
+from .contracts import reads
+from .team_record import TeamMatchRecord
 
+
+@reads(raw_sections=('matchInfo',))
 class SetPieceAnalyzer:
     """
     Analyzes set piece performance including:
@@ -16,12 +20,12 @@ class SetPieceAnalyzer:
     """
 
     @classmethod
-    def analyze_set_pieces(cls, matches_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_set_pieces(cls, records: List[TeamMatchRecord]) -> Dict[str, Any]:
         """
         Comprehensive set piece analysis across multiple matches
 
         Args:
-            matches_data: List of match raw_data dictionaries
+            records: The user's TeamMatchRecord per match
 
         Returns:
             Dictionary with set piece analysis
@@ -36,13 +40,8 @@ class SetPieceAnalyzer:
         total_goals = 0
         total_shots = 0
 
-        for match_data in matches_data:
-            if not match_data or 'matchInfo' not in match_data:
-                continue
-
-            # Get user's match info (first item)
-            match_info = match_data['matchInfo'][0]
-            shoot_data = match_info.get('shoot') or {}  # Handle None case
+        for record in records:
+            shoot_data = record.shoot
 
             # Free kicks (handle None values)
             total_freekick_shots += shoot_data.get('shootFreekick') or 0
@@ -4,6 +4,8 @@ Analyzes shooting efficiency by location and type
 """
 from typing import Dict, Any, List
 
+from .team_record import TeamMatchRecord
+
 
 class ShootingQualityAnalyzer:
     """
@@ -15,12 +17,12 @@ class ShootingQualityAnalyzer:
     """
 
     @classmethod
-    def analyze_shooting_quality(cls, matches_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_shooting_quality(cls, records: List[TeamMatchRecord]) -> Dict[str, Any]:
         """
         Comprehensive shooting quality analysis across multiple matches
 
         Args:
-            matches_data: List of match raw_data dictionaries
+            records: The user's TeamMatchRecord per match
 
         Returns:
             Dictionary with shooting quality analysis
@@ -35,15 +37,10 @@ class ShootingQualityAnalyzer:
         total_shots = 0
         total_goals = 0
         total_effective_shots = 0
-        total_matches = len(matches_data)
-
-        for match_data in matches_data:
-            if not match_data or 'matchInfo' not in match_data:
-                continue
+        total_matches = len(records)
 
-            # Get user's match info
-            match_info = match_data['matchInfo'][0]
-            shoot_data = match_info.get('shoot') or {}  # Handle None case
+        for record in records:
+            shoot_data = record.shoot
 
             # Inside box (handle None values)
             total_shots_in_box += shoot_data.get('shootInPenalty') or 0
@@ -131,8 +128,8 @@ class ShootingQualityAnalyzer:
                 'conversion_rate': round(overall_conversion, 1),
                 'clinical_rating': round(clinical_rating, 1),
                 'shooting_style': shooting_style,
-                'shots_per_game': round(total_shots / total_matches, 1),
-                'goals_per_game': round(total_goals / total_matches, 2),
+                'shots_per_game': round(total_shots / total_matches, 1) if total_matches > 0 else 0,
+                'goals_per_game': round(total_goals / total_matches, 2) if total_matches > 0 else 0,
                 'matches_analyzed': total_matches
             },
             'insights': insights
@@ -6,7 +6,17 @@ Skill Gap Analyzer — B2
 import math
 from typing import List, Dict, Any
 
+from .contracts import reads
 
+
+@reads(
+    performance_fields=(
+        'spid', 'player_name', 'position', 'rating', 'goals', 'assists',
+        'shots', 'shots_on_target', 'pass_attempts', 'pass_success',
+        'dribble_attempts', 'dribble_success',
+    ),
+    external=('ranker_stats',),
+)
 class SkillGapAnalyzer:
     """랭커 대비 내 선수 활용 격차 분석기"""
 
@@ -94,6 +104,17 @@ class SkillGapAnalyzer:
         'dribble_success_rate': 15.0,
     }
 
+    # METRICS_CONFIG key → per-player average metric in metric_distributions (population percentile);
+    # my_stats are averages over several matches, so they are not compared with single-match values
+    POPULATION_METRICS = {
+        'avg_rating': 'player_rating',
+        'goals_per_game': 'player_goals',
+        'assists_per_game': 'player_assists',
+        'shot_accuracy': 'player_shot_accuracy',
+        'pass_accuracy': 'player_pass_accuracy',
+        'dribble_success_rate': 'player_dribble_success_rate',
+    }
+
     # Ranker avg rating (spRating not in ranker-stats API, use domain estimate)
     RANKER_AVG_RATING = 7.2
 
@@ -200,12 +221,16 @@ class SkillGapAnalyzer:
             {spid, player_name, appearances, metric_gaps, priority_improvements,
              overall_z_score, overall_level, ranker_proximity}
         """
+        from api.utils.distributions import DistributionService
+
         my_stats = cls._extract_my_stats(performances)
         ranker_stats = cls._extract_ranker_stats(ranker_status_list)
 
         if not my_stats or not ranker_stats:
             return {}
 
+        position_group = DistributionService.position_group(position)
+
         gaps = {}
         priority_improvements = []
 
@@ -230,6 +255,10 @@ class SkillGapAnalyzer:
                 'n_rankers': n_rankers,
                 'z_score': z_score,
                 'percentile': cls._z_to_percentile(z_score),
+                # 같은 포지션 그룹 유저 선수들의 평균 스탯 분포 기준 백분위 (표본 부족 시 None)
+                'population_percentile': DistributionService.percentile(
+                    cls.POPULATION_METRICS[metric], my_val, position_group,
+                ),
                 'gap_level': cls._gap_level(z_score),
                 'gap_level_info': cls.GAP_LEVEL_LABELS.get(cls._gap_level(z_score), {}),
             }
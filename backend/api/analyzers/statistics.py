@@ -1,6 +1,11 @@
 from typing import List, Dict, Any
 from decimal import Decimal
 
+from django.db.models import (
+    Avg, Case, Count, F, FloatField, IntegerField, Max, Q, Subquery, Value, When, Window,
+)
+from django.db.models.functions import Coalesce, RowNumber
+
 
 class StatisticsCalculator:
     """Calculate various statistics from match data"""
@@ -174,6 +179,12 @@ class StatisticsCalculator:
         }
 
 
+class _RowCount(Subquery):
+    """Row count of a (sliced) queryset as a scalar subquery"""
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) AS counted_rows)'
+    output_field = IntegerField()
+
+
 class StatisticsAnalyzer:
     """
     Alternative statistics interface that works directly with Django QuerySets
@@ -235,3 +246,84 @@ class StatisticsAnalyzer:
                 break
             form.append(result_map.get(match.result, 'D'))
         return form
+
+    @classmethod
+    def aggregate_recent(cls, queryset, limit: int, form_size: int = 5) -> Dict[str, Any]:
+        """
+        Summarize the newest `limit` matches of a Match queryset in one SQL query.
+
+        The range is numbered newest-first with ROW_NUMBER() in a subquery
+        (served by the (ouid, match_type, -match_date) index) and reduced with
+        filtered COUNT / AVG, so only scalars reach Python and no model
+        instances are built. The recent/older split matches
+        StatisticsCalculator.calculate_form_trend (recent = first n // 2); n
+        is counted by an uncorrelated scalar subquery over the same LIMITed
+        range, so no part of the query reads past the newest `limit` rows.
+
+        Returns:
+            total, wins, losses, draws, avg_* per-match averages,
+            recent_form (newest-first results, up to form_size),
+            recent_half_wins / recent_half_count / older_half_wins
+        """
+        newest = queryset.order_by('-match_date', '-id')
+        ranked = newest.annotate(
+            rn=Window(RowNumber(), order_by=[F('match_date').desc(), F('id').desc()]),
+            n=_RowCount(newest.values('id')[:limit]),
+        )[:limit]
+
+        form_columns = {
+            f'form_{i}': Max(Case(When(rn=i, then='result')))
+            for i in range(1, form_size + 1)
+        }
+        in_recent_half = Q(rn__lte=F('n') / 2)
+
+        agg = ranked.aggregate(
+            total=Count('id'),
+            wins=Count('id', filter=Q(result='win')),
+            losses=Count('id', filter=Q(result='lose')),
+            draws=Count('id', filter=Q(result='draw')),
+            avg_goals_for=Avg('goals_for', output_field=FloatField()),
+            avg_goals_against=Avg('goals_against', output_field=FloatField()),
+            avg_possession=Avg('possession', output_field=FloatField()),
+            avg_shots=Avg('shots', output_field=FloatField()),
+            avg_shots_on_target=Avg('shots_on_target', output_field=FloatField()),
+            avg_pass_success_rate=Avg(
+                Coalesce('pass_success_rate', Value(0), output_field=FloatField()),
+                output_field=FloatField(),
+            ),
+            recent_half_count=Count('id', filter=in_recent_half),
+            recent_half_wins=Count('id', filter=in_recent_half & Q(result='win')),
+            older_half_wins=Count('id', filter=~in_recent_half & Q(result='win')),
+            **form_columns,
+        )
+
+        recent_form = [agg.pop(key) for key in form_columns]
+        agg['recent_form'] = [r for r in recent_form if r is not None]
+        for key, value in agg.items():
+            if key.startswith('avg_'):
+                agg[key] = float(value or 0)
+        return agg
+
+    @classmethod
+    def form_trend(cls, agg: Dict[str, Any]) -> Dict[str, Any]:
+        """calculate_form_trend equivalent from aggregate_recent() scalars"""
+        total = agg['total']
+        if total < 2:
+            return {'trend': 'stable', 'recent_win_rate': 0.0, 'older_win_rate': 0.0}
+
+        recent_count = agg['recent_half_count']
+        recent_wr = agg['recent_half_wins'] / recent_count * 100
+        older_wr = agg['older_half_wins'] / (total - recent_count) * 100
+
+        if recent_wr > older_wr:
+            trend = 'improving'
+        elif recent_wr < older_wr:
+            trend = 'declining'
+        else:
+            trend = 'stable'
+
+        return {
+            'trend': trend,
+            'recent_win_rate': round(recent_wr, 1),
+            'older_win_rate': round(older_wr, 1),
+        }
@@ -1,6 +1,12 @@
 from typing import List, Dict, Any
 
+from .contracts import reads
 
+
+@reads(match_fields=(
+    'result', 'possession', 'shots', 'shots_on_target',
+    'goals_for', 'goals_against', 'pass_success_rate',
+))
 class StyleAnalyzer:
     """Enhanced playing style analyzer with sophisticated pattern detection"""
 
@@ -2,8 +2,9 @@
 Tactical Insights Analyzer
 Provides professional-level tactical analysis and coaching feedback in Korean
 """
-from typing import Dict, List
+from typing import Dict, List, Union
 from api.models import Match
+from api.analyzers.pitch_grid import PitchGrid
 
 
 class TacticalInsightsAnalyzer:
@@ -47,14 +48,18 @@ class TacticalInsightsAnalyzer:
         }
 
     @classmethod
-    def _detect_attack_pattern(cls, shot_details: List[Dict]) -> Dict:
+    def _detect_attack_pattern(cls, shot_details: Union[List[Dict], PitchGrid]) -> Dict:
         """
         Detect attack pattern: wing play vs central penetration
 
+        Args:
+            shot_details: shot detail dictionaries, or the match's PitchGrid
+
         Returns:
             Dict with pattern type and statistics
         """
-        if not shot_details:
+        grid = shot_details if isinstance(shot_details, PitchGrid) else PitchGrid.from_points(shot_details)
+        if not grid.total:
             return {
                 'type': 'balanced',
                 'wing_shots': 0,
@@ -65,9 +70,9 @@ class TacticalInsightsAnalyzer:
         # Classify shots by position (y coordinate)
         # y < 0.25 or y > 0.75: wing
         # 0.35 <= y <= 0.65: central
-        wing_shots = sum(1 for s in shot_details if s.get('y', 0.5) < 0.25 or s.get('y', 0.5) > 0.75)
-        central_shots = sum(1 for s in shot_details if 0.35 <= s.get('y', 0.5) <= 0.65)
-        total_shots = len(shot_details)
+        wing_shots = grid.count(y=(0.0, 0.25)) + grid.count(y=(0.75, 1.0))
+        central_shots = grid.count(y=(0.35, 0.65))
+        total_shots = grid.total
 
         # Determine pattern
         if wing_shots > central_shots * 1.5:
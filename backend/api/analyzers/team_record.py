@@ -0,0 +1,91 @@
+"""
+Team Match Record
+One team's side of a match, extracted once from raw_data and shared by analyzers
+
+Every raw_data analyzer used to re-walk raw_data['matchInfo'] to find the
+user's entry (several just took matchInfo[0] without checking ouid). A
+TeamMatchRecord is built once per (match, ouid) and is cached on the Match
+instance, so all analyzers in a request share one lookup and read only the
+sections they use.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+
+@dataclass(slots=True)
+class TeamMatchRecord:
+    """One team's matchInfo entry with None sections normalized to empty"""
+
+    ouid: str
+    nickname: Optional[str] = None
+    match_detail: Dict[str, Any] = field(default_factory=dict)
+    shoot: Dict[str, Any] = field(default_factory=dict)
+    passes: Dict[str, Any] = field(default_factory=dict)
+    defence: Dict[str, Any] = field(default_factory=dict)
+    shoot_detail: List[Dict[str, Any]] = field(default_factory=list)
+    players: List[Dict[str, Any]] = field(default_factory=list)
+    opponent: Optional['TeamMatchRecord'] = None
+
+    @staticmethod
+    def _section(info: Dict, key: str, kind: type):
+        value = info.get(key)
+        return value if isinstance(value, kind) else kind()
+
+    @classmethod
+    def _from_info(cls, info: Dict[str, Any]) -> 'TeamMatchRecord':
+        return cls(
+            ouid=info.get('ouid'),
+            nickname=info.get('nickname'),
+            match_detail=cls._section(info, 'matchDetail', dict),
+            shoot=cls._section(info, 'shoot', dict),
+            passes=cls._section(info, 'pass', dict),
+            defence=cls._section(info, 'defence', dict),
+            shoot_detail=cls._section(info, 'shootDetail', list),
+            players=cls._section(info, 'player', list),
+        )
+
+    @classmethod
+    def from_raw(cls, raw_data: Optional[Dict], ouid: str) -> Optional['TeamMatchRecord']:
+        """
+        Build the record for `ouid` (with its opponent attached) from raw_data.
+
+        Returns None when raw_data is empty or `ouid` is not in matchInfo.
+        """
+        if not raw_data:
+            return None
+
+        own = opponent = None
+        for info in raw_data.get('matchInfo') or []:
+            if info.get('ouid') == ouid:
+                own = own or info
+            elif opponent is None:
+                opponent = info
+
+        if own is None:
+            return None
+
+        record = cls._from_info(own)
+        if opponent is not None:
+            record.opponent = cls._from_info(opponent)
+        return record
+
+    @classmethod
+    def for_match(cls, match, ouid: Optional[str] = None) -> Optional['TeamMatchRecord']:
+        """Record for a Match instance (default: the match owner), memoized on the instance"""
+        ouid = ouid or match.ouid_id
+        records = match.__dict__.setdefault('_team_records', {})
+        if ouid not in records:
+            records[ouid] = cls.from_raw(match.raw_data, ouid)
+        return records[ouid]
+
+    @classmethod
+    def for_matches(cls, matches: Iterable, ouid: Optional[str] = None) -> List['TeamMatchRecord']:
+        """Records for the Match instances that have raw_data for `ouid`"""
+        records = (cls.for_match(m, ouid) for m in matches)
+        return [r for r in records if r is not None]
+
+    @classmethod
+    def from_raw_list(cls, matches_raw: Iterable[Dict], ouid: str) -> List['TeamMatchRecord']:
+        """Records for raw match-detail payloads (e.g. fetched from the API)"""
+        records = (cls.from_raw(raw, ouid) for raw in matches_raw)
+        return [r for r in records if r is not None]
@@ -0,0 +1,112 @@
+"""
+Management command to archive and delete matches past the retention policy
+
+Expired matches (older than MATCH_RETENTION_MONTHS and outside each user's
+most recent MATCH_RETENTION_KEEP_RECENT matches per match type) are grouped
+into month partitions. Each partition's matches and the rows of every table
+depending on them (shot_details, player_performances, match_grids, ...) are
+exported to gzip JSONL files under
+MATCH_ARCHIVE_DIR/<YYYY-MM>/ and then deleted in batches.
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.retention import MatchRetention
+
+
+class Command(BaseCommand):
+    help = 'Archive month partitions of expired matches to compressed files and delete them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=None,
+            help='Retention window in months (default: settings.MATCH_RETENTION_MONTHS)',
+        )
+        parser.add_argument(
+            '--keep-recent',
+            type=int,
+            default=None,
+            help='Always keep this many recent matches per user and match type '
+                 '(default: settings.MATCH_RETENTION_KEEP_RECENT)',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            type=str,
+            default=None,
+            help='Archive directory (default: settings.MATCH_ARCHIVE_DIR)',
+        )
+        parser.add_argument(
+            '--partition',
+            type=str,
+            default=None,
+            help='Only archive one month partition (YYYY-MM)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Matches per delete transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List expired partitions without exporting or deleting',
+        )
+        parser.add_argument(
+            '--vacuum',
+            action='store_true',
+            help='VACUUM (ANALYZE) the tables afterwards (PostgreSQL)',
+        )
+
+    def handle(self, *args, **options):
+        if options['partition']:
+            try:
+                datetime.strptime(options['partition'], '%Y-%m')
+            except ValueError:
+                raise CommandError(f"Invalid partition (expected YYYY-MM): {options['partition']}")
+
+        retention = MatchRetention(
+            months=options['months'],
+            keep_recent=options['keep_recent'],
+            archive_dir=options['archive_dir'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            f"Retention: before {retention.cutoff():%Y-%m-%d}, "
+            f"keeping {retention.keep_recent} recent matches per user/match type"
+        )
+
+        partitions = retention.partitions()
+        if options['partition']:
+            partitions = [p for p in partitions if p['label'] == options['partition']]
+
+        if not partitions:
+            self.stdout.write("No expired partitions")
+            return
+
+        for partition in partitions:
+            self.stdout.write(f"  {partition['label']}: {partition['matches']} matches")
+
+        if options['dry_run']:
+            self.stdout.write("DRY RUN - no changes made")
+            return
+
+        def progress(label, counts):
+            self.stdout.write(
+                f"  [{label}] " + ', '.join(f"{n} {table}" for table, n in counts.items()),
+                ending='\r',
+            )
+
+        for partition in partitions:
+            result = retention.archive_partition(partition['month'], progress=progress)
+            self.stdout.write(self.style.SUCCESS(
+                f"\n✓ {result.label} archived to {result.path}: "
+                + ', '.join(f"{n} {table}" for table, n in result.counts.items())
+            ))
+
+        if options['vacuum']:
+            retention.vacuum()
+            self.stdout.write("Vacuumed archived tables")
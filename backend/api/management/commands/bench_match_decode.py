@@ -0,0 +1,100 @@
+"""
+Management command to benchmark match-detail decoding
+
+Compares the current path (stdlib json decode of the full payload, as
+response.json() does) with the projected orjson path, per match:
+- CPU time to decode + pickle for the cache
+- Python heap retained by the decoded structure (tracemalloc)
+- Pickled size written to Redis / stored JSON size
+"""
+import json
+import pickle
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from api.models import Match
+from nexon_api.projection import decode_match_detail, orjson
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full vs projected match-detail decoding (CPU and memory per match)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            type=str,
+            help='JSON file with one match-detail response or a list of them (default: sample Match.raw_data)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=200,
+            help='Matches to sample from the database (default: 200)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timing repetitions (default: 5)',
+        )
+
+    def _load_bodies(self, options):
+        if options['file']:
+            with open(options['file'], 'rb') as f:
+                payload = json.load(f)
+            payloads = payload if isinstance(payload, list) else [payload]
+        else:
+            payloads = list(
+                Match.objects.filter(raw_data__isnull=False)
+                .order_by('-id')
+                .values_list('raw_data', flat=True)[:options['limit']]
+            )
+        return [json.dumps(p, ensure_ascii=False).encode('utf-8') for p in payloads]
+
+    @staticmethod
+    def _measure(decode, bodies, repeat):
+        """Return (cpu seconds per match, retained bytes per match, pickled bytes per match)."""
+        best = None
+        for _ in range(repeat):
+            start = time.process_time()
+            for body in bodies:
+                pickle.dumps(decode(body), pickle.HIGHEST_PROTOCOL)
+            elapsed = time.process_time() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        tracemalloc.start()
+        decoded = [decode(body) for body in bodies]
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        pickled = sum(len(pickle.dumps(d, pickle.HIGHEST_PROTOCOL)) for d in decoded)
+        n = len(bodies)
+        return best / n, retained / n, pickled / n
+
+    def handle(self, *args, **options):
+        bodies = self._load_bodies(options)
+        if not bodies:
+            raise CommandError('No match payloads to benchmark')
+
+        self.stdout.write(
+            f"Benchmarking {len(bodies)} matches "
+            f"(avg body {sum(map(len, bodies)) / len(bodies) / 1024:.1f} KB, "
+            f"parser: {'orjson' if orjson else 'json'})"
+        )
+
+        results = {
+            'full (json)': self._measure(json.loads, bodies, options['repeat']),
+            'projected': self._measure(decode_match_detail, bodies, options['repeat']),
+        }
+
+        self.stdout.write(f"{'path':<14}{'cpu ms/match':>14}{'heap KB/match':>15}{'pickle KB/match':>17}")
+        for name, (cpu, heap, pickled) in results.items():
+            self.stdout.write(f"{name:<14}{cpu * 1000:>14.3f}{heap / 1024:>15.1f}{pickled / 1024:>17.1f}")
+
+        full, projected = results['full (json)'], results['projected']
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✓ Projected vs full: {full[0] / max(projected[0], 1e-9):.1f}x faster, "
+            f"heap {100 * (projected[1] / max(full[1], 1) - 1):+.0f}%, "
+            f"cache entry {100 * (projected[2] / max(full[2], 1) - 1):+.0f}%"
+        ))
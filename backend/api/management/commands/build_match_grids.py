@@ -0,0 +1,17 @@
+"""
+Management command to build shot / assist position grids from raw_data stored in matches.
+New matches get their MatchGrid rows at ingest; run this once for older matches.
+
+Runs on the shared MatchBackfill engine: keyset-paginated Match.id chunks are
+processed by a process pool, each chunk replacing its rows with one DELETE
+and batched bulk_create. Progress is checkpointed so --resume continues an
+interrupted run.
+"""
+from api.management.commands.reextract_shots import Command as ReextractCommand
+
+
+class Command(ReextractCommand):
+    help = 'Build MatchGrid shot / assist position grids from match raw_data'
+
+    JOB = 'match_grids'
+    ROW_LABEL = 'grids'
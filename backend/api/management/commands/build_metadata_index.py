@@ -0,0 +1,50 @@
+"""
+Management command to build the binary metadata index from spid/seasonid JSON
+"""
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from nexon_api.metadata import MetadataLoader
+from nexon_api.metadata_index import MetadataIndex, build_index
+
+
+class Command(BaseCommand):
+    help = 'Build the mmap-able metadata index (spid names + seasons) from static JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Output path (default: settings.METADATA_INDEX_PATH)',
+        )
+
+    def handle(self, *args, **options):
+        output = Path(options['output'] or settings.METADATA_INDEX_PATH)
+
+        self.stdout.write('Loading metadata...')
+        spid_data = MetadataLoader.load_metadata('spid')
+        season_data = MetadataLoader.load_metadata('seasonid')
+
+        if not spid_data:
+            raise CommandError('spid metadata unavailable — cannot build index')
+
+        # Stamped with the published snapshot version (if any) so workers can tell a stale file
+        data = build_index(spid_data, season_data or [], MetadataLoader.published_version() or '')
+
+        # Write to a temp file and rename so running workers never map a partial file
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output.with_suffix(output.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, output)
+
+        index = MetadataIndex.open(output)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Metadata index written to {output} '
+            f'({len(index)} players, {len(index.season_ids)} seasons, {len(data) / 1024:.0f} KB, '
+            f'snapshot {index.snapshot_version or "none"})'
+        ))
+        index.close()
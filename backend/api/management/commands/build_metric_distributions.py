@@ -0,0 +1,33 @@
+"""
+Management command to rebuild population metric distributions
+
+Streams every stored PlayerPerformance into KLL sketches per (metric,
+position group, division) and replaces the per-row and per-player average
+(`player_*`) metric rows of metric_distributions. New matches are merged in at ingest; run this once to
+seed the table and nightly (cron) so re-extracted or archived rows are
+reflected; per-player averages are only refreshed here. Power score
+sketches are left as they are.
+"""
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from api.utils.distributions import DistributionService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild metric_distributions (population percentiles) from player_performances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per database chunk / sketch update')
+
+    def handle(self, *args, **options):
+        counts = DistributionService.rebuild(batch_size=options['batch_size'])
+
+        by_metric = defaultdict(int)
+        for (metric, group, division), n in counts.items():
+            if group == DistributionService.ALL and division == 0:
+                by_metric[metric] = n
+        for metric, n in sorted(by_metric.items()):
+            self.stdout.write(f"  {metric:<28} {n:>10} samples")
+        self.stdout.write(self.style.SUCCESS(f"✓ Rebuilt {len(counts)} distributions"))
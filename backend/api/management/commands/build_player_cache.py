@@ -1,67 +1,119 @@
 """
 Management command to build player name cache from existing match raw_data
+
+Set-based: spIds are pulled out of raw_data by the database in Match.id batches
+(jsonb_array_elements on PostgreSQL) instead of loading every payload into
+Python, and placeholder names are written with one UPDATE per id range.
+Both phases checkpoint in the cache so an interrupted run can --resume.
 """
-from django.core.management.base import BaseCommand
 from django.core.cache import cache
-from api.models import Match, PlayerPerformance
-import json
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max
+from api.models import Match
+from api.utils.metadata_backfill import MetadataBackfill
 
 
 class Command(BaseCommand):
     help = 'Build player name cache from existing match data'
 
+    CACHE_KEY = 'player_spid_mapping'
+    MATCH_CHECKPOINT_KEY = 'backfill:build_player_cache:match_id'
+    UPDATE_CHECKPOINT_KEY = 'backfill:build_player_cache:perf_id'
+
+    SPID_QUERY = (
+        "SELECT DISTINCT (p->>'spId')::bigint "
+        "FROM matches AS m "
+        "CROSS JOIN LATERAL jsonb_array_elements(COALESCE(m.raw_data->'matchInfo', '[]'::jsonb)) AS mi "
+        "CROSS JOIN LATERAL jsonb_array_elements(COALESCE(mi->'player', '[]'::jsonb)) AS p "
+        "WHERE m.id > %s AND m.id <= %s AND p ? 'spId'"
+    )
+    PLACEHOLDER_UPDATE = (
+        "UPDATE player_performances SET player_name = '선수 ' || spid "
+        "WHERE player_name LIKE 'Unknown Player%%' AND id > %s AND id <= %s"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Match / PlayerPerformance id range per batch (default: 5000)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the last committed batch of a previous run',
+        )
+
+    def _spids_in_range(self, lo, hi):
+        """Distinct spIds referenced by matches with lo < id <= hi"""
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(self.SPID_QUERY, [lo, hi])
+                return {row[0] for row in cursor.fetchall()}
+
+        spids = set()
+        for raw_data in Match.objects.filter(id__gt=lo, id__lte=hi).values_list('raw_data', flat=True).iterator():
+            for info in (raw_data or {}).get('matchInfo', []):
+                for player in info.get('player', []):
+                    if player.get('spId'):
+                        spids.add(player['spId'])
+        return spids
+
     def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        resume = options['resume']
+
         self.stdout.write('Building player name cache from match data...')
 
-        # Dictionary to store spid -> name mapping
+        # Phase 1: collect spids
         player_mapping = {}
-
-        # Get all matches with raw_data
-        matches = Match.objects.filter(raw_data__isnull=False)
-        total_matches = matches.count()
-
-        self.stdout.write(f'Processing {total_matches} matches...')
-
-        for idx, match in enumerate(matches, 1):
-            if idx % 10 == 0:
-                self.stdout.write(f'Processed {idx}/{total_matches}...', ending='\r')
-
-            match_info = match.raw_data.get('matchInfo', [])
-
-            for info in match_info:
-                players = info.get('player', [])
-
-                for player in players:
-                    spid = player.get('spId')
-                    if spid and spid not in player_mapping:
-                        # Try to extract player name from spid
-                        # spid format: typically base_id + season_id
-                        # We'll store the spid for now
-                        player_mapping[spid] = f"선수 {spid}"
-
-        self.stdout.write(f'\nFound {len(player_mapping)} unique players')
-
-        # Save to cache
-        cache_key = 'player_spid_mapping'
-        cache.set(cache_key, player_mapping, None)  # No expiration
+        start_id = 0
+        if resume:
+            player_mapping = cache.get(self.CACHE_KEY) or {}
+            start_id = int(cache.get(self.MATCH_CHECKPOINT_KEY) or 0)
+            self.stdout.write(f'Resuming after Match id {start_id} ({len(player_mapping)} players so far)')
+
+        max_match_id = Match.objects.filter(raw_data__isnull=False).aggregate(m=Max('id'))['m'] or 0
+        self.stdout.write(f'Processing matches up to id {max_match_id}...')
+
+        lo = start_id
+        while lo < max_match_id:
+            hi = min(lo + batch_size, max_match_id)
+            for spid in self._spids_in_range(lo, hi):
+                if spid and spid not in player_mapping:
+                    # Placeholder until real names are loaded (see update_player_names)
+                    player_mapping[spid] = f"선수 {spid}"
+
+            cache.set(self.CACHE_KEY, player_mapping, None)  # No expiration
+            cache.set(self.MATCH_CHECKPOINT_KEY, hi, None)
+            self.stdout.write(f'Processed {hi}/{max_match_id}...', ending='\r')
+            lo = hi
+
+        cache.delete(self.MATCH_CHECKPOINT_KEY)
 
         self.stdout.write(self.style.SUCCESS(
-            f'✓ Player cache built with {len(player_mapping)} entries'
+            f'\n✓ Player cache built with {len(player_mapping)} entries'
         ))
 
-        # Now update PlayerPerformance records
+        # Phase 2: set-based placeholder names for rows still marked unknown
         self.stdout.write('\nUpdating PlayerPerformance records...')
 
-        updated = 0
-        for player_perf in PlayerPerformance.objects.filter(player_name__startswith='Unknown Player').iterator():
-            if player_perf.spid in player_mapping:
-                player_perf.player_name = player_mapping[player_perf.spid]
-                player_perf.save(update_fields=['player_name'])
-                updated += 1
+        update_start = int(cache.get(self.UPDATE_CHECKPOINT_KEY) or 0) if resume else 0
+
+        def progress(last_id, max_id, updated):
+            cache.set(self.UPDATE_CHECKPOINT_KEY, last_id, None)
+            self.stdout.write(f"Updated {updated['player_names']} ({last_id}/{max_id})...", ending='\r')
 
-                if updated % 100 == 0:
-                    self.stdout.write(f'Updated {updated}...', ending='\r')
+        updated = MetadataBackfill.run_in_batches(
+            [('player_names', self.PLACEHOLDER_UPDATE)],
+            batch_size=batch_size,
+            start_id=update_start,
+            progress=progress,
+        )
+        cache.delete(self.UPDATE_CHECKPOINT_KEY)
 
         self.stdout.write(self.style.SUCCESS(
-            f'\n✓ Updated {updated} player names'
+            f"\n✓ Updated {updated['player_names']} player names"
         ))
@@ -0,0 +1,75 @@
+"""
+Management command to audit query plans of the hot ORM queries
+
+Runs EXPLAIN (ANALYZE, BUFFERS) for each query in api.utils.query_plans
+against one user's data and reports the scan nodes. Exits with an error when
+any query seq-scans its target table (PostgreSQL only).
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from api.models import User
+from api.utils.query_plans import hot_queries, explain, seq_scans, summarize
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot match/shot/player queries and fail on sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--nickname',
+            type=str,
+            help='User to audit (default: the user with the most matches)',
+        )
+        parser.add_argument(
+            '--match-type',
+            type=int,
+            default=50,
+            help='Match type for the recent-matches query (default: 50)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=50,
+            help='Recent matches limit (default: 50)',
+        )
+        parser.add_argument(
+            '--no-analyze',
+            action='store_true',
+            help='Plan only, without executing the queries',
+        )
+
+    def _pick_user(self, nickname):
+        if nickname:
+            user = User.objects.filter(nickname=nickname).first()
+            if user is None:
+                raise CommandError(f'User not found: {nickname}')
+            return user
+
+        user = User.objects.annotate(n=Count('matches')).order_by('-n').first()
+        if user is None:
+            raise CommandError('No users to audit')
+        return user
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Query plan audit requires PostgreSQL')
+
+        user = self._pick_user(options['nickname'])
+        self.stdout.write(f'Auditing hot queries for {user.nickname} ({user.ouid})')
+
+        failures = []
+        for name, (table, queryset) in hot_queries(
+            user.ouid, options['match_type'], options['limit']
+        ).items():
+            plan = explain(queryset, analyze=not options['no_analyze'])
+            self.stdout.write(f"\n{name} ({plan.get('Actual Total Time', plan.get('Total Cost'))})")
+            for line in summarize(plan):
+                self.stdout.write(f'  {line}')
+            if seq_scans(plan, table):
+                failures.append(name)
+
+        if failures:
+            raise CommandError(f"Sequential scans in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('\n✓ No sequential scans on hot queries'))
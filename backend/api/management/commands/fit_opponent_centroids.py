@@ -0,0 +1,70 @@
+"""
+Management command to fit OpponentClassifier centroids with mini-batch k-means
+
+Streams the opponent side of every stored match (raw_data) in batches,
+starting from the domain centroids so archetype labels are kept, and saves
+the result to OPPONENT_CENTROIDS_PATH. Run offline (cron); workers pick the
+new file up when OPPONENT_LEARNED_CENTROIDS is on.
+"""
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.analyzers.opponent_classifier import OpponentClassifier
+from api.analyzers.opponent_clustering import MiniBatchKMeans, save_centroids
+from api.analyzers.team_record import TeamMatchRecord
+from api.models import Match
+
+
+class Command(BaseCommand):
+    help = 'Fit opponent archetype centroids (mini-batch k-means over stored matches)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1024, help='Matches per k-means step')
+        parser.add_argument('--epochs', type=int, default=3, help='Passes over the stored matches')
+        parser.add_argument('--match-type', type=int, default=None, help='Only this match type')
+        parser.add_argument('--output', type=str, default=None,
+                            help='Output path (default: settings.OPPONENT_CENTROIDS_PATH)')
+        parser.add_argument('--dry-run', action='store_true', help='Fit and report without saving')
+
+    def _batches(self, match_type, batch_size):
+        matches = Match.objects.exclude(raw_data__isnull=True).only('ouid_id', 'raw_data')
+        if match_type is not None:
+            matches = matches.filter(match_type=match_type)
+
+        records = []
+        for match in matches.iterator(chunk_size=batch_size):
+            records.append(TeamMatchRecord.from_raw(match.raw_data, match.ouid_id))
+            if len(records) == batch_size:
+                yield OpponentClassifier.feature_matrix(records)[0]
+                records = []
+        if records:
+            yield OpponentClassifier.feature_matrix(records)[0]
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0 or options['epochs'] <= 0:
+            raise CommandError('--batch-size and --epochs must be positive')
+
+        kmeans = MiniBatchKMeans(OpponentClassifier.DEFAULT_CENTROIDS)
+        last_batch = np.empty((0, len(OpponentClassifier.FEATURES)))
+        for epoch in range(1, options['epochs'] + 1):
+            for batch in self._batches(options['match_type'], options['batch_size']):
+                kmeans.partial_fit(batch)
+                last_batch = batch
+            self.stdout.write(f"  epoch {epoch}: {kmeans.samples} samples seen")
+
+        if not kmeans.samples:
+            raise CommandError('No stored opponents with raw_data to fit')
+
+        shifts = np.abs(kmeans.centroids - OpponentClassifier.DEFAULT_CENTROIDS).max(axis=1)
+        for archetype, count, shift in zip(OpponentClassifier.ARCHETYPES, kmeans.counts, shifts):
+            self.stdout.write(f"  {archetype['id']:<15} assigned {int(count):>7}  max shift {shift:.3f}")
+        self.stdout.write(f"  inertia (last batch): {kmeans.inertia(last_batch):.3f}")
+
+        if options['dry_run']:
+            self.stdout.write('Dry run: centroids not saved')
+            return
+
+        output = options['output'] or settings.OPPONENT_CENTROIDS_PATH
+        save_centroids(output, kmeans.centroids, OpponentClassifier.FEATURES, kmeans.samples)
+        self.stdout.write(self.style.SUCCESS(f"✓ Centroids written to {output}"))
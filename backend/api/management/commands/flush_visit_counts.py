@@ -0,0 +1,26 @@
+"""
+Management command to flush pending visit counts from Redis into daily buckets
+
+Visits are normally flushed by the visitor endpoint at most every
+VISIT_FLUSH_SECONDS; run this from cron or before a Redis restart to persist
+the pending counts immediately.
+"""
+from django.core.management.base import BaseCommand
+
+from api.utils.visit_counter import VisitCounter
+
+
+class Command(BaseCommand):
+    help = 'Flush pending Redis visit counts into daily_visit_counts'
+
+    def handle(self, *args, **options):
+        flushed = VisitCounter.flush()
+        if not flushed:
+            self.stdout.write("Nothing to flush (or another flush is running)")
+            return
+
+        for day, count in sorted(flushed.items()):
+            self.stdout.write(f"  {day}: +{count} visits")
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Flushed {sum(flushed.values())} visits, total {VisitCounter.total()}"
+        ))
@@ -1,15 +1,22 @@
 """
 Management command to re-extract PlayerPerformance data from raw_data stored in matches.
 Fixes position decoding: old code stored lineup_index (0-10) instead of spPosition (0-27).
+
+Runs on the shared MatchBackfill engine: keyset-paginated Match.id chunks are
+re-extracted by a process pool, each chunk replacing its rows with one DELETE
+and batched bulk_create. Progress is checkpointed so --resume continues an
+interrupted run.
 """
 from django.core.management.base import BaseCommand
-from api.models import Match, PlayerPerformance
-from api.utils.player_extractor import PlayerPerformanceExtractor
+from api.utils.backfill import MatchBackfill
 
 
 class Command(BaseCommand):
     help = 'Re-extract PlayerPerformance from match raw_data to fix position data'
 
+    JOB = 'player_performances'
+    ROW_LABEL = 'performances'
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--nickname',
@@ -27,54 +34,66 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be done without making changes',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Worker processes (default: 4, 1 = run inline)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Matches per chunk (default: 500)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows per bulk_create batch (default: 2000)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the last committed chunk of a previous run',
+        )
 
     def handle(self, *args, **options):
-        qs = Match.objects.filter(raw_data__isnull=False)
+        filters = {}
 
         if options['nickname']:
-            qs = qs.filter(ouid__nickname=options['nickname'])
+            filters['ouid__nickname'] = options['nickname']
             self.stdout.write(f"Filtering to user: {options['nickname']}")
 
         if options['match_type'] is not None:
-            qs = qs.filter(match_type=options['match_type'])
+            filters['match_type'] = options['match_type']
             self.stdout.write(f"Filtering to match_type: {options['match_type']}")
 
-        total = qs.count()
+        backfill = MatchBackfill(
+            self.JOB,
+            filters=filters,
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            insert_batch_size=options['batch_size'],
+        )
+
+        start_id = backfill.checkpoint() if options['resume'] else 0
+        total = backfill.queryset().filter(id__gt=start_id).count()
+        if start_id:
+            self.stdout.write(f"Resuming after Match id {start_id}")
         self.stdout.write(f"Found {total} matches with raw_data to re-process")
 
         if options['dry_run']:
             self.stdout.write("DRY RUN - no changes made")
             return
 
-        success = 0
-        failed = 0
-        total_performances = 0
-
-        for i, match in enumerate(qs.select_related('ouid'), 1):
-            try:
-                # Delete existing PlayerPerformance records for this match
-                deleted_count, _ = PlayerPerformance.objects.filter(match=match).delete()
+        def progress(stats, last_id):
+            self.stdout.write(
+                f"  [{stats.matches}/{total}] checkpoint id {last_id}, "
+                f"{stats.failed} failed, {stats.rows} {self.ROW_LABEL} total",
+                ending='\r',
+            )
 
-                # Re-extract from raw_data
-                count = PlayerPerformanceExtractor.extract_and_save(match)
-                total_performances += count
-                success += 1
-                if i % 20 == 0 or i == total:
-                    self.stdout.write(
-                        f"  [{i}/{total}] Processed {success} matches, "
-                        f"{failed} failed, {total_performances} performances total"
-                    )
-            except Exception as e:
-                failed += 1
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"  [{i}/{total}] FAILED match {match.match_id}: {e}"
-                    )
-                )
+        stats = backfill.run(resume=options['resume'], progress=progress)
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"\nDone: {success} succeeded, {failed} failed, "
-                f"{total_performances} PlayerPerformance records created"
-            )
-        )
+        self.stdout.write(self.style.SUCCESS(f"\nDone: {stats.summary()}"))
@@ -1,15 +1,22 @@
 """
 Management command to re-extract shot details from raw_data stored in matches.
 Fixes goalTime decoding: Nexon API uses period-based bit encoding for goalTime.
+
+Runs on the shared MatchBackfill engine: keyset-paginated Match.id chunks are
+re-extracted by a process pool, each chunk replacing its rows with one DELETE
+and batched bulk_create. Progress is checkpointed so --resume continues an
+interrupted run.
 """
 from django.core.management.base import BaseCommand
-from api.models import Match, ShotDetail
-from api.utils.shot_extractor import ShotDataExtractor
+from api.utils.backfill import MatchBackfill
 
 
 class Command(BaseCommand):
     help = 'Re-extract shot details from match raw_data to fix goalTime decoding'
 
+    JOB = 'shots'
+    ROW_LABEL = 'shots'
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--nickname',
@@ -27,49 +34,66 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be done without making changes',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Worker processes (default: 4, 1 = run inline)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Matches per chunk (default: 500)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows per bulk_create batch (default: 2000)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the last committed chunk of a previous run',
+        )
 
     def handle(self, *args, **options):
-        qs = Match.objects.filter(raw_data__isnull=False)
+        filters = {}
 
         if options['nickname']:
-            qs = qs.filter(ouid__nickname=options['nickname'])
+            filters['ouid__nickname'] = options['nickname']
             self.stdout.write(f"Filtering to user: {options['nickname']}")
 
         if options['match_type'] is not None:
-            qs = qs.filter(match_type=options['match_type'])
+            filters['match_type'] = options['match_type']
             self.stdout.write(f"Filtering to match_type: {options['match_type']}")
 
-        total = qs.count()
+        backfill = MatchBackfill(
+            self.JOB,
+            filters=filters,
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            insert_batch_size=options['batch_size'],
+        )
+
+        start_id = backfill.checkpoint() if options['resume'] else 0
+        total = backfill.queryset().filter(id__gt=start_id).count()
+        if start_id:
+            self.stdout.write(f"Resuming after Match id {start_id}")
         self.stdout.write(f"Found {total} matches with raw_data to re-process")
 
         if options['dry_run']:
             self.stdout.write("DRY RUN - no changes made")
             return
 
-        success = 0
-        failed = 0
-        total_shots = 0
+        def progress(stats, last_id):
+            self.stdout.write(
+                f"  [{stats.matches}/{total}] checkpoint id {last_id}, "
+                f"{stats.failed} failed, {stats.rows} {self.ROW_LABEL} total",
+                ending='\r',
+            )
 
-        for i, match in enumerate(qs.select_related('ouid'), 1):
-            try:
-                count = ShotDataExtractor.extract_and_save(match, match.ouid.ouid)
-                total_shots += count
-                success += 1
-                if i % 20 == 0 or i == total:
-                    self.stdout.write(
-                        f"  [{i}/{total}] Processed {success} matches, "
-                        f"{failed} failed, {total_shots} shots total"
-                    )
-            except Exception as e:
-                failed += 1
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"  [{i}/{total}] FAILED match {match.match_id}: {e}"
-                    )
-                )
+        stats = backfill.run(resume=options['resume'], progress=progress)
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"\nDone: {success} succeeded, {failed} failed, {total_shots} shots extracted"
-            )
-        )
+        self.stdout.write(self.style.SUCCESS(f"\nDone: {stats.summary()}"))
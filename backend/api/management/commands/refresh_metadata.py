@@ -0,0 +1,81 @@
+"""
+Management command to publish a new metadata snapshot and backfill stored names
+"""
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.utils.metadata_backfill import MetadataBackfill
+from nexon_api.metadata import MetadataLoader
+from nexon_api.metadata_index import build_index
+
+
+class Command(BaseCommand):
+    help = 'Fetch latest spid/seasonid metadata, bump the snapshot version and backfill PlayerPerformance names'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Ignore stored ETags and republish even if upstream is unchanged',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Backfill every spid/season, not only the ones that changed',
+        )
+
+    @staticmethod
+    def _names(spid_data, season_data):
+        players = {p['id']: p.get('name', '') for p in (spid_data or []) if 'id' in p}
+        seasons = {s['seasonId']: s.get('className', '') for s in (season_data or []) if 'seasonId' in s}
+        return players, seasons
+
+    def handle(self, *args, **options):
+        old_players, old_seasons = self._names(
+            MetadataLoader.load_metadata('spid'),
+            MetadataLoader.load_metadata('seasonid'),
+        )
+
+        self.stdout.write('Checking upstream metadata...')
+        version = MetadataLoader.publish_snapshot(force=options['force'])
+
+        if version is None and not options['full']:
+            self.stdout.write(self.style.SUCCESS('✓ Metadata unchanged'))
+            return
+
+        spid_data = MetadataLoader.load_metadata('spid')
+        season_data = MetadataLoader.load_metadata('seasonid')
+        new_players, new_seasons = self._names(spid_data, season_data)
+
+        if version:
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Published snapshot {version} ({len(new_players)} players, {len(new_seasons)} seasons)'
+            ))
+
+        # Rebuild this host's mmap index in place so its workers pick it up on their next
+        # version check. Other hosts' files keep the old snapshot version in their header,
+        # so their workers ignore them and use the published snapshot instead
+        index_path = Path(settings.METADATA_INDEX_PATH)
+        if index_path.exists() and spid_data:
+            tmp_path = index_path.with_suffix(index_path.suffix + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(build_index(spid_data, season_data or [], MetadataLoader.published_version() or ''))
+            os.replace(tmp_path, index_path)
+            self.stdout.write(f'Rebuilt metadata index {index_path}')
+
+        if options['full']:
+            changed_players, changed_seasons = new_players, new_seasons
+        else:
+            changed_players = {k: v for k, v in new_players.items() if old_players.get(k) != v}
+            changed_seasons = {k: v for k, v in new_seasons.items() if old_seasons.get(k) != v}
+
+        self.stdout.write(
+            f'Backfilling {len(changed_players)} player names, {len(changed_seasons)} season names...'
+        )
+        updated = MetadataBackfill.backfill_names(changed_players, changed_seasons)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Updated {updated['player_names']} player names, {updated['season_names']} season names"
+        ))
@@ -0,0 +1,55 @@
+"""
+Management command to snapshot ranker stats of the most played cards
+
+Collects the most played (spid, position) pairs from recent player
+performances and fetches their ranker stats in batches, within a request
+budget and rate, into ranker_benchmarks. Run nightly (cron); skill-gap and
+ranker-gap read these snapshots and call the API live only for rare cards.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.ranker_benchmarks import RankerBenchmarks
+
+
+class Command(BaseCommand):
+    help = 'Snapshot ranker-stats of the most played (spid, position) pairs into ranker_benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--matchtype', type=int, nargs='+', default=[50], help='Match types (default: 50)')
+        parser.add_argument('--top', type=int, default=2000, help='Pairs per match type')
+        parser.add_argument('--days', type=int, default=30, help='Look-back window for popularity')
+        parser.add_argument('--min-appearances', type=int, default=5, help='Minimum appearances of a pair')
+        parser.add_argument('--batch-size', type=int, default=10, help='Players per ranker-stats request')
+        parser.add_argument('--max-requests', type=int, default=500, help='Upstream request budget per match type')
+        parser.add_argument('--rate', type=float, default=2.0, help='Requests per second')
+        parser.add_argument('--keep-days', type=int, default=7,
+                            help='Delete snapshots not refreshed for this many days')
+        parser.add_argument('--dry-run', action='store_true', help='List the pairs without fetching')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0 or options['top'] <= 0:
+            raise CommandError('--batch-size and --top must be positive')
+
+        for matchtype in options['matchtype']:
+            pairs = RankerBenchmarks.popular_pairs(
+                matchtype, days=options['days'], top=options['top'],
+                min_appearances=options['min_appearances'],
+            )
+            self.stdout.write(f"matchtype {matchtype}: {len(pairs)} popular pairs")
+            if options['dry_run'] or not pairs:
+                continue
+
+            counts = RankerBenchmarks.snapshot(
+                matchtype, pairs,
+                batch_size=options['batch_size'],
+                max_requests=options['max_requests'],
+                requests_per_second=options['rate'],
+            )
+            self.stdout.write(
+                f"  {counts['requests']} requests, {counts['stored']} stored, "
+                f"{counts['empty']} without ranker data, {counts['failed']} failed"
+            )
+
+        if not options['dry_run']:
+            pruned = RankerBenchmarks.prune(options['keep_days'])
+            self.stdout.write(self.style.SUCCESS(f"✓ Snapshot done ({pruned} stale rows pruned)"))
@@ -1,14 +1,24 @@
 """
 Management command to update player names in PlayerPerformance records
+
+Set-based: the spid → name mapping is COPY'd into a temp table and applied with
+UPDATE ... FROM in id-range batches. Progress is checkpointed in the cache so
+an interrupted run can continue with --resume.
+
+Every row whose stored name differs from the current metadata is rewritten,
+not only "Unknown Player" placeholders, so renamed players are refreshed too.
 """
+from django.core.cache import cache
 from django.core.management.base import BaseCommand
-from api.models import PlayerPerformance
+from api.utils.metadata_backfill import MetadataBackfill
 from nexon_api.metadata import MetadataLoader
 
 
 class Command(BaseCommand):
     help = 'Update player names in PlayerPerformance records using Nexon metadata'
 
+    CHECKPOINT_KEY = 'backfill:update_player_names:last_id'
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--limit',
@@ -16,48 +26,64 @@ class Command(BaseCommand):
             default=None,
             help='Limit number of records to update (default: all)',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50000,
+            help='PlayerPerformance id range per committed batch (default: 50000)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the last committed batch of a previous run',
+        )
+        parser.add_argument(
+            '--seasons',
+            action='store_true',
+            help='Also rewrite season_name from seasonid metadata',
+        )
 
     def handle(self, *args, **options):
-        limit = options.get('limit')
-
-        # First, ensure metadata is loaded
         self.stdout.write('Loading metadata...')
-        MetadataLoader.load_metadata('spid')
-
-        # Get PlayerPerformance records with Unknown Player names
-        query = PlayerPerformance.objects.filter(
-            player_name__startswith='Unknown Player'
-        )
-
-        if limit:
-            query = query[:limit]
+        spid_data = MetadataLoader.load_metadata('spid') or []
+        player_names = {p['id']: p.get('name', '') for p in spid_data if 'id' in p}
+        if not player_names and MetadataLoader._get_index() is not None:
+            player_names = dict(MetadataLoader._get_index().iter_players())
 
-        total = query.count()
-        self.stdout.write(f'Found {total} players to update')
+        season_names = {}
+        if options['seasons']:
+            season_data = MetadataLoader.load_metadata('seasonid') or []
+            season_names = {s['seasonId']: s.get('className', '') for s in season_data if 'seasonId' in s}
 
-        updated = 0
-        failed = 0
+        start_id = 0
+        if options['resume']:
+            start_id = int(cache.get(self.CHECKPOINT_KEY) or 0)
+            self.stdout.write(f'Resuming after PlayerPerformance id {start_id}')
 
-        for player_perf in query.iterator():
-            # Get player name from metadata
-            player_name = MetadataLoader.get_player_name(player_perf.spid)
+        self.stdout.write(f'Applying {len(player_names)} spid names...')
 
-            # Only update if we got a real name (not "Unknown Player")
-            if not player_name.startswith('Unknown Player'):
-                player_perf.player_name = player_name
-                player_perf.save(update_fields=['player_name'])
-                updated += 1
+        def progress(last_id, max_id, updated):
+            cache.set(self.CHECKPOINT_KEY, last_id, None)
+            self.stdout.write(
+                f"  [{last_id}/{max_id}] {updated.get('player_names', 0)} names updated",
+                ending='\r',
+            )
 
-                if updated % 100 == 0:
-                    self.stdout.write(f'Updated {updated}/{total}...', ending='\r')
-            else:
-                failed += 1
+        updated = MetadataBackfill.backfill_names(
+            player_names,
+            season_names,
+            batch_size=options['batch_size'],
+            start_id=start_id,
+            progress=progress,
+            limit=options['limit'],
+        )
+        if not options['limit']:
+            cache.delete(self.CHECKPOINT_KEY)
 
         self.stdout.write(self.style.SUCCESS(
-            f'\n✓ Updated {updated} player names'
+            f"\n✓ Updated {updated['player_names']} player names"
         ))
-
-        if failed > 0:
-            self.stdout.write(self.style.WARNING(
-                f'⚠ {failed} players still unknown (spid not in metadata)'
+        if options['seasons']:
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ Updated {updated['season_names']} season names"
             ))
@@ -0,0 +1,40 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_optimize_match_indexes'),
+    ]
+
+    operations = [
+        # ── ShotDetail covering index ──
+        # INCLUDE columns match the ShotDetail .values(...) projections so
+        # filter(match__in=...) is answered by an index-only scan.
+        migrations.AddIndex(
+            model_name='shotdetail',
+            index=models.Index(
+                fields=['match'],
+                include=[
+                    'x', 'y', 'result', 'shot_type', 'goal_time', 'in_penalty',
+                    'assist_spid', 'assist_x', 'assist_y', 'shooter_spid',
+                ],
+                name='shot_details_match_cover_idx',
+            ),
+        ),
+        # ── PlayerPerformance partial index ──
+        # Every player view filters (match__in, user_ouid) and excludes substitutes (position 28).
+        migrations.AddIndex(
+            model_name='playerperformance',
+            index=models.Index(
+                fields=['user_ouid', 'match'],
+                include=[
+                    'spid', 'player_name', 'position', 'grade', 'rating', 'goals', 'assists',
+                    'shots', 'shots_on_target', 'pass_attempts', 'pass_success',
+                    'dribble_attempts', 'dribble_success', 'tackle_success', 'blocks',
+                ],
+                condition=~models.Q(position=28),
+                name='player_perf_starters_idx',
+            ),
+        ),
+    ]
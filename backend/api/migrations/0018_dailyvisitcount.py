@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_from_site_visits(apps, schema_editor):
+    """Seed daily buckets from existing SiteVisit rows so totals carry over."""
+    SiteVisit = apps.get_model('api', 'SiteVisit')
+    DailyVisitCount = apps.get_model('api', 'DailyVisitCount')
+
+    rows = (
+        SiteVisit.objects.annotate(date=TruncDate('visited_at'))
+        .values('date').annotate(visits=Count('id'))
+    )
+    DailyVisitCount.objects.bulk_create(
+        [DailyVisitCount(date=row['date'], visits=row['visits']) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_covering_and_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyVisitCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('visits', models.BigIntegerField(default=0)),
+                ('unique_visitors', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'daily_visit_counts',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.RunPython(backfill_from_site_visits, migrations.RunPython.noop),
+    ]
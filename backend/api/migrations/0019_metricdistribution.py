@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_dailyvisitcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricDistribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50)),
+                ('position_group', models.CharField(max_length=20)),
+                ('division', models.IntegerField(default=0)),
+                ('count', models.BigIntegerField(default=0)),
+                ('sketch', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'metric_distributions',
+                'unique_together': {('metric', 'position_group', 'division')},
+            },
+        ),
+    ]
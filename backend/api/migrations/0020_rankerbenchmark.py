@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_metricdistribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankerBenchmark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matchtype', models.IntegerField()),
+                ('spid', models.BigIntegerField()),
+                ('position', models.IntegerField()),
+                ('status', models.JSONField(default=dict)),
+                ('snapshot_date', models.DateField()),
+            ],
+            options={
+                'db_table': 'ranker_benchmarks',
+                'unique_together': {('matchtype', 'spid', 'position')},
+            },
+        ),
+    ]
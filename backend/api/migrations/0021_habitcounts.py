@@ -0,0 +1,30 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_rankerbenchmark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabitCounts',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('match_type', models.IntegerField()),
+                ('stream', models.CharField(max_length=10)),
+                ('counts', models.BinaryField()),
+                ('tail', models.JSONField(default=list)),
+                ('matches', models.IntegerField(default=0)),
+                ('last_match_date', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ouid', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='habit_counts', to='api.user')),
+            ],
+            options={
+                'db_table': 'habit_counts',
+                'unique_together': {('ouid', 'match_type', 'stream')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_habitcounts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchGrid',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ouid', models.CharField(max_length=255)),
+                ('is_owner', models.BooleanField(default=True)),
+                ('shots', models.IntegerField(default=0)),
+                ('shot_cells', models.BinaryField()),
+                ('goal_cells', models.BinaryField()),
+                ('assist_cells', models.BinaryField()),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grids', to='api.match')),
+            ],
+            options={
+                'db_table': 'match_grids',
+                'unique_together': {('match', 'ouid')},
+            },
+        ),
+    ]
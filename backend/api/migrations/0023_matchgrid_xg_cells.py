@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_matchgrid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchgrid',
+            name='xg_cells',
+            field=models.BinaryField(default=b''),
+        ),
+    ]
@@ -83,6 +83,15 @@ class ShotDetail(models.Model):
         indexes = [
             models.Index(fields=['match', 'result']),
             models.Index(fields=['match', 'goal_time']),
+            # Index-only scans for the heatmap / aggregate .values(...) projections
+            models.Index(
+                fields=['match'],
+                include=[
+                    'x', 'y', 'result', 'shot_type', 'goal_time', 'in_penalty',
+                    'assist_spid', 'assist_x', 'assist_y', 'shooter_spid',
+                ],
+                name='shot_details_match_cover_idx',
+            ),
         ]
 
     _COORD_QUANT = Decimal('0.0001')  # 4 decimal places
@@ -100,6 +109,25 @@ class ShotDetail(models.Model):
         return f"Shot at ({self.x}, {self.y}) - {self.result}"
 
 
+class MatchGrid(models.Model):
+    """Quantized shot / assist-origin positions of one side of a match (api.analyzers.pitch_grid)"""
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='grids')
+    ouid = models.CharField(max_length=255)  # side: the match owner or the opponent
+    is_owner = models.BooleanField(default=True)
+    shots = models.IntegerField(default=0)
+    shot_cells = models.BinaryField()  # PitchGrid.to_bytes() of shot positions
+    goal_cells = models.BinaryField()
+    assist_cells = models.BinaryField()  # assist origins of the side's shots
+    xg_cells = models.BinaryField(default=b'')  # xG per cell in thousandths (MatchGrids.XG_SCALE)
+
+    class Meta:
+        db_table = 'match_grids'
+        unique_together = ['match', 'ouid']
+
+    def __str__(self):
+        return f"Grid {self.match_id}/{self.ouid}: {self.shots} shots"
+
+
 class UserStats(models.Model):
     """Aggregated User Statistics Model"""
     PERIOD_CHOICES = [
@@ -220,6 +248,18 @@ class PlayerPerformance(models.Model):
             models.Index(fields=['match', 'user_ouid']),
             models.Index(fields=['user_ouid', 'spid']),
             models.Index(fields=['user_ouid', 'match', 'position']),
+            # Starting XI rows (substitutes, position 28, excluded) with the columns the
+            # player ranking / analysis views read via .values(...)
+            models.Index(
+                fields=['user_ouid', 'match'],
+                include=[
+                    'spid', 'player_name', 'position', 'grade', 'rating', 'goals', 'assists',
+                    'shots', 'shots_on_target', 'pass_attempts', 'pass_success',
+                    'dribble_attempts', 'dribble_success', 'tackle_success', 'blocks',
+                ],
+                condition=~models.Q(position=28),
+                name='player_perf_starters_idx',
+            ),
         ]
 
     def save(self, *args, **kwargs):
@@ -254,8 +294,60 @@ class PlayerPerformance(models.Model):
         return f"{self.player_name} ({self.rating}) - {self.match.match_id}"
 
 
+class MetricDistribution(models.Model):
+    """Population distribution snapshot of one metric (KLL quantile sketch) per position group / division"""
+    metric = models.CharField(max_length=50)
+    position_group = models.CharField(max_length=20)  # PlayerPowerRanking group, or 'all'
+    division = models.IntegerField(default=0)  # User.max_division, 0 = all divisions
+    count = models.BigIntegerField(default=0)
+    sketch = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'metric_distributions'
+        unique_together = ['metric', 'position_group', 'division']
+
+    def __str__(self):
+        return f"{self.metric} [{self.position_group}/{self.division}] n={self.count}"
+
+
+class RankerBenchmark(models.Model):
+    """Nightly snapshot of ranker-stats for popular (spid, position) pairs (`manage.py snapshot_ranker_benchmarks`)"""
+    matchtype = models.IntegerField()
+    spid = models.BigIntegerField()
+    position = models.IntegerField()
+    status = models.JSONField(default=dict)  # ranker-stats `status`; {} = no ranker data for this card
+    snapshot_date = models.DateField()
+
+    class Meta:
+        db_table = 'ranker_benchmarks'
+        unique_together = ['matchtype', 'spid', 'position']
+
+    def __str__(self):
+        return f"{self.spid}@{self.position} [{self.matchtype}] {self.snapshot_date}"
+
+
+class HabitCounts(models.Model):
+    """Habit engine n-gram counts of one symbol stream per user / match type, updated at ingest"""
+    ouid = models.ForeignKey(User, on_delete=models.CASCADE, related_name='habit_counts')
+    match_type = models.IntegerField()
+    stream = models.CharField(max_length=10)  # 'pass' (one symbol per match) / 'shot' (per shot, within a match)
+    counts = models.BinaryField()  # uint32 n-gram counts, orders 0..MAX_ORDER (api.analyzers.habit_engine)
+    tail = models.JSONField(default=list)  # last symbols of a cross-match stream: context of the next match
+    matches = models.IntegerField(default=0)
+    last_match_date = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'habit_counts'
+        unique_together = ['ouid', 'match_type', 'stream']
+
+    def __str__(self):
+        return f"{self.ouid_id} [{self.match_type}/{self.stream}] {self.matches} matches"
+
+
 class SiteVisit(models.Model):
-    """Site Visit Counter Model"""
+    """Site Visit Counter Model (legacy per-visit rows; counts now go to DailyVisitCount)"""
     visited_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -263,3 +355,18 @@ class SiteVisit(models.Model):
 
     def __str__(self):
         return f"Visit at {self.visited_at}"
+
+
+class DailyVisitCount(models.Model):
+    """Site visits per day (Asia/Seoul), flushed in batches from the Redis counter"""
+    date = models.DateField(unique=True)
+    visits = models.BigIntegerField(default=0)
+    unique_visitors = models.IntegerField(default=0)  # HyperLogLog estimate
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_visit_counts'
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.date}: {self.visits} visits"
@@ -9,6 +9,7 @@ from django.dispatch import receiver
 from .models import Match
 from .utils.shot_extractor import ShotDataExtractor
 from .utils.player_extractor import PlayerPerformanceExtractor
+from .utils.match_grids import MatchGrids
 import logging
 
 logger = logging.getLogger(__name__)
@@ -69,3 +70,27 @@ def extract_player_performances_on_match_save(sender, instance, created, **kwarg
                 f"Failed to extract player performances for match {instance.match_id}: {str(e)}",
                 exc_info=True
             )
+
+
+@receiver(post_save, sender=Match)
+def build_match_grids_on_match_save(sender, instance, created, **kwargs):
+    """
+    Automatically build shot / assist position grids when Match is created.
+
+    Stores one quantized PitchGrid set per side (owner and opponent) in the
+    MatchGrid table, so window heatmaps and zone counts sum small arrays.
+
+    Args:
+        sender: The Match model class
+        instance: The actual Match instance being saved
+        created: Boolean indicating if this is a new record
+        **kwargs: Additional keyword arguments
+    """
+    if created and instance.raw_data:
+        try:
+            MatchGrids.extract_and_save(instance)
+        except Exception as e:
+            logger.error(
+                f"Failed to build grids for match {instance.match_id}: {str(e)}",
+                exc_info=True
+            )
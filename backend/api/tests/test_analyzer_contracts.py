@@ -0,0 +1,136 @@
+"""
+Tests for analyzer input contracts and the fetch planner.
+
+Tests cover:
+- @reads registering an analyzer's declared inputs
+- FetchPlan merging contracts and gating upstream calls
+- player-contribution skipping the unused trade history calls
+- form-cycle and ranker-gap reading declared Match columns only (no raw_data)
+- style and power rankings reading declared ShotDetail columns only, with
+  raw_data loaded once for the pass distribution
+"""
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.analyzers.contracts import REGISTRY, FetchPlan, reads
+from api.analyzers.form_cycle_analyzer import FormCycleAnalyzer
+from api.analyzers.roi_analyzer import ROIAnalyzer
+from api.models import User, Match, PlayerPerformance
+
+
+class FetchPlanTest(TestCase):
+    """Test contract registration and merging."""
+
+    def test_registry(self):
+        """Test decorated analyzers are registered with their inputs."""
+        self.assertIs(REGISTRY['ROIAnalyzer'], ROIAnalyzer.INPUTS)
+        self.assertIn('rating', ROIAnalyzer.INPUTS.performance_fields)
+        self.assertEqual(FormCycleAnalyzer.INPUTS.raw_sections, ())
+
+    def test_merge_and_needs(self):
+        """Test fields are unioned in order and external calls gated."""
+        @reads(match_fields=('result', 'match_date'), raw_sections=('matchInfo',), external=('user_trade',))
+        class Example:
+            pass
+
+        plan = FetchPlan(FormCycleAnalyzer, Example)
+
+        self.assertEqual(plan.match_fields.count('result'), 1)
+        self.assertEqual(plan.match_fields[0], 'match_date')
+        self.assertTrue(plan.needs('user_trade'))
+        self.assertFalse(plan.defer_raw_data)
+        self.assertFalse(FetchPlan(ROIAnalyzer).needs('user_trade'))
+        self.assertTrue(FetchPlan(ROIAnalyzer).defer_raw_data)
+
+
+class PlannedViewsTest(TestCase):
+    """Test views fetch only what their analyzers declare."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(ouid='plan-user', nickname='Planner')
+        now = timezone.now()
+        for i in range(4):
+            match = Match.objects.create(
+                match_id=f'plan-{i}', ouid=self.user, match_date=now - timedelta(hours=i),
+                match_type=50, result='win', goals_for=2, goals_against=1, possession=55,
+                shots=8, shots_on_target=4, pass_success_rate=Decimal('82.50'),
+                raw_data={'matchInfo': []},
+            )
+            PlayerPerformance.objects.create(
+                match=match, user_ouid=self.user, spid=101, player_name='P101',
+                position=25, grade=5, rating=Decimal('7.5'), goals=1,
+            )
+        self.api = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    @patch('api.views.NexonAPIClient')
+    def test_contribution_skips_trade_history(self, mock_client):
+        """Test player-contribution no longer pages the trade API."""
+        mock_client.return_value.get_user_matches.return_value = []
+
+        response = self.api.get(
+            f'/api/users/{self.user.ouid}/analysis/player-contribution/',
+            {'matchtype': 50, 'limit': 30},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_client.return_value.get_user_trade.assert_not_called()
+        self.assertEqual(response.data['trade_history_count'], 0)
+        self.assertEqual(response.data['squad_roi'][0]['spid'], 101)
+
+    @patch('api.views.NexonAPIClient')
+    def test_form_cycle_without_raw_data(self, mock_client):
+        """Test form-cycle never selects raw_data."""
+        mock_client.return_value.get_user_matches.return_value = []
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get(
+                f'/api/users/{self.user.ouid}/analysis/form-cycle/',
+                {'matchtype': 50, 'limit': 50},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        match_selects = [q['sql'] for q in queries if 'FROM "matches"' in q['sql']]
+        self.assertTrue(match_selects)
+        self.assertFalse(any('raw_data' in sql for sql in match_selects))
+
+    @patch('api.views.RankerBenchmarks.stats', return_value=[])
+    @patch('api.views.NexonAPIClient')
+    def test_ranker_gap_without_raw_data(self, mock_client, mock_stats):
+        """Test ranker-gap reads declared Match columns only."""
+        mock_client.return_value.get_user_matches.return_value = []
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get(f'/api/users/{self.user.ouid}/analysis/ranker-gap/', {'matchtype': 50})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['matches_analyzed'], 4)
+        self.assertFalse(any('raw_data' in q['sql'] for q in queries if 'FROM "matches"' in q['sql']))
+
+    @patch('api.views.NexonAPIClient')
+    def test_power_rankings_declared_shot_columns(self, mock_client):
+        """Test power rankings select only declared shot columns and load raw_data in the window query."""
+        mock_client.return_value.get_user_matches.return_value = []
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get(f'/api/users/{self.user.ouid}/analysis/power-rankings/', {'matchtype': 50})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rankings'][0]['spid'], 101)
+        shot_selects = [q['sql'] for q in queries if 'FROM "shot_details"' in q['sql']]
+        self.assertTrue(shot_selects)
+        self.assertFalse(any('"assist_x"' in sql for sql in shot_selects))
+        # raw_data comes with the match window, not one query per match
+        self.assertEqual(sum('"matches"."raw_data"' in q['sql'] for q in queries), 1)
@@ -7,6 +7,7 @@ Tests cover:
 - TimelineAnalyzer (key moments, xG by period)
 - TacticalInsightsAnalyzer (insights generation)
 - StatisticsAnalyzer
+- TeamMatchRecord (per-team raw_data extraction shared by analyzers)
 """
 from decimal import Decimal
 from django.test import TestCase
@@ -17,6 +18,9 @@ from api.analyzers.style_analyzer import StyleAnalyzer
 from api.analyzers.timeline_analyzer import TimelineAnalyzer
 from api.analyzers.tactical_analyzer import TacticalInsightsAnalyzer
 from api.analyzers.statistics import StatisticsAnalyzer
+from api.analyzers.team_record import TeamMatchRecord
+from api.analyzers.set_piece_analyzer import SetPieceAnalyzer
+from api.analyzers.battle_predictor import BattlePredictor
 
 
 class ShotAnalyzerTest(TestCase):
@@ -628,3 +632,65 @@ class StatisticsAnalyzerTest(TestCase):
         # Form should contain W, L, or D
         for result in form:
             self.assertIn(result, ['W', 'L', 'D'])
+
+
+class TeamMatchRecordTest(TestCase):
+    """Test TeamMatchRecord extraction from raw_data."""
+
+    RAW = {
+        'matchInfo': [
+            {
+                'ouid': 'opponent-ouid',
+                'matchDetail': {'matchResult': '승', 'possession': 55},
+                'shoot': {'goalTotalDisplay': 3, 'shootFreekick': 4, 'goalFreekick': 2},
+                'pass': None,
+            },
+            {
+                'ouid': 'record-user',
+                'matchDetail': {'matchResult': '패', 'controller': 'gamepad'},
+                'shoot': {'goalTotalDisplay': 1, 'shootTotal': 6, 'shootFreekick': 1},
+                'pass': {'passTry': 100, 'passSuccess': 80},
+                'defence': None,
+            },
+        ]
+    }
+
+    def setUp(self):
+        self.user = User.objects.create(ouid='record-user', nickname='Recorder')
+        self.match = Match.objects.create(
+            ouid=self.user, match_id='record-match', match_date=timezone.now(),
+            match_type=50, result='lose', goals_for=1, goals_against=3,
+            possession=45, shots=6, shots_on_target=2, raw_data=self.RAW,
+        )
+
+    def test_finds_user_entry_by_ouid(self):
+        """Test the user's entry is used even when it is not matchInfo[0]."""
+        record = TeamMatchRecord.from_raw(self.RAW, 'record-user')
+
+        self.assertEqual(record.shoot['goalTotalDisplay'], 1)
+        self.assertEqual(record.match_detail['controller'], 'gamepad')
+        self.assertEqual(record.opponent.ouid, 'opponent-ouid')
+        self.assertEqual(record.opponent.passes, {})
+        self.assertEqual(record.defence, {})
+
+    def test_missing_user_returns_none(self):
+        """Test unknown ouid or empty raw_data yields no record."""
+        self.assertIsNone(TeamMatchRecord.from_raw(self.RAW, 'someone-else'))
+        self.assertIsNone(TeamMatchRecord.from_raw({}, 'record-user'))
+
+    def test_record_memoized_on_match(self):
+        """Test for_match builds the record once per (match, ouid)."""
+        first = TeamMatchRecord.for_match(self.match)
+        self.assertIs(TeamMatchRecord.for_match(self.match), first)
+        self.assertEqual(TeamMatchRecord.for_matches([self.match]), [first])
+
+    def test_analyzers_read_user_side(self):
+        """Test analyzers aggregate the user's side, not matchInfo[0]."""
+        records = TeamMatchRecord.for_matches([self.match])
+
+        set_pieces = SetPieceAnalyzer.analyze_set_pieces(records)
+        self.assertEqual(set_pieces['freekick_analysis']['shots'], 1)
+
+        perf = BattlePredictor.extract_performance(records)
+        self.assertEqual(perf['losses'], 1)
+        self.assertEqual(perf['goals_against_avg'], 3.0)
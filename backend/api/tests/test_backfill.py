@@ -0,0 +1,159 @@
+"""
+Tests for the chunked match re-extraction framework.
+
+Tests cover:
+- Keyset chunking over Match.id
+- Shot / PlayerPerformance rows replaced per chunk, kept for matches that fail
+- Checkpoint-based --resume and filters
+- Checkpoints scoped to the run's filters
+- reextract_shots / reextract_player_performances commands
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import User, Match, ShotDetail, PlayerPerformance
+from api.utils.backfill import MatchBackfill
+
+
+def _raw_data(ouid, n_shots):
+    return {
+        'matchInfo': [
+            {
+                'ouid': ouid,
+                'shootDetail': [
+                    {'goalTime': 10 * (i + 1), 'x': 0.8, 'y': 0.5, 'type': 2, 'result': 2}
+                    for i in range(n_shots)
+                ],
+                'player': [
+                    {'spId': 300000001, 'spPosition': 25, 'spGrade': 5, 'status': {'spRating': 7.5}},
+                    {'spId': 300000002, 'spPosition': 28, 'spGrade': 1, 'status': {'spRating': 0}},
+                ],
+            }
+        ]
+    }
+
+
+class MatchBackfillTest(TestCase):
+    """Test MatchBackfill chunking, replacement and resume."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(ouid='backfill-user', nickname='Backfiller')
+        self.other = User.objects.create(ouid='other-user', nickname='Other')
+        self.matches = [
+            Match.objects.create(
+                match_id=f'backfill-{i}', ouid=self.user if i < 3 else self.other,
+                match_date=timezone.now(), match_type=50, result='win',
+                goals_for=1, goals_against=0, possession=50, shots=5, shots_on_target=2,
+                pass_success_rate=Decimal('80.00'),
+                raw_data=_raw_data('backfill-user' if i < 3 else 'other-user', 2),
+            )
+            for i in range(4)
+        ]
+        # Rows from an older extractor that must be replaced
+        ShotDetail.objects.all().delete()
+        PlayerPerformance.objects.all().delete()
+        ShotDetail.objects.create(
+            match=self.matches[0], x=Decimal('0.1'), y=Decimal('0.1'),
+            result='off_target', shot_type=1, goal_time=1,
+        )
+
+    def test_iter_chunks_uses_keyset_ranges(self):
+        """Test chunks cover every id exactly once in ascending ranges."""
+        chunks = list(MatchBackfill('shots', chunk_size=3).iter_chunks())
+
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[0][1], chunks[1][0])
+        self.assertEqual(chunks[1][1], self.matches[-1].id)
+
+    def test_shots_replaced_per_chunk(self):
+        """Test stale shots are deleted and every match re-extracted."""
+        stats = MatchBackfill('shots', chunk_size=2, workers=1).run()
+
+        self.assertEqual(stats.matches, 4)
+        self.assertEqual(stats.rows, 8)
+        self.assertEqual(stats.failed, 0)
+        self.assertEqual(ShotDetail.objects.count(), 8)
+        self.assertFalse(ShotDetail.objects.filter(goal_time=1).exists())
+        self.assertIsNone(cache.get('backfill:shots:last_id'))
+
+    def test_failed_matches_keep_their_rows(self):
+        """Test rows survive when a match's build raises or has nothing to extract."""
+        Match.objects.filter(pk=self.matches[0].pk).update(raw_data={'matchInfo': [{'ouid': 'backfill-user'}]})
+        broken = self.matches[1]
+        ShotDetail.objects.create(match=broken, x=Decimal('0.2'), y=Decimal('0.2'),
+                                  result='off_target', shot_type=1, goal_time=1)
+        Match.objects.filter(pk=broken.pk).update(raw_data={'matchInfo': [{'ouid': 'backfill-user', 'shootDetail': 1}]})
+
+        stats = MatchBackfill('shots', chunk_size=10, workers=1).run()
+
+        self.assertEqual(stats.failed, 1)
+        self.assertEqual(ShotDetail.objects.filter(match=self.matches[0], goal_time=1).count(), 1)
+        self.assertEqual(ShotDetail.objects.filter(match=broken, goal_time=1).count(), 1)
+        self.assertEqual(ShotDetail.objects.filter(match__in=self.matches[2:]).count(), 4)
+
+    def test_player_performances_only_rated_players(self):
+        """Test performances are rebuilt for registered teams, skipping unrated players."""
+        stats = MatchBackfill('player_performances', chunk_size=3, workers=1).run()
+
+        self.assertEqual(stats.rows, 4)
+        self.assertEqual(PlayerPerformance.objects.filter(spid=300000002).count(), 0)
+        self.assertEqual(PlayerPerformance.objects.filter(user_ouid=self.other).count(), 1)
+
+    def test_resume_skips_checkpointed_matches(self):
+        """Test resume starts after the stored checkpoint."""
+        cache.set('backfill:shots:last_id', self.matches[1].id, None)
+
+        stats = MatchBackfill('shots', chunk_size=10, workers=1).run(resume=True)
+
+        self.assertEqual(stats.matches, 2)
+        self.assertEqual(ShotDetail.objects.filter(match=self.matches[0]).count(), 1)
+
+    def test_filters_restrict_matches(self):
+        """Test queryset filters (nickname) limit the matches processed."""
+        stats = MatchBackfill(
+            'shots', filters={'ouid__nickname': 'Other'}, workers=1
+        ).run()
+
+        self.assertEqual(stats.matches, 1)
+        self.assertEqual(ShotDetail.objects.filter(match=self.matches[3]).count(), 2)
+
+    def test_checkpoint_scoped_to_filters(self):
+        """Test a filtered run neither resumes from nor overwrites another run's checkpoint."""
+        cache.set('backfill:shots:last_id', self.matches[3].id, None)
+        other = MatchBackfill('shots', filters={'ouid__nickname': 'Other'}, chunk_size=10, workers=1)
+        mine = MatchBackfill('shots', filters={'ouid__nickname': 'Backfiller'}, workers=1)
+
+        self.assertNotEqual(other.checkpoint_key, mine.checkpoint_key)
+        same = MatchBackfill('shots', filters={'ouid__nickname': 'Other'})
+        self.assertEqual(other.checkpoint_key, same.checkpoint_key)
+        self.assertEqual(other.checkpoint(), 0)
+
+        stats = other.run(resume=True)
+
+        self.assertEqual(stats.matches, 1)
+        self.assertEqual(MatchBackfill('shots').checkpoint(), self.matches[3].id)
+
+    def test_unknown_job_rejected(self):
+        """Test an unknown job name raises ValueError."""
+        with self.assertRaises(ValueError):
+            MatchBackfill('passes')
+
+    def test_commands_run_inline(self):
+        """Test both re-extract commands run with --workers 1 and honour --dry-run."""
+        call_command('reextract_shots', dry_run=True, stdout=StringIO())
+        self.assertEqual(ShotDetail.objects.count(), 1)
+
+        out = StringIO()
+        call_command('reextract_shots', workers=1, chunk_size=2, stdout=out)
+        self.assertIn('matches/sec', out.getvalue())
+        self.assertEqual(ShotDetail.objects.count(), 8)
+
+        call_command('reextract_player_performances', workers=1, nickname='Backfiller', stdout=StringIO())
+        self.assertEqual(PlayerPerformance.objects.count(), 3)
@@ -0,0 +1,145 @@
+"""
+Tests for binned heatmap responses.
+
+Tests cover:
+- bins / points parsing and limits (bins must divide the grid)
+- Density and xG sums per bin, sampled points capped and columnar
+- xG grids stored at ingest
+- Match heatmap with ?bins (stored grids or ShotDetail fallback), list without it
+- Shot analysis with ?bins from the cached analysis, 400 on invalid bins or points
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.analyzers.pitch_grid import PitchGrid
+from api.analyzers.shot_analyzer import ShotAnalyzer
+from api.models import Match, MatchGrid, ShotDetail, User
+from api.utils.match_grids import MatchGrids, XG_SCALE
+
+
+class HeatmapTest(SimpleTestCase):
+    """Test parsing and the binned response."""
+
+    def test_parse_bins(self):
+        self.assertEqual(MatchGrids.parse_bins('20x10'), (20, 10))
+        self.assertEqual(MatchGrids.parse_bins(' 4X25 '), (4, 25))
+        # Bin counts that don't divide the grid would give unequal bin widths
+        for value in ('', '20', '0x5', '101x10', 'axb', '-2x3', '20x12', '30x10'):
+            with self.assertRaises(ValueError):
+                MatchGrids.parse_bins(value)
+
+    def test_parse_points(self):
+        self.assertEqual(MatchGrids.parse_points(None), 0)
+        self.assertEqual(MatchGrids.parse_points('50'), 50)
+        self.assertEqual(MatchGrids.parse_points('100000'), MatchGrids.MAX_POINTS)
+        self.assertEqual(MatchGrids.parse_points('-3'), 0)
+        with self.assertRaises(ValueError):
+            MatchGrids.parse_points('many')
+
+    def test_density_and_xg_sums(self):
+        shots = [{'x': 0.9, 'y': 0.4, 'result': 'goal', 'shot_type': 1},
+                 {'x': 0.95, 'y': 0.45, 'result': 'off_target', 'shot_type': 1},
+                 {'x': 0.2, 'y': 0.9, 'result': 'blocked', 'shot_type': 1}]
+        heatmap = MatchGrids.heatmap(MatchGrids._grids(shots), (2, 2))
+
+        self.assertEqual(heatmap['bins'], [2, 2])
+        self.assertEqual(heatmap['total_shots'], 3)
+        self.assertEqual(heatmap['density'], [[0, 1], [2, 0]])
+        near_goal = sum(round(ShotAnalyzer._calculate_advanced_xg(s) * XG_SCALE) for s in shots[:2]) / XG_SCALE
+        self.assertAlmostEqual(heatmap['xg'][1][0], near_goal, places=3)
+        self.assertEqual(heatmap['xg'][0][0], 0)
+        self.assertNotIn('points', heatmap)
+
+    def test_sampled_points(self):
+        points = [{'x': i / 1000, 'y': 0.123456, 'result': 'goal', 'xg': 0.12345} for i in range(1000)]
+        heatmap = MatchGrids.heatmap({'shots': PitchGrid(), 'xg': PitchGrid()}, (1, 1), points, 10)
+
+        sample = heatmap['points']
+        self.assertEqual(len(sample['x']), 10)
+        self.assertEqual((sample['x'][0], sample['x'][-1]), (0.0, 0.999))
+        self.assertEqual(set(sample['y']), {0.123})
+        self.assertEqual(set(sample['xg']), {0.123})
+        few = MatchGrids.heatmap({'shots': PitchGrid(), 'xg': PitchGrid()}, (1, 1), points[:3], 10)
+        self.assertEqual(len(few['points']['x']), 3)
+
+
+class HeatmapEndpointTest(TestCase):
+    """Test ?bins on the match heatmap and shot analysis endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create(ouid='heatmap-user', nickname='Heatmap')
+
+    def _legacy_match(self, i):
+        """A match with one ShotDetail row, stored before grids"""
+        match = self._match(i)
+        MatchGrid.objects.filter(match=match).delete()
+        ShotDetail.objects.create(match=match, x=Decimal('0.8'), y=Decimal('0.5'), result='goal',
+                                  shot_type=3, goal_time=30)
+        return match
+
+    def _match(self, i, shots=()):
+        raw = {'matchInfo': [{'ouid': self.user.ouid, 'shoot': {}, 'shootDetail': list(shots)}]}
+        return Match.objects.create(
+            match_id=f'heatmap-{i}', ouid=self.user, match_date=timezone.now(), match_type=50,
+            result='win', goals_for=1, goals_against=0, possession=50, shots=len(shots), shots_on_target=1,
+            pass_success_rate=Decimal('80.00'), raw_data=raw,
+        )
+
+    def test_xg_grid_stored_at_ingest(self):
+        match = self._match(1, [{'goalTime': 100, 'x': 0.9, 'y': 0.5, 'type': 2, 'result': 3}])
+
+        xg = MatchGrids.for_match(match, 'xg')
+        shot = ShotDetail.objects.get(match=match)
+        expected = ShotAnalyzer._calculate_advanced_xg(
+            {'x': float(shot.x), 'y': float(shot.y), 'shot_type': shot.shot_type})
+        self.assertEqual(xg.total, round(expected * XG_SCALE))
+
+    def test_match_heatmap(self):
+        """Test the binned response from stored grids, and the shot list without bins."""
+        match = self._match(1, [{'goalTime': 100, 'x': 0.9, 'y': 0.5, 'type': 2, 'result': 3},
+                                {'goalTime': 200, 'x': 0.3, 'y': 0.2, 'type': 2, 'result': 1}])
+        url = f'/api/matches/{match.match_id}/heatmap/'
+
+        binned = self.client.get(url, {'bins': '2x1', 'points': '1'})
+        self.assertEqual(binned.status_code, status.HTTP_200_OK)
+        self.assertEqual(binned.data['density'], [[1], [1]])
+        self.assertEqual(len(binned.data['points']['x']), 1)
+
+        self.assertEqual(len(self.client.get(url).data), 2)
+        self.assertEqual(self.client.get(url, {'bins': '2by1'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_match_heatmap_without_grids(self):
+        """Test matches stored before grids are binned from their ShotDetail rows."""
+        match = self._legacy_match(1)
+
+        response = self.client.get(f'/api/matches/{match.match_id}/heatmap/', {'bins': '1x1'})
+
+        self.assertEqual(response.data['density'], [[1]])
+        self.assertGreater(response.data['xg'][0][0], 0)
+
+    @patch('api.views.UserViewSet._ensure_matches', return_value=[])
+    def test_shot_analysis(self, _ensure):
+        """Test ?bins swaps heatmap_data for the binned heatmap, also from the cached analysis."""
+        match = self._legacy_match(1)
+        url = f'/api/users/{self.user.ouid}/analysis/shots/'
+
+        plain = self.client.get(url, {'matchtype': 50, 'limit': 10})
+        self.assertEqual(len(plain.data['heatmap_data']), 1)
+
+        binned = self.client.get(url, {'matchtype': 50, 'limit': 10, 'bins': '4x4', 'points': '5'})
+        self.assertEqual(binned.status_code, status.HTTP_200_OK)
+        self.assertNotIn('heatmap_data', binned.data)
+        self.assertEqual(binned.data['heatmap']['density'][3][2], 1)
+        self.assertEqual(binned.data['heatmap']['points']['xg'], [round(plain.data['heatmap_data'][0]['xg'], 3)])
+        self.assertEqual(binned.data['total_shots'], plain.data['total_shots'])
+
+        invalid = self.client.get(url, {'bins': '4x4', 'points': 'all'})
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
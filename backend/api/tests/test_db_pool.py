@@ -0,0 +1,97 @@
+"""
+Tests for the database connection budget.
+
+Tests cover:
+- Ingestion slots bounded, with wait timeout and metrics
+- Slots released when the body raises
+- Connections inside an atomic block left open
+- Pools closed before forking backfill workers
+- /api/internal/db-pool/ token-protected metrics endpoint
+"""
+from unittest.mock import MagicMock, patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import User
+from api.utils.db_pool import IngestionBudget, IngestionBudgetExhausted, close_pools, release_connections
+
+
+class IngestionBudgetTest(TestCase):
+    """Test IngestionBudget slot accounting."""
+
+    def test_slots_bounded(self):
+        """Test a full budget times out instead of opening more connections."""
+        budget = IngestionBudget(size=1, timeout=0.01)
+
+        with budget.slot():
+            with self.assertRaises(IngestionBudgetExhausted):
+                with budget.slot():
+                    pass
+
+        stats = budget.stats()
+        self.assertEqual(stats['acquired'], 1)
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['peak'], 1)
+        self.assertEqual(stats['in_use'], 0)
+
+    def test_slot_released_on_error(self):
+        """Test the slot is returned when the ingestion body fails."""
+        budget = IngestionBudget(size=1, timeout=0.01)
+
+        with self.assertRaises(ValueError):
+            with budget.slot():
+                raise ValueError('bad match')
+
+        with budget.slot():
+            self.assertEqual(budget.stats()['in_use'], 1)
+
+    def test_atomic_connection_kept(self):
+        """Test release_connections does not close a connection mid-transaction."""
+        User.objects.create(ouid='pool-user', nickname='Pooled')
+
+        release_connections()
+
+        self.assertTrue(User.objects.filter(ouid='pool-user').exists())
+        self.assertTrue(connection.in_atomic_block)
+
+    def test_close_pools_before_fork(self):
+        """Test opened pools are shut down, and no pool is created for the others."""
+        pooled, unpooled = MagicMock(_connection_pools={'default': object()}), MagicMock(_connection_pools={})
+        handler = MagicMock()
+        handler.__iter__.return_value = iter(['default', 'replica'])
+        handler.__getitem__.side_effect = {'default': pooled, 'replica': unpooled}.__getitem__
+
+        with patch('api.utils.db_pool.connections', handler):
+            close_pools()
+
+        handler.close_all.assert_called_once()
+        pooled.close_pool.assert_called_once()
+        unpooled.close_pool.assert_not_called()
+
+
+class DbPoolStatsEndpointTest(TestCase):
+    """Test the pool metrics endpoint."""
+
+    @override_settings(METRICS_TOKEN='')
+    def test_disabled_without_token(self):
+        """Test the endpoint is hidden when no token is configured."""
+        response = APIClient().get('/api/internal/db-pool/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_stats_with_token(self):
+        """Test the correct token returns pool and ingestion metrics."""
+        client = APIClient()
+
+        self.assertEqual(
+            client.get('/api/internal/db-pool/', HTTP_X_METRICS_TOKEN='wrong').status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        response = client.get('/api/internal/db-pool/', HTTP_X_METRICS_TOKEN='secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ingestion', response.data)
+        self.assertIn('pools', response.data)
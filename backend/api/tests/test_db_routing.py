@@ -0,0 +1,115 @@
+"""
+Tests for read-replica routing.
+
+Tests cover:
+- Reads routed to the replica only inside replica_reads()
+- Sticky primary reads after a user's sync, also for the rest of the syncing request
+- Replica lag check with fallback to the primary
+- primary_reads() overriding a replica block
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.models import Match
+from api.utils import db_routing
+from api.utils.db_routing import ReplicaRouter, replica_reads, primary_reads, stick_to_primary
+
+
+@patch('api.utils.db_routing.replica_configured', return_value=True)
+class ReplicaRouterTest(TestCase):
+    """Test ReplicaRouter alias selection."""
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_reads_outside_block_use_default(self, _configured):
+        """Test routing is opt-in: no block, no routing decision."""
+        self.assertIsNone(self.router.db_for_read(Match))
+        self.assertEqual(self.router.db_for_write(Match), 'default')
+
+    @patch('api.utils.db_routing.replica_lag', return_value=0.5)
+    def test_healthy_replica_used(self, _lag, _configured):
+        """Test reads inside a block go to the replica, writes stay on primary."""
+        with replica_reads('some-user'):
+            self.assertEqual(self.router.db_for_read(Match), 'replica')
+            self.assertEqual(self.router.db_for_write(Match), 'default')
+        self.assertIsNone(self.router.db_for_read(Match))
+
+    @patch('api.utils.db_routing.replica_lag', return_value=0.5)
+    def test_sticky_after_sync(self, _lag, _configured):
+        """Test a user synced recently reads from the primary."""
+        stick_to_primary('synced-user')
+
+        with replica_reads('synced-user'):
+            self.assertEqual(self.router.db_for_read(Match), 'default')
+        with replica_reads('other-user'):
+            self.assertEqual(self.router.db_for_read(Match), 'replica')
+
+    @patch('api.utils.db_routing.replica_lag', return_value=0.5)
+    def test_sync_inside_block_switches_to_primary(self, _lag, _configured):
+        """Test reads after a sync in the same request go to the primary, even after earlier replica reads."""
+        with replica_reads('syncing-user'):
+            self.assertEqual(self.router.db_for_read(Match), 'replica')
+            with primary_reads():
+                stick_to_primary('syncing-user')
+            self.assertEqual(self.router.db_for_read(Match), 'default')
+
+        with replica_reads('another-user'):
+            stick_to_primary('syncing-user')
+            self.assertEqual(self.router.db_for_read(Match), 'replica')
+
+    @patch('api.utils.db_routing.replica_lag')
+    def test_alias_chosen_at_first_read(self, lag, _configured):
+        """Test entering a block makes no routing decision until something is read."""
+        with replica_reads('some-user'):
+            lag.assert_not_called()
+            lag.return_value = 0.5
+            self.assertEqual(self.router.db_for_read(Match), 'replica')
+            self.router.db_for_read(Match)
+        lag.assert_called_once()
+
+    def test_lagging_or_unreachable_replica(self, _configured):
+        """Test lag above the limit or a failed check falls back to primary."""
+        with override_settings(REPLICA_MAX_LAG_SECONDS=5):
+            for lag in (30.0, None):
+                with self.subTest(lag=lag), patch('api.utils.db_routing.replica_lag', return_value=lag):
+                    with replica_reads('some-user'):
+                        self.assertEqual(self.router.db_for_read(Match), 'default')
+
+    @patch('api.utils.db_routing.replica_lag', return_value=0.0)
+    def test_primary_reads_nested(self, _lag, _configured):
+        """Test primary_reads() inside a replica block, restored on exit."""
+        with replica_reads():
+            with primary_reads():
+                self.assertEqual(self.router.db_for_read(Match), 'default')
+            self.assertEqual(self.router.db_for_read(Match), 'replica')
+
+
+class ReplicaLagTest(TestCase):
+    """Test replica_lag caching and failure handling."""
+
+    def setUp(self):
+        db_routing._lag.update(checked_at=0.0, seconds=None)
+
+    def tearDown(self):
+        db_routing._lag.update(checked_at=0.0, seconds=None)
+
+    @override_settings(REPLICA_LAG_CHECK_SECONDS=60)
+    def test_unreachable_replica_cached_as_none(self):
+        """Test a missing replica alias reports None and is not re-checked."""
+        self.assertIsNone(db_routing.replica_lag())
+
+        with patch('api.utils.db_routing.connections') as connections:
+            self.assertIsNone(db_routing.replica_lag())
+            connections.__getitem__.assert_not_called()
+
+    def test_not_configured_never_routes(self):
+        """Test without DATABASES['replica'] every block reads from default."""
+        with replica_reads('some-user'):
+            self.assertEqual(ReplicaRouter().db_for_read(Match), 'default')
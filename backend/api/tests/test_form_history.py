@@ -0,0 +1,115 @@
+"""
+Tests for the full-history form mode backed by SQL window functions.
+
+Tests cover:
+- SQL performance score / rolling form matching the Python analyzer
+- Day ordinals cut at Asia/Seoul midnight, not UTC
+- Streaks, sessions and current form agreeing with analyze_form_cycle
+- All four series read in one statement over a shared scored CTE
+- form-cycle ?limit=all returning the summarized day timeline
+"""
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.analyzers.form_cycle_analyzer import FormCycleAnalyzer
+from api.models import User, Match
+from api.utils.form_history import FormHistory
+
+
+class FormHistoryTest(TestCase):
+    """Test FormHistory against the in-memory analyzer."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(ouid='history-user', nickname='Veteran')
+        rng = random.Random(3)
+        # Matches at 23:00-05:00 KST straddle KST midnight but share one UTC day
+        start = datetime(2025, 3, 1, 14, 0, tzinfo=dt_timezone.utc)
+        self.rows = []
+        for i in range(60):
+            result = rng.choice(['win', 'win', 'draw', 'lose'])
+            match_date = start + timedelta(days=i // 4, hours=(i % 4) * 2)
+            fields = dict(
+                result=result, goals_for=rng.randint(0, 4), goals_against=rng.randint(0, 4),
+                possession=rng.randint(35, 65), shots=rng.randint(0, 12),
+                shots_on_target=rng.randint(0, 6),
+                pass_success_rate=None if i % 7 == 0 else Decimal(f'{rng.uniform(65, 92):.2f}'),
+            )
+            Match.objects.create(
+                match_id=f'history-{i}', ouid=self.user, match_date=match_date,
+                match_type=50, raw_data={'matchInfo': []}, **fields,
+            )
+            self.rows.append({
+                **fields,
+                'match_date': str(timezone.localtime(match_date)),
+                'pass_success_rate': float(fields['pass_success_rate'] or 70),
+            })
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_scores_match_python(self):
+        """Test the SQL score expression equals _match_performance_score."""
+        scored = list(FormHistory(self.user, 50).scored().order_by('match_date'))
+
+        for row, expected in zip(scored, self.rows):
+            self.assertAlmostEqual(row['score'], FormCycleAnalyzer._match_performance_score(expected))
+
+    def test_day_ordinal_uses_local_day(self):
+        """Test days are cut at KST midnight: 14:00 UTC is 23:00 KST the same day."""
+        scored = list(FormHistory(self.user, 50).scored().order_by('match_date'))
+
+        # i=0 is 23:00 KST on 3/1 alone; i=1..3 are 01:00-05:00 KST on 3/2
+        self.assertEqual([r['ordinal'] for r in scored[:5]], [1, 1, 2, 3, 4])
+        self.assertEqual(str(scored[1]['day']), '2025-03-02')
+
+    def test_summary_agrees_with_in_memory_analysis(self):
+        """Test streaks, sessions and current form match analyze_form_cycle."""
+        expected = FormCycleAnalyzer.analyze_form_cycle(self.rows)
+        result = FormCycleAnalyzer.analyze_form_history(FormHistory(self.user, 50).summarize())
+
+        self.assertEqual(result['total_matches'], 60)
+        self.assertEqual(result['win_rate'], expected['win_rate'])
+        self.assertEqual(result['avg_form_index'], expected['avg_form_index'])
+        self.assertEqual(result['session_analysis'], expected['session_analysis'])
+        self.assertEqual(
+            [(s['type'], s['start_idx'], s['length']) for s in result['streaks']['all']],
+            [(s['type'], s['start_idx'], s['length']) for s in expected['streaks']['all']],
+        )
+        self.assertEqual(result['current_form'], expected['current_form'])
+        self.assertEqual(result['form_timeline'][-1]['match_index'], 60)
+
+    def test_summary_is_one_statement(self):
+        """Test the windowed scan is written once and shared by every series."""
+        with CaptureQueriesContext(connection) as ctx:
+            summary = FormHistory(self.user, 50).summarize()
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+        sql = ctx.captured_queries[0]['sql']
+        self.assertEqual(sql.count('FROM "matches"'), 1)
+        self.assertEqual(len(summary['recent']), 10)
+        self.assertEqual(sum(day['matches'] for day in summary['daily']), 60)
+
+    @patch('api.views.NexonAPIClient')
+    def test_view_all_history(self, mock_client):
+        """Test ?limit=all serves the day timeline without the 200 cap."""
+        mock_client.return_value.get_user_matches.return_value = []
+
+        response = APIClient().get(
+            f'/api/users/{self.user.ouid}/analysis/form-cycle/', {'matchtype': 50, 'limit': 'all'},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['mode'], 'history')
+        self.assertEqual(response.data['matches_requested'], 'all')
+        self.assertEqual(len(response.data['form_timeline']), 16)
@@ -0,0 +1,200 @@
+"""
+Tests for the habit engine.
+
+Tests cover:
+- n-gram counts with cross-call context, transitions, chains and entropy
+- Serialized counts round trip and layout checks
+- Pass and shot symbols derived from a match record
+- Stored counts rebuilt in match-date order and updated per sync
+- Habit loop analysis from stored counts or from the analyzed window, with
+  the sequence scope labelled
+- Synced matches not stored for the user left out of the habit update
+"""
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from api.analyzers.habit_engine import (
+    NgramCounts, PASS_SYMBOLS, SHOT_SYMBOLS, pass_symbol, shot_symbols,
+)
+from api.analyzers.habit_loop_analyzer import HabitLoopAnalyzer
+from api.analyzers.pitch_grid import PitchGrid
+from api.analyzers.team_record import TeamMatchRecord
+from api.models import HabitCounts, Match, User
+from api.utils.habit_store import HabitStore
+from api.views import UserViewSet
+
+PASS_TRIES = {
+    'short': {'shortPassTry': 80, 'longPassTry': 10, 'throughPassTry': 5},
+    'long': {'shortPassTry': 10, 'longPassTry': 60, 'throughPassTry': 5},
+    'through': {'shortPassTry': 10, 'longPassTry': 5, 'throughPassTry': 40},
+}
+
+
+def _raw(ouid, pass_type, shots=()):
+    return {'matchInfo': [
+        {'ouid': ouid, 'pass': PASS_TRIES[pass_type], 'shootDetail': list(shots)},
+        {'ouid': 'opponent', 'pass': PASS_TRIES['short'], 'shootDetail': []},
+    ]}
+
+
+class NgramCountsTest(SimpleTestCase):
+    """Test counting and queries."""
+
+    def test_add_with_context(self):
+        """Test a chain continued across calls counts the same as one sequence."""
+        whole = NgramCounts(PASS_SYMBOLS)
+        whole.add(['short', 'short', 'long', 'short'])
+
+        split = NgramCounts(PASS_SYMBOLS)
+        tail = split.add(['short', 'short'])
+        self.assertEqual(tail, ['short', 'short'])
+        tail = split.add(['long'], context=tail)
+        tail = split.add(['short'], context=tail)
+
+        self.assertEqual(tail, ['long', 'short'])
+        for order in range(3):
+            self.assertTrue((whole.arrays[order] == split.arrays[order]).all())
+        self.assertEqual(whole.total(0), 4)
+        self.assertEqual(whole.total(1), 3)
+        self.assertEqual(whole.total(2), 2)
+
+    def test_transitions_and_chains(self):
+        """Test transition probabilities and chains above the threshold."""
+        counts = NgramCounts(PASS_SYMBOLS)
+        counts.add(['short', 'long', 'short', 'long', 'short', 'through'])
+
+        self.assertEqual(counts.transitions(1)[('short',)], {'long': 2 / 3, 'through': 1 / 3})
+        self.assertEqual(counts.transitions(1)[('long',)], {'short': 1.0})
+
+        chains = counts.chains(order=1, threshold=0.5)
+        self.assertEqual([(c['context'], c['next']) for c in chains], [(('long',), 'short'), (('short',), 'long')])
+        self.assertEqual(chains[1]['count'], 2)
+        self.assertEqual(chains[1]['support'], 3)
+        self.assertEqual(counts.chains(order=2, threshold=0.5, min_support=2)[0]['context'], ('short', 'long'))
+
+    def test_entropy(self):
+        """Test normalized entropy: 0 for a constant stream, 1 for uniform."""
+        counts = NgramCounts(SHOT_SYMBOLS)
+        self.assertIsNone(counts.entropy(0))
+        counts.add(['box_center'] * 5)
+        self.assertEqual(counts.entropy(0), 0.0)
+
+        uniform = NgramCounts(SHOT_SYMBOLS)
+        uniform.add(list(SHOT_SYMBOLS))
+        self.assertAlmostEqual(uniform.entropy(0), 1.0)
+        # Every context seen once is followed by one symbol: fully predictable
+        self.assertEqual(uniform.entropy(1), 0.0)
+
+    def test_bytes_round_trip(self):
+        """Test serialized counts load back, and a different layout is rejected."""
+        counts = NgramCounts(PASS_SYMBOLS)
+        counts.add(['short', 'long', 'through', 'short'])
+        data = counts.to_bytes()
+
+        self.assertEqual(len(data), 4 * (3 + 9 + 27))
+        loaded = NgramCounts.from_bytes(PASS_SYMBOLS, data)
+        self.assertEqual(loaded.transitions(2), counts.transitions(2))
+        loaded.add(['long'])  # loaded arrays are writable
+        with self.assertRaises(ValueError):
+            NgramCounts.from_bytes(SHOT_SYMBOLS, data)
+
+
+class SymbolsTest(SimpleTestCase):
+    """Test symbols derived from a match record."""
+
+    def test_pass_symbol(self):
+        record = TeamMatchRecord.from_raw(_raw('u', 'through'), 'u')
+        self.assertEqual(pass_symbol(record), 'through')
+        self.assertIsNone(pass_symbol(TeamMatchRecord(ouid='u')))
+
+    def test_shot_symbols_in_goal_time_order(self):
+        record = TeamMatchRecord.from_raw(_raw('u', 'short', shots=[
+            {'goalTime': 2000, 'y': 0.5, 'inPenalty': False},
+            {'goalTime': 100, 'y': 0.2, 'inPenalty': True},
+            {'goalTime': 16777216 + 50, 'y': 0.6, 'inPenalty': True},
+        ]), 'u')
+        self.assertEqual(shot_symbols(record), ['box_wide', 'out_center', 'box_center'])
+
+
+class HabitStoreTest(TestCase):
+    """Test stored counts: rebuild and per-sync updates."""
+
+    def setUp(self):
+        self.user = User.objects.create(ouid='habit-user', nickname='Habit')
+        self.now = timezone.now()
+
+    def _match(self, i, pass_type, days_ago, shots=()):
+        return Match.objects.create(
+            match_id=f'habit-{i}', ouid=self.user, match_date=self.now - timedelta(days=days_ago),
+            match_type=50, result='win', goals_for=1, goals_against=0, possession=50, shots=len(shots),
+            shots_on_target=0, pass_success_rate=Decimal('80.00'), raw_data=_raw(self.user.ouid, pass_type, shots),
+        )
+
+    def test_rebuild_in_match_date_order(self):
+        """Test the pass stream is chained oldest first, whatever the insert order."""
+        self._match(1, 'long', days_ago=1)
+        self._match(2, 'short', days_ago=3, shots=[{'goalTime': 1, 'y': 0.5, 'inPenalty': True}])
+        self._match(3, 'short', days_ago=2)
+
+        counts = HabitStore.rebuild(self.user, 50)
+
+        self.assertEqual(counts['pass'].transitions(1), {('short',): {'short': 0.5, 'long': 0.5}})
+        self.assertEqual(counts['shot'].total(0), 1)
+        row = HabitCounts.objects.get(ouid=self.user, match_type=50, stream='pass')
+        self.assertEqual(row.tail, ['short', 'long'])
+        self.assertEqual(row.matches, 3)
+        self.assertEqual(HabitStore.load(self.user, 50)['pass'].transitions(2), counts['pass'].transitions(2))
+
+    def test_record_matches(self):
+        """Test newer matches extend the stored chain and older ones add only their own counts."""
+        self.assertEqual(HabitStore.record_matches(self.user, [self._match(1, 'short', days_ago=5)]), 0)
+        self.assertIsNone(HabitStore.load(self.user, 50))
+        HabitStore.rebuild(self.user, 50)
+
+        synced = [self._match(3, 'through', days_ago=1), self._match(2, 'long', days_ago=2),
+                  self._match(4, 'long', days_ago=9)]
+        self.assertEqual(HabitStore.record_matches(self.user, synced), 3)
+
+        counts = HabitStore.load(self.user, 50)['pass']
+        self.assertEqual(counts.total(0), 4)
+        self.assertEqual(counts.transitions(1), {('short',): {'long': 1.0}, ('long',): {'through': 1.0}})
+        self.assertEqual(counts.transitions(2), {('short', 'long'): {'through': 1.0}})
+        row = HabitCounts.objects.get(ouid=self.user, match_type=50, stream='pass')
+        self.assertEqual((row.tail, row.matches), (['long', 'through'], 4))
+        self.assertEqual(row.last_match_date, synced[0].match_date)
+
+    def test_analysis_from_stored_counts(self):
+        """Test stored counts and the window fallback give the same chains for the same matches."""
+        pattern = ['short', 'short', 'long'] * 4
+        matches = [self._match(i, p, days_ago=len(pattern) - i) for i, p in enumerate(pattern)]
+        records = [TeamMatchRecord.for_match(m) for m in reversed(matches)]  # newest first, as the view
+
+        stored = HabitLoopAnalyzer.analyze_habit_loops(
+            records, PitchGrid(), [], habit_counts=HabitStore.rebuild(self.user, 50),
+        )
+        window = HabitLoopAnalyzer.analyze_habit_loops(records, PitchGrid(), [])
+
+        self.assertEqual(stored['dominant_pass_chains'], window['dominant_pass_chains'])
+        self.assertEqual(stored['pass_sequence_length'], 12)
+        self.assertEqual((stored['sequence_scope'], window['sequence_scope']), ('history', 'window'))
+        self.assertEqual(stored['transition_matrix']['long'], {'short': 1.0})
+        self.assertEqual(
+            sorted(loop['sequence'] for loop in stored['pass_chain_loops']),
+            [['long', 'short', 'short'], ['short', 'long', 'short'], ['short', 'short', 'long']],
+        )
+        self.assertEqual(stored['dominant_pass_chains'][0]['from'], 'long')
+
+    @patch('api.views.HabitStore.record_matches')
+    @patch('api.views.NexonAPIClient')
+    def test_sync_skips_matches_not_created(self, mock_client, mock_record):
+        """Test a fetched match without the user's matchInfo is not passed to the habit update."""
+        mock_client.return_value.get_user_matches.return_value = ['foreign-match']
+        mock_client.return_value.get_match_detail.return_value = {'matchInfo': [{'ouid': 'someone-else'}]}
+
+        UserViewSet()._do_ensure_matches(self.user, 50, 10)
+
+        mock_record.assert_called_once_with(self.user, [])
@@ -0,0 +1,122 @@
+"""
+Tests for projected match-detail decoding.
+
+Tests cover:
+- Whitelisted fields kept, everything else dropped
+- Projection applied to every matchInfo / player entry
+- NexonAPIClient using the projected decoder behind the setting
+- bench_match_decode management command
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from nexon_api.client import NexonAPIClient
+from nexon_api.projection import decode_match_detail
+
+
+PAYLOAD = {
+    'matchId': 'm1',
+    'matchDate': '2026-01-01T12:00:00',
+    'matchType': 50,
+    'unusedTopLevel': {'big': list(range(50))},
+    'matchInfo': [
+        {
+            'ouid': 'u1',
+            'nickname': '테스터',
+            'accessId': 'drop-me',
+            'matchDetail': {'matchResult': '승', 'possession': 55},
+            'shoot': {'goalTotalDisplay': 2},
+            'pass': {'passTry': 100},
+            'defence': {'tackleTry': 5},
+            'shootDetail': [{'goalTime': 30, 'x': 0.8, 'y': 0.5, 'result': 3}],
+            'player': [
+                {'spId': 1, 'spPosition': 25, 'spGrade': 5, 'status': {'spRating': 7.0}, 'extra': 'x'},
+            ],
+        },
+        {'ouid': 'u2', 'matchDetail': {'matchResult': '패'}},
+    ],
+}
+
+
+class ProjectionTest(TestCase):
+    """Test decode_match_detail field projection."""
+
+    def test_keeps_only_whitelisted_fields(self):
+        """Test unused keys are dropped at every level."""
+        data = decode_match_detail(json.dumps(PAYLOAD).encode('utf-8'))
+
+        self.assertNotIn('unusedTopLevel', data)
+        self.assertEqual(data['matchType'], 50)
+        info = data['matchInfo'][0]
+        self.assertNotIn('accessId', info)
+        self.assertEqual(info['nickname'], '테스터')
+        self.assertEqual(info['shootDetail'], PAYLOAD['matchInfo'][0]['shootDetail'])
+        self.assertEqual(
+            info['player'],
+            [{'spId': 1, 'spPosition': 25, 'spGrade': 5, 'status': {'spRating': 7.0}}],
+        )
+
+    def test_missing_fields_stay_missing(self):
+        """Test absent keys are not added, so .get() defaults still apply."""
+        data = decode_match_detail(json.dumps(PAYLOAD))
+
+        self.assertEqual(data['matchInfo'][1], {'ouid': 'u2', 'matchDetail': {'matchResult': '패'}})
+
+
+class ClientProjectedDecodeTest(TestCase):
+    """Test NexonAPIClient.get_match_detail decode path selection."""
+
+    def setUp(self):
+        cache.clear()
+        self.response = Mock()
+        self.response.content = json.dumps(PAYLOAD).encode('utf-8')
+        self.response.json.return_value = PAYLOAD
+        self.response.raise_for_status.return_value = None
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_projected_decode_enabled(self):
+        """Test the setting routes the body through decode_match_detail."""
+        with override_settings(NEXON_PROJECTED_DECODE=True), \
+                patch.object(NexonAPIClient, '_get_session') as get_session:
+            get_session.return_value.get.return_value = self.response
+            data = NexonAPIClient().get_match_detail('m1')
+
+        self.assertNotIn('unusedTopLevel', data)
+        self.response.json.assert_not_called()
+
+    def test_full_decode_by_default(self):
+        """Test the default path still returns the full response.json()."""
+        with override_settings(NEXON_PROJECTED_DECODE=False), \
+                patch.object(NexonAPIClient, '_get_session') as get_session:
+            get_session.return_value.get.return_value = self.response
+            data = NexonAPIClient().get_match_detail('m1')
+
+        self.assertIn('unusedTopLevel', data)
+
+
+class BenchMatchDecodeCommandTest(TestCase):
+    """Test bench_match_decode reports both paths."""
+
+    def test_bench_from_file(self):
+        """Test the command benchmarks payloads read from a file."""
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump([PAYLOAD, PAYLOAD], f)
+
+        out = StringIO()
+        try:
+            call_command('bench_match_decode', file=path, repeat=1, stdout=out)
+        finally:
+            os.remove(path)
+
+        self.assertIn('Benchmarking 2 matches', out.getvalue())
+        self.assertIn('projected', out.getvalue())
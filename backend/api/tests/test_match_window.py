@@ -0,0 +1,97 @@
+"""
+Tests for the SQL top-N match window.
+
+Tests cover:
+- Window limited to the newest N matches of one user and match type
+- Shots / performances filtered through the id subquery in one query
+- Substitutes and other users excluded by default
+- power_rankings built from flat rows with joined match columns
+"""
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import User, Match, ShotDetail, PlayerPerformance
+from api.utils.match_window import MatchWindow
+
+
+class MatchWindowTest(TestCase):
+    """Test MatchWindow querysets."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(ouid='window-user', nickname='Windowed')
+        self.other = User.objects.create(ouid='window-other', nickname='Other')
+        now = timezone.now()
+        self.matches = []
+        for i in range(5):
+            match = Match.objects.create(
+                match_id=f'window-{i}', ouid=self.user, match_date=now - timedelta(hours=i),
+                match_type=50, result='win' if i % 2 == 0 else 'lose',
+                goals_for=2, goals_against=1, possession=50, shots=5, shots_on_target=2,
+                pass_success_rate=Decimal('80.00'), raw_data={'matchInfo': []},
+            )
+            ShotDetail.objects.create(
+                match=match, x=Decimal('0.8'), y=Decimal('0.5'), result='goal', shot_type=1,
+            )
+            for spid, position, owner in ((101, 25, self.user), (102, 28, self.user), (201, 25, self.other)):
+                PlayerPerformance.objects.create(
+                    match=match, user_ouid=owner, spid=spid, player_name=f'P{spid}',
+                    position=position, grade=5, rating=Decimal('7.0'), goals=1,
+                )
+            self.matches.append(match)
+        # Different match type, never in the window
+        Match.objects.create(
+            match_id='window-52', ouid=self.user, match_date=now, match_type=52,
+            result='win', goals_for=1, goals_against=0, possession=50, shots=1,
+            shots_on_target=1, pass_success_rate=Decimal('80.00'), raw_data={'matchInfo': []},
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_window_is_newest_n(self):
+        """Test ids() selects the newest `limit` matches of the match type."""
+        window = MatchWindow(self.user, 50, 3)
+
+        self.assertEqual(
+            list(window.matches().values_list('match_id', flat=True)),
+            ['window-0', 'window-1', 'window-2'],
+        )
+        self.assertEqual(window.count(), 3)
+
+    def test_shots_single_query(self):
+        """Test shots are fetched with one query using the id subquery."""
+        window = MatchWindow(self.user.ouid, 50, 3)
+
+        with self.assertNumQueries(1):
+            rows = list(window.shots().values_list('x', 'result'))
+
+        self.assertEqual(len(rows), 3)
+
+    def test_performances_filters(self):
+        """Test default performances exclude substitutes and other users."""
+        window = MatchWindow(self.user, 50, 2)
+
+        self.assertEqual(set(window.performances().values_list('spid', flat=True)), {101})
+        self.assertEqual(window.performances(user_only=False, starters_only=False).count(), 6)
+
+    @patch('api.views.NexonAPIClient')
+    def test_power_rankings_uses_joined_rows(self, mock_client):
+        """Test power_rankings reads match result / goals via the join."""
+        mock_client.return_value.get_user_matches.return_value = []
+
+        response = APIClient().get(
+            f'/api/users/{self.user.ouid}/analysis/power-rankings/',
+            {'matchtype': 50, 'limit': 5},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['spid'] for r in response.data['rankings']], [101])
+        self.assertEqual(response.data['rankings'][0]['matches_played'], 5)
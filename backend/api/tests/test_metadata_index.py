@@ -0,0 +1,270 @@
+"""
+Tests for the binary metadata index.
+
+Tests cover:
+- Round-trip of spid names and season entries
+- Misses for unknown spid/season ids
+- MetadataLoader lookups served from the mmap'd index
+- build_metadata_index management command output
+- Snapshot version changes dropping per-process lookups and closing the old index
+- An index stamped with another snapshot version ignored until rebuilt
+- Set-based name backfill of PlayerPerformance rows
+- Batched/resumable update_player_names and build_player_cache commands
+"""
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.models import User, Match, PlayerPerformance
+from api.utils.metadata_backfill import MetadataBackfill
+from nexon_api.metadata import MetadataLoader
+from nexon_api.metadata_index import MetadataIndex, build_index
+
+
+SPID_DATA = [
+    {'id': 300000001, 'name': '손흥민'},
+    {'id': 101000002, 'name': 'Pelé'},
+    {'id': 216000003, 'name': ''},
+]
+SEASON_DATA = [
+    {'seasonId': 300, 'className': '24TOTS (24 Team of the Season)', 'seasonImg': 'https://img/300.png'},
+    {'seasonId': 101, 'className': 'ICON (ICON)', 'seasonImg': 'https://img/101.png'},
+]
+
+
+class MetadataIndexTest(TestCase):
+    """Test MetadataIndex encoding and lookups."""
+
+    def setUp(self):
+        self.index = MetadataIndex(build_index(SPID_DATA, SEASON_DATA))
+
+    def test_player_names_round_trip(self):
+        """Test names (including non-ASCII and empty) survive encoding."""
+        self.assertEqual(self.index.get_player_name(300000001), '손흥민')
+        self.assertEqual(self.index.get_player_name(101000002), 'Pelé')
+        self.assertEqual(self.index.get_player_name(216000003), '')
+        self.assertEqual(len(self.index), 3)
+
+    def test_spids_are_sorted(self):
+        """Test spid array is sorted for binary search."""
+        self.assertEqual(list(self.index.spids), sorted(p['id'] for p in SPID_DATA))
+
+    def test_unknown_spid_returns_none(self):
+        """Test misses return None rather than raising."""
+        self.assertIsNone(self.index.get_player_name(999))
+        self.assertIsNone(self.index.get_player_name(999999999999))
+
+    def test_season_lookup(self):
+        """Test season className and image lookups."""
+        season = self.index.get_season(101)
+        self.assertEqual(season['className'], 'ICON (ICON)')
+        self.assertEqual(season['seasonImg'], 'https://img/101.png')
+        self.assertIsNone(self.index.get_season(555))
+
+    def test_rejects_foreign_file(self):
+        """Test bad magic raises ValueError."""
+        with self.assertRaises(ValueError):
+            MetadataIndex(b'XXXX' + b'\0' * 12)
+
+
+class MetadataLoaderIndexTest(TestCase):
+    """Test MetadataLoader serves lookups from the index file."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.idx')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(build_index(SPID_DATA, SEASON_DATA))
+        MetadataLoader._index = None
+
+    def tearDown(self):
+        MetadataLoader._index = None
+        os.remove(self.path)
+
+    def test_loader_uses_index(self):
+        """Test player/season lookups come from the mmap'd index."""
+        with override_settings(METADATA_INDEX_PATH=self.path):
+            self.assertEqual(MetadataLoader.get_player_name(300000001), '손흥민')
+            self.assertEqual(MetadataLoader.get_player_name(42), 'Unknown Player (42)')
+            self.assertEqual(MetadataLoader.get_season_info(300)['name'], '24TOTS')
+            self.assertEqual(MetadataLoader.get_season_img(101), 'https://img/101.png')
+
+    def test_build_command_writes_index(self):
+        """Test build_metadata_index writes a loadable file."""
+        output = self.path + '.built'
+
+        def fake_load(metadata_type):
+            return SPID_DATA if metadata_type == 'spid' else SEASON_DATA
+
+        with patch.object(MetadataLoader, 'load_metadata', side_effect=fake_load):
+            call_command('build_metadata_index', output=output, stdout=StringIO())
+
+        try:
+            index = MetadataIndex.open(output)
+            self.assertEqual(index.get_player_name(101000002), 'Pelé')
+            self.assertEqual(len(index.season_ids), 2)
+            index.close()
+        finally:
+            os.remove(output)
+
+
+class MetadataSnapshotVersionTest(TestCase):
+    """Test per-process lookups are swapped when the snapshot version changes."""
+
+    def setUp(self):
+        cache.clear()
+        MetadataLoader._reset_snapshot()
+        MetadataLoader._version = None
+        MetadataLoader._version_checked_at = 0.0
+
+    def tearDown(self):
+        cache.clear()
+        MetadataLoader._reset_snapshot()
+        MetadataLoader._version = None
+        MetadataLoader._version_checked_at = 0.0
+
+    def test_version_bump_reloads_lookups(self):
+        """Test a new version key makes the next lookup see new metadata."""
+        with override_settings(METADATA_INDEX_PATH=None):
+            cache.set('metadata:spid', [{'id': 1, 'name': 'Old'}], None)
+            self.assertEqual(MetadataLoader.get_player_name(1), 'Old')
+            self.assertEqual(MetadataLoader.get_player_name(2), 'Unknown Player (2)')
+
+            cache.set('metadata:spid', [{'id': 1, 'name': 'Old'}, {'id': 2, 'name': 'New'}], None)
+            cache.set(MetadataLoader.VERSION_KEY, 'v2', None)
+
+            # Within the polling interval the old snapshot is still served
+            self.assertEqual(MetadataLoader.get_player_name(2), 'Unknown Player (2)')
+
+            MetadataLoader._version_checked_at = 0.0
+            self.assertEqual(MetadataLoader.get_player_name(2), 'New')
+            self.assertEqual(MetadataLoader._version, 'v2')
+
+    def test_reset_closes_previous_index(self):
+        """Test the replaced index's mapping is released, not leaked per version bump."""
+        fd, path = tempfile.mkstemp(suffix='.idx')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(build_index(SPID_DATA, SEASON_DATA))
+        try:
+            with override_settings(METADATA_INDEX_PATH=path):
+                self.assertEqual(MetadataLoader.get_player_name(101000002), 'Pelé')
+                mapped = MetadataLoader._index._buffer
+
+                MetadataLoader._reset_snapshot()
+
+                self.assertTrue(mapped.closed)
+                self.assertEqual(MetadataLoader.get_player_name(101000002), 'Pelé')
+        finally:
+            os.remove(path)
+
+
+    def test_stale_index_ignored(self):
+        """Test a file built from an older snapshot is bypassed for the published snapshot, then reused once rebuilt."""
+        fd, path = tempfile.mkstemp(suffix='.idx')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(build_index(SPID_DATA, SEASON_DATA, 'v1'))
+        cache.set('metadata:spid', SPID_DATA + [{'id': 400000004, 'name': 'New Season'}], None)
+        cache.set(MetadataLoader.VERSION_KEY, 'v2', None)
+        try:
+            with override_settings(METADATA_INDEX_PATH=path):
+                self.assertEqual(MetadataLoader.get_player_name(400000004), 'New Season')
+                self.assertIs(MetadataLoader._index, False)
+
+                with open(path, 'wb') as f:
+                    f.write(build_index(SPID_DATA, SEASON_DATA, 'v2'))
+                MetadataLoader._index_checked_at = 0.0
+                self.assertEqual(MetadataLoader.get_player_name(101000002), 'Pelé')
+                self.assertEqual(MetadataLoader._index.snapshot_version, 'v2')
+        finally:
+            os.remove(path)
+
+
+class MetadataBackfillTest(TestCase):
+    """Test set-based PlayerPerformance name backfill."""
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create(ouid='backfill-user', nickname='Backfill')
+        match = Match.objects.create(
+            match_id='backfill-match', ouid=user, match_date=timezone.now(),
+            match_type=50, result='win', goals_for=1, goals_against=0,
+            possession=50, shots=5, shots_on_target=2, raw_data={},
+        )
+        for spid, name in [(300000001, 'ST 5등급'), (300000001, 'ST 5등급'), (101000002, 'Pelé')]:
+            PlayerPerformance.objects.create(
+                match=match, user_ouid=user, spid=spid, player_name=name,
+                season_id=spid // 1000000, position=25, grade=5, rating=Decimal('7.0'),
+            )
+
+    def test_backfill_updates_only_stale_rows(self):
+        """Test names and shortened season names are rewritten in bulk."""
+        updated = MetadataBackfill.backfill_names(
+            {300000001: '손흥민', 101000002: 'Pelé'},
+            {300: '24TOTS (24 Team of the Season)'},
+        )
+
+        self.assertEqual(updated['player_names'], 2)
+        self.assertEqual(updated['season_names'], 2)
+        self.assertEqual(
+            PlayerPerformance.objects.filter(spid=300000001, player_name='손흥민').count(), 2
+        )
+        self.assertEqual(
+            set(PlayerPerformance.objects.filter(season_id=300).values_list('season_name', flat=True)),
+            {'24TOTS'},
+        )
+        self.assertEqual(PlayerPerformance.objects.get(spid=101000002).player_name, 'Pelé')
+
+    def test_update_player_names_in_batches(self):
+        """Test the command applies names across several id-range batches."""
+        spid_data = [{'id': 300000001, 'name': '손흥민'}]
+        with patch.object(MetadataLoader, 'load_metadata', return_value=spid_data):
+            call_command('update_player_names', batch_size=1, stdout=StringIO())
+
+        self.assertEqual(
+            PlayerPerformance.objects.filter(player_name='손흥민').count(), 2
+        )
+        self.assertIsNone(cache.get('backfill:update_player_names:last_id'))
+
+    def test_update_player_names_limit(self):
+        """Test --limit stops after that many names, leaving a checkpoint to resume from."""
+        spid_data = [{'id': 300000001, 'name': '손흥민'}]
+        with patch.object(MetadataLoader, 'load_metadata', return_value=spid_data):
+            call_command('update_player_names', limit=1, stdout=StringIO())
+            self.assertEqual(PlayerPerformance.objects.filter(player_name='손흥민').count(), 1)
+
+            call_command('update_player_names', resume=True, stdout=StringIO())
+        self.assertEqual(PlayerPerformance.objects.filter(player_name='손흥민').count(), 2)
+
+    def test_update_player_names_resume_skips_done_batches(self):
+        """Test --resume only touches rows after the checkpoint."""
+        first_id = PlayerPerformance.objects.order_by('id').values_list('id', flat=True)[0]
+        cache.set('backfill:update_player_names:last_id', first_id, None)
+
+        spid_data = [{'id': 300000001, 'name': '손흥민'}]
+        with patch.object(MetadataLoader, 'load_metadata', return_value=spid_data):
+            call_command('update_player_names', resume=True, stdout=StringIO())
+
+        self.assertEqual(PlayerPerformance.objects.get(id=first_id).player_name, 'ST 5등급')
+        self.assertEqual(
+            PlayerPerformance.objects.filter(player_name='손흥민').count(), 1
+        )
+
+    def test_build_player_cache_collects_spids(self):
+        """Test spIds are collected from raw_data and placeholders applied."""
+        match = Match.objects.get(match_id='backfill-match')
+        Match.objects.filter(pk=match.pk).update(raw_data={
+            'matchInfo': [{'player': [{'spId': 300000001}, {'spId': 555000001}]}]
+        })
+        PlayerPerformance.objects.filter(spid=101000002).update(player_name='Unknown Player (101000002)')
+
+        call_command('build_player_cache', batch_size=1, stdout=StringIO())
+
+        mapping = cache.get('player_spid_mapping')
+        self.assertEqual(set(mapping), {300000001, 555000001})
+        self.assertEqual(PlayerPerformance.objects.get(spid=101000002).player_name, '선수 101000002')
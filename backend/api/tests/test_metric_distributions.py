@@ -0,0 +1,204 @@
+"""
+Tests for population percentiles from streaming quantile sketches.
+
+Tests cover:
+- KLL sketch rank accuracy, exact total weight, merge and serialization
+- Midrank percentiles for heavily tied (discrete) metrics
+- Ingest buffering, flush into metric_distributions and fallback keys
+- Sample minimum below which analyzers keep their fixed fallback
+- Rebuild from stored player performances (substitutes excluded), including
+  per-player averages for players with enough starts
+- Power scores observed once per (user, card) per period
+- PlayerPowerRanking percentile rank from the population
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from api.analyzers.metrics.quantile_sketch import KLLSketch
+from api.analyzers.player_power_ranking import PlayerPowerRanking
+from api.models import MetricDistribution, Match, PlayerPerformance, User
+from api.utils.distributions import DistributionService
+
+
+class KLLSketchTest(SimpleTestCase):
+    """Test the quantile sketch."""
+
+    def setUp(self):
+        rng = random.Random(1)
+        self.data = sorted(rng.gauss(6.5, 0.9) for _ in range(50000))
+
+    def _true_percentile(self, value):
+        return 100.0 * sum(1 for v in self.data if v < value) / len(self.data)
+
+    def test_rank_accuracy_and_size(self):
+        """Test percentiles within 1.5 points with O(k) items retained."""
+        sketch = KLLSketch(k=200, rng=random.Random(2))
+        for value in random.Random(3).sample(self.data, len(self.data)):
+            sketch.update(value)
+        cdf = sketch.cdf()
+
+        self.assertEqual(cdf.n, 50000)
+        self.assertLess(sum(len(level) for level in sketch.levels), 1000)
+        for value in (5.0, 6.0, 6.5, 7.0, 8.0):
+            self.assertAlmostEqual(cdf.percentile(value), self._true_percentile(value), delta=1.5)
+        self.assertAlmostEqual(cdf.quantile(0.5), 6.5, delta=0.05)
+
+    def test_merge_and_round_trip(self):
+        """Test merged halves equal the whole stream and survive serialization."""
+        left, right = KLLSketch(k=200), KLLSketch(k=200)
+        left.update_many(self.data[::2])
+        right.update_many(self.data[1::2])
+
+        merged = KLLSketch.from_dict(left.merge(right).to_dict())
+
+        self.assertEqual(merged.n, 50000)
+        self.assertEqual(merged.cdf().n, 50000)
+        self.assertAlmostEqual(merged.cdf().percentile(6.5), 50.0, delta=1.5)
+
+    def test_ties_count_half(self):
+        """Test a value shared by 70% of the stream sits at its midrank."""
+        sketch = KLLSketch(k=200)
+        sketch.update_many([0.0] * 7000 + [1.0] * 2000 + [2.0] * 1000)
+        cdf = sketch.cdf()
+
+        self.assertAlmostEqual(cdf.percentile(0.0), 35.0, delta=1.5)
+        self.assertAlmostEqual(cdf.percentile(2.0), 95.0, delta=1.5)
+        self.assertIsNone(KLLSketch().cdf().percentile(1.0))
+
+
+@override_settings(DISTRIBUTION_MIN_SAMPLES=50)
+class DistributionServiceTest(TestCase):
+    """Test ingest, flush, queries and rebuild."""
+
+    def setUp(self):
+        cache.clear()
+        DistributionService._pending.clear()
+        DistributionService.invalidate()
+        self.user = User.objects.create(ouid='dist-user', nickname='Sampler', max_division=900)
+        self.match = Match.objects.create(
+            match_id='dist-1', ouid=self.user, match_date=timezone.now() - timedelta(hours=1),
+            match_type=50, result='win', goals_for=2, goals_against=1, possession=50,
+            shots=8, shots_on_target=4, pass_success_rate=Decimal('80.00'), raw_data={'matchInfo': []},
+        )
+
+    def tearDown(self):
+        DistributionService._pending.clear()
+        DistributionService.invalidate()
+
+    def _performances(self, count, position=25, rating_base=6.0):
+        return [
+            PlayerPerformance(
+                match=self.match, user_ouid=self.user, spid=100 + i, player_name=f'P{i}',
+                position=position, grade=1, rating=Decimal(f'{rating_base + (i % 30) / 10:.1f}'),
+                goals=i % 3, shots=4, shots_on_target=2, pass_attempts=20, pass_success=15,
+            )
+            for i in range(count)
+        ]
+
+    def test_observe_and_flush(self):
+        """Test values are buffered per key and merged into stored sketches."""
+        DistributionService.observe_performances(self._performances(60) + self._performances(5, position=28))
+
+        flushed = DistributionService.flush()
+
+        # 4 keys (group/all × division/all) × 5 metrics (no dribbles attempted) × 60 starters
+        self.assertEqual(flushed, 4 * 5 * 60)
+        row = MetricDistribution.objects.get(metric='rating', position_group='striker', division=900)
+        self.assertEqual(row.count, 60)
+        self.assertFalse(MetricDistribution.objects.filter(metric='dribble_success_rate').exists())
+        self.assertEqual(DistributionService._pending, {})
+
+        DistributionService.observe_performances(self._performances(60))
+        DistributionService.flush()
+        self.assertEqual(MetricDistribution.objects.get(metric='rating', position_group='all', division=0).count, 120)
+
+    def test_percentile_and_fallback_keys(self):
+        """Test the most specific key with enough samples answers, None below the minimum."""
+        DistributionService.observe_performances(self._performances(60))
+        DistributionService.flush()
+
+        self.assertAlmostEqual(DistributionService.percentile('rating', 7.5, 'striker', 900), 50.0, delta=5)
+        # Unknown division falls back to the striker population across divisions
+        self.assertIsNotNone(DistributionService.percentile('rating', 7.5, 'striker', 2000))
+        self.assertIsNotNone(DistributionService.percentile('rating', 7.5, 'goalkeeper'))
+        with override_settings(DISTRIBUTION_MIN_SAMPLES=1000):
+            DistributionService.invalidate()
+            self.assertIsNone(DistributionService.percentile('rating', 7.5, 'striker', 900))
+
+    def test_failed_flush_keeps_values(self):
+        """Test values of keys not merged stay buffered."""
+        DistributionService.observe('power_score', 70.0, 'striker', 900)
+
+        with patch.object(MetricDistribution.objects, 'get_or_create', side_effect=RuntimeError('db down')):
+            with self.assertRaises(RuntimeError):
+                DistributionService.flush()
+
+        self.assertEqual(sum(len(v) for v in DistributionService._pending.values()), 4)
+
+    def test_rebuild(self):
+        """Test rebuild streams stored rows and keeps power score sketches."""
+        PlayerPerformance.objects.bulk_create(self._performances(60) + self._performances(5, position=28))
+        DistributionService.observe('power_score', 70.0)
+        DistributionService.flush()
+
+        counts = DistributionService.rebuild(batch_size=16)
+
+        self.assertEqual(counts[('rating', 'striker', 900)], 60)
+        self.assertEqual(counts[('goals', 'all', 0)], 60)
+        self.assertEqual(MetricDistribution.objects.get(metric='shot_accuracy', position_group='all', division=900).count, 60)
+        self.assertTrue(MetricDistribution.objects.filter(metric='power_score').exists())
+        # Every striker started once: no card reaches the per-player minimum
+        self.assertFalse(MetricDistribution.objects.filter(metric__startswith='player_').exists())
+
+    def test_rebuild_player_averages(self):
+        """Test one averaged value per card with enough starts, under its most frequent position."""
+        def start(spid, position, rating, shots_on_target):
+            return PlayerPerformance(
+                match=self.match, user_ouid=self.user, spid=spid, player_name=f'P{spid}',
+                position=position, grade=1, rating=Decimal(rating), goals=1,
+                shots=4, shots_on_target=shots_on_target, pass_attempts=0, pass_success=0,
+            )
+
+        PlayerPerformance.objects.bulk_create(
+            [start(1, 25, '6.0', 0), start(1, 25, '8.0', 4), start(1, 25, '7.0', 2), start(1, 25, '7.0', 2)]
+            + [start(1, 19, '7.0', 2), start(1, 28, '1.0', 0)]
+            + [start(2, 25, '9.0', 4) for _ in range(4)]
+        )
+
+        counts = DistributionService.rebuild()
+
+        self.assertEqual(counts[('player_rating', 'striker', 900)], 1)
+        self.assertNotIn(('player_rating', 'midfielder', 900), counts)
+        self.assertNotIn(('player_pass_accuracy', 'all', 0), counts)
+        rating = KLLSketch.from_dict(
+            MetricDistribution.objects.get(metric='player_rating', position_group='all', division=0).sketch
+        )
+        accuracy = KLLSketch.from_dict(
+            MetricDistribution.objects.get(metric='player_shot_accuracy', position_group='all', division=0).sketch
+        )
+        self.assertEqual(rating.cdf().percentile(7.0), 50.0)
+        self.assertEqual(accuracy.cdf().percentile(50.0), 50.0)
+
+    def test_power_score_observed_once(self):
+        """Test recomputed power scores of one card are buffered once per period."""
+        self.assertTrue(DistributionService.observe_once('power_score', 70.0, 'u:1', 'striker', 900))
+        self.assertFalse(DistributionService.observe_once('power_score', 71.0, 'u:1', 'striker', 900))
+        self.assertTrue(DistributionService.observe_once('power_score', 72.0, 'u:2', 'striker', 900))
+
+        self.assertEqual(DistributionService._pending[('power_score', 'striker', 900)], [70.0, 72.0])
+
+    def test_power_ranking_percentile(self):
+        """Test percentile rank from observed power scores, normal estimate before that."""
+        self.assertEqual(PlayerPowerRanking._calculate_percentile_rank(65.0, 'striker', 900), 50)
+
+        for score in range(100):
+            DistributionService.observe('power_score', float(score), 'striker', 900)
+        DistributionService.flush()
+
+        self.assertEqual(PlayerPowerRanking._calculate_percentile_rank(80.0, 'striker', 900), 80)
@@ -0,0 +1,157 @@
+"""
+Tests for negative caching and match fetch backoff.
+
+Tests cover:
+- Unknown nicknames answered from the negative cache (one upstream call)
+- Error classes (not found, 5xx, timeout) mapped to their TTLs; 4xx not cached
+- Exponential backoff per match id, reset on success
+- _ensure_matches skipping match ids that are backing off
+- Metrics endpoint guarded by the metrics token
+"""
+from unittest.mock import Mock, patch
+
+import requests
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import User
+from api.views import UserViewSet
+from nexon_api.client import NexonAPIClient
+from nexon_api.exceptions import NexonAPIException, UpstreamTimeoutException, UserNotFoundException
+from nexon_api.negative_cache import MatchFetchBackoff, NegativeCache, classify, upstream_stats
+
+
+def _error_response(status_code, body=None):
+    response = Mock(status_code=status_code, text='')
+    response.json.return_value = body or {}
+    error = requests.exceptions.HTTPError(f'{status_code} Error', response=response)
+    response.raise_for_status.side_effect = error
+    return response
+
+
+class NegativeCacheTest(TestCase):
+    """Test negative caching of failed client reads."""
+
+    def setUp(self):
+        cache.clear()
+        self.session = Mock()
+        patcher = patch.object(NexonAPIClient, '_get_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_unknown_nickname_called_once(self):
+        """Test repeated searches for an unknown nickname hit the API once."""
+        self.session.get.return_value = _error_response(400, {'error': {'name': 'OPENAPI00004'}})
+        client = NexonAPIClient()
+
+        for _ in range(3):
+            with self.assertRaises(UserNotFoundException):
+                client.get_user_ouid('typo-nickname')
+
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_search_view_404_from_negative_cache(self):
+        """Test /users/search/ keeps answering 404 without new upstream calls."""
+        self.session.get.return_value = _error_response(400)
+        api = APIClient()
+
+        for _ in range(2):
+            response = api.get('/api/users/search/', {'nickname': 'nobody-here'})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_timeout_and_server_error_classes(self):
+        """Test timeouts and 5xx are classified and cached with their TTLs."""
+        self.session.get.side_effect = requests.exceptions.Timeout('slow')
+        client = NexonAPIClient()
+
+        with self.assertRaises(UpstreamTimeoutException):
+            client.get_user_max_division('ouid-timeout')
+        with self.assertRaises(UpstreamTimeoutException):
+            client.get_user_max_division('ouid-timeout')
+        self.assertEqual(self.session.get.call_count, 1)
+
+        self.assertEqual(classify(NexonAPIException('down', status_code=502)), 'server_error')
+        self.assertIsNone(classify(NexonAPIException('forbidden', status_code=403)))
+        with override_settings(NEXON_NEGATIVE_TTL_SERVER_ERROR=7):
+            self.assertEqual(NegativeCache.ttl('server_error'), 7)
+
+    def test_client_error_not_cached(self):
+        """Test 4xx other than 400 is not negative-cached."""
+        self.session.get.return_value = _error_response(403)
+        client = NexonAPIClient()
+
+        for _ in range(2):
+            with self.assertRaises(NexonAPIException):
+                client.get_user_max_division('ouid-403')
+
+        self.assertEqual(self.session.get.call_count, 2)
+
+    def test_stats_count_hits(self):
+        """Test negative cache hits are counted per error class."""
+        before = upstream_stats().get('hits.not_found', 0)
+        NegativeCache.record('ouid:x', UserNotFoundException('missing'))
+
+        with self.assertRaises(UserNotFoundException):
+            NegativeCache.check('ouid:x')
+
+        self.assertEqual(upstream_stats()['hits.not_found'], before + 1)
+
+
+@override_settings(MATCH_FETCH_BACKOFF_BASE=60, MATCH_FETCH_BACKOFF_MAX=300)
+class MatchFetchBackoffTest(TestCase):
+    """Test per-match-id backoff."""
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_delay_doubles_and_caps(self):
+        """Test delays double per failure up to the maximum."""
+        self.assertEqual([MatchFetchBackoff.failed('m1') for _ in range(5)], [60, 120, 240, 300, 300])
+
+    def test_split_and_reset(self):
+        """Test failed ids are skipped until success clears them."""
+        MatchFetchBackoff.failed('m1')
+
+        self.assertEqual(MatchFetchBackoff.split(['m1', 'm2']), (['m2'], ['m1']))
+
+        MatchFetchBackoff.succeeded('m1')
+        self.assertEqual(MatchFetchBackoff.split(['m1', 'm2']), (['m1', 'm2'], []))
+
+    @patch('api.views.NexonAPIClient')
+    def test_ensure_matches_skips_backing_off_ids(self, mock_client):
+        """Test a failing match id is fetched once, then skipped."""
+        user = User.objects.create(ouid='backoff-user', nickname='Backoff')
+        mock_client.return_value.get_user_matches.return_value = ['bad-match']
+        mock_client.return_value.get_match_detail.side_effect = NexonAPIException('boom')
+
+        UserViewSet()._do_ensure_matches(user, 50, 10)
+        # Background greenlets of other tests may also reach the mock while pooled
+        fetched = mock_client.return_value.get_match_detail.call_count
+        UserViewSet()._do_ensure_matches(user, 50, 10)
+
+        self.assertGreaterEqual(fetched, 1)
+        self.assertEqual(mock_client.return_value.get_match_detail.call_count, fetched)
+        self.assertEqual(MatchFetchBackoff.split(['bad-match'])[1], ['bad-match'])
+
+
+class UpstreamStatsViewTest(TestCase):
+    """Test the upstream metrics endpoint."""
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_requires_token(self):
+        """Test the endpoint hides itself without the metrics token."""
+        api = APIClient()
+
+        self.assertEqual(api.get('/api/internal/upstream/').status_code, status.HTTP_404_NOT_FOUND)
+        response = api.get('/api/internal/upstream/', HTTP_X_METRICS_TOKEN='secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,137 @@
+"""
+Tests for vectorized opponent classification and mini-batch k-means centroids.
+
+Tests cover:
+- Feature matrix rows in FEATURES order, records without opponents skipped
+- Broadcast classification equal to per-row nearest centroid
+- classify_opponents summary from the matrix path
+- MiniBatchKMeans moving centers to the data while keeping labels
+- Centroid persistence, feature mismatch rejection and learned mode
+- fit_opponent_centroids command over stored matches
+"""
+import os
+import random
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from api.analyzers.opponent_classifier import OpponentClassifier
+from api.analyzers.opponent_clustering import MiniBatchKMeans, load_centroids, save_centroids
+from api.analyzers.team_record import TeamMatchRecord
+from api.models import User, Match
+
+
+def _raw(ouid, rng):
+    def side(owner):
+        return {
+            'ouid': owner,
+            'matchDetail': {'possession': rng.randint(30, 70)},
+            'pass': {
+                'passTry': 100, 'shortPassTry': rng.randint(20, 60), 'longPassTry': rng.randint(10, 40),
+                'throughPassTry': rng.randint(0, 10), 'passSuccess': rng.randint(60, 95),
+            },
+            'shoot': {'shootTotal': rng.randint(2, 20)},
+            'defence': {'tackleTry': rng.randint(5, 25), 'block': rng.randint(0, 8)},
+            'shootDetail': [{'x': rng.uniform(0.6, 1.0)} for _ in range(rng.randint(0, 6))],
+        }
+    return {'matchInfo': [side(ouid), side('opponent')]}
+
+
+class OpponentClassifierTest(SimpleTestCase):
+    """Test the matrix classification path."""
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.records = [TeamMatchRecord.from_raw(_raw('me', rng), 'me') for _ in range(40)]
+
+    def test_feature_matrix(self):
+        """Test one row per record with an opponent, in FEATURES order."""
+        lone = TeamMatchRecord.from_raw({'matchInfo': [{'ouid': 'me'}]}, 'me')
+
+        features, kept = OpponentClassifier.feature_matrix([self.records[0], None, lone, self.records[1]])
+
+        self.assertEqual(features.shape, (2, len(OpponentClassifier.FEATURES)))
+        self.assertEqual(kept, [0, 3])
+        possession = self.records[0].opponent.match_detail['possession']
+        self.assertAlmostEqual(features[0][OpponentClassifier.FEATURES.index('possession')], possession / 100)
+
+    def test_broadcast_matches_loop(self):
+        """Test classify_matrix equals a per-row nearest centroid search."""
+        features, _ = OpponentClassifier.feature_matrix(self.records)
+        centroids = OpponentClassifier.DEFAULT_CENTROIDS
+
+        labels = OpponentClassifier.classify_matrix(features, centroids)
+
+        expected = [int(np.argmin([np.linalg.norm(row - c) for c in centroids])) for row in features]
+        self.assertEqual(labels.tolist(), expected)
+        self.assertEqual(len(OpponentClassifier.classify_matrix(features[:0], centroids)), 0)
+
+    def test_classify_opponents_summary(self):
+        """Test every record is classified and counted once."""
+        matches = [{'result': 'win', 'goals_for': 2, 'goals_against': 1, 'record': r} for r in self.records]
+
+        result = OpponentClassifier.classify_opponents(matches)
+
+        self.assertEqual(result['total_classified'], 40)
+        self.assertEqual(sum(a['match_count'] for a in result['archetype_summary']), 40)
+
+    def test_minibatch_kmeans(self):
+        """Test centers converge to cluster means and keep their initial order."""
+        rng = np.random.default_rng(0)
+        truth = np.array([[0.2, 0.2], [0.8, 0.8]])
+        data = np.vstack([truth[i] + rng.normal(0, 0.02, (500, 2)) for i in (0, 1)])
+        rng.shuffle(data)
+        kmeans = MiniBatchKMeans(np.array([[0.3, 0.3], [0.7, 0.7]]))
+
+        for batch in np.array_split(data, 10):
+            kmeans.partial_fit(batch)
+
+        np.testing.assert_allclose(kmeans.centroids, truth, atol=0.01)
+        self.assertEqual(kmeans.samples, 1000)
+
+    def test_persistence_and_learned_mode(self):
+        """Test saved centroids are loaded, checked against FEATURES and used."""
+        learned = OpponentClassifier.DEFAULT_CENTROIDS + 0.01
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'centroids.json')
+            save_centroids(path, learned, OpponentClassifier.FEATURES, samples=123)
+
+            np.testing.assert_allclose(load_centroids(path, OpponentClassifier.FEATURES), learned)
+            self.assertIsNone(load_centroids(path, ('possession',)))
+            self.assertIsNone(load_centroids(os.path.join(tmp, 'missing.json'), OpponentClassifier.FEATURES))
+
+            with override_settings(OPPONENT_LEARNED_CENTROIDS=True, OPPONENT_CENTROIDS_PATH=path):
+                np.testing.assert_allclose(OpponentClassifier.centroids(), learned)
+            with override_settings(OPPONENT_LEARNED_CENTROIDS=False, OPPONENT_CENTROIDS_PATH=path):
+                self.assertIs(OpponentClassifier.centroids(), OpponentClassifier.DEFAULT_CENTROIDS)
+
+
+class FitOpponentCentroidsCommandTest(TestCase):
+    """Test the offline fitting command."""
+
+    def test_fits_and_saves(self):
+        """Test the command streams stored opponents and writes centroids."""
+        user = User.objects.create(ouid='fit-user', nickname='Fitter')
+        rng = random.Random(5)
+        for i in range(30):
+            Match.objects.create(
+                match_id=f'fit-{i}', ouid=user, match_date=timezone.now() - timedelta(hours=i),
+                match_type=50, result='win', goals_for=1, goals_against=0, possession=50,
+                shots=5, shots_on_target=2, pass_success_rate=Decimal('80.00'), raw_data=_raw(user.ouid, rng),
+            )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'centroids.json')
+            out = StringIO()
+            call_command('fit_opponent_centroids', '--batch-size', '8', '--epochs', '2', '--output', path, stdout=out)
+
+            centroids = load_centroids(path, OpponentClassifier.FEATURES)
+
+        self.assertIn('60 samples seen', out.getvalue())
+        self.assertEqual(centroids.shape, OpponentClassifier.DEFAULT_CENTROIDS.shape)
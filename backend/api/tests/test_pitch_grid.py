@@ -0,0 +1,177 @@
+"""
+Tests for quantized pitch grids.
+
+Tests cover:
+- Region counts exact at two-decimal thresholds, zones, equal-bin rebinning and moments
+- Sparse serialization round trip
+- Grids for both sides built at ingest (shots, goals, assist origins)
+- Window sums, with ShotDetail fallback for matches stored before grids
+- xG of rows stored before xg_cells recomputed instead of summed as zero
+- build_match_grids backfill command
+- Analyzers reading grids (attack pattern, attack width)
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from api.analyzers.opponent_dna_analyzer import OpponentDNAAnalyzer
+from api.analyzers.pitch_grid import PitchGrid
+from api.analyzers.tactical_analyzer import TacticalInsightsAnalyzer
+from api.models import Match, MatchGrid, ShotDetail, User
+from api.utils.match_grids import MatchGrids
+from api.utils.match_window import MatchWindow
+
+
+def _raw(ouid, shots, opponent_shots=()):
+    return {'matchInfo': [
+        {'ouid': ouid, 'shoot': {}, 'shootDetail': list(shots)},
+        {'ouid': 'grid-opponent', 'shoot': {}, 'shootDetail': list(opponent_shots)},
+    ]}
+
+
+def _shot(x, y, result=3, assist=None):
+    shot = {'goalTime': 100, 'x': x, 'y': y, 'type': 2, 'result': result}
+    if assist:
+        shot['assistX'], shot['assistY'] = assist
+    return shot
+
+
+class PitchGridTest(SimpleTestCase):
+    """Test grid queries."""
+
+    def test_region_counts_at_thresholds(self):
+        """Test points on a two-decimal threshold fall in the upper region."""
+        grid = PitchGrid.from_xy([(0.5, 0.25), (0.5, 0.2499), (0.5, 0.29), (0.5, 0.65), (0.5, 1.0), (0.5, None)])
+
+        self.assertEqual(grid.total, 5)
+        self.assertEqual(grid.count(y=(0.0, 0.25)), 1)
+        self.assertEqual(grid.count(y=(0.25, 0.29)), 1)
+        self.assertEqual(grid.count(y=(0.29, 0.30)), 1)
+        self.assertEqual(grid.count(y=(0.65, 1.0)), 2)
+
+    def test_zones_and_rebin(self):
+        grid = PitchGrid.from_xy([(0.1, 0.1), (0.5, 0.5), (0.9, 0.9), (0.9, 0.95)])
+
+        zones = grid.zones(x_edges=(0.33, 0.66), y_edges=(0.33, 0.66))
+        self.assertEqual(zones.tolist(), [[1, 0, 0], [0, 1, 0], [0, 0, 2]])
+        self.assertEqual(grid.rebin(2, 2).tolist(), [[1, 0], [0, 3]])
+        self.assertEqual(grid.rebin(5, 4).tolist(), [[1, 0, 0, 0], [0, 0, 0, 0], [0, 0, 1, 0],
+                                                     [0, 0, 0, 0], [0, 0, 0, 2]])
+        for nx, ny in ((0, 2), (3, 4), (20, 12)):
+            with self.assertRaises(ValueError):
+                grid.rebin(nx, ny)
+
+    def test_moments(self):
+        """Test mean / std within the cell quantization of the raw values."""
+        xs = [0.612, 0.7, 0.83, 0.9, 0.955]
+        grid = PitchGrid.from_xy((x, 0.5) for x in xs)
+        mean = sum(xs) / len(xs)
+        std = (sum((x - mean) ** 2 for x in xs) / len(xs)) ** 0.5
+
+        self.assertAlmostEqual(grid.mean('x'), mean, delta=0.005)
+        self.assertAlmostEqual(grid.std('x'), std, delta=0.005)
+        self.assertAlmostEqual(grid.std('y'), 0.0)
+        self.assertIsNone(PitchGrid().std('x'))
+
+    def test_bytes_round_trip(self):
+        grid = PitchGrid.from_xy([(0.1, 0.2), (0.1, 0.2), (0.99, 0.01)])
+        data = grid.to_bytes()
+
+        self.assertEqual(len(data), 8)  # two cells: 2 indices + 2 counts, uint16
+        self.assertTrue((PitchGrid.from_bytes(data).cells == grid.cells).all())
+        self.assertEqual(PitchGrid.from_bytes(b'').total, 0)
+
+
+class MatchGridsTest(TestCase):
+    """Test stored grids per match side."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(ouid='grid-user', nickname='Grid')
+
+    def _match(self, i, shots, opponent_shots=()):
+        return Match.objects.create(
+            match_id=f'grid-{i}', ouid=self.user, match_date=timezone.now(), match_type=50,
+            result='win', goals_for=1, goals_against=0, possession=50, shots=len(shots), shots_on_target=1,
+            pass_success_rate=Decimal('80.00'), raw_data=_raw(self.user.ouid, shots, opponent_shots),
+        )
+
+    def test_built_at_ingest_for_both_sides(self):
+        """Test the post_save signal stores shots, goals and assist origins per side."""
+        match = self._match(1, [_shot(0.9, 0.5, result=1, assist=(0.7, 0.2)), _shot(0.8, 0.1)],
+                            opponent_shots=[_shot(0.6, 0.4)])
+
+        rows = {row.ouid: row for row in MatchGrid.objects.filter(match=match)}
+        self.assertEqual(set(rows), {'grid-user', 'grid-opponent'})
+        self.assertTrue(rows['grid-user'].is_owner)
+        self.assertFalse(rows['grid-opponent'].is_owner)
+        self.assertEqual(rows['grid-user'].shots, 2)
+
+        goals = MatchGrids.for_match(match, 'goals')
+        self.assertEqual(goals.count(x=(0.9, 0.91), y=(0.5, 0.51)), 1)
+        self.assertEqual(goals.total, 1)
+        self.assertEqual(MatchGrids.for_match(match, 'assists').count(x=(0.7, 0.71), y=(0.2, 0.21)), 1)
+        self.assertEqual(MatchGrids.for_match(match, 'shots', owner=False).total, 1)
+
+    def test_window_sum_with_shot_detail_fallback(self):
+        """Test window grids sum stored rows and fill in matches without grids."""
+        self._match(1, [_shot(0.9, 0.5), _shot(0.85, 0.1)])
+        legacy = self._match(2, [_shot(0.7, 0.9)])
+        MatchGrid.objects.filter(match=legacy).delete()
+
+        window = MatchWindow(self.user, 50, 10)
+        shots = MatchGrids.window(window, 'shots')
+
+        self.assertEqual(shots.total, 3)
+        self.assertEqual(shots.count(y=(0.75, 1.0)), 1)
+        self.assertEqual(MatchGrids.window(window, 'shots', owner=False).total, 0)
+        self.assertEqual(ShotDetail.objects.filter(match=legacy).count(), 1)
+
+    def test_xg_of_rows_without_xg_cells(self):
+        """Test rows stored before migration 0023 (xg_cells=b'') still contribute xG on both sides."""
+        match = self._match(1, [_shot(0.9, 0.5), _shot(0.85, 0.1)], opponent_shots=[_shot(0.8, 0.5)])
+        window = MatchWindow(self.user, 50, 10)
+        expected = {owner: MatchGrids.window(window, 'xg', owner).total for owner in (True, False)}
+        MatchGrid.objects.filter(match=match).update(xg_cells=b'')
+
+        for owner in (True, False):
+            grids = MatchGrids.for_matches(window.ids(), ('shots', 'xg'), owner)
+            self.assertGreater(expected[owner], 0)
+            self.assertEqual(grids['xg'].total, expected[owner])
+            self.assertEqual(grids['shots'].total, 2 if owner else 1)
+
+    def test_backfill_command(self):
+        """Test build_match_grids creates grids for matches stored before them."""
+        match = self._match(1, [_shot(0.9, 0.5)], opponent_shots=[_shot(0.6, 0.4)])
+        MatchGrid.objects.all().delete()
+        out = StringIO()
+
+        call_command('build_match_grids', '--workers', '1', stdout=out)
+
+        self.assertIn('Done', out.getvalue())
+        self.assertEqual(MatchGrid.objects.filter(match=match).count(), 2)
+        self.assertEqual(MatchGrids.for_match(match).total, 1)
+
+
+class GridAnalyzersTest(SimpleTestCase):
+    """Test analyzers reading grids."""
+
+    def test_attack_pattern_from_grid_or_points(self):
+        points = [{'x': 0.8, 'y': 0.1}, {'x': 0.8, 'y': 0.9}, {'x': 0.8, 'y': 0.75}, {'x': 0.9, 'y': 0.5}]
+
+        from_points = TacticalInsightsAnalyzer._detect_attack_pattern(points)
+        from_grid = TacticalInsightsAnalyzer._detect_attack_pattern(PitchGrid.from_points(points))
+
+        self.assertEqual(from_points, from_grid)
+        self.assertEqual((from_grid['wing_shots'], from_grid['central_shots']), (3, 1))
+        self.assertEqual(from_grid['type'], 'wing_play')
+        self.assertEqual(TacticalInsightsAnalyzer._detect_attack_pattern([])['type'], 'balanced')
+
+    def test_attack_width(self):
+        shots = [{'x': 0.5, 'y': 0.5}, {'x': 0.7, 'y': 0.5}, {'x': 0.9, 'y': 0.5}]
+        self.assertAlmostEqual(OpponentDNAAnalyzer._compute_attack_width(shots), 0.163, places=3)
+        self.assertIsNone(OpponentDNAAnalyzer._compute_attack_width(shots[:2]))
@@ -0,0 +1,109 @@
+"""
+Tests for the hot-query plan audit.
+
+Tests cover:
+- Seq Scan detection over a JSON plan tree, PostgreSQL-only guard
+- No sequential scans on the hot match / shot / player queries (PostgreSQL)
+- Covering and partial indexes used for index-only scans (PostgreSQL)
+"""
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipIf, skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import User, Match, ShotDetail, PlayerPerformance
+from api.utils.query_plans import hot_queries, explain, iter_nodes, seq_scans
+
+
+PLAN = {
+    'Node Type': 'Nested Loop',
+    'Plans': [
+        {'Node Type': 'Index Scan', 'Relation Name': 'matches', 'Index Name': 'matches_ouid_type_date_idx'},
+        {'Node Type': 'Seq Scan', 'Relation Name': 'shot_details'},
+    ],
+}
+
+
+class SeqScanDetectionTest(TestCase):
+    """Test plan tree helpers."""
+
+    def test_seq_scans_filtered_by_table(self):
+        """Test only Seq Scan nodes on the given relation are returned."""
+        self.assertEqual(len(list(iter_nodes(PLAN))), 3)
+        self.assertEqual(len(seq_scans(PLAN)), 1)
+        self.assertEqual(seq_scans(PLAN, 'shot_details')[0]['Relation Name'], 'shot_details')
+        self.assertEqual(seq_scans(PLAN, 'matches'), [])
+
+    @skipIf(connection.vendor == 'postgresql', 'Checks the non-PostgreSQL guard')
+    def test_explain_requires_postgresql(self):
+        """Test explain() refuses other databases with a RuntimeError."""
+        with self.assertRaises(RuntimeError):
+            explain(Match.objects.all())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN plans require PostgreSQL')
+class HotQueryPlanTest(TestCase):
+    """Test hot queries on a seeded database avoid sequential scans."""
+
+    USERS = 40
+    MATCHES_PER_USER = 150
+    SHOTS_PER_MATCH = 8
+    PLAYERS_PER_MATCH = 18
+
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create([
+            User(ouid=f'plan-user-{u}', nickname=f'Planner{u}') for u in range(cls.USERS)
+        ])
+        now = timezone.now()
+        matches = Match.objects.bulk_create([
+            Match(
+                match_id=f'plan-{u}-{i}', ouid=user, match_date=now - timedelta(hours=i),
+                match_type=50 if i % 3 else 52, result='win' if i % 2 else 'lose',
+                goals_for=i % 4, goals_against=i % 3, possession=50, shots=8,
+                shots_on_target=3, pass_success_rate=Decimal('80.00'),
+            )
+            for u, user in enumerate(users) for i in range(cls.MATCHES_PER_USER)
+        ], batch_size=2000)
+
+        ShotDetail.objects.bulk_create([
+            ShotDetail(
+                match=match, x=Decimal('0.8500'), y=Decimal('0.5000'), result='on_target',
+                shot_type=1, goal_time=600 * s, shooter_spid=100000000 + s,
+            )
+            for match in matches for s in range(cls.SHOTS_PER_MATCH)
+        ], batch_size=5000)
+
+        PlayerPerformance.objects.bulk_create([
+            PlayerPerformance(
+                match=match, user_ouid=match.ouid, spid=200000000 + p, player_name=f'Player {p}',
+                position=28 if p == 0 else p, grade=5, rating=Decimal('7.0'),
+            )
+            for match in matches for p in range(cls.PLAYERS_PER_MATCH)
+        ], batch_size=5000)
+
+        with connection.cursor() as cursor:
+            for table in ('users', 'matches', 'shot_details', 'player_performances'):
+                cursor.execute(f'ANALYZE {table}')
+
+    def test_no_seq_scans(self):
+        """Test every hot query reaches its table through an index."""
+        for name, (table, queryset) in hot_queries('plan-user-7').items():
+            with self.subTest(query=name):
+                self.assertEqual(seq_scans(explain(queryset), table), [])
+
+    def test_covering_indexes_used(self):
+        """Test the shot and starting-XI projections read the new covering indexes."""
+        queries = hot_queries('plan-user-7')
+        expected = {
+            'shot_details': 'shot_details_match_cover_idx',
+            'starter_performances': 'player_perf_starters_idx',
+        }
+        for name, index in expected.items():
+            with self.subTest(query=name):
+                plan = explain(queries[name][1])
+                used = {node.get('Index Name') for node in iter_nodes(plan)}
+                self.assertIn(index, used)
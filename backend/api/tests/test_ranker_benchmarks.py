@@ -0,0 +1,139 @@
+"""
+Tests for nightly ranker benchmark snapshots.
+
+Tests cover:
+- Most played (spid, position) pairs per match type, substitutes excluded
+- Snapshot batches under the request budget, empty cards stored, failures skipped
+- Snapshot-first reads with live calls only for missing or stale cards
+- Snapshot entries still returned when the live call fails
+- snapshot_ranker_benchmarks command
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import Match, PlayerPerformance, RankerBenchmark, User
+from api.utils.ranker_benchmarks import RankerBenchmarks
+from nexon_api.exceptions import NexonAPIException
+
+
+def _ranker_client(without=()):
+    """Client mock answering ranker-stats for every requested player except `without`"""
+    client = Mock()
+    client.get_ranker_stats.side_effect = lambda matchtype, players: [
+        {'spId': p['id'], 'spPosition': p['po'], 'status': {'goal': 0.4, 'matchCount': 50}}
+        for p in players if p['id'] not in without
+    ]
+    return client
+
+
+class RankerBenchmarksTest(TestCase):
+    """Test popularity, snapshots and snapshot-first reads."""
+
+    def setUp(self):
+        user = User.objects.create(ouid='bench-user', nickname='Bench')
+        now = timezone.now()
+        # spid 1 @25 in 6 matches, spid 2 @18 in 5, spid 3 @25 in 2, spid 4 as substitute in 6
+        for i in range(6):
+            match = Match.objects.create(
+                match_id=f'bench-{i}', ouid=user, match_date=now - timedelta(days=i),
+                match_type=50, result='win', goals_for=1, goals_against=0, possession=50,
+                shots=5, shots_on_target=2, pass_success_rate=Decimal('80.00'), raw_data={'matchInfo': []},
+            )
+            lineup = [(1, 25), (4, 28)] + ([(2, 18)] if i < 5 else []) + ([(3, 25)] if i < 2 else [])
+            PlayerPerformance.objects.bulk_create([
+                PlayerPerformance(match=match, user_ouid=user, spid=spid, player_name=str(spid),
+                                  position=position, grade=1, rating=Decimal('7.0'))
+                for spid, position in lineup
+            ])
+        Match.objects.create(
+            match_id='bench-other', ouid=user, match_date=now, match_type=52, result='win',
+            goals_for=1, goals_against=0, possession=50, shots=5, shots_on_target=2,
+            pass_success_rate=Decimal('80.00'), raw_data={'matchInfo': []},
+        )
+
+    def test_popular_pairs(self):
+        """Test pairs ranked by appearances above the minimum, per match type."""
+        self.assertEqual(RankerBenchmarks.popular_pairs(50, min_appearances=2), [(1, 25), (2, 18), (3, 25)])
+        self.assertEqual(RankerBenchmarks.popular_pairs(50, min_appearances=5, top=1), [(1, 25)])
+        self.assertEqual(RankerBenchmarks.popular_pairs(52, min_appearances=1), [])
+
+    @patch('api.utils.ranker_benchmarks.time.sleep')
+    def test_snapshot_budget_and_empty_cards(self, mock_sleep):
+        """Test batches stop at the budget and cards without data are stored empty."""
+        client = _ranker_client(without={2})
+        pairs = [(1, 25), (2, 18), (3, 25), (5, 10)]
+
+        counts = RankerBenchmarks.snapshot(50, pairs, batch_size=2, max_requests=1, client=client)
+
+        self.assertEqual(counts, {'requests': 1, 'stored': 1, 'empty': 1, 'failed': 0})
+        self.assertEqual(RankerBenchmark.objects.get(spid=2).status, {})
+        mock_sleep.assert_not_called()
+
+        counts = RankerBenchmarks.snapshot(50, pairs, batch_size=2, requests_per_second=4, client=client)
+        self.assertEqual(counts['requests'], 2)
+        mock_sleep.assert_called_once_with(0.25)
+        self.assertEqual(RankerBenchmark.objects.filter(matchtype=50).count(), 4)
+
+    def test_snapshot_skips_failed_batches(self):
+        """Test a failing batch keeps its previous snapshot."""
+        client = Mock()
+        client.get_ranker_stats.side_effect = RuntimeError('upstream down')
+
+        counts = RankerBenchmarks.snapshot(50, [(1, 25)], requests_per_second=0, client=client)
+
+        self.assertEqual(counts['failed'], 1)
+        self.assertFalse(RankerBenchmark.objects.exists())
+
+    def test_stats_snapshot_first(self):
+        """Test fresh snapshots are served and only other cards are fetched live."""
+        today = timezone.localdate()
+        RankerBenchmark.objects.create(matchtype=50, spid=1, position=25, status={'goal': 0.9}, snapshot_date=today)
+        RankerBenchmark.objects.create(matchtype=50, spid=2, position=18, status={}, snapshot_date=today)
+        RankerBenchmark.objects.create(matchtype=50, spid=3, position=25, status={'goal': 0.1},
+                                       snapshot_date=today - timedelta(days=30))
+        client = _ranker_client()
+
+        entries = RankerBenchmarks.stats(
+            50, [{'id': 1, 'po': 25}, {'id': 2, 'po': 18}, {'id': 3, 'po': 25}, {'id': 1, 'po': 27}], client=client,
+        )
+
+        client.get_ranker_stats.assert_called_once_with(50, [{'id': 3, 'po': 25}, {'id': 1, 'po': 27}])
+        self.assertEqual([(e['spId'], e['spPosition']) for e in entries], [(1, 25), (3, 25), (1, 27)])
+        self.assertEqual(entries[0]['status'], {'goal': 0.9})
+
+        client.reset_mock()
+        RankerBenchmarks.stats(50, [{'id': 1, 'po': 25}, {'id': 2, 'po': 18}], client=client)
+        client.get_ranker_stats.assert_not_called()
+
+    def test_stats_live_failure_keeps_snapshots(self):
+        """Test a failed live call for rare cards still returns the snapshot entries."""
+        RankerBenchmark.objects.create(matchtype=50, spid=1, position=25, status={'goal': 0.9},
+                                       snapshot_date=timezone.localdate())
+        client = Mock()
+        client.get_ranker_stats.side_effect = NexonAPIException('rate limited')
+
+        with self.assertLogs('api.utils.ranker_benchmarks', 'WARNING'):
+            entries = RankerBenchmarks.stats(50, [{'id': 1, 'po': 25}, {'id': 9, 'po': 25}], client=client)
+
+        self.assertEqual(entries, [{'spId': 1, 'spPosition': 25, 'status': {'goal': 0.9}}])
+
+    @patch('api.utils.ranker_benchmarks.NexonAPIClient')
+    def test_command(self, mock_client_class):
+        """Test the command snapshots popular pairs and prunes stale rows."""
+        mock_client_class.return_value = _ranker_client()
+        RankerBenchmark.objects.create(matchtype=50, spid=99, position=0, status={'goal': 1},
+                                       snapshot_date=timezone.localdate() - timedelta(days=10))
+        out = StringIO()
+
+        call_command('snapshot_ranker_benchmarks', '--min-appearances', '2', '--rate', '0', stdout=out)
+
+        self.assertIn('3 popular pairs', out.getvalue())
+        self.assertEqual(
+            set(RankerBenchmark.objects.values_list('spid', 'position')), {(1, 25), (2, 18), (3, 25)},
+        )
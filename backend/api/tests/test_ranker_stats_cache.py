@@ -0,0 +1,97 @@
+"""
+Tests for the per-player ranker-stats cache.
+
+Tests cover:
+- Cache keys stable across processes (no per-process hash())
+- Batches split into cached and missing players, missing fetched in one call
+- Players without ranker data cached as empty and omitted from results
+- Failed batches negative-cached by a stable batch digest
+"""
+import json
+from unittest.mock import Mock, patch
+
+import requests
+from django.core.cache import cache
+from django.test import TestCase
+
+from nexon_api.client import NexonAPIClient
+from nexon_api.exceptions import NexonAPIException
+
+RANKER_URL = f"{NexonAPIClient.BASE_URL}/fconline/v1/ranker-stats"
+
+
+def _ranker_response(params, without=()):
+    players = json.loads(params['players'])
+    response = Mock(status_code=200)
+    response.json.return_value = [
+        {'spId': p['id'], 'spPosition': p['po'], 'status': {'goal': 0.5, 'matchCount': 100}}
+        for p in players if p['id'] not in without
+    ]
+    return response
+
+
+class RankerStatsCacheTest(TestCase):
+    """Test ranker stats caching per (matchtype, spid, position)."""
+
+    def setUp(self):
+        cache.clear()
+        self.session = Mock()
+        self.session.get.side_effect = lambda url, **kwargs: _ranker_response(kwargs['params'], without={300})
+        patcher = patch.object(NexonAPIClient, '_get_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        cache.clear()
+
+    def _requested(self):
+        """Players of each ranker-stats call (other upstream calls ignored)"""
+        return [
+            [(p['id'], p['po']) for p in json.loads(c.kwargs['params']['players'])]
+            for c in self.session.get.call_args_list if c.args[0] == RANKER_URL
+        ]
+
+    def test_stable_key(self):
+        """Test the per-player key is a plain string of the player identity."""
+        self.assertEqual(NexonAPIClient._ranker_stats_key(50, 101, 25), 'ranker_stats:50:101:25')
+
+    def test_only_missing_players_requested(self):
+        """Test a superset batch requests only the players not cached."""
+        client = NexonAPIClient()
+
+        first = client.get_ranker_stats(50, [{'id': 101, 'po': 25}, {'id': 102, 'po': 18}])
+        second = client.get_ranker_stats(50, [{'id': 102, 'po': 18}, {'id': 103, 'po': 0}, {'id': 101, 'po': 25}])
+        third = client.get_ranker_stats(50, [{'id': 103, 'po': 0}])
+
+        self.assertEqual(self._requested(), [[(101, 25), (102, 18)], [(103, 0)]])
+        self.assertEqual([e['spId'] for e in first], [101, 102])
+        self.assertEqual([e['spId'] for e in second], [102, 103, 101])
+        self.assertEqual([e['spId'] for e in third], [103])
+        # Same spid at another position or match type is a separate entry
+        client.get_ranker_stats(52, [{'id': 101, 'po': 25}])
+        client.get_ranker_stats(50, [{'id': 101, 'po': 27}])
+        self.assertEqual(self._requested()[2:], [[(101, 25)], [(101, 27)]])
+
+    def test_players_without_data_cached_empty(self):
+        """Test players absent from the response are not requested again."""
+        client = NexonAPIClient()
+
+        result = client.get_ranker_stats(50, [{'id': 300, 'po': 25}, {'id': 101, 'po': 25}])
+        again = client.get_ranker_stats(50, [{'id': 300, 'po': 25}])
+
+        self.assertEqual([e['spId'] for e in result], [101])
+        self.assertEqual(again, [])
+        self.assertEqual(len(self._requested()), 1)
+        self.assertEqual(cache.get('ranker_stats:50:300:25'), {})
+
+    def test_failed_batch_negative_cached(self):
+        """Test a failing batch is not retried upstream within the negative TTL."""
+        self.session.get.side_effect = requests.exceptions.RetryError('too many 503')
+        client = NexonAPIClient()
+
+        for _ in range(2):
+            with self.assertRaises(NexonAPIException):
+                client.get_ranker_stats(50, [{'id': 101, 'po': 25}])
+
+        self.assertEqual(len(self._requested()), 1)
+        self.assertIsNone(cache.get('ranker_stats:50:101:25'))
@@ -0,0 +1,132 @@
+"""
+Tests for match retention and archiving.
+
+Tests cover:
+- Retention cutoff at a month boundary
+- Per-user recent window kept regardless of age
+- Month partitions exported to gzip JSONL and deleted with their rows
+- Every table with a foreign key to Match archived with it (grids as base64)
+- archive_matches command (--dry-run, --partition)
+"""
+import base64
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from api.analyzers.pitch_grid import PitchGrid
+from api.models import User, Match, MatchGrid, ShotDetail, PlayerPerformance
+from api.utils.retention import ARCHIVED_TABLES, MatchRetention
+
+
+NOW = timezone.make_aware(datetime(2026, 6, 15, 12, 0))
+
+
+class MatchRetentionTest(TestCase):
+    """Test MatchRetention policy and partition archiving."""
+
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.user = User.objects.create(ouid='retention-user', nickname='Keeper')
+        # 6 matches, one per month back from June 2026
+        self.matches = []
+        for i in range(6):
+            match = Match.objects.create(
+                match_id=f'retention-{i}', ouid=self.user,
+                match_date=NOW - timedelta(days=31 * i), match_type=50, result='win',
+                goals_for=1, goals_against=0, possession=50, shots=1, shots_on_target=1,
+                pass_success_rate=Decimal('80.00'), raw_data={'matchId': f'retention-{i}'},
+            )
+            ShotDetail.objects.create(
+                match=match, x=Decimal('0.8'), y=Decimal('0.5'), result='goal', shot_type=1,
+            )
+            PlayerPerformance.objects.create(
+                match=match, user_ouid=self.user, spid=100000001, player_name='Player',
+                position=25, grade=1, rating=Decimal('7.0'),
+            )
+            self.matches.append(match)
+
+    def tearDown(self):
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+
+    def _retention(self, **kwargs):
+        kwargs.setdefault('months', 2)
+        kwargs.setdefault('keep_recent', 1)
+        return MatchRetention(archive_dir=self.archive_dir, now=NOW, **kwargs)
+
+    def test_cutoff_is_month_start(self):
+        """Test the cutoff is the first day of the month `months` back."""
+        cutoff = self._retention(months=7).cutoff()
+
+        self.assertEqual((cutoff.year, cutoff.month, cutoff.day, cutoff.hour), (2025, 11, 1, 0))
+
+    def test_recent_window_kept(self):
+        """Test matches inside the per-user recent window never expire."""
+        self.assertEqual(self._retention().expired().count(), 3)
+        self.assertEqual(self._retention(keep_recent=5).expired().count(), 1)
+        self.assertEqual(self._retention(keep_recent=10).expired().count(), 0)
+
+    def test_archive_partition(self):
+        """Test a month partition is exported with its rows and then deleted."""
+        retention = self._retention()
+        partitions = retention.partitions()
+        self.assertEqual([p['matches'] for p in partitions], [1, 1, 1])
+
+        result = retention.archive_partition(partitions[0]['month'])
+
+        self.assertEqual(
+            result.counts, {'matches': 1, 'shot_details': 1, 'player_performances': 1, 'match_grids': 0},
+        )
+        self.assertFalse(Match.objects.filter(match_id='retention-5').exists())
+        self.assertEqual(ShotDetail.objects.count(), 5)
+        self.assertEqual(PlayerPerformance.objects.count(), 5)
+
+        with gzip.open(f"{result.path}/matches.jsonl.gz", 'rt', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows[0]['match_id'], 'retention-5')
+        self.assertEqual(rows[0]['raw_data'], {'matchId': 'retention-5'})
+
+    def test_every_match_dependent_archived(self):
+        """Test all foreign-key dependents of Match are archived, not cascade-deleted."""
+        dependents = {
+            rel.related_model for rel in Match._meta.related_objects if rel.one_to_many or rel.one_to_one
+        }
+        self.assertTrue(dependents <= {model for model, _ in ARCHIVED_TABLES})
+        self.assertIn(MatchGrid, dependents)
+
+        cells = PitchGrid.from_xy([(0.8, 0.5)]).to_bytes()
+        MatchGrid.objects.create(match=self.matches[5], ouid=self.user.ouid, is_owner=True, shots=1,
+                                 shot_cells=cells)
+        retention = self._retention()
+
+        result = retention.archive_partition(retention.partitions()[0]['month'])
+
+        self.assertEqual(result.counts['match_grids'], 1)
+        self.assertFalse(MatchGrid.objects.filter(match_id=self.matches[5].id).exists())
+        with gzip.open(f"{result.path}/match_grids.jsonl.gz", 'rt', encoding='utf-8') as f:
+            row = json.loads(f.readline())
+        self.assertEqual(base64.b64decode(row['shot_cells']), cells)
+
+    def test_command_dry_run_and_partition(self):
+        """Test --dry-run changes nothing and --partition archives one month."""
+        out = StringIO()
+        call_command(
+            'archive_matches', months=2, keep_recent=1, archive_dir=self.archive_dir,
+            dry_run=True, stdout=out,
+        )
+        self.assertIn('DRY RUN', out.getvalue())
+        self.assertEqual(Match.objects.count(), 6)
+
+        label = self._retention().partitions()[-1]['label']
+        call_command(
+            'archive_matches', months=2, keep_recent=1, archive_dir=self.archive_dir,
+            partition=label, stdout=StringIO(),
+        )
+        self.assertEqual(Match.objects.count(), 5)
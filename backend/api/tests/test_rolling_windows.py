@@ -0,0 +1,97 @@
+"""
+Tests for the prefix-sum rolling window engine.
+
+Tests cover:
+- Rolling sums / means / label counts matching naive windows
+- Windows larger than the series and range means
+- Run detection for streaks
+- FormCycleAnalyzer scoring each match once
+"""
+import random
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from api.analyzers.form_cycle_analyzer import FormCycleAnalyzer
+from api.analyzers.metrics.form_index import FormIndexCalculator
+from api.analyzers.metrics.rolling import RollingWindows, runs
+
+
+class RollingWindowsTest(SimpleTestCase):
+    """Test RollingWindows against naive per-window sums."""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = [rng.uniform(0, 10) for _ in range(40)]
+        self.labels = [rng.choice(['win', 'draw', 'lose']) for _ in range(40)]
+        self.engine = RollingWindows(self.values, self.labels)
+
+    def test_means_and_counts(self):
+        """Test every window size matches a direct computation."""
+        for window in (1, 5, 10, 40):
+            expected = [
+                sum(self.values[i - window + 1:i + 1]) / window
+                for i in range(window - 1, len(self.values))
+            ]
+            wins = [
+                self.labels[i - window + 1:i + 1].count('win')
+                for i in range(window - 1, len(self.labels))
+            ]
+            for got, want in zip(self.engine.means(window), expected):
+                self.assertAlmostEqual(got, want)
+            self.assertEqual(self.engine.counts('win', window).tolist(), wins)
+
+    def test_out_of_range_windows(self):
+        """Test windows longer than the series are empty."""
+        self.assertEqual(len(self.engine.means(41)), 0)
+        self.assertEqual(len(self.engine.counts('win', 0)), 0)
+
+    def test_range_mean(self):
+        """Test range means from prefix sums."""
+        self.assertAlmostEqual(self.engine.range_mean(3, 9), sum(self.values[3:9]) / 6)
+        self.assertEqual(self.engine.range_mean(5, 5), 0.0)
+
+    def test_runs(self):
+        """Test consecutive runs with start and length."""
+        self.assertEqual(
+            runs(['hot', 'hot', 'neutral', 'cold', 'cold', 'cold']),
+            [('hot', 0, 2), ('neutral', 2, 1), ('cold', 3, 3)],
+        )
+        self.assertEqual(runs([]), [])
+
+
+class RollingFormTest(SimpleTestCase):
+    """Test form analysis built on RollingWindows."""
+
+    def _matches(self, results):
+        return [{
+            'match_date': f'2025-01-01 {i // 60:02d}:{i % 60:02d}:00',
+            'result': result, 'goals_for': 3 if result == 'win' else 0,
+            'goals_against': 0 if result == 'win' else 2,
+            'possession': 55, 'shots': 10, 'shots_on_target': 6, 'pass_success_rate': 85,
+        } for i, result in enumerate(results)]
+
+    def test_each_match_scored_once(self):
+        """Test per-match scores are computed once for both windows."""
+        matches = self._matches(['win'] * 30)
+        original = FormCycleAnalyzer._match_performance_score
+
+        with patch.object(FormCycleAnalyzer, '_match_performance_score', side_effect=original) as score:
+            FormCycleAnalyzer.analyze_form_cycle(matches)
+
+        self.assertEqual(score.call_count, 30)
+
+    def test_streaks_from_runs(self):
+        """Test a winning run followed by a losing run yields hot then cold streaks."""
+        result = FormCycleAnalyzer.analyze_form_cycle(self._matches(['win'] * 10 + ['lose'] * 10))
+
+        streak_types = [s['type'] for s in result['streaks']['all']]
+        self.assertEqual(streak_types, ['hot', 'cold'])
+        self.assertEqual(result['streaks']['all'][0]['start_idx'], 4)
+        self.assertEqual(len(result['rolling_5']), 16)
+
+    def test_trend_halves(self):
+        """Test trend compares half means."""
+        rising = [{'rating': 6.0}] * 3 + [{'rating': 7.0}] * 3
+        self.assertEqual(FormIndexCalculator._calculate_trend(rising), 'improving')
+        self.assertEqual(FormIndexCalculator._calculate_trend(rising[::-1]), 'declining')
@@ -0,0 +1,196 @@
+"""
+Tests for single-flight Nexon API loads.
+
+Tests cover:
+- Concurrent greenlets loading one key make a single upstream call
+- Leader errors propagated to waiting greenlets
+- Waiting greenlets get their own copy of the leader's result
+- Cached values served without calling the loader; falsy results not cached
+  unless an empty timeout is given (users without divisions)
+- A key locked by another process is awaited instead of reloaded
+- NexonAPIClient read methods coalesced (cached and uncached)
+- User detail no longer keeps its own division cache
+"""
+from unittest.mock import Mock, patch
+
+import gevent
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import User
+from nexon_api.client import NexonAPIClient
+from nexon_api.exceptions import NexonAPIException
+from nexon_api.single_flight import SingleFlight
+
+
+def _slow(value, calls):
+    def loader():
+        calls.append(1)
+        gevent.sleep(0.01)
+        return value
+    return loader
+
+
+class SingleFlightTest(TestCase):
+    """Test SingleFlight.load."""
+
+    def setUp(self):
+        cache.clear()
+        self.flight = SingleFlight(wait_timeout=2.0, poll_interval=0.01)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_concurrent_loads_call_once(self):
+        """Test N greenlets on one key share a single loader call."""
+        calls = []
+        loader = _slow({'ok': 1}, calls)
+
+        jobs = [gevent.spawn(self.flight.load, 'sf:test', loader, 60) for _ in range(10)]
+        gevent.joinall(jobs)
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(job.value == {'ok': 1} for job in jobs))
+        self.assertEqual(cache.get('sf:test'), {'ok': 1})
+
+    def test_waiters_get_copies(self):
+        """Test a caller mutating its result does not change the others'."""
+        calls = []
+        loader = _slow({'divisions': [1]}, calls)
+
+        jobs = [gevent.spawn(self.flight.load, 'sf:copies', loader) for _ in range(3)]
+        gevent.joinall(jobs)
+        jobs[0].value['divisions'].append(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([job.value['divisions'] for job in jobs[1:]], [[1], [1]])
+
+    def test_uncached_loads_coalesced(self):
+        """Test timeout=None coalesces concurrent calls but caches nothing."""
+        calls = []
+        loader = _slow([1, 2], calls)
+
+        jobs = [gevent.spawn(self.flight.load, 'sf:uncached', loader) for _ in range(5)]
+        gevent.joinall(jobs)
+
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(cache.get('sf:uncached'))
+
+    def test_error_propagates_to_followers(self):
+        """Test waiting greenlets re-raise the leader's exception."""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            gevent.sleep(0.01)
+            raise NexonAPIException('boom')
+
+        jobs = [gevent.spawn(self.flight.load, 'sf:error', loader, 60) for _ in range(4)]
+        gevent.joinall(jobs)
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(job.exception, NexonAPIException) for job in jobs))
+
+    def test_cache_hit_skips_loader(self):
+        """Test a cached value is returned without loading."""
+        cache.set('sf:hit', {'cached': True}, 60)
+        loader = Mock()
+
+        self.assertEqual(self.flight.load('sf:hit', loader, 60), {'cached': True})
+        loader.assert_not_called()
+
+    def test_falsy_result_not_cached(self):
+        """Test empty results are returned but not cached."""
+        self.assertEqual(self.flight.load('sf:empty', lambda: [], 60), [])
+        self.assertIsNone(cache.get('sf:empty'))
+
+    def test_empty_result_cached_with_empty_timeout(self):
+        """Test empty results are cached (and served) when an empty timeout is given."""
+        loader = Mock(return_value=[])
+
+        self.assertEqual(self.flight.load('sf:none', loader, 60, empty_timeout=5), [])
+        self.assertEqual(self.flight.load('sf:none', loader, 60, empty_timeout=5), [])
+        loader.assert_called_once()
+
+    def test_waits_for_other_process_lock(self):
+        """Test a key locked elsewhere is read from the cache once filled."""
+        cache.add('sf_lock:sf:remote', 1, 15)
+        loader = Mock(return_value={'local': True})
+
+        def other_process():
+            gevent.sleep(0.03)
+            cache.set('sf:remote', {'remote': True}, 60)
+
+        gevent.spawn(other_process)
+        result = self.flight.load('sf:remote', loader, 60)
+
+        self.assertEqual(result, {'remote': True})
+        loader.assert_not_called()
+
+
+class NexonClientSingleFlightTest(TestCase):
+    """Test NexonAPIClient reads go through SingleFlight."""
+
+    def setUp(self):
+        cache.clear()
+        self.session = Mock()
+        self.calls = []
+
+        def get(url, **kwargs):
+            self.calls.append(url)
+            gevent.sleep(0.01)
+            response = Mock(status_code=200, content=b'[]')
+            response.json.return_value = [{'matchType': 50, 'division': 800}]
+            response.raise_for_status.return_value = None
+            return response
+
+        self.session.get.side_effect = get
+        patcher = patch.object(NexonAPIClient, '_get_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_cached_read_single_upstream_call(self):
+        """Test concurrent get_user_max_division calls hit the API once."""
+        client = NexonAPIClient()
+        jobs = [gevent.spawn(client.get_user_max_division, 'ouid-1') for _ in range(8)]
+        gevent.joinall(jobs)
+
+        # Greenlets left over from other tests may share the patched session
+        self.assertEqual(sum('/maxdivision' in url for url in self.calls), 1)
+        self.assertEqual(jobs[0].value, [{'matchType': 50, 'division': 800}])
+
+    def test_empty_divisions_cached(self):
+        """Test a user without divisions is not re-fetched on every retrieve."""
+        self.session.get.side_effect = None
+        self.session.get.return_value = Mock(status_code=200, content=b'[]', **{'json.return_value': []})
+        client = NexonAPIClient()
+
+        self.assertEqual(client.get_user_max_division('ouid-empty'), [])
+        self.assertEqual(client.get_user_max_division('ouid-empty'), [])
+
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_uncached_read_single_upstream_call(self):
+        """Test concurrent get_user_info calls (not cached) hit the API once."""
+        client = NexonAPIClient()
+        jobs = [gevent.spawn(client.get_user_info, 'ouid-1') for _ in range(8)]
+        gevent.joinall(jobs)
+
+        self.assertEqual(sum('/user/basic' in url for url in self.calls), 1)
+
+    @patch('api.views.NexonAPIClient')
+    def test_user_detail_has_no_division_cache(self, mock_client):
+        """Test retrieve relies on the client cache, not user_divisions:{ouid}."""
+        mock_client.return_value.get_user_max_division.return_value = []
+        user = User.objects.create(ouid='sf-user', nickname='Trending')
+
+        response = APIClient().get(f'/api/users/{user.ouid}/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_client.return_value.get_user_max_division.assert_called_once_with('sf-user')
+        self.assertIsNone(cache.get(f'user_divisions:{user.ouid}'))
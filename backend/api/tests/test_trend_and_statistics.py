@@ -6,10 +6,14 @@ TDD tests for:
      _ensure_matches like every other analysis endpoint).
   3. pass_try=0 masking: passTry=0 should not be silently replaced with 1,
      which would produce a misleading 0% pass rate.
+  4. SQL aggregation (StatisticsAnalyzer.aggregate_recent) matching the
+     Python calculators for overview/statistics, without an unbounded window.
 """
 from decimal import Decimal
 from unittest.mock import patch, MagicMock
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from datetime import timedelta
 from rest_framework.test import APIClient
@@ -17,7 +21,7 @@ from rest_framework import status
 from django.core.cache import cache
 
 from api.models import User, Match
-from api.analyzers.statistics import StatisticsCalculator
+from api.analyzers.statistics import StatisticsCalculator, StatisticsAnalyzer
 
 
 # ---------------------------------------------------------------------------
@@ -341,3 +345,66 @@ class TestPassTryZeroHandling(TestCase):
         rate = (pass_data.get('passSuccess', 0) / pass_try * 100) if pass_try > 0 else None
 
         self.assertIsNone(rate)
+
+
+# ===========================================================================
+# Issue 4 – SQL aggregation for overview / statistics
+# ===========================================================================
+
+class TestAggregateRecent(TestCase):
+    """StatisticsAnalyzer.aggregate_recent must agree with the Python path."""
+
+    RESULTS = ['win', 'win', 'lose', 'draw', 'win', 'lose', 'lose', 'win', 'draw']
+
+    def setUp(self):
+        self.user = User.objects.create(ouid='agg-user', nickname='AggTester')
+        for i, result in enumerate(self.RESULTS):
+            make_match(self.user, f'agg-{i}', result, days_ago=i)
+        Match.objects.filter(match_id='agg-8').update(pass_success_rate=None)
+
+    def _python_stats(self, limit):
+        matches = list(Match.objects.filter(ouid=self.user).order_by('-match_date')[:limit])
+        dicts = [{
+            'result': m.result,
+            'goals_for': m.goals_for,
+            'goals_against': m.goals_against,
+            'possession': m.possession,
+            'shots': m.shots,
+            'shots_on_target': m.shots_on_target,
+            'pass_success_rate': float(m.pass_success_rate or 0),
+        } for m in matches]
+        return StatisticsCalculator.calculate_statistics(dicts), dicts
+
+    def test_matches_python_calculators(self):
+        """Averages, form and trend equal the StatisticsCalculator results."""
+        for limit in (1, 4, 7, 20):
+            agg = StatisticsAnalyzer.aggregate_recent(Match.objects.filter(ouid=self.user), limit)
+            expected, dicts = self._python_stats(limit)
+
+            self.assertEqual(agg['total'], expected['total_matches'])
+            self.assertEqual(agg['wins'], sum(1 for d in dicts if d['result'] == 'win'))
+            self.assertAlmostEqual(agg['avg_goals_for'], expected['avg_goals_for'], places=2)
+            self.assertAlmostEqual(agg['avg_pass_success_rate'], expected['avg_pass_success_rate'], places=2)
+            self.assertEqual(agg['recent_form'], [d['result'] for d in dicts[:5]])
+            self.assertEqual(StatisticsAnalyzer.form_trend(agg), expected['trends'])
+
+    def test_empty_range(self):
+        """No matches yields zero totals and an empty form."""
+        agg = StatisticsAnalyzer.aggregate_recent(Match.objects.filter(ouid__ouid='nobody'), 10)
+        self.assertEqual(agg['total'], 0)
+        self.assertEqual(agg['recent_form'], [])
+        self.assertEqual(agg['avg_shots'], 0.0)
+
+    def test_single_query(self):
+        """The whole summary is one SQL statement."""
+        with self.assertNumQueries(1):
+            StatisticsAnalyzer.aggregate_recent(Match.objects.filter(ouid=self.user), 20)
+
+    def test_no_unbounded_window(self):
+        """Only ROW_NUMBER() is windowed; the range size is counted under the LIMIT."""
+        with CaptureQueriesContext(connection) as queries:
+            StatisticsAnalyzer.aggregate_recent(Match.objects.filter(ouid=self.user), 4)
+
+        sql = queries[0]['sql'].upper()
+        self.assertEqual(sql.count(' OVER '), 1)
+        self.assertIn('ROW_NUMBER() OVER', sql)
@@ -0,0 +1,94 @@
+"""
+Tests for the Redis-backed visit counter.
+
+Tests cover:
+- Visits counted without database writes
+- Batched flush of pending counts into daily buckets
+- Total rebuilt from bucket sums + pending after eviction
+- HyperLogLog unique-visitor estimate stored on flush
+- visitor-count endpoint and flush_visit_counts command
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import DailyVisitCount
+from api.utils.visit_counter import VisitCounter
+
+
+@override_settings(VISIT_FLUSH_SECONDS=3600)
+class VisitCounterTest(TestCase):
+    """Test VisitCounter record / flush / total."""
+
+    def setUp(self):
+        cache.clear()
+        # Flush already ran this interval: records must not touch the DB
+        cache.set(VisitCounter.FLUSH_DUE_KEY, 1, 3600)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_record_without_db_writes(self):
+        """Test visits after the first only hit the cache."""
+        self.assertEqual(VisitCounter.record(), 1)
+
+        with self.assertNumQueries(0):
+            for _ in range(4):
+                total = VisitCounter.record()
+
+        self.assertEqual(total, 5)
+        self.assertFalse(DailyVisitCount.objects.exists())
+
+    def test_flush_moves_pending_into_bucket(self):
+        """Test flush adds pending counts to today's bucket and clears them."""
+        DailyVisitCount.objects.create(date=timezone.localdate(), visits=10)
+        for _ in range(3):
+            VisitCounter.record()
+
+        flushed = VisitCounter.flush()
+
+        self.assertEqual(flushed, {timezone.localdate(): 3})
+        self.assertEqual(DailyVisitCount.objects.get(date=timezone.localdate()).visits, 13)
+        self.assertEqual(VisitCounter.pending(), {})
+        self.assertEqual(VisitCounter.total(), 13)
+
+    def test_total_rebuilt_from_buckets(self):
+        """Test a missing cached total is rebuilt from bucket sums plus pending."""
+        DailyVisitCount.objects.create(date=timezone.localdate() - timedelta(days=30), visits=100)
+        DailyVisitCount.objects.create(date=timezone.localdate() - timedelta(days=1), visits=20)
+        VisitCounter.record()
+        VisitCounter.record()
+
+        cache.delete(VisitCounter.TOTAL_KEY)
+
+        self.assertEqual(VisitCounter.total(), 122)
+
+    def test_unique_visitors_from_hyperloglog(self):
+        """Test the HLL estimate is stored with the flushed bucket."""
+        client = Mock()
+        client.pfcount.return_value = 2
+        with patch.object(VisitCounter, '_redis', return_value=client):
+            VisitCounter.record('visitor-a')
+            VisitCounter.record('visitor-b')
+            VisitCounter.flush()
+
+        self.assertEqual(client.pfadd.call_count, 2)
+        self.assertEqual(DailyVisitCount.objects.get(date=timezone.localdate()).unique_visitors, 2)
+
+    def test_endpoint_and_command(self):
+        """Test POST counts a visit, GET reads it, the command flushes it."""
+        api = APIClient()
+        self.assertEqual(api.post('/api/visitor-count/').data['total_visits'], 1)
+        self.assertEqual(api.get('/api/visitor-count/').data['total_visits'], 1)
+
+        out = StringIO()
+        call_command('flush_visit_counts', stdout=out)
+
+        self.assertIn('Flushed 1 visits', out.getvalue())
+        self.assertEqual(DailyVisitCount.objects.get().visits, 1)
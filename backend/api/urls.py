@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     UserViewSet, MatchViewSet, UserStatsViewSet,
     get_tier_info, send_support_message, search_players, opponent_dna,
-    visitor_count,
+    visitor_count, db_pool_stats, upstream_stats,
 )
 
 router = DefaultRouter()
@@ -18,4 +18,6 @@ urlpatterns = [
     path('search-players/', search_players, name='search-players'),
     path('opponent-dna/', opponent_dna, name='opponent-dna'),
     path('visitor-count/', visitor_count, name='visitor-count'),
+    path('internal/db-pool/', db_pool_stats, name='db-pool-stats'),
+    path('internal/upstream/', upstream_stats, name='upstream-stats'),
 ]
@@ -0,0 +1,281 @@
+"""
+Match Backfill Framework
+
+Shared engine for re-extracting derived rows (ShotDetail, PlayerPerformance,
+MatchGrid)
+from Match.raw_data across the whole database:
+
+- keyset pagination over Match.id, loading only the columns extractors read
+- chunks processed by a multiprocessing pool, one DB connection per worker
+- one DELETE + batched bulk_create per chunk instead of per match
+- a low-water-mark checkpoint in the cache so a killed run can --resume,
+  keyed by job and filters so a resume never continues another filter's run
+- throughput reporting (matches/sec, rows/sec)
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from api.utils.db_pool import close_pools
+
+logger = logging.getLogger(__name__)
+
+
+# Columns the extractors read from Match; raw_data is the only large one
+MATCH_ONLY_FIELDS = ('id', 'match_id', 'raw_data', 'ouid_id', 'goals_for', 'goals_against')
+
+
+# Builders return (unsaved rows, ids of the matches they were built for, matches
+# failed). Only the built matches have their rows replaced: a match whose build
+# raised or had nothing to extract keeps its existing rows.
+
+def _build_shots(matches) -> Tuple[List, List[int], int]:
+    from api.utils.shot_extractor import ShotDataExtractor
+
+    objects = []
+    built = []
+    failed = 0
+    for match in matches:
+        try:
+            shots = ShotDataExtractor.build_shot_details(match, match.ouid_id)
+        except Exception as e:
+            failed += 1
+            logger.warning(f"Shot re-extraction failed for match {match.match_id}: {e}")
+            continue
+        if shots is not None:
+            objects.extend(shots)
+            built.append(match.id)
+    return objects, built, failed
+
+
+def _build_performances(matches) -> Tuple[List, List[int], int]:
+    from api.models import User
+    from api.utils.player_extractor import PlayerPerformanceExtractor
+
+    team_ouids = {
+        info.get('ouid')
+        for match in matches
+        for info in (match.raw_data or {}).get('matchInfo', [])
+        if info.get('ouid')
+    }
+    users_by_ouid = {u.ouid: u for u in User.objects.filter(ouid__in=team_ouids)}
+
+    objects = []
+    built = []
+    failed = 0
+    for match in matches:
+        try:
+            objects.extend(PlayerPerformanceExtractor.build_performances(match, users_by_ouid))
+        except Exception as e:
+            failed += 1
+            logger.warning(f"PlayerPerformance re-extraction failed for match {match.match_id}: {e}")
+            continue
+        built.append(match.id)
+    return objects, built, failed
+
+
+def _build_grids(matches) -> Tuple[List, List[int], int]:
+    from api.utils.match_grids import MatchGrids
+
+    objects = []
+    built = []
+    failed = 0
+    for match in matches:
+        try:
+            objects.extend(MatchGrids.build(match))
+        except Exception as e:
+            failed += 1
+            logger.warning(f"Grid build failed for match {match.match_id}: {e}")
+            continue
+        built.append(match.id)
+    return objects, built, failed
+
+
+def _shot_model():
+    from api.models import ShotDetail
+    return ShotDetail
+
+
+def _performance_model():
+    from api.models import PlayerPerformance
+    return PlayerPerformance
+
+
+def _grid_model():
+    from api.models import MatchGrid
+    return MatchGrid
+
+
+# name -> (model getter, builder)
+JOBS: Dict[str, Tuple[Callable, Callable]] = {
+    'shots': (_shot_model, _build_shots),
+    'player_performances': (_performance_model, _build_performances),
+    'match_grids': (_grid_model, _build_grids),
+}
+
+
+def process_chunk(job: str, filters: dict, lo: int, hi: int, insert_batch_size: int) -> Tuple[int, int, int, int]:
+    """
+    Re-extract one Match.id range (lo, hi] for `job`.
+
+    Runs in a pool worker, which opens its own DB connection on first query
+    (the parent closes its connections and pools before forking). Existing derived rows
+    of the matches that built are replaced in a single transaction; failed
+    matches keep theirs.
+
+    Returns:
+        (hi, matches processed, rows created, matches failed)
+    """
+    from api.models import Match
+
+    get_model, build = JOBS[job]
+    model = get_model()
+
+    matches = list(
+        Match.objects.filter(raw_data__isnull=False, id__gt=lo, id__lte=hi, **filters)
+        .only(*MATCH_ONLY_FIELDS)
+        .order_by('id')
+    )
+    if not matches:
+        return hi, 0, 0, 0
+
+    objects, built, failed = build(matches)
+
+    with transaction.atomic():
+        model.objects.filter(match_id__in=built).delete()
+        model.objects.bulk_create(objects, batch_size=insert_batch_size)
+
+    return hi, len(matches), len(objects), failed
+
+
+def _process_chunk_star(args):
+    return process_chunk(*args)
+
+
+@dataclass
+class BackfillStats:
+    matches: int = 0
+    rows: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.monotonic() - self.started_at, 1e-6)
+
+    def summary(self) -> str:
+        return (
+            f"{self.matches} matches, {self.rows} rows, {self.failed} failed in {self.elapsed:.1f}s "
+            f"({self.matches / self.elapsed:.1f} matches/sec, {self.rows / self.elapsed:.0f} rows/sec)"
+        )
+
+
+class MatchBackfill:
+    """Parallel, chunked, resumable re-extraction over Match.raw_data"""
+
+    CHECKPOINT_KEY = 'backfill:{}:last_id'
+    # Filtered runs checkpoint separately: a --nickname run's low-water mark
+    # says nothing about the matches a whole-table run has covered
+    FILTERED_CHECKPOINT_KEY = 'backfill:{}:{}:last_id'
+
+    def __init__(
+        self,
+        job: str,
+        filters: Optional[dict] = None,
+        chunk_size: int = 500,
+        workers: int = 4,
+        insert_batch_size: int = 2000,
+    ):
+        if job not in JOBS:
+            raise ValueError(f"Unknown backfill job: {job}")
+        self.job = job
+        self.filters = filters or {}
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.insert_batch_size = insert_batch_size
+        self.checkpoint_key = self._checkpoint_key(job, self.filters)
+
+    @classmethod
+    def _checkpoint_key(cls, job: str, filters: dict) -> str:
+        if not filters:
+            return cls.CHECKPOINT_KEY.format(job)
+        scope = json.dumps(filters, sort_keys=True, default=str)
+        return cls.FILTERED_CHECKPOINT_KEY.format(job, hashlib.md5(scope.encode()).hexdigest()[:12])
+
+    def queryset(self):
+        from api.models import Match
+        return Match.objects.filter(raw_data__isnull=False, **self.filters)
+
+    def iter_chunks(self, start_id: int = 0):
+        """Yield (lo, hi] Match.id ranges of up to chunk_size rows via keyset pagination"""
+        last = start_id
+        while True:
+            ids = list(
+                self.queryset().filter(id__gt=last).order_by('id')
+                .values_list('id', flat=True)[:self.chunk_size]
+            )
+            if not ids:
+                return
+            yield last, ids[-1]
+            last = ids[-1]
+
+    def checkpoint(self) -> int:
+        return int(cache.get(self.checkpoint_key) or 0)
+
+    def run(self, resume: bool = False, progress: Optional[Callable[[BackfillStats, int], None]] = None) -> BackfillStats:
+        """
+        Process every chunk and return throughput stats.
+
+        Chunks complete out of order across workers; the checkpoint only
+        advances to the highest id below which every chunk has committed, so a
+        resumed run never skips work (at worst it redoes a few chunks).
+        """
+        start_id = self.checkpoint() if resume else 0
+        stats = BackfillStats()
+
+        chunks = [
+            (self.job, self.filters, lo, hi, self.insert_batch_size)
+            for lo, hi in self.iter_chunks(start_id)
+        ]
+        if not chunks:
+            cache.delete(self.checkpoint_key)
+            return stats
+
+        pending = [hi for _, _, _, hi, _ in chunks]
+        done = set()
+        low_water = start_id
+
+        def record(result):
+            nonlocal low_water
+            hi, matches, rows, failed = result
+            stats.matches += matches
+            stats.rows += rows
+            stats.failed += failed
+            done.add(hi)
+            while pending and pending[0] in done:
+                low_water = pending.pop(0)
+            cache.set(self.checkpoint_key, low_water, None)
+            if progress:
+                progress(stats, low_water)
+
+        if self.workers <= 1:
+            for chunk in chunks:
+                record(process_chunk(*chunk))
+        else:
+            # Close the parent's connections and pools so forked workers open their own
+            close_pools()
+            ctx = multiprocessing.get_context('fork')
+            with ctx.Pool(self.workers) as pool:
+                for result in pool.imap_unordered(_process_chunk_star, chunks):
+                    record(result)
+
+        cache.delete(self.checkpoint_key)
+        logger.info(f"Backfill {self.job}: {stats.summary()}")
+        return stats
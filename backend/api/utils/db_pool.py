@@ -0,0 +1,140 @@
+"""
+Database Connection Budget
+
+With DB_POOL_MAX_SIZE set, every alias uses Django's psycopg 3 connection
+pool (OPTIONS['pool']), bounded per worker process: request greenlets check
+a connection out for the request and return it when the request finishes,
+waiting up to DB_POOL_TIMEOUT when the pool is exhausted.
+
+Ingestion greenlets (the GeventPool in `_do_ensure_matches`, background
+syncs) are not requests, so nothing returns their connection. They take a
+slot from the ingestion budget instead: at most DB_INGEST_MAX_CONNECTIONS
+of them hold a connection at once, leaving the rest of the pool to request
+greenlets, and the connection is returned to the pool when the slot is
+released.
+
+gevent's monkey-patching makes the semaphore and the pool greenlet-aware.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionBudgetExhausted(Exception):
+    """No ingestion slot became free within DB_POOL_TIMEOUT"""
+
+
+class IngestionBudget:
+    """Bounded number of ingestion greenlets holding a DB connection"""
+
+    def __init__(self, size: int, timeout: float):
+        self.size = size
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.peak = 0
+        self.acquired = 0
+        self.waited = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+    @contextmanager
+    def slot(self):
+        """Hold an ingestion slot; this greenlet's connections are returned on exit"""
+        start = time.monotonic()
+        if not self._semaphore.acquire(timeout=self.timeout):
+            with self._lock:
+                self.timeouts += 1
+            logger.warning(f"Ingestion DB budget exhausted after {self.timeout}s: {self.stats()}")
+            raise IngestionBudgetExhausted(f"no ingestion connection within {self.timeout}s")
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self.acquired += 1
+            self.in_use += 1
+            self.peak = max(self.peak, self.in_use)
+            if waited > 0.01:
+                self.waited += 1
+                self.wait_seconds += waited
+        try:
+            yield
+        finally:
+            release_connections()
+            with self._lock:
+                self.in_use -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict:
+        return {
+            'size': self.size,
+            'in_use': self.in_use,
+            'peak': self.peak,
+            'acquired': self.acquired,
+            'waited': self.waited,
+            'timeouts': self.timeouts,
+            'wait_seconds': round(self.wait_seconds, 3),
+        }
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def ingestion_budget() -> IngestionBudget:
+    """Process-wide ingestion budget (created on first use)"""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                _budget = IngestionBudget(settings.DB_INGEST_MAX_CONNECTIONS, settings.DB_POOL_TIMEOUT)
+    return _budget
+
+
+def ingestion_slot():
+    return ingestion_budget().slot()
+
+
+def release_connections():
+    """
+    Return the current greenlet's connections (to the pool, or close them).
+
+    Connections inside an atomic block are left alone: without gevent's
+    monkey-patching (runserver, tests) greenlets share the caller's connection.
+    """
+    for conn in connections.all(initialized_only=True):
+        if not conn.in_atomic_block:
+            conn.close()
+
+
+def close_pools():
+    """
+    Close this process's connections and shut down its connection pools.
+
+    connections.close_all() only returns pooled connections to the pool, so
+    a forked child would inherit (and share) the parent's pooled sockets.
+    Call this before forking; each side then opens its own pool on first use.
+    """
+    connections.close_all()
+    for alias in connections:
+        conn = connections[alias]
+        # Only pools already opened: the `pool` property would create one
+        if alias in getattr(conn, '_connection_pools', {}):
+            conn.close_pool()
+
+
+def pool_stats() -> Dict:
+    """psycopg pool stats per alias (when pooling is enabled) and the ingestion budget"""
+    pools = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is not None:
+            pools[alias] = pool.get_stats()
+    return {'pools': pools, 'ingestion': ingestion_budget().stats()}
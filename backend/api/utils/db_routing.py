@@ -0,0 +1,181 @@
+"""
+Read-Replica Routing
+
+Analysis endpoints only read once `_ensure_matches` has synced, so their
+queries can be served by a streaming replica (DATABASES['replica'],
+configured with DB_REPLICA_HOST) while ingestion writes and visit counter
+flushes stay on the primary.
+
+Routing is opt-in: reads go to the replica only inside `replica_reads(ouid)`
+(or a view wrapped with `@use_replica`), and only when
+
+- the user was not synced within REPLICA_STICKY_SECONDS (`stick_to_primary`
+  is called after new matches are written, so the user's next requests read
+  their own writes from the primary; it also switches the calling request's
+  own replica block, whose later reads follow the sync), and
+- the replica's replay lag, checked at most every REPLICA_LAG_CHECK_SECONDS,
+  is under REPLICA_MAX_LAG_SECONDS. An unreachable replica counts as lagging.
+
+The alias is chosen at the block's first routed read, not on entry, and
+`stick_to_primary` overrides it for the rest of the block.
+
+`primary_reads()` forces the primary inside a replica block, e.g. for the
+existence checks `_ensure_matches` makes before inserting.
+
+State is kept in a threading.local, which gevent's monkey-patching makes
+greenlet-local, so concurrent requests in one worker don't share it.
+"""
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+
+_state = threading.local()
+
+# Replay lag of the replica in seconds: CASE covers an idle primary, where
+# pg_last_xact_replay_timestamp() keeps aging although nothing is pending.
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_lag = {'checked_at': 0.0, 'seconds': None}
+_lag_lock = threading.Lock()
+
+
+def replica_configured() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+def _sticky_key(ouid: str) -> str:
+    return f"db_sticky:{ouid}"
+
+
+def stick_to_primary(ouid: str) -> None:
+    """Read `ouid`'s data from the primary for the next REPLICA_STICKY_SECONDS"""
+    if replica_configured():
+        cache.set(_sticky_key(ouid), 1, settings.REPLICA_STICKY_SECONDS)
+        # The syncing request's own replica block reads its writes too
+        choice = getattr(_state, 'replica_choice', None)
+        if choice is not None and choice.ouid == ouid:
+            choice.alias = PRIMARY
+
+
+def replica_lag() -> Optional[float]:
+    """Replica replay lag in seconds (cached per process), None if unreachable"""
+    now = time.monotonic()
+    if now - _lag['checked_at'] < settings.REPLICA_LAG_CHECK_SECONDS:
+        return _lag['seconds']
+
+    with _lag_lock:
+        if now - _lag['checked_at'] < settings.REPLICA_LAG_CHECK_SECONDS:
+            return _lag['seconds']
+        try:
+            with connections[REPLICA].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                seconds = float(cursor.fetchone()[0])
+        except Exception as e:
+            logger.warning(f"Replica lag check failed, reading from primary: {e}")
+            seconds = None
+        _lag.update(checked_at=now, seconds=seconds)
+        return seconds
+
+
+def replica_healthy() -> bool:
+    lag = replica_lag()
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+
+def _choose(ouid: Optional[str]) -> str:
+    if not replica_configured():
+        return PRIMARY
+    if ouid and cache.get(_sticky_key(ouid)):
+        return PRIMARY
+    return REPLICA if replica_healthy() else PRIMARY
+
+
+class _ReplicaChoice:
+    """Alias of a replica_reads() block, chosen at its first routed read"""
+
+    __slots__ = ('ouid', 'alias')
+
+    def __init__(self, ouid: Optional[str]):
+        self.ouid = ouid
+        self.alias = None
+
+    def resolve(self) -> str:
+        if self.alias is None:
+            self.alias = _choose(self.ouid)
+        return self.alias
+
+
+@contextmanager
+def _reading_from(alias):
+    previous = getattr(_state, 'read_db', None)
+    _state.read_db = alias
+    try:
+        yield alias
+    finally:
+        _state.read_db = previous
+
+
+@contextmanager
+def replica_reads(ouid: Optional[str] = None):
+    """Route reads to the replica (or the primary when sticky / lagging)"""
+    choice = _ReplicaChoice(ouid)
+    previous = getattr(_state, 'replica_choice', None)
+    _state.replica_choice = choice
+    try:
+        with _reading_from(choice):
+            yield choice
+    finally:
+        _state.replica_choice = previous
+
+
+def primary_reads():
+    """Route reads to the primary, also inside a replica_reads block"""
+    return _reading_from(PRIMARY)
+
+
+def use_replica(view):
+    """Decorator for read-only viewset actions keyed by the `ouid` URL kwarg"""
+    @functools.wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        with replica_reads(kwargs.get('ouid')):
+            return view(self, request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Send reads inside replica_reads() to the chosen alias; writes to the primary"""
+
+    def db_for_read(self, model, **hints):
+        read_db = getattr(_state, 'read_db', None)
+        if isinstance(read_db, _ReplicaChoice):
+            return read_db.resolve()
+        return read_db
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replica rows are copies of primary rows
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
@@ -0,0 +1,288 @@
+"""
+Metric Distributions
+
+Population distributions of player metrics, so analyzers report real
+percentiles from our own user base instead of an assumed normal
+distribution. Each (metric, position group, division) keeps a KLL quantile
+sketch (api.analyzers.metrics.quantile_sketch) in MetricDistribution; every
+value also goes into the 'all' group and division 0 (all divisions), which
+are the fallbacks for sparse keys.
+
+- Ingest: `observe_performances()` is called with the PlayerPerformance rows
+  of each newly extracted match. Values are buffered per process and merged
+  into the stored sketches (one row lock per key) at most every
+  DISTRIBUTION_FLUSH_SECONDS. Buffered values are lost if the process dies
+  before a flush, bounded by the interval.
+- Power scores are not per-row; the power-rankings view observes the scores
+  it computes, at most once per (user, player) per DISTRIBUTION_OBSERVE_SECONDS
+  (`observe_once`), so a player is not weighted by how often the view misses
+  its cache.
+- Queries: `percentile()` loads a snapshot once per
+  DISTRIBUTION_REFRESH_SECONDS per process and answers with one bisect.
+  Keys with fewer than DISTRIBUTION_MIN_SAMPLES values return None and the
+  caller keeps its fixed-distribution fallback.
+- `manage.py build_metric_distributions` rebuilds the per-row sketches from
+  every stored PlayerPerformance (initial load, nightly refresh).
+
+The per-row metrics sketch single-match values: a percentile compares one
+match against the per-match distribution at the same position. Averages over
+several matches are far less spread out, so they are compared against the
+`player_` metrics instead: per-player averages (one value per user and card
+with DISTRIBUTION_PLAYER_MIN_APPEARANCES starts), built only by the rebuild.
+"""
+import logging
+import time
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from api.analyzers.metrics.quantile_sketch import KLLSketch, QuantileCdf
+from api.analyzers.player_power_ranking import PlayerPowerRanking
+from api.models import MetricDistribution, PlayerPerformance
+from api.utils.db_routing import primary_reads
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str, int]
+
+SUB_POSITION = 28
+
+# PlayerPerformance columns read to compute the per-row metrics
+PERFORMANCE_FIELDS = (
+    'rating', 'goals', 'assists', 'shots', 'shots_on_target',
+    'pass_attempts', 'pass_success', 'dribble_attempts', 'dribble_success',
+)
+
+
+def performance_metrics(rating, goals, assists, shots, shots_on_target,
+                        pass_attempts, pass_success, dribble_attempts, dribble_success) -> Dict[str, float]:
+    """Per-match metric values of one player row (rates only when attempted)"""
+    values = {'rating': float(rating), 'goals': float(goals), 'assists': float(assists)}
+    if shots:
+        values['shot_accuracy'] = shots_on_target / shots * 100
+    if pass_attempts:
+        values['pass_accuracy'] = pass_success / pass_attempts * 100
+    if dribble_attempts:
+        values['dribble_success_rate'] = dribble_success / dribble_attempts * 100
+    return values
+
+
+def player_metrics(appearances, rating, goals, assists, *totals) -> Dict[str, float]:
+    """Per-player average metric values from one player's summed PERFORMANCE_FIELDS"""
+    values = performance_metrics(
+        float(rating) / appearances, goals / appearances, assists / appearances, *totals,
+    )
+    return {f'player_{metric}': value for metric, value in values.items()}
+
+
+class DistributionService:
+    """Streaming population percentiles per (metric, position group, division)"""
+
+    ALL = 'all'
+    PERFORMANCE_METRICS = (
+        'rating', 'goals', 'assists', 'shot_accuracy', 'pass_accuracy', 'dribble_success_rate',
+    )
+    PLAYER_METRICS = tuple(f'player_{metric}' for metric in PERFORMANCE_METRICS)
+
+    _pending: Dict[Key, List[float]] = defaultdict(list)
+    _last_flush = time.monotonic()
+    _snapshots: Dict[Key, Tuple[float, Optional[QuantileCdf]]] = {}
+
+    @staticmethod
+    def position_group(position: int) -> Optional[str]:
+        """PlayerPowerRanking group of a position code, None for substitutes"""
+        if position is None or position == SUB_POSITION:
+            return None
+        return PlayerPowerRanking._get_position_group(position)
+
+    @classmethod
+    def _keys(cls, metric: str, position_group: str, division: Optional[int]) -> List[Key]:
+        """Most specific key first; the 'all' group and division 0 are the fallbacks"""
+        keys = []
+        for group in dict.fromkeys((position_group or cls.ALL, cls.ALL)):
+            for div in dict.fromkeys((division or 0, 0)):
+                keys.append((metric, group, div))
+        return keys
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+    @classmethod
+    def observe(cls, metric: str, value: float, position_group: str = ALL,
+                division: Optional[int] = None) -> None:
+        """Buffer one value for every key it belongs to"""
+        for key in cls._keys(metric, position_group, division):
+            cls._pending[key].append(float(value))
+
+    @classmethod
+    def observe_once(cls, metric: str, value: float, identity: str, position_group: str = ALL,
+                     division: Optional[int] = None) -> bool:
+        """observe() unless `identity` already contributed to `metric` this period; returns whether it did"""
+        if not cache.add(f'dist_observed:{metric}:{identity}', 1, settings.DISTRIBUTION_OBSERVE_SECONDS):
+            return False
+        cls.observe(metric, value, position_group, division)
+        return True
+
+    @classmethod
+    def observe_performances(cls, performances: Iterable[PlayerPerformance]) -> None:
+        """Buffer the per-row metrics of newly ingested PlayerPerformance objects"""
+        for p in performances:
+            group = cls.position_group(p.position)
+            if group is None:
+                continue
+            division = getattr(p.user_ouid, 'max_division', None)
+            values = performance_metrics(*(getattr(p, f) for f in PERFORMANCE_FIELDS))
+            for metric, value in values.items():
+                cls.observe(metric, value, group, division)
+        cls.maybe_flush()
+
+    @classmethod
+    def maybe_flush(cls) -> None:
+        if time.monotonic() - cls._last_flush < settings.DISTRIBUTION_FLUSH_SECONDS:
+            return
+        try:
+            cls.flush()
+        except Exception as e:
+            logger.warning(f"Metric distribution flush failed: {e}")
+
+    @classmethod
+    def _sketch(cls, row: MetricDistribution) -> KLLSketch:
+        if row.sketch:
+            return KLLSketch.from_dict(row.sketch)
+        return KLLSketch(k=settings.DISTRIBUTION_SKETCH_K)
+
+    @classmethod
+    def flush(cls) -> int:
+        """Merge this process's buffered values into the stored sketches; returns values flushed"""
+        pending, cls._pending = cls._pending, defaultdict(list)
+        cls._last_flush = time.monotonic()
+
+        flushed = 0
+        remaining = list(pending)
+        try:
+            with primary_reads():
+                while remaining:
+                    key = remaining[0]
+                    metric, group, division = key
+                    with transaction.atomic():
+                        MetricDistribution.objects.get_or_create(metric=metric, position_group=group, division=division)
+                        row = MetricDistribution.objects.select_for_update().get(
+                            metric=metric, position_group=group, division=division,
+                        )
+                        sketch = cls._sketch(row)
+                        sketch.update_many(pending[key])
+                        row.sketch, row.count = sketch.to_dict(), sketch.n
+                        row.save(update_fields=['sketch', 'count', 'updated_at'])
+                    remaining.pop(0)
+                    cls._snapshots.pop(key, None)
+                    flushed += len(pending[key])
+        finally:
+            # Values of keys not merged stay buffered for the next flush
+            for key in remaining:
+                cls._pending[key][:0] = pending[key]
+        return flushed
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    @classmethod
+    def snapshot(cls, metric: str, position_group: str = ALL, division: int = 0) -> Optional[QuantileCdf]:
+        """Loaded CDF of one key (per-process, refreshed periodically), None below the sample minimum"""
+        key = (metric, position_group, division)
+        cached = cls._snapshots.get(key)
+        if cached and time.monotonic() - cached[0] < settings.DISTRIBUTION_REFRESH_SECONDS:
+            return cached[1]
+
+        row = MetricDistribution.objects.filter(
+            metric=metric, position_group=position_group, division=division,
+            count__gte=settings.DISTRIBUTION_MIN_SAMPLES,
+        ).only('sketch').first()
+        cdf = KLLSketch.from_dict(row.sketch).cdf() if row else None
+        cls._snapshots[key] = (time.monotonic(), cdf)
+        return cdf
+
+    @classmethod
+    def percentile(cls, metric: str, value: float, position_group: Optional[str] = None,
+                   division: Optional[int] = None) -> Optional[float]:
+        """Population percentile (0-100) of `value`, from the most specific key with enough samples"""
+        for key in cls._keys(metric, position_group, division):
+            cdf = cls.snapshot(*key)
+            if cdf is not None:
+                return round(cdf.percentile(value), 1)
+        return None
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop loaded snapshots (next query reloads from the database)"""
+        cls._snapshots.clear()
+
+    # ------------------------------------------------------------------
+    # Rebuild
+    # ------------------------------------------------------------------
+    @classmethod
+    def rebuild(cls, batch_size: int = 5000) -> Dict[Key, int]:
+        """
+        Recompute the per-row and per-player metric sketches from every stored
+        PlayerPerformance. Replaces the stored rows of PERFORMANCE_METRICS and
+        PLAYER_METRICS (power_score is kept); returns the sample count per key.
+        """
+        k = settings.DISTRIBUTION_SKETCH_K
+        sketches: Dict[Key, KLLSketch] = defaultdict(lambda: KLLSketch(k=k))
+        buffers: Dict[Key, List[float]] = defaultdict(list)
+
+        def add(values: Dict[str, float], group: Optional[str], division: Optional[int]) -> None:
+            for metric, value in values.items():
+                for key in cls._keys(metric, group, division):
+                    buffers[key].append(value)
+                    if len(buffers[key]) >= batch_size:
+                        sketches[key].update_many(buffers.pop(key))
+
+        rows = (
+            PlayerPerformance.objects.exclude(position=SUB_POSITION)
+            .values_list('position', 'user_ouid__max_division', *PERFORMANCE_FIELDS)
+            .iterator(chunk_size=batch_size)
+        )
+        for position, division, *fields in rows:
+            add(performance_metrics(*fields), cls.position_group(position), division)
+
+        # Per-player averages: sums per (user, card, position), merged per (user, card)
+        # and grouped under the position the card started at most
+        player_rows = (
+            PlayerPerformance.objects.exclude(position=SUB_POSITION)
+            .values('user_ouid', 'spid', 'position', 'user_ouid__max_division')
+            .annotate(appearances=Count('id'), **{f'total_{f}': Sum(f) for f in PERFORMANCE_FIELDS})
+            .order_by('user_ouid', 'spid')
+            .iterator(chunk_size=batch_size)
+        )
+        for _, positions in groupby(player_rows, key=itemgetter('user_ouid', 'spid')):
+            positions = list(positions)
+            appearances = sum(p['appearances'] for p in positions)
+            if appearances < settings.DISTRIBUTION_PLAYER_MIN_APPEARANCES:
+                continue
+            main = max(positions, key=itemgetter('appearances'))
+            totals = [sum(p[f'total_{f}'] or 0 for p in positions) for f in PERFORMANCE_FIELDS]
+            add(player_metrics(appearances, *totals),
+                cls.position_group(main['position']), main['user_ouid__max_division'])
+
+        for key, values in buffers.items():
+            sketches[key].update_many(values)
+
+        with transaction.atomic():
+            MetricDistribution.objects.filter(
+                metric__in=cls.PERFORMANCE_METRICS + cls.PLAYER_METRICS,
+            ).delete()
+            MetricDistribution.objects.bulk_create([
+                MetricDistribution(
+                    metric=metric, position_group=group, division=division,
+                    count=sketch.n, sketch=sketch.to_dict(),
+                )
+                for (metric, group, division), sketch in sketches.items()
+            ], batch_size=500)
+        cls.invalidate()
+        return {key: sketch.n for key, sketch in sketches.items()}
@@ -0,0 +1,236 @@
+"""
+Form History
+
+Form and session aggregates over a user's entire stored match history,
+computed by the database with window functions so Python never holds the
+match rows (form-cycle's `?limit=all` mode).
+
+One windowed query scores every match and numbers it:
+
+- score: FormCycleAnalyzer._match_performance_score as an SQL expression
+- ordinal: ROW_NUMBER() per local day (TIME_ZONE, Asia/Seoul), i.e. "n-th
+  match of the day". Days are cut in local time, not UTC.
+- form_5 / form_10: AVG(score) over the last 5 / 10 matches (ROWS frames)
+
+Outer queries reduce it to summarized series: per-ordinal session win rates,
+one row per day (form at the day's last match), hot/cold streaks as
+gaps-and-islands runs, and the latest matches for current form. All four
+run in one statement over a shared `scored` CTE, so the window scan happens
+once per summary. The inner
+query is compiled by Django for the active backend, so the same SQL runs on
+Postgres (the replica, under replica_reads) and on SQLite in tests.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Avg, Case, Count, F, FloatField, IntegerField, Value, When, Window
+from django.db.models.functions import Cast, Coalesce, Greatest, Least, RowNumber, TruncDate
+from django.db.models.expressions import RowRange
+from django.utils import timezone
+
+from api.models import Match
+
+
+HOT_THRESHOLD = 70.0
+COLD_THRESHOLD = 40.0
+MIN_STREAK_LEN = 3
+
+# The four series share one statement: `scored` is a CTE referenced by every
+# section, so Postgres materializes the windowed scan once instead of
+# re-running it per series. Each section has a `pos` column giving its order.
+SUMMARY_SQL = """
+    WITH scored AS ({scored}),
+    sessions (pos, total, wins, draws, losses) AS (
+        SELECT ordinal, COUNT(*),
+               SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN result = 'draw' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN result = 'lose' THEN 1 ELSE 0 END)
+        FROM scored
+        GROUP BY ordinal
+    ),
+    -- Form at the day's last match; valid windows only (full 5 / 10 matches)
+    daily (pos, day, total, wins, draws, losses, goals_for, goals_against, avg_score,
+           form_5, form_10, form_sum, form_count) AS (
+        SELECT ROW_NUMBER() OVER (ORDER BY day), CAST(day AS TEXT), COUNT(*),
+               SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN result = 'draw' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN result = 'lose' THEN 1 ELSE 0 END),
+               SUM(goals_for), SUM(goals_against), AVG(score),
+               MAX(CASE WHEN ordinal = day_size AND n_5 = 5 THEN form_5 END),
+               MAX(CASE WHEN ordinal = day_size AND n_10 = 10 THEN form_10 END),
+               SUM(CASE WHEN n_5 = 5 THEN ROUND(CAST(form_5 * 10 AS NUMERIC), 1) END),
+               SUM(CASE WHEN n_5 = 5 THEN 1 ELSE 0 END)
+        FROM scored
+        GROUP BY day
+    ),
+    -- Runs of consecutive hot / cold rolling-5 form: seq minus the row number
+    -- within the phase is constant along a run
+    phased AS (
+        SELECT seq, match_date,
+               CASE WHEN ROUND(CAST(form_5 * 10 AS NUMERIC), 1) >= {hot} THEN 'hot'
+                    WHEN ROUND(CAST(form_5 * 10 AS NUMERIC), 1) <= {cold} THEN 'cold'
+                    ELSE 'neutral' END AS phase
+        FROM scored
+        WHERE n_5 = 5
+    ),
+    islands AS (
+        SELECT seq, match_date, phase,
+               seq - ROW_NUMBER() OVER (PARTITION BY phase ORDER BY seq) AS island
+        FROM phased
+    ),
+    streaks (pos, phase, run_length, first_date) AS (
+        SELECT MIN(seq), phase, COUNT(*), MIN(match_date)
+        FROM islands
+        WHERE phase <> 'neutral'
+        GROUP BY phase, island
+        HAVING COUNT(*) >= {min_len}
+    ),
+    recent (pos, result, form_5, n_5, form_10, n_10) AS (
+        SELECT -seq, result, form_5, n_5, form_10, n_10
+        FROM scored
+        ORDER BY seq DESC
+        LIMIT 10
+    )
+    {sections}
+    ORDER BY section, pos
+"""
+
+# Columns of the combined result. Sections fill some and leave the rest as
+# typed NULLs, so UNION ALL resolves one type per column on every backend.
+SUMMARY_COLUMNS = (
+    ('pos', 'BIGINT'), ('label', 'TEXT'), ('at', 'TIMESTAMP WITH TIME ZONE'),
+    *((f'i{n}', 'BIGINT') for n in range(1, 8)),
+    *((f'f{n}', 'DOUBLE PRECISION') for n in range(1, 4)),
+    ('num', 'NUMERIC'),
+)
+
+# section CTE -> {summary column: section column}
+SECTIONS = {
+    'sessions': {'pos': 'pos', 'i1': 'total', 'i2': 'wins', 'i3': 'draws', 'i4': 'losses'},
+    'daily': {
+        'pos': 'pos', 'label': 'day', 'i1': 'total', 'i2': 'wins', 'i3': 'draws', 'i4': 'losses',
+        'i5': 'goals_for', 'i6': 'goals_against', 'i7': 'form_count',
+        'f1': 'avg_score', 'f2': 'form_5', 'f3': 'form_10', 'num': 'form_sum',
+    },
+    'streaks': {'pos': 'pos', 'label': 'phase', 'at': 'first_date', 'i1': 'run_length'},
+    'recent': {'pos': 'pos', 'label': 'result', 'i1': 'n_5', 'i2': 'n_10', 'f1': 'form_5', 'f2': 'form_10'},
+}
+
+
+def _sections_sql() -> str:
+    """UNION ALL of the section CTEs in SUMMARY_COLUMNS layout"""
+    return '\n    UNION ALL\n    '.join(
+        "SELECT '{}' AS section, {} FROM {}".format(
+            section,
+            ', '.join(
+                f'{columns[name]} AS {name}' if name in columns else f'CAST(NULL AS {sql_type}) AS {name}'
+                for name, sql_type in SUMMARY_COLUMNS
+            ),
+            section,
+        )
+        for section, columns in SECTIONS.items()
+    )
+
+
+def _local(value) -> str:
+    """Local-time string of a datetime column (SQLite returns strings)"""
+    return str(timezone.localtime(value)) if isinstance(value, datetime) else str(value)
+
+
+def _float(name: str):
+    return Cast(name, FloatField())
+
+
+def performance_score():
+    """FormCycleAnalyzer._match_performance_score as a database expression"""
+    base = Case(
+        When(result='win', then=Value(6.0)),
+        When(result='draw', then=Value(4.0)),
+        default=Value(2.0),
+        output_field=FloatField(),
+    )
+    gd_bonus = Greatest(Least((_float('goals_for') - _float('goals_against')) * Value(0.5), Value(2.0)), Value(-2.0))
+    shot_quality = Least(_float('shots_on_target') / Greatest(_float('shots'), Value(1.0)) * Value(1.5), Value(1.0))
+    poss_bonus = (_float('possession') - Value(50.0)) * Value(0.01)
+    pass_bonus = (Coalesce(_float('pass_success_rate'), Value(70.0)) - Value(70.0)) * Value(0.01)
+    return Greatest(Least(base + gd_bonus + shot_quality + poss_bonus + pass_bonus, Value(10.0)), Value(0.0))
+
+
+class FormHistory:
+    """Full-history form summary of one user and match type"""
+
+    def __init__(self, ouid, match_type: int):
+        self.ouid = getattr(ouid, 'ouid', ouid)
+        self.match_type = match_type
+
+    def scored(self):
+        """Every match with its score, local day, day ordinal and rolling form"""
+        chronological = [F('match_date').asc(), F('id').asc()]
+        local_day = TruncDate('match_date', tzinfo=ZoneInfo(settings.TIME_ZONE))
+
+        def rolling(function, size):
+            return Window(function, order_by=chronological, frame=RowRange(start=-(size - 1), end=0))
+
+        return (
+            Match.objects.filter(ouid=self.ouid, match_type=self.match_type)
+            .annotate(score=performance_score())
+            .values('id', 'match_date', 'result', 'goals_for', 'goals_against', 'score')
+            .annotate(
+                day=local_day,
+                seq=Window(RowNumber(), order_by=chronological),
+                ordinal=Window(RowNumber(), partition_by=[local_day], order_by=chronological),
+                day_size=Window(Count('id'), partition_by=[local_day]),
+                form_5=rolling(Avg('score'), 5),
+                n_5=rolling(Count('id', output_field=IntegerField()), 5),
+                form_10=rolling(Avg('score'), 10),
+                n_10=rolling(Count('id', output_field=IntegerField()), 10),
+            )
+        )
+
+    def _fetch(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Rows of every section (by section column name), from one statement"""
+        queryset = self.scored()
+        inner_sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+        sql = SUMMARY_SQL.format(
+            scored=inner_sql, sections=_sections_sql(),
+            hot=HOT_THRESHOLD, cold=COLD_THRESHOLD, min_len=MIN_STREAK_LEN,
+        )
+        names = [name for name, _ in SUMMARY_COLUMNS]
+        rows = {section: [] for section in SECTIONS}
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            for section, *values in cursor.fetchall():
+                row = dict(zip(names, values))
+                rows[section].append({column: row[name] for name, column in SECTIONS[section].items()})
+        return rows
+
+    def summarize(self) -> Dict[str, Any]:
+        """Summarized series for FormCycleAnalyzer.analyze_form_history"""
+        rows = self._fetch()
+        sessions = [{
+            'session': int(row['pos']), 'total': int(row['total']),
+            'wins': int(row['wins']), 'draws': int(row['draws']), 'losses': int(row['losses']),
+        } for row in rows['sessions']]
+        daily = [{
+            'date': str(row['day'])[:10],
+            'matches': int(row['total']), 'wins': int(row['wins']), 'draws': int(row['draws']),
+            'losses': int(row['losses']),
+            'goals_for': int(row['goals_for'] or 0), 'goals_against': int(row['goals_against'] or 0),
+            'avg_score': float(row['avg_score']),
+            'form_5': None if row['form_5'] is None else float(row['form_5']),
+            'form_10': None if row['form_10'] is None else float(row['form_10']),
+            'form_index_sum': float(row['form_sum'] or 0), 'form_index_count': int(row['form_count'] or 0),
+        } for row in rows['daily']]
+        streaks = [{
+            'type': row['phase'], 'start_idx': int(row['pos']) - 1,
+            'length': int(row['run_length']), 'match_date': _local(row['first_date']),
+        } for row in rows['streaks']]
+        recent = [{
+            'result': row['result'],
+            'form_5': float(row['form_5']) if row['n_5'] == 5 else None,
+            'form_10': float(row['form_10']) if row['n_10'] == 10 else None,
+        } for row in rows['recent']]
+        return {'sessions': sessions, 'daily': daily, 'streaks': streaks, 'recent': recent}
@@ -0,0 +1,126 @@
+"""
+Habit Store
+Stored habit engine counts (HabitCounts rows), per user, match type and stream
+
+- `record_matches()` runs after a sync with the matches it created: their
+  symbols come from the raw_data already in memory and are added to the
+  user's counts under a row lock. Matches newer than the stored 'pass' stream
+  are chained onto its tail; older ones (a deeper sync) add only their own
+  n-grams. Users without stored counts are skipped, their first read builds
+  them.
+- `load()` returns the counts per stream, or None when not built yet.
+- `rebuild()` counts a user's stored matches in match-date order (the first
+  habit-loop read, or when the stored layout no longer matches the engine).
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+
+from api.analyzers.habit_engine import (
+    NgramCounts, PASS_SYMBOLS, SHOT_SYMBOLS, pass_symbol, shot_symbols,
+)
+from api.analyzers.team_record import TeamMatchRecord
+from api.models import HabitCounts, Match
+from api.utils.db_routing import primary_reads
+
+
+class HabitStore:
+    """Incrementally maintained habit counts"""
+
+    STREAMS = {'pass': PASS_SYMBOLS, 'shot': SHOT_SYMBOLS}
+    # Streams chained across matches (the others restart every match)
+    CHAINED = {'pass'}
+
+    @staticmethod
+    def _symbols(match: Match) -> Dict[str, List[str]]:
+        record = TeamMatchRecord.for_match(match)
+        if record is None:
+            return {'pass': [], 'shot': []}
+        symbol = pass_symbol(record)
+        return {'pass': [symbol] if symbol else [], 'shot': shot_symbols(record)}
+
+    @classmethod
+    def _count_match(cls, rows: Dict[str, HabitCounts], counts: Dict[str, NgramCounts], match: Match) -> None:
+        """Add one match to the counts and row state of every stream"""
+        symbols = cls._symbols(match)
+        for stream, row in rows.items():
+            newer = row.last_match_date is None or match.match_date > row.last_match_date
+            if stream in cls.CHAINED and newer:
+                if symbols[stream]:
+                    row.tail = counts[stream].add(symbols[stream], context=row.tail)
+            else:
+                counts[stream].add(symbols[stream])
+            row.matches += 1
+            if newer:
+                row.last_match_date = match.match_date
+
+    @classmethod
+    def record_matches(cls, user, matches: Iterable[Match]) -> int:
+        """Add newly stored matches to the user's counts; returns the matches counted"""
+        by_type = defaultdict(list)
+        for match in matches:
+            if match.raw_data and match.match_date:
+                by_type[match.match_type].append(match)
+
+        counted = 0
+        with primary_reads(), transaction.atomic():
+            for match_type, group in by_type.items():
+                rows = {
+                    row.stream: row
+                    for row in HabitCounts.objects.select_for_update().filter(ouid=user, match_type=match_type)
+                }
+                if set(rows) != set(cls.STREAMS):
+                    continue
+                try:
+                    counts = {stream: NgramCounts.from_bytes(cls.STREAMS[stream], bytes(row.counts))
+                              for stream, row in rows.items()}
+                except ValueError:
+                    # Engine layout changed: drop the rows, the next read rebuilds them
+                    HabitCounts.objects.filter(ouid=user, match_type=match_type).delete()
+                    continue
+
+                for match in sorted(group, key=lambda m: m.match_date):
+                    cls._count_match(rows, counts, match)
+                for stream, row in rows.items():
+                    row.counts = counts[stream].to_bytes()
+                    row.save(update_fields=['counts', 'tail', 'matches', 'last_match_date', 'updated_at'])
+                counted += len(group)
+        return counted
+
+    @classmethod
+    def load(cls, user, match_type: int) -> Optional[Dict[str, NgramCounts]]:
+        """Counts per stream, or None when the user's counts are not built (or stale)"""
+        rows = {row.stream: row for row in HabitCounts.objects.filter(ouid=user, match_type=match_type)}
+        if set(rows) != set(cls.STREAMS):
+            return None
+        try:
+            return {stream: NgramCounts.from_bytes(cls.STREAMS[stream], bytes(row.counts))
+                    for stream, row in rows.items()}
+        except ValueError:
+            return None
+
+    @classmethod
+    def rebuild(cls, user, match_type: int) -> Dict[str, NgramCounts]:
+        """Recount all stored matches of the user in match-date order and replace the rows"""
+        rows = {stream: HabitCounts(ouid=user, match_type=match_type, stream=stream, tail=[])
+                for stream in cls.STREAMS}
+        counts = {stream: NgramCounts(symbols) for stream, symbols in cls.STREAMS.items()}
+
+        with primary_reads():
+            matches = (
+                Match.objects.filter(ouid=user, match_type=match_type)
+                .exclude(match_date__isnull=True)
+                .only('ouid', 'match_date', 'match_type', 'raw_data')
+                .order_by('match_date', 'id')
+            )
+            for match in matches.iterator(chunk_size=100):
+                if match.raw_data:
+                    cls._count_match(rows, counts, match)
+
+            for stream, row in rows.items():
+                row.counts = counts[stream].to_bytes()
+            with transaction.atomic():
+                HabitCounts.objects.filter(ouid=user, match_type=match_type).delete()
+                HabitCounts.objects.bulk_create(rows.values())
+        return counts
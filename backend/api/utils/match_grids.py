@@ -0,0 +1,202 @@
+"""
+Match Grids
+
+Per-match PitchGrids (api.analyzers.pitch_grid) of shot positions, goals,
+assist origins and xG, one MatchGrid row per side (the match owner and the
+opponent), built at ingest by a post_save signal and for older matches by
+`manage.py build_match_grids`.
+
+Window reads sum the stored grids. Owner-side matches stored before grids
+existed are filled in from their ShotDetail rows, and the empty xG channel of
+rows stored before migration 0023 from ShotDetail (owner) or raw_data
+(opponent), so results don't depend on the backfill having run.
+
+`heatmap()` is the binned heatmap response (`?bins=NxM`, N and M divisors of
+GRID_SIZE so every bin covers the same pitch area): density and xG-sum grids
+rebinned from the stored cells, plus an optional sample of at most
+MAX_POINTS shots in columns, floats rounded to 3 decimals.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from api.analyzers.pitch_grid import GRID_SIZE, PitchGrid
+from api.analyzers.shot_analyzer import ShotAnalyzer
+from api.models import Match, MatchGrid, ShotDetail
+from api.utils.match_window import MatchWindow
+from api.utils.shot_extractor import ShotDataExtractor
+
+# xG is stored as integer thousandths per cell
+XG_SCALE = 1000
+
+_BINS_PATTERN = re.compile(r'^(\d+)x(\d+)$')
+
+
+def _xg(get, shot) -> float:
+    """Shot xG as ShotAnalyzer computes it (0 without coordinates)"""
+    try:
+        x, y = float(get(shot, 'x')), float(get(shot, 'y'))
+    except (TypeError, ValueError):
+        return 0.0
+    return ShotAnalyzer._calculate_advanced_xg({'x': x, 'y': y, 'shot_type': get(shot, 'shot_type') or 0})
+
+
+class MatchGrids:
+    """Stored shot / assist grids per (match, side)"""
+
+    # channel -> MatchGrid column
+    CHANNELS = {'shots': 'shot_cells', 'goals': 'goal_cells', 'assists': 'assist_cells', 'xg': 'xg_cells'}
+
+    MAX_POINTS = 500
+
+    @staticmethod
+    def _grids(shots) -> Dict[str, PitchGrid]:
+        """Channel grids of ShotDetail objects (or values() dicts)"""
+        get = (lambda s, k: s.get(k)) if shots and isinstance(shots[0], dict) else getattr
+        return {
+            'shots': PitchGrid.from_xy((get(s, 'x'), get(s, 'y')) for s in shots),
+            'goals': PitchGrid.from_xy((get(s, 'x'), get(s, 'y')) for s in shots if get(s, 'result') == 'goal'),
+            'assists': PitchGrid.from_xy((get(s, 'assist_x'), get(s, 'assist_y')) for s in shots),
+            'xg': PitchGrid.from_xy(
+                ((get(s, 'x'), get(s, 'y')) for s in shots),
+                weights=(round(_xg(get, s) * XG_SCALE) for s in shots),
+            ),
+        }
+
+    @classmethod
+    def build(cls, match: Match) -> List[MatchGrid]:
+        """Unsaved grid rows for every side in the match's raw_data"""
+        rows = []
+        seen = set()
+        for info in (match.raw_data or {}).get('matchInfo') or []:
+            ouid = info.get('ouid')
+            if not ouid or ouid in seen:
+                continue
+            seen.add(ouid)
+            shots = (ShotDataExtractor.build_shot_details(match, ouid) or []) if info.get('shootDetail') else []
+            grids = cls._grids(shots)
+            rows.append(MatchGrid(
+                match=match, ouid=ouid, is_owner=ouid == match.ouid_id, shots=len(shots),
+                **{column: grids[channel].to_bytes() for channel, column in cls.CHANNELS.items()},
+            ))
+        return rows
+
+    @classmethod
+    def extract_and_save(cls, match: Match) -> int:
+        """Replace the match's grid rows; returns the sides stored"""
+        rows = cls.build(match)
+        MatchGrid.objects.filter(match=match).delete()
+        MatchGrid.objects.bulk_create(rows)
+        return len(rows)
+
+    @classmethod
+    def for_matches(cls, match_ids, channels: Sequence[str] = ('shots',), owner: bool = True) -> Dict[str, PitchGrid]:
+        """Sum of each channel over `match_ids` (a list or an id subquery), one query for all channels"""
+        grids = {channel: PitchGrid() for channel in channels}
+        rows = MatchGrid.objects.filter(match_id__in=match_ids, is_owner=owner).values_list(
+            'match_id', 'shots', *(cls.CHANNELS[channel] for channel in channels)
+        )
+        # rows built before migration 0023 have shots but xg_cells=b''
+        stale = []
+        for match_id, shots, *cells_row in rows:
+            for channel, cells in zip(channels, cells_row):
+                if channel == 'xg' and shots and not cells:
+                    stale.append(match_id)
+                    continue
+                grids[channel].cells += PitchGrid.from_bytes(bytes(cells)).cells
+
+        if owner:
+            missing = list(
+                ShotDetail.objects.filter(match_id__in=match_ids, match__grids__isnull=True)
+                .values('x', 'y', 'result', 'shot_type', 'assist_x', 'assist_y')
+            )
+            if missing:
+                fallback = cls._grids(missing)
+                for channel in channels:
+                    grids[channel].cells += fallback[channel].cells
+        if stale:
+            grids['xg'].cells += cls._stale_xg(stale, owner).cells
+        return grids
+
+    @classmethod
+    def _stale_xg(cls, match_ids: List[int], owner: bool) -> PitchGrid:
+        """xG grid of sides whose row predates xg_cells: ShotDetail for the owner, raw_data for opponents"""
+        if owner:
+            shots = list(ShotDetail.objects.filter(match_id__in=match_ids).values('x', 'y', 'shot_type'))
+            return cls._grids(shots)['xg']
+        grid = PitchGrid()
+        for match in Match.objects.filter(id__in=match_ids):
+            for row in cls.build(match):
+                if not row.is_owner:
+                    grid.cells += PitchGrid.from_bytes(row.xg_cells).cells
+        return grid
+
+    @classmethod
+    def window(cls, window: MatchWindow, channel: str = 'shots', owner: bool = True) -> PitchGrid:
+        """Sum of one channel over the window's matches (owner or opponent side)"""
+        return cls.for_matches(window.ids(), (channel,), owner)[channel]
+
+    @classmethod
+    def for_match(cls, match: Match, channel: str = 'shots', owner: bool = True) -> Optional[PitchGrid]:
+        """One side's grid of a match, None when not built"""
+        cells = (
+            MatchGrid.objects.filter(match=match, is_owner=owner)
+            .values_list(cls.CHANNELS[channel], flat=True).first()
+        )
+        return PitchGrid.from_bytes(bytes(cells)) if cells is not None else None
+
+    @staticmethod
+    def parse_bins(value: str) -> Tuple[int, int]:
+        """'NxM' -> (N, M); ValueError unless both divide GRID_SIZE (equal bin widths)"""
+        match = _BINS_PATTERN.match((value or '').strip().lower())
+        if not match:
+            raise ValueError("bins must look like 'NxM', e.g. 20x10")
+        nx, ny = int(match.group(1)), int(match.group(2))
+        if not (PitchGrid.valid_bins(nx) and PitchGrid.valid_bins(ny)):
+            divisors = ', '.join(str(n) for n in range(1, GRID_SIZE + 1) if PitchGrid.valid_bins(n))
+            raise ValueError(f'bins must be one of {divisors} per axis')
+        return nx, ny
+
+    @classmethod
+    def parse_points(cls, value: Optional[str]) -> int:
+        """Sampled point count (0 = none), capped at MAX_POINTS; ValueError when not an integer"""
+        if value in (None, ''):
+            return 0
+        try:
+            points = int(value)
+        except (TypeError, ValueError):
+            raise ValueError('points must be an integer')
+        return min(max(points, 0), cls.MAX_POINTS)
+
+    @staticmethod
+    def _sample(points: List[Dict], k: int) -> List[Dict]:
+        """At most k points evenly spaced over the list (deterministic, so cached responses agree)"""
+        if len(points) <= k:
+            return points
+        return [points[i] for i in np.linspace(0, len(points) - 1, k).round().astype(int)]
+
+    @classmethod
+    def heatmap(cls, grids: Dict[str, PitchGrid], bins: Tuple[int, int],
+                points: Iterable[Dict] = (), max_points: int = 0) -> Dict:
+        """
+        Binned heatmap: density[i][j] and xg[i][j] for x bin i and y bin j, and
+        up to max_points sampled shots as columns (x, y, result, xg).
+        """
+        nx, ny = bins
+        xg = np.round(grids['xg'].rebin(nx, ny) / XG_SCALE, 3)
+        heatmap = {
+            'bins': [nx, ny],
+            'total_shots': grids['shots'].total,
+            'density': grids['shots'].rebin(nx, ny).tolist(),
+            'xg': [[value if value else 0 for value in row] for row in xg.tolist()],
+        }
+        if max_points:
+            sample = cls._sample(list(points), max_points)
+            heatmap['points'] = {
+                'x': [round(float(p['x']), 3) for p in sample],
+                'y': [round(float(p['y']), 3) for p in sample],
+                'result': [p.get('result') for p in sample],
+                'xg': [round(p['xg'] if 'xg' in p else _xg(dict.get, p), 3) for p in sample],
+            }
+        return heatmap
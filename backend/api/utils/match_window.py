@@ -0,0 +1,63 @@
+"""
+Match Window
+
+The "recent N matches of one user and match type" window most analysis
+views work on, expressed as an SQL subquery instead of a Python list.
+
+Filtering with `match__in=<list of Match>` binds one parameter per match and
+makes the caller load the Match rows first; `match_id__in=window.ids()`
+instead embeds the top-N id selection in each query:
+
+    WHERE match_id IN (SELECT id FROM matches
+                       WHERE ouid_id = %s AND match_type = %s
+                       ORDER BY match_date DESC, id DESC LIMIT %s)
+
+so matches, shots and performances are each fetched in a single pass.
+Project the returned querysets with values() / values_list(); joined Match
+columns (e.g. 'match__result') are selected individually, never raw_data.
+"""
+from api.models import Match, ShotDetail, PlayerPerformance
+
+
+SUBSTITUTE_POSITION = 28  # spPosition of bench players
+
+
+class MatchWindow:
+    """Most recent `limit` matches of `ouid` for `match_type`"""
+
+    def __init__(self, ouid, match_type: int, limit: int):
+        self.ouid = getattr(ouid, 'ouid', ouid)
+        self.match_type = match_type
+        self.limit = limit
+
+    def matches(self):
+        """Matches in the window, newest first"""
+        return (
+            Match.objects.filter(ouid=self.ouid, match_type=self.match_type)
+            .order_by('-match_date', '-id')[:self.limit]
+        )
+
+    def ids(self):
+        """Match.id subquery for `match_id__in=` filters"""
+        return self.matches().values('id')
+
+    def count(self) -> int:
+        return self.matches().count()
+
+    def shots(self):
+        """ShotDetail rows of every match in the window"""
+        return ShotDetail.objects.filter(match_id__in=self.ids())
+
+    def performances(self, user_only: bool = True, starters_only: bool = True):
+        """
+        PlayerPerformance rows in the window.
+
+        By default only the window owner's starting XI (substitutes, position
+        28, excluded).
+        """
+        qs = PlayerPerformance.objects.filter(match_id__in=self.ids())
+        if user_only:
+            qs = qs.filter(user_ouid=self.ouid)
+        if starters_only:
+            qs = qs.exclude(position=SUBSTITUTE_POSITION)
+        return qs
@@ -0,0 +1,186 @@
+"""
+Metadata Backfill
+
+Set-based rewrite of PlayerPerformance.player_name / season_name after a
+metadata snapshot changes. Names are loaded into a temp table (COPY on
+PostgreSQL) and applied with UPDATE ... FROM, optionally in primary-key
+batches so long runs commit incrementally and can resume from a checkpoint.
+"""
+import csv
+import io
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Max
+
+logger = logging.getLogger(__name__)
+
+
+NAME_MAX_LENGTH = 100  # PlayerPerformance.player_name / season_name max_length
+
+# (last_id, max_id, updated_counts) after each committed batch
+ProgressCallback = Callable[[int, int, Dict[str, int]], None]
+
+
+def short_season_name(class_name: str) -> str:
+    """"BDO (Ballon d'Or)" -> "BDO", matching PlayerPerformanceExtractor"""
+    if class_name and '(' in class_name:
+        return class_name.split('(')[0].strip()
+    return class_name
+
+
+class MetadataBackfill:
+    """Apply spid/season name mappings to stored PlayerPerformance rows"""
+
+    PLAYER_NAME_UPDATE = (
+        "UPDATE player_performances AS pp SET player_name = t.name "
+        "FROM tmp_spid_names AS t "
+        "WHERE pp.spid = t.key AND pp.player_name <> t.name "
+        "AND pp.id > %s AND pp.id <= %s"
+    )
+    # id of the Nth stale player name after an id (the end of a --limit run)
+    PLAYER_NAME_LIMIT_ID = (
+        "SELECT pp.id FROM player_performances AS pp "
+        "JOIN tmp_spid_names AS t ON pp.spid = t.key "
+        "WHERE pp.player_name <> t.name AND pp.id > %s "
+        "ORDER BY pp.id LIMIT 1 OFFSET %s"
+    )
+    SEASON_NAME_UPDATE = (
+        "UPDATE player_performances AS pp SET season_name = t.name "
+        "FROM tmp_season_names AS t "
+        "WHERE pp.season_id = t.key "
+        "AND (pp.season_name IS NULL OR pp.season_name <> t.name) "
+        "AND pp.id > %s AND pp.id <= %s"
+    )
+
+    @staticmethod
+    def _load_temp_table(cursor, table: str, key_type: str, rows: Iterable[Tuple[int, str]]):
+        """Create a temp (key, name) table and bulk load rows (COPY on PostgreSQL)."""
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(f"CREATE TEMP TABLE {table} (key {key_type} PRIMARY KEY, name varchar({NAME_MAX_LENGTH}))")
+
+        rows = [(key, name[:NAME_MAX_LENGTH]) for key, name in rows]
+        if not rows:
+            return
+
+        if connection.vendor == 'postgresql':
+            buf = io.StringIO()
+            csv.writer(buf).writerows(rows)
+            buf.seek(0)
+            sql = f"COPY {table} (key, name) FROM STDIN WITH (FORMAT csv)"
+            if hasattr(cursor, 'copy_expert'):  # psycopg2
+                cursor.copy_expert(sql, buf)
+            else:  # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buf.getvalue())
+            cursor.execute(f"ANALYZE {table}")
+        else:
+            cursor.executemany(f"INSERT INTO {table} (key, name) VALUES (%s, %s)", rows)
+
+    @staticmethod
+    def run_in_batches(
+        statements: List[Tuple[str, str]],
+        batch_size: Optional[int] = None,
+        start_id: int = 0,
+        progress: Optional[ProgressCallback] = None,
+        stop_id: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Execute id-ranged UPDATE statements over player_performances in batches.
+
+        Each statement takes two params (exclusive lower id, inclusive upper id).
+        Every batch commits on its own, so an interrupted run loses at most one
+        batch and can restart from the last reported id.
+
+        Args:
+            statements: [(counter_name, sql)] applied to each id range
+            batch_size: rows of id space per batch (None = a single batch)
+            start_id: resume after this PlayerPerformance.id
+            progress: called after each committed batch
+            stop_id: last PlayerPerformance.id to touch (None = the highest)
+
+        Returns:
+            {counter_name: rows updated}
+        """
+        from api.models import PlayerPerformance
+
+        max_id = PlayerPerformance.objects.aggregate(m=Max('id'))['m'] or 0
+        if stop_id is not None:
+            max_id = min(max_id, stop_id)
+        updated = {name: 0 for name, _ in statements}
+        step = batch_size or max(max_id - start_id, 1)
+
+        lo = start_id
+        while lo < max_id:
+            hi = min(lo + step, max_id)
+            with transaction.atomic(), connection.cursor() as cursor:
+                for name, sql in statements:
+                    cursor.execute(sql, [lo, hi])
+                    updated[name] += max(cursor.rowcount, 0)
+            lo = hi
+            if progress:
+                progress(hi, max_id, updated)
+
+        return updated
+
+    @classmethod
+    def backfill_names(
+        cls,
+        player_names: Dict[int, str],
+        season_names: Dict[int, str],
+        batch_size: Optional[int] = None,
+        start_id: int = 0,
+        progress: Optional[ProgressCallback] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Rewrite player_name and season_name for every PlayerPerformance row whose
+        stored value differs from the given mappings.
+
+        Args:
+            player_names: {spid: player name}; empty names are skipped
+            season_names: {season_id: season className}; shortened like the extractor
+            batch_size / start_id / progress: see run_in_batches
+            limit: update at most this many player names (in id order); season
+                names are applied over the same id range
+
+        Returns:
+            {'player_names': rows updated, 'season_names': rows updated}
+        """
+        statements = []
+        stop_id = None
+
+        # Temp tables live for the session, so they outlast the per-batch transactions
+        with connection.cursor() as cursor:
+            if player_names:
+                cls._load_temp_table(
+                    cursor, 'tmp_spid_names', 'bigint',
+                    ((spid, name) for spid, name in player_names.items() if name),
+                )
+                statements.append(('player_names', cls.PLAYER_NAME_UPDATE))
+                if limit:
+                    cursor.execute(cls.PLAYER_NAME_LIMIT_ID, [start_id, limit - 1])
+                    row = cursor.fetchone()
+                    stop_id = row[0] if row else None
+            if season_names:
+                cls._load_temp_table(
+                    cursor, 'tmp_season_names', 'integer',
+                    ((sid, short_season_name(name)) for sid, name in season_names.items() if name),
+                )
+                statements.append(('season_names', cls.SEASON_NAME_UPDATE))
+
+        try:
+            updated = cls.run_in_batches(statements, batch_size, start_id, progress, stop_id)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("DROP TABLE IF EXISTS tmp_spid_names")
+                cursor.execute("DROP TABLE IF EXISTS tmp_season_names")
+
+        updated.setdefault('player_names', 0)
+        updated.setdefault('season_names', 0)
+        logger.info(
+            f"Metadata backfill: {updated['player_names']} player names, "
+            f"{updated['season_names']} season names updated"
+        )
+        return updated
@@ -5,6 +5,7 @@ Extracts detailed player statistics from Nexon API raw_data
 import logging
 from typing import Dict, List, Any
 from api.models import Match, PlayerPerformance
+from api.utils.distributions import DistributionService
 from nexon_api.metadata import MetadataLoader
 
 logger = logging.getLogger(__name__)
@@ -35,24 +36,45 @@ class PlayerPerformanceExtractor:
 
         from api.models import User
 
-        performance_objects = []
-
         # Batch load all team users to avoid N+1 queries
         team_ouids = [info.get('ouid') for info in match_info_list if info.get('ouid')]
         users_by_ouid = {u.ouid: u for u in User.objects.filter(ouid__in=team_ouids)}
 
+        performance_objects = cls.build_performances(match, users_by_ouid)
+
+        if performance_objects:
+            PlayerPerformance.objects.bulk_create(performance_objects)
+            # Population percentiles (metric_distributions) follow new matches only;
+            # re-extraction of stored matches is covered by build_metric_distributions
+            DistributionService.observe_performances(performance_objects)
+
+        return len(performance_objects)
+
+    @classmethod
+    def build_performances(cls, match: Match, users_by_ouid: Dict[str, Any]) -> List[PlayerPerformance]:
+        """
+        매치의 (저장되지 않은) PlayerPerformance 객체 목록 생성
+
+        Batch re-extraction calls this directly to bulk insert across matches.
+
+        Args:
+            match: Match 객체 (raw_data, ouid_id, goals_for/against 필요)
+            users_by_ouid: {ouid: User} — 등록된 유저의 팀만 추출
+
+        Returns:
+            PlayerPerformance 객체 목록
+        """
+        performance_objects = []
+
         # matchInfo 배열 순회 (user와 opponent)
-        for match_info in match_info_list:
+        for match_info in match.raw_data.get('matchInfo', []):
             players = match_info.get('player', [])
 
             if not players:
                 continue
 
-            # Get the OUID for this team
-            team_ouid_str = match_info.get('ouid')
-
-            # Find the User object for this OUID (from pre-loaded batch)
-            team_user = users_by_ouid.get(team_ouid_str)
+            # Find the User object for this team's OUID (from pre-loaded batch)
+            team_user = users_by_ouid.get(match_info.get('ouid'))
             if not team_user:
                 continue
 
@@ -73,13 +95,10 @@ class PlayerPerformanceExtractor:
                         performance_objects.append(performance)
                         participated_index += 1
                 except Exception as e:
-                    logger.warning(f"Player extraction failed spid={spid}: {e}")
+                    logger.warning(f"Player extraction failed spid={player_data.get('spId')}: {e}")
                     continue
 
-        if performance_objects:
-            PlayerPerformance.objects.bulk_create(performance_objects)
-
-        return len(performance_objects)
+        return performance_objects
 
     @staticmethod
     def _calculate_percentages(p: PlayerPerformance):
@@ -292,7 +311,7 @@ class PlayerPerformanceExtractor:
             if performance.spid in player_ids:
                 # This is the player's team
                 ouid = info.get('ouid')
-                if ouid == match.ouid.ouid:
+                if ouid == match.ouid_id:
                     is_user_player = True
             else:
                 # This is opponent's team
@@ -311,7 +330,7 @@ class PlayerPerformanceExtractor:
             # For opponent's GK
             user_match_info = None
             for info in match_info_list:
-                if info.get('ouid') == match.ouid.ouid:
+                if info.get('ouid') == match.ouid_id:
                     user_match_info = info
                     break
 
@@ -0,0 +1,83 @@
+"""
+Query Plan Audit
+
+Hot ORM querysets used by the match / player / heatmap views, plus helpers to
+EXPLAIN them on PostgreSQL and find sequential scans in the plan tree. Used by
+the plan-check tests and the `explain_hot_queries` command.
+"""
+import json
+from typing import Any, Dict, Iterator, List
+
+from django.db import connection
+
+from api.models import Match
+from api.utils.match_window import MatchWindow
+
+
+SHOT_VALUES = (
+    'x', 'y', 'result', 'shot_type', 'goal_time', 'in_penalty',
+    'assist_spid', 'assist_x', 'assist_y', 'shooter_spid',
+)
+
+PERFORMANCE_VALUES = (
+    'spid', 'player_name', 'position', 'grade', 'rating', 'goals', 'assists',
+    'shots', 'shots_on_target', 'pass_attempts', 'pass_success',
+    'dribble_attempts', 'dribble_success', 'tackle_success', 'blocks',
+)
+
+
+def hot_queries(ouid: str, match_type: int = 50, limit: int = 50) -> Dict[str, Any]:
+    """
+    The hot querysets for one user, keyed by name.
+
+    Each value is the table the query must not seq-scan and the queryset,
+    written the same way the views build it.
+    """
+    window = MatchWindow(ouid, match_type, limit)
+    match_id = Match.objects.filter(ouid=ouid).values_list('match_id', flat=True).first()
+
+    return {
+        'recent_matches': ('matches', window.matches()),
+        'match_by_id': ('matches', Match.objects.filter(match_id=match_id, ouid__ouid=ouid)),
+        'shot_details': ('shot_details', window.shots().values(*SHOT_VALUES)),
+        'starter_performances': ('player_performances', window.performances().values(*PERFORMANCE_VALUES)),
+    }
+
+
+def explain(queryset, analyze: bool = True) -> Dict[str, Any]:
+    """Root plan node of EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) for a queryset; RuntimeError off PostgreSQL"""
+    if connection.vendor != 'postgresql':
+        raise RuntimeError('Query plan audit requires PostgreSQL')
+    options = {'analyze': True, 'buffers': True} if analyze else {}
+    return json.loads(queryset.explain(format='json', **options))[0]['Plan']
+
+
+def iter_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Depth-first walk over a JSON plan tree"""
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from iter_nodes(child)
+
+
+def seq_scans(plan: Dict[str, Any], table: str = None) -> List[Dict[str, Any]]:
+    """Seq Scan nodes in the plan (only on `table` when given)"""
+    return [
+        node for node in iter_nodes(plan)
+        if node.get('Node Type') == 'Seq Scan'
+        and (table is None or node.get('Relation Name') == table)
+    ]
+
+
+def summarize(plan: Dict[str, Any]) -> List[str]:
+    """One line per scan node: type, relation/index, rows and shared buffers"""
+    lines = []
+    for node in iter_nodes(plan):
+        if 'Relation Name' not in node and 'Index Name' not in node:
+            continue
+        target = node.get('Index Name') or node.get('Relation Name')
+        buffers = node.get('Shared Hit Blocks', 0) + node.get('Shared Read Blocks', 0)
+        lines.append(
+            f"{node['Node Type']} on {target} "
+            f"(rows={node.get('Actual Rows', node.get('Plan Rows'))}, buffers={buffers})"
+        )
+    return lines
@@ -0,0 +1,147 @@
+"""
+Ranker Benchmarks
+
+Ranker stats of the most played cards, fetched offline and read from the
+database so skill-gap / ranker-gap don't call /fconline/v1/ranker-stats for
+the cards thousands of users share.
+
+- `manage.py snapshot_ranker_benchmarks` (nightly) takes the most played
+  (spid, position) pairs of recent PlayerPerformance rows and fetches their
+  ranker stats in batches, under a request budget and rate, into
+  RankerBenchmark (one row per pair, with the snapshot date). Cards without
+  ranker data are stored with an empty status so they are not asked again.
+- `RankerBenchmarks.stats()` answers from snapshots at most
+  RANKER_BENCHMARK_MAX_AGE_DAYS old and calls the API (cached per player by
+  the client) only for the remaining, rare cards. If that call fails the
+  snapshot entries are still returned.
+"""
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from api.models import PlayerPerformance, RankerBenchmark
+from nexon_api.client import NexonAPIClient
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[int, int]
+
+SUB_POSITION = 28
+
+
+def _entry(spid: int, position: int, status: Dict) -> Dict:
+    """ranker-stats response entry shape"""
+    return {'spId': spid, 'spPosition': position, 'status': status}
+
+
+class RankerBenchmarks:
+    """Snapshot-first ranker stats"""
+
+    @staticmethod
+    def popular_pairs(matchtype: int, days: int = 30, top: int = 2000, min_appearances: int = 5) -> List[Pair]:
+        """Most played (spid, position) pairs of the last `days` days, most played first"""
+        since = timezone.now() - timedelta(days=days)
+        rows = (
+            PlayerPerformance.objects
+            .filter(match__match_type=matchtype, match__match_date__gte=since)
+            .exclude(position=SUB_POSITION)
+            .values('spid', 'position')
+            .annotate(appearances=Count('id'))
+            .filter(appearances__gte=min_appearances)
+            .order_by('-appearances', 'spid', 'position')[:top]
+        )
+        return [(row['spid'], row['position']) for row in rows]
+
+    @staticmethod
+    def snapshot(matchtype: int, pairs: Sequence[Pair], batch_size: int = 10,
+                 max_requests: int = 500, requests_per_second: float = 2.0,
+                 client: Optional[NexonAPIClient] = None) -> Dict[str, int]:
+        """
+        Fetch and store ranker stats for `pairs`, at most `max_requests` upstream
+        calls spaced 1 / requests_per_second apart. Failed batches are skipped
+        (their previous snapshot stays). Returns counts of the run.
+        """
+        client = client or NexonAPIClient()
+        today = timezone.localdate()
+        interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        counts = {'requests': 0, 'stored': 0, 'empty': 0, 'failed': 0}
+
+        for start in range(0, len(pairs), batch_size):
+            if counts['requests'] >= max_requests:
+                break
+            batch = pairs[start:start + batch_size]
+            if counts['requests'] and interval:
+                time.sleep(interval)
+            counts['requests'] += 1
+            try:
+                entries = client.get_ranker_stats(matchtype, [{'id': s, 'po': p} for s, p in batch])
+            except Exception:
+                counts['failed'] += len(batch)
+                continue
+
+            statuses = {}
+            for entry in entries if isinstance(entries, list) else []:
+                status = entry.get('status')
+                if isinstance(status, list):  # some responses wrap the status in a list
+                    status = status[0] if status else {}
+                statuses[(entry.get('spId'), entry.get('spPosition'))] = status or {}
+
+            rows = [
+                RankerBenchmark(
+                    matchtype=matchtype, spid=spid, position=position,
+                    status=statuses.get((spid, position), {}), snapshot_date=today,
+                )
+                for spid, position in batch
+            ]
+            RankerBenchmark.objects.bulk_create(
+                rows, update_conflicts=True,
+                unique_fields=['matchtype', 'spid', 'position'],
+                update_fields=['status', 'snapshot_date'],
+            )
+            empty = sum(1 for row in rows if not row.status)
+            counts['stored'] += len(rows) - empty
+            counts['empty'] += empty
+        return counts
+
+    @staticmethod
+    def prune(keep_days: int) -> int:
+        """Delete snapshots not refreshed within `keep_days` (cards no longer popular)"""
+        cutoff = timezone.localdate() - timedelta(days=keep_days)
+        deleted, _ = RankerBenchmark.objects.filter(snapshot_date__lt=cutoff).delete()
+        return deleted
+
+    @staticmethod
+    def stats(matchtype: int, players: Sequence[Dict], client: Optional[NexonAPIClient] = None) -> List[Dict]:
+        """
+        Ranker-stats entries for players ([{'id': spid, 'po': position}]), in request
+        order: fresh snapshots first, one live API call for the rest. Cards without
+        ranker data, and cards whose live call failed, are omitted, as in the API response.
+        """
+        wanted = list(dict.fromkeys((int(p['id']), int(p['po'])) for p in players))
+        fresh_since = timezone.localdate() - timedelta(days=settings.RANKER_BENCHMARK_MAX_AGE_DAYS)
+        snapshots = {
+            (row.spid, row.position): row.status
+            for row in RankerBenchmark.objects.filter(
+                matchtype=matchtype, spid__in={spid for spid, _ in wanted}, snapshot_date__gte=fresh_since,
+            ).only('spid', 'position', 'status')
+        }
+
+        entries = {pair: _entry(*pair, snapshots[pair]) for pair in wanted if snapshots.get(pair)}
+        missing = [pair for pair in wanted if pair not in snapshots]
+        if missing:
+            try:
+                live = (client or NexonAPIClient()).get_ranker_stats(
+                    matchtype, [{'id': spid, 'po': po} for spid, po in missing],
+                )
+            except Exception as e:
+                logger.warning(f"Live ranker stats failed for {len(missing)} cards: {e}")
+                live = []
+            for entry in live if isinstance(live, list) else []:
+                entries[(entry.get('spId'), entry.get('spPosition'))] = entry
+
+        return [entries[pair] for pair in wanted if pair in entries]
@@ -0,0 +1,186 @@
+"""
+Match Retention
+
+Data lifecycle for matches and every table that depends on them (shot_details,
+player_performances, match_grids, ...; see ARCHIVED_TABLES). Endpoints
+never read past the most recent 200 matches per (user, match type), so older
+rows are archived to compressed files and removed from the hot tables.
+
+Rows are handled in calendar-month partitions of Match.match_date. A match
+expires when it is older than the retention window AND outside its user's
+most recent `keep_recent` matches of that match type. Each partition is
+exported to `<archive_dir>/<YYYY-MM>/<table>.jsonl.gz` (gzip members appended
+per batch) and deleted in Match.id keyset batches, one transaction per batch,
+so a killed run can simply be restarted. Export is at-least-once: a batch
+whose DELETE did not commit is written again on the next run. Binary columns
+are exported as base64 strings.
+"""
+import base64
+import gzip
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from api.models import Match
+
+logger = logging.getLogger(__name__)
+
+
+def _archived_tables():
+    """Match and every model with a foreign key to it, as (model, Match id column)"""
+    dependents = [
+        (rel.related_model, rel.field.attname)
+        for rel in Match._meta.related_objects
+        if rel.one_to_many or rel.one_to_one
+    ]
+    return ((Match, 'id'), *dependents)
+
+
+# Derived from Match's reverse relations, so a new dependent table is archived
+# instead of silently cascade-deleted
+ARCHIVED_TABLES = _archived_tables()
+
+# (partition label, counts so far) after each committed batch
+ProgressCallback = Callable[[str, Dict[str, int]], None]
+
+
+@dataclass
+class PartitionResult:
+    """Rows archived and deleted for one month partition"""
+    label: str
+    path: str
+    counts: Dict[str, int] = field(default_factory=dict)
+
+
+class MatchRetention:
+    """Archive and delete matches that fall outside the retention policy"""
+
+    def __init__(
+        self,
+        months: Optional[int] = None,
+        keep_recent: Optional[int] = None,
+        archive_dir: Optional[str] = None,
+        batch_size: int = 1000,
+        now: Optional[datetime] = None,
+    ):
+        self.months = settings.MATCH_RETENTION_MONTHS if months is None else months
+        self.keep_recent = settings.MATCH_RETENTION_KEEP_RECENT if keep_recent is None else keep_recent
+        self.archive_dir = archive_dir or settings.MATCH_ARCHIVE_DIR
+        self.batch_size = batch_size
+        self.now = now or timezone.now()
+
+    def cutoff(self) -> datetime:
+        """Start of the oldest month still inside the retention window"""
+        local = timezone.localtime(self.now)
+        months = local.year * 12 + local.month - 1 - self.months
+        return local.replace(
+            year=months // 12, month=months % 12 + 1, day=1,
+            hour=0, minute=0, second=0, microsecond=0,
+        )
+
+    def expired(self):
+        """Matches older than the cutoff and beyond the per-user recent window"""
+        old_matches = Match.objects.filter(match_date__lt=self.cutoff())
+        if self.keep_recent <= 0:
+            return old_matches
+
+        boundary = (
+            Match.objects
+            .filter(ouid=OuterRef('ouid'), match_type=OuterRef('match_type'))
+            .order_by('-match_date', '-id')
+            .values('match_date')[self.keep_recent - 1:self.keep_recent]
+        )
+        # Users with fewer than keep_recent matches get a NULL boundary and keep everything
+        return (
+            old_matches
+            .annotate(keep_boundary=Subquery(boundary))
+            .filter(match_date__lt=F('keep_boundary'))
+        )
+
+    def partitions(self) -> List[Dict]:
+        """Expired matches per month: [{'month': datetime, 'label': 'YYYY-MM', 'matches': n}]"""
+        rows = (
+            self.expired()
+            .annotate(month=TruncMonth('match_date'))
+            .values('month')
+            .annotate(matches=Count('id'))
+            .order_by('month')
+        )
+        return [{**row, 'label': row['month'].strftime('%Y-%m')} for row in rows]
+
+    def partition_path(self, label: str) -> str:
+        return os.path.join(self.archive_dir, label)
+
+    def archive_partition(self, month: datetime, progress: Optional[ProgressCallback] = None) -> PartitionResult:
+        """Export one month's expired rows to gzip JSONL files, then delete them"""
+        label = month.strftime('%Y-%m')
+        path = self.partition_path(label)
+        os.makedirs(path, exist_ok=True)
+
+        result = PartitionResult(label=label, path=path, counts={m._meta.db_table: 0 for m, _ in ARCHIVED_TABLES})
+        month_qs = self.expired().filter(match_date__gte=month, match_date__lt=_next_month(month))
+
+        last_id = 0
+        while True:
+            ids = list(
+                month_qs.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:self.batch_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                for model, key in ARCHIVED_TABLES:
+                    rows = model.objects.filter(**{f'{key}__in': ids}).order_by('id').values()
+                    result.counts[model._meta.db_table] += self._append(path, model._meta.db_table, rows)
+
+                # Children first so the Match delete needs no cascade collection
+                for model, key in reversed(ARCHIVED_TABLES):
+                    model.objects.filter(**{f'{key}__in': ids}).delete()
+
+            last_id = ids[-1]
+            if progress:
+                progress(label, result.counts)
+
+        logger.info(f"Archived partition {label}: {result.counts}")
+        return result
+
+    @staticmethod
+    def _append(path: str, table: str, rows) -> int:
+        count = 0
+        with gzip.open(os.path.join(path, f'{table}.jsonl.gz'), 'at', encoding='utf-8') as f:
+            for row in rows.iterator(chunk_size=2000):
+                f.write(json.dumps(row, cls=_ArchiveEncoder, ensure_ascii=False))
+                f.write('\n')
+                count += 1
+        return count
+
+    @staticmethod
+    def vacuum():
+        """VACUUM (ANALYZE) the archived tables so freed pages are reused (PostgreSQL)"""
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            for model, _ in ARCHIVED_TABLES:
+                cursor.execute(f'VACUUM (ANALYZE) {connection.ops.quote_name(model._meta.db_table)}')
+
+
+class _ArchiveEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, (bytes, memoryview)):
+            return base64.b64encode(bytes(o)).decode('ascii')
+        return super().default(o)
+
+
+def _next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1, day=1)
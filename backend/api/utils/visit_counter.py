@@ -0,0 +1,133 @@
+"""
+Visit Counter
+
+Site visits are counted in Redis and flushed to DailyVisitCount in batches,
+so a visitor ping costs a few Redis commands instead of a row insert:
+
+- `visits:pending:<date>`: INCR per visit, not yet flushed to the database
+- `visits:hll:<date>`: HyperLogLog of visitor fingerprints (unique estimate)
+- `visitor_total`: cached all-time total (INCR per visit)
+
+`flush()` moves pending counts into the daily buckets (one transaction per
+day, at most every VISIT_FLUSH_SECONDS, triggered by the visit that finds the
+interval elapsed, or by `manage.py flush_visit_counts`). When the cached
+total is missing (restart, eviction) it is rebuilt from the bucket sum plus
+the pending counts, never from COUNT(*) over visits. Pending counts evicted
+before a flush are lost, bounded by the flush interval.
+"""
+import logging
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from api.models import DailyVisitCount
+
+logger = logging.getLogger(__name__)
+
+
+class VisitCounter:
+    """Redis-backed visit counter with daily database buckets"""
+
+    TOTAL_KEY = 'visitor_total'
+    TOTAL_TTL = 3600
+    FLUSH_DUE_KEY = 'visits:flush_due'
+    FLUSH_LOCK_KEY = 'visits:flush_lock'
+    PENDING_TTL = 7 * 24 * 3600
+    FLUSH_DAYS = 3  # pending keys older than this many days are no longer flushed
+
+    @staticmethod
+    def _pending_key(day: date) -> str:
+        return f"visits:pending:{day.isoformat()}"
+
+    @staticmethod
+    def _hll_key(day: date) -> str:
+        return f"visits:hll:{day.isoformat()}"
+
+    @staticmethod
+    def _redis():
+        """Raw redis client of the default cache, None for non-Redis backends"""
+        get_client = getattr(getattr(cache, '_cache', None), 'get_client', None)
+        return get_client(write=True) if get_client else None
+
+    @classmethod
+    def record(cls, visitor: Optional[str] = None) -> int:
+        """Count one visit (and the visitor for the unique estimate); returns the total"""
+        today = timezone.localdate()
+        key = cls._pending_key(today)
+        cache.add(key, 0, cls.PENDING_TTL)
+        try:
+            cache.incr(key)
+        except ValueError:  # evicted between add and incr
+            cache.set(key, 1, cls.PENDING_TTL)
+
+        client = cls._redis()
+        if visitor and client is not None:
+            hll_key = cache.make_key(cls._hll_key(today))
+            client.pfadd(hll_key, visitor)
+            client.expire(hll_key, cls.PENDING_TTL)
+
+        try:
+            total = cache.incr(cls.TOTAL_KEY)
+        except ValueError:
+            total = cls.total()  # rebuilt total already includes this visit
+
+        if cache.add(cls.FLUSH_DUE_KEY, 1, settings.VISIT_FLUSH_SECONDS):
+            try:
+                cls.flush()
+            except Exception as e:
+                logger.warning(f"Visit counter flush failed: {e}")
+        return total
+
+    @classmethod
+    def pending(cls, days: int = FLUSH_DAYS) -> Dict[date, int]:
+        """Unflushed counts per day"""
+        today = timezone.localdate()
+        keys = {cls._pending_key(today - timedelta(days=i)): today - timedelta(days=i) for i in range(days)}
+        return {keys[k]: int(v) for k, v in cache.get_many(list(keys)).items() if v}
+
+    @classmethod
+    def unique_visitors(cls, day: Optional[date] = None) -> Optional[int]:
+        """HyperLogLog estimate for a day (default today), None without Redis"""
+        client = cls._redis()
+        if client is None:
+            return None
+        return client.pfcount(cache.make_key(cls._hll_key(day or timezone.localdate())))
+
+    @classmethod
+    def total(cls) -> int:
+        """All-time visits: cached, else bucket sum + pending counts"""
+        total = cache.get(cls.TOTAL_KEY)
+        if total is None:
+            stored = DailyVisitCount.objects.aggregate(total=Sum('visits'))['total'] or 0
+            total = stored + sum(cls.pending().values())
+            cache.set(cls.TOTAL_KEY, total, cls.TOTAL_TTL)
+        return int(total)
+
+    @classmethod
+    def flush(cls) -> Dict[date, int]:
+        """Move pending counts into DailyVisitCount; returns visits flushed per day"""
+        if not cache.add(cls.FLUSH_LOCK_KEY, 1, 60):
+            return {}  # another worker is flushing
+
+        flushed = {}
+        try:
+            for day, count in cls.pending().items():
+                unique = cls.unique_visitors(day) or 0
+                with transaction.atomic():
+                    DailyVisitCount.objects.get_or_create(date=day)
+                    DailyVisitCount.objects.filter(date=day).update(
+                        visits=F('visits') + count,
+                        unique_visitors=Greatest(F('unique_visitors'), Value(unique)),
+                    )
+                # Visits counted while flushing stay pending for the next flush
+                cache.decr(cls._pending_key(day), count)
+                flushed[day] = count
+        finally:
+            cache.delete(cls.FLUSH_LOCK_KEY)
+        return flushed
@@ -11,7 +11,7 @@ from django.http import Http404
 from django.utils import timezone
 from datetime import datetime
 import datetime as dt
-from .models import User, Match, ShotDetail, UserStats, PlayerPerformance, SiteVisit
+from .models import User, Match, ShotDetail, UserStats, PlayerPerformance
 from .serializers import (
     UserSerializer, MatchSerializer, MatchListSerializer,
     ShotDetailSerializer, UserStatsSerializer,
@@ -20,6 +20,7 @@ from .serializers import (
 )
 from nexon_api.client import NexonAPIClient
 from nexon_api.exceptions import NexonAPIException, UserNotFoundException
+from nexon_api.negative_cache import MatchFetchBackoff
 from nexon_api.metadata import MetadataLoader
 from django.core.cache import cache
 import logging
@@ -27,7 +28,7 @@ import logging
 logger = logging.getLogger(__name__)
 from .analyzers.shot_analyzer import ShotAnalyzer
 from .analyzers.style_analyzer import StyleAnalyzer
-from .analyzers.statistics import StatisticsCalculator
+from .analyzers.statistics import StatisticsAnalyzer
 from .analyzers.timeline_analyzer import TimelineAnalyzer
 from .analyzers.player_power_ranking import PlayerPowerRanking
 from .analyzers.pass_analyzer import PassAnalyzer
@@ -36,6 +37,23 @@ from .analyzers.defense_analyzer import DefenseAnalyzer
 from .analyzers.pass_variety_analyzer import PassVarietyAnalyzer
 from .analyzers.shooting_quality_analyzer import ShootingQualityAnalyzer
 from .analyzers.aggregate_stats_analyzer import AggregateStatsAnalyzer
+from .analyzers.contracts import FetchPlan
+from .analyzers.team_record import TeamMatchRecord
+from .utils.match_window import MatchWindow
+from .utils.distributions import DistributionService
+from .utils.ranker_benchmarks import RankerBenchmarks
+from .utils.habit_store import HabitStore
+from .utils.match_grids import MatchGrids
+from .utils.db_routing import use_replica, primary_reads, stick_to_primary
+from .utils.db_pool import ingestion_slot, release_connections
+
+
+def _heatmap_params(request):
+    """(bins, points) of a binned heatmap request (?bins=NxM&points=K), bins None without ?bins"""
+    bins = request.query_params.get('bins')
+    if not bins:
+        return None, 0
+    return MatchGrids.parse_bins(bins), MatchGrids.parse_points(request.query_params.get('points'))
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -130,6 +148,7 @@ class UserViewSet(viewsets.ModelViewSet):
             f"skill_gap_{ouid}_{matchtype}_{limit}",
             f"player_contribution_{ouid}_{matchtype}_{limit}",
             f"form_cycle_{ouid}_{matchtype}_{limit}",
+            f"form_cycle_{ouid}_{matchtype}_all",
             f"ranker_gap_{ouid}_{matchtype}_{limit}",
             f"habit_loop_{ouid}_{matchtype}_{limit}",
             f"opponent_types_{ouid}_{matchtype}_{limit}",
@@ -141,13 +160,19 @@ class UserViewSet(viewsets.ModelViewSet):
 
     def _match_queryset(self, user, matchtype, limit, defer_raw_data=False):
         """Build the common Match queryset, optionally deferring raw_data."""
-        qs = Match.objects.filter(ouid=user, match_type=matchtype).order_by('-match_date')
+        qs = Match.objects.filter(ouid=user, match_type=matchtype).order_by('-match_date', '-id')
         if defer_raw_data:
             qs = qs.defer('raw_data')
         return qs[:limit]
 
-    def _do_ensure_matches(self, user, matchtype, limit, defer_raw_data=False):
-        """Core logic for fetching and storing matches from Nexon API."""
+    @primary_reads()
+    def _do_ensure_matches(self, user, matchtype, limit, defer_raw_data=False, materialize=True):
+        """
+        Core logic for fetching and storing matches from Nexon API.
+
+        With materialize=False only the sync runs and None is returned, for
+        callers that aggregate the stored rows in SQL.
+        """
         try:
             client = NexonAPIClient()
             match_ids = client.get_user_matches(user.ouid, matchtype=matchtype, limit=limit)
@@ -158,32 +183,56 @@ class UserViewSet(viewsets.ModelViewSet):
                 .values_list('match_id', flat=True)
             )
             new_ids = [mid for mid in match_ids if mid not in existing_ids]
+            # Ids whose fetch failed recently are skipped until their backoff expires
+            new_ids, _ = MatchFetchBackoff.split(new_ids)
 
             # Fetch new matches in parallel (gevent-compatible)
             if new_ids:
+                created = []
+
                 def fetch_and_save(match_id):
                     try:
                         match_data = client.get_match_detail(match_id)
-                        self._create_match_from_data(match_id, user, match_data)
+                        # Bounded DB budget for ingestion; the HTTP fetch above stays unbounded
+                        with ingestion_slot():
+                            match = self._create_match_from_data(match_id, user, match_data)
+                        if match is not None:
+                            created.append(match)
+                        MatchFetchBackoff.succeeded(match_id)
                     except Exception as e:
-                        logger.warning(f"Match fetch failed {match_id}: {e}")
+                        delay = MatchFetchBackoff.failed(match_id)
+                        logger.warning(f"Match fetch failed {match_id} (retry in {delay}s): {e}")
                         pass  # Individual match failures are non-fatal
 
+                # Read this user's data from the primary until the replica has the new rows
+                stick_to_primary(user.ouid)
                 pool = GeventPool(size=10)
                 pool.map(fetch_and_save, new_ids)
+                stick_to_primary(user.ouid)
+
+                # Habit counts are updated once per sync, in match-date order
+                try:
+                    with ingestion_slot():
+                        HabitStore.record_matches(user, created)
+                except Exception as e:
+                    logger.warning(f"Habit count update failed for {user.ouid}: {e}")
 
                 # Invalidate analysis caches so they recompute with new matches
                 self._invalidate_user_caches(user.ouid, matchtype, limit)
 
-            return list(self._match_queryset(user, matchtype, limit, defer_raw_data))
-
         except NexonAPIException:
-            return list(self._match_queryset(user, matchtype, limit, defer_raw_data))
+            pass
 
-    def _ensure_matches(self, user, matchtype, limit, defer_raw_data=False):
+        if not materialize:
+            return None
+        return list(self._match_queryset(user, matchtype, limit, defer_raw_data))
+
+    @primary_reads()
+    def _ensure_matches(self, user, matchtype, limit, defer_raw_data=False, materialize=True):
         """
         Ensure we have at least 'limit' matches in the database.
         Uses Redis lock to prevent duplicate API calls for the same user.
+        Returns the matches, or None when materialize=False.
         """
         lock_key = f"ensure_lock:{user.ouid}:{matchtype}"
 
@@ -196,19 +245,25 @@ class UserViewSet(viewsets.ModelViewSet):
         while elapsed < max_wait:
             if cache.add(lock_key, "1", timeout=120):
                 try:
-                    return self._do_ensure_matches(user, matchtype, limit, defer_raw_data)
+                    return self._do_ensure_matches(user, matchtype, limit, defer_raw_data, materialize)
                 finally:
                     cache.delete(lock_key)
 
             # While waiting, check if DB already has enough data (single query)
-            db_matches = list(self._match_queryset(user, matchtype, limit, defer_raw_data))
-            if len(db_matches) >= limit:
-                return db_matches
+            if not materialize:
+                if self._match_queryset(user, matchtype, limit).count() >= limit:
+                    return None
+            else:
+                db_matches = list(self._match_queryset(user, matchtype, limit, defer_raw_data))
+                if len(db_matches) >= limit:
+                    return db_matches
             time.sleep(delay)
             elapsed += delay
             delay = min(delay * 2, max_delay)
 
         # Timeout — return whatever is in DB
+        if not materialize:
+            return None
         return list(self._match_queryset(user, matchtype, limit, defer_raw_data))
 
     def _start_background_fetch(self, user, matchtype, limit):
@@ -235,8 +290,9 @@ class UserViewSet(viewsets.ModelViewSet):
 
             def bg_fetch():
                 try:
-                    self._do_ensure_matches(user, matchtype, limit)
+                    self._do_ensure_matches(user, matchtype, limit, materialize=False)
                 finally:
+                    release_connections()  # not a request: nothing else returns its connection
                     cache.delete(lock_key)
                     cache.delete(fetching_key)
                     cache.set(synced_key, str(limit), timeout=1800)  # 30 min
@@ -259,12 +315,8 @@ class UserViewSet(viewsets.ModelViewSet):
         data = dict(serializer.data)
 
         try:
-            cache_key = f'user_divisions:{instance.ouid}'
-            divisions_raw = cache.get(cache_key)
-            if divisions_raw is None:
-                client = NexonAPIClient()
-                divisions_raw = client.get_user_max_division(instance.ouid) or []
-                cache.set(cache_key, divisions_raw, 1800)
+            # Cached (max_division:{ouid}) and single-flight inside the client
+            divisions_raw = NexonAPIClient().get_user_max_division(instance.ouid) or []
 
             MATCHTYPE_LABELS = {50: '공식경기', 52: '감독모드'}
             divisions = []
@@ -332,6 +384,8 @@ class UserViewSet(viewsets.ModelViewSet):
                     'max_division': max_division
                 }
             )
+            if created:
+                stick_to_primary(ouid)
 
             logger.info(f"[USER_SEARCH] nickname='{nickname}' found (API, ouid={ouid}, new={'yes' if created else 'no'})")
             serializer = self.get_serializer(user)
@@ -380,6 +434,7 @@ class UserViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=True, methods=['get'], url_path='overview')
+    @use_replica
     def overview(self, request, ouid=None):
         """
         GET /api/users/{ouid}/overview/?matchtype=50&limit=20
@@ -403,14 +458,12 @@ class UserViewSet(viewsets.ModelViewSet):
         if not is_fetching:
             is_fetching = self._start_background_fetch(user, matchtype, limit)
 
-        # Use whatever matches are in DB right now (defer raw_data — not needed for overview)
-        matches = list(
-            Match.objects.filter(ouid=user, match_type=matchtype)
-            .defer('raw_data')
-            .order_by('-match_date')[:limit]
+        # Aggregate whatever matches are in DB right now in one SQL query
+        agg = StatisticsAnalyzer.aggregate_recent(
+            Match.objects.filter(ouid=user, match_type=matchtype), limit
         )
 
-        if not matches:
+        if not agg['total']:
             return Response({
                 'user': {
                     'ouid': user.ouid,
@@ -445,30 +498,28 @@ class UserViewSet(viewsets.ModelViewSet):
             })
 
         # Calculate statistics
-        total_matches = len(matches)
-        wins = sum(1 for m in matches if m.result == 'win')
-        losses = sum(1 for m in matches if m.result == 'lose')
-        draws = sum(1 for m in matches if m.result == 'draw')
+        total_matches = agg['total']
+        wins = agg['wins']
+        losses = agg['losses']
+        draws = agg['draws']
         win_rate = (wins / total_matches * 100) if total_matches > 0 else 0
 
         # Average stats
-        avg_goals_for = sum(m.goals_for for m in matches) / total_matches
-        avg_goals_against = sum(m.goals_against for m in matches) / total_matches
-        avg_possession = sum(m.possession for m in matches) / total_matches
-        avg_shots = sum(m.shots for m in matches) / total_matches
-        avg_shots_on_target = sum(m.shots_on_target for m in matches) / total_matches
-        avg_pass_success = sum(float(m.pass_success_rate or 0) for m in matches) / total_matches
+        avg_goals_for = agg['avg_goals_for']
+        avg_goals_against = agg['avg_goals_against']
+        avg_possession = agg['avg_possession']
+        avg_shots = agg['avg_shots']
+        avg_shots_on_target = agg['avg_shots_on_target']
+        avg_pass_success = agg['avg_pass_success_rate']
 
         shot_accuracy = (avg_shots_on_target / avg_shots * 100) if avg_shots > 0 else 0
 
         # Recent form (last 5 games)
-        recent_5 = matches[:5]
-        recent_form = [m.result for m in recent_5]
+        recent_form = agg['recent_form']
         recent_wins = sum(1 for r in recent_form if r == 'win')
 
         # Trends (recent half vs older half, matches ordered newest-first)
-        match_dicts = [{'result': m.result} for m in matches]
-        trend_data = StatisticsCalculator.calculate_form_trend(match_dicts)
+        trend_data = StatisticsAnalyzer.form_trend(agg)
         trend = trend_data['trend']
         recent_win_rate = trend_data['recent_win_rate']
         older_win_rate = trend_data['older_win_rate']
@@ -564,26 +615,36 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(overview_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/shots')
+    @use_replica
     def shot_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/shots/?matchtype=50&limit=10
 
         Returns comprehensive shot analysis across recent matches using ShotAnalyzer.
+
+        With ?bins=NxM the per-shot heatmap_data list is replaced by a binned
+        `heatmap` (density and xG sums per bin, see MatchGrids.heatmap), with
+        up to ?points=K sampled shots.
         """
         user = get_object_or_404(User, ouid=ouid)
         matchtype = int(request.query_params.get('matchtype', 50))
         limit = int(request.query_params.get('limit', 10))
+        try:
+            bins, points = _heatmap_params(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         # Check cache first (15 minute TTL)
         cache_key = f"shot_analysis:{ouid}:{matchtype}:{limit}"
         cached_data = cache.get(cache_key)
         if cached_data:
-            return Response(cached_data)
+            return Response(self._binned_shot_analysis(cached_data, user, matchtype, limit, bins, points))
 
         # Ensure we have enough matches (fetch from API if needed)
-        matches = self._ensure_matches(user, matchtype, limit, defer_raw_data=True)
+        self._ensure_matches(user, matchtype, limit, materialize=False)
+        window = MatchWindow(user, matchtype, limit)
 
-        if not matches:
+        if not window.ids().exists():
             return Response(
                 {'error': 'No matches found for this user'},
                 status=status.HTTP_404_NOT_FOUND
@@ -594,7 +655,9 @@ class UserViewSet(viewsets.ModelViewSet):
         player_shots = {}  # spid -> {shots, goals, xg_total}
 
         # Single query for all shots across all matches (fixes N+1)
-        all_shot_objects = ShotDetail.objects.filter(match__in=matches)
+        all_shot_objects = window.shots().values_list(
+            'x', 'y', 'result', 'shot_type', 'shooter_spid', named=True
+        )
 
         for shot in all_shot_objects:
                 # Add to overall shot list for heatmap
@@ -638,7 +701,7 @@ class UserViewSet(viewsets.ModelViewSet):
                     player_shots[spid]['xg_total'] += shot_xg
 
         if not all_shots:
-            return Response(
+            return Response(self._binned_shot_analysis(
                 {
                     'total_shots': 0,
                     'goals': 0,
@@ -652,7 +715,7 @@ class UserViewSet(viewsets.ModelViewSet):
                     'zone_analysis': {},
                     'top_scorers': [],
                     'feedback': ['아직 슈팅 데이터가 없습니다.']
-                }
+                }, user, matchtype, limit, bins, points)
             )
 
         # Analyze using ShotAnalyzer
@@ -706,9 +769,20 @@ class UserViewSet(viewsets.ModelViewSet):
         # Cache for 15 minutes
         cache.set(cache_key, response_data, 900)
 
-        return Response(response_data)
+        return Response(self._binned_shot_analysis(response_data, user, matchtype, limit, bins, points))
+
+    @staticmethod
+    def _binned_shot_analysis(data, user, matchtype, limit, bins, points):
+        """Shot analysis with heatmap_data swapped for the binned heatmap (unchanged without bins)"""
+        if bins is None:
+            return data
+        grids = MatchGrids.for_matches(MatchWindow(user, matchtype, limit).ids(), ('shots', 'xg'))
+        binned = {key: value for key, value in data.items() if key != 'heatmap_data'}
+        binned['heatmap'] = MatchGrids.heatmap(grids, bins, data.get('heatmap_data', []), points)
+        return binned
 
     @action(detail=True, methods=['get'], url_path='analysis/style')
+    @use_replica
     def style_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/style/?matchtype=50&limit=20
@@ -725,8 +799,10 @@ class UserViewSet(viewsets.ModelViewSet):
         if cached_data:
             return Response(cached_data)
 
+        plan = FetchPlan(StyleAnalyzer, AggregateStatsAnalyzer)
+
         # Ensure we have enough matches (fetch from API if needed)
-        matches = self._ensure_matches(user, matchtype, limit)
+        matches = self._ensure_matches(user, matchtype, limit, defer_raw_data=plan.defer_raw_data)
 
         if not matches:
             empty = StyleAnalyzer._empty_analysis()
@@ -752,14 +828,11 @@ class UserViewSet(viewsets.ModelViewSet):
         analysis['insights'] = insights
 
         # === Aggregate Statistics (NEW) ===
-        # Collect all shot details in a single query (avoid N+1)
-        all_shot_details = list(ShotDetail.objects.filter(match__in=matches).values(
-            'x', 'y', 'result', 'shot_type', 'goal_time', 'in_penalty',
-            'assist_spid', 'assist_x', 'assist_y', 'shooter_spid'
-        ))
+        # Collect all shot details in a single query (avoid N+1), declared columns only
+        all_shot_details = list(plan.shot_rows(MatchWindow(user, matchtype, limit)))
 
-        # Collect all match raw_data for pass type distribution
-        matches_raw_data = [match.raw_data for match in matches if match.raw_data]
+        # User's side of each match for pass type distribution
+        team_records = TeamMatchRecord.for_matches(matches)
 
         # Analyze aggregate statistics
         aggregate_stats = {}
@@ -777,9 +850,9 @@ class UserViewSet(viewsets.ModelViewSet):
             # Assist network aggregate
             aggregate_stats['assist_network'] = AggregateStatsAnalyzer.analyze_assist_network_aggregate(all_shot_details)
 
-        if matches_raw_data:
+        if team_records:
             # Pass type distribution (average pass success rates)
-            aggregate_stats['pass_distribution'] = AggregateStatsAnalyzer.analyze_pass_type_distribution(matches_raw_data)
+            aggregate_stats['pass_distribution'] = AggregateStatsAnalyzer.analyze_pass_type_distribution(team_records)
 
         # Add aggregate stats to response
         analysis['aggregate_stats'] = aggregate_stats
@@ -791,11 +864,12 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(analysis)
 
     @action(detail=True, methods=['get'], url_path='statistics')
+    @use_replica
     def statistics(self, request, ouid=None):
         """
         GET /api/users/{ouid}/statistics/?matchtype=50&limit=10
 
-        Returns statistical overview with trends using StatisticsCalculator.
+        Returns statistical overview with trends, aggregated in a single SQL query.
         """
         user = get_object_or_404(User, ouid=ouid)
         matchtype = int(request.query_params.get('matchtype', 50))
@@ -807,28 +881,33 @@ class UserViewSet(viewsets.ModelViewSet):
         if cached_data:
             return Response(cached_data)
 
-        # Get recent matches (auto-fetch from Nexon API if not in DB)
-        matches = self._ensure_matches(user, matchtype, limit)
+        # Sync recent matches (auto-fetch from Nexon API if not in DB), then
+        # aggregate them in SQL without loading model instances
+        self._ensure_matches(user, matchtype, limit, materialize=False)
+        agg = StatisticsAnalyzer.aggregate_recent(
+            Match.objects.filter(ouid=user, match_type=matchtype), limit
+        )
 
-        if not matches:
+        if not agg['total']:
             return Response(
                 {'error': 'No matches found for this user'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Convert matches to dict format for analyzer
-        match_data = [{
-            'result': match.result,
-            'goals_for': match.goals_for,
-            'goals_against': match.goals_against,
-            'possession': match.possession,
-            'shots': match.shots,
-            'shots_on_target': match.shots_on_target,
-            'pass_success_rate': float(match.pass_success_rate or 0),
-        } for match in matches]
-
         # Calculate statistics
-        stats = StatisticsCalculator.calculate_statistics(match_data)
+        result_codes = {'win': 'W', 'lose': 'L', 'draw': 'D'}
+        stats = {
+            'total_matches': agg['total'],
+            'win_rate': round(agg['wins'] / agg['total'] * 100, 2),
+            'avg_goals_for': round(agg['avg_goals_for'], 2),
+            'avg_goals_against': round(agg['avg_goals_against'], 2),
+            'avg_possession': round(agg['avg_possession'], 2),
+            'avg_shots': round(agg['avg_shots'], 2),
+            'avg_shots_on_target': round(agg['avg_shots_on_target'], 2),
+            'avg_pass_success_rate': round(agg['avg_pass_success_rate'], 2),
+            'recent_form': [result_codes[r] for r in agg['recent_form'] if r in result_codes],
+            'trends': StatisticsAnalyzer.form_trend(agg),
+        }
 
         # Validate and serialize
         serializer = StatisticsSerializer(data=stats)
@@ -871,6 +950,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return cleaned
 
     @action(detail=True, methods=['get'], url_path='analysis/power-rankings')
+    @use_replica
     def power_rankings(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/power-rankings/
@@ -895,9 +975,11 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(cached)
 
         user = get_object_or_404(User, ouid=ouid)
+        # raw_data is loaded for the aggregate pass distribution (TeamMatchRecord)
+        plan = FetchPlan(PlayerPowerRanking, AggregateStatsAnalyzer)
 
         # Ensure we have enough matches (fetch from API if needed)
-        matches = self._ensure_matches(user, matchtype, limit, defer_raw_data=True)
+        matches = self._ensure_matches(user, matchtype, limit, defer_raw_data=plan.defer_raw_data)
 
         if not matches:
             return Response({
@@ -908,15 +990,12 @@ class UserViewSet(viewsets.ModelViewSet):
         # Get ALL player performances in a single query (avoid N+1)
         player_rankings = {}
 
-        all_performances = PlayerPerformance.objects.filter(
-            match__in=matches,
-            user_ouid=user
-        ).exclude(position=28).select_related('match')
-
-
+        # Flat rows of the declared columns (with the three Match columns used), no Match hydration
+        all_performances = plan.performance_rows(MatchWindow(user, matchtype, limit), named=True)
 
         for perf in all_performances:
-            match = perf.match
+            match_result = perf.match__result
+            goals_for, goals_against = perf.match__goals_for, perf.match__goals_against
             spid = perf.spid
 
             if spid not in player_rankings:
@@ -974,18 +1053,18 @@ class UserViewSet(viewsets.ModelViewSet):
                 'goals_conceded': perf.goals_conceded if perf.position == 0 else None,
                 'xg': float(perf.xg) if perf.xg else None,
                 'xg_against': float(perf.xg_against) if perf.xg_against else None,
-                'match_result': match.result
+                'match_result': match_result
             })
 
             # Add match context
             player_rankings[spid]['match_contexts'].append({
-                'result': match.result,
-                'final_goal_difference': abs(match.goals_for - match.goals_against),
-                'is_clutch_situation': abs(match.goals_for - match.goals_against) <= 1,
+                'result': match_result,
+                'final_goal_difference': abs(goals_for - goals_against),
+                'is_clutch_situation': abs(goals_for - goals_against) <= 1,
                 'is_winning_goal': False,  # Would need shot details to determine
                 'has_late_goal': False,     # Would need shot details to determine
-                'is_comeback': match.result == 'win' and match.goals_against > 0,
-                'was_losing': match.goals_against > match.goals_for
+                'is_comeback': match_result == 'win' and goals_against > 0,
+                'was_losing': goals_against > goals_for
             })
 
         # Calculate power rankings for each player
@@ -1003,7 +1082,14 @@ class UserViewSet(viewsets.ModelViewSet):
             ranking = PlayerPowerRanking.calculate_power_ranking(
                 player_performances=data['performances'],
                 match_contexts=data['match_contexts'],
-                position=most_common_position
+                position=most_common_position,
+                division=user.max_division,
+            )
+            # Power scores are per player, not per row: the population is fed from rankings computed here,
+            # once per (user, card) per period however often this view recomputes them
+            DistributionService.observe_once(
+                'power_score', ranking['power_score'], f'{user.ouid}:{spid}',
+                DistributionService.position_group(most_common_position), user.max_division,
             )
 
             # Transform position_rating to match frontend expectations
@@ -1052,18 +1138,17 @@ class UserViewSet(viewsets.ModelViewSet):
                 **ranking
             })
 
+        DistributionService.maybe_flush()
+
         # Sort by power score
         results.sort(key=lambda x: x['power_score'], reverse=True)
 
         # === Aggregate Statistics (NEW) ===
-        # Collect all shot details in a single query (avoid N+1)
-        all_shot_details = list(ShotDetail.objects.filter(match__in=matches).values(
-            'x', 'y', 'result', 'shot_type', 'goal_time', 'in_penalty',
-            'assist_spid', 'assist_x', 'assist_y', 'shooter_spid'
-        ))
+        # Collect all shot details in a single query (avoid N+1), declared columns only
+        all_shot_details = list(plan.shot_rows(MatchWindow(user, matchtype, limit)))
 
-        # Collect all match raw_data for pass type distribution
-        matches_raw_data = [match.raw_data for match in matches if match.raw_data]
+        # User's side of each match for pass type distribution
+        team_records = TeamMatchRecord.for_matches(matches)
 
         # Analyze aggregate statistics
         aggregate_stats = {}
@@ -1081,9 +1166,9 @@ class UserViewSet(viewsets.ModelViewSet):
             # Time-based goal patterns (when goals are scored)
             aggregate_stats['goal_patterns'] = AggregateStatsAnalyzer.analyze_time_based_goal_patterns(all_shot_details)
 
-        if matches_raw_data:
+        if team_records:
             # Pass type distribution (average pass success rates)
-            aggregate_stats['pass_distribution'] = AggregateStatsAnalyzer.analyze_pass_type_distribution(matches_raw_data)
+            aggregate_stats['pass_distribution'] = AggregateStatsAnalyzer.analyze_pass_type_distribution(team_records)
 
         response_data = {
             'total_players': len(results),
@@ -1097,6 +1182,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/passes')
+    @use_replica
     def pass_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/passes/
@@ -1137,7 +1223,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
         # Get all player performances (single query instead of per-match)
         all_performances = list(
-            PlayerPerformance.objects.filter(match__in=matches).values(
+            MatchWindow(user, matchtype, limit).performances(user_only=False, starters_only=False).values(
                 'spid', 'player_name', 'season_id', 'season_name',
                 'position', 'pass_attempts', 'pass_success',
                 'assists', 'goals'
@@ -1162,6 +1248,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/set-pieces')
+    @use_replica
     def set_piece_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/set-pieces/
@@ -1182,20 +1269,21 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(cached)
 
         user = get_object_or_404(User, ouid=ouid)
+        plan = FetchPlan(SetPieceAnalyzer)
 
         # Ensure we have enough matches (fetch from API if needed)
-        matches = self._ensure_matches(user, matchtype, limit)
+        matches = self._ensure_matches(user, matchtype, limit, defer_raw_data=plan.defer_raw_data)
 
         if not matches:
             return Response({
                 'error': 'No matches found'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # Extract raw_data from matches
-        matches_data = [match.raw_data for match in matches if match.raw_data]
+        # User's side of each match, extracted once from raw_data
+        team_records = TeamMatchRecord.for_matches(matches)
 
         # Analyze set pieces
-        analysis = SetPieceAnalyzer.analyze_set_pieces(matches_data)
+        analysis = SetPieceAnalyzer.analyze_set_pieces(team_records)
 
         response_data = {
             'matchtype': matchtype,
@@ -1209,6 +1297,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/defense')
+    @use_replica
     def defense_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/defense/
@@ -1238,11 +1327,11 @@ class UserViewSet(viewsets.ModelViewSet):
                 'error': 'No matches found'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # Extract raw_data from matches
-        matches_data = [match.raw_data for match in matches if match.raw_data]
+        # User's side of each match, extracted once from raw_data
+        team_records = TeamMatchRecord.for_matches(matches)
 
         # Analyze defense
-        analysis = DefenseAnalyzer.analyze_defense(matches_data)
+        analysis = DefenseAnalyzer.analyze_defense(team_records)
 
         response_data = {
             'matchtype': matchtype,
@@ -1256,6 +1345,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/pass-variety')
+    @use_replica
     def pass_variety_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/pass-variety/
@@ -1284,11 +1374,11 @@ class UserViewSet(viewsets.ModelViewSet):
                 'error': 'No matches found'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # Extract raw_data from matches
-        matches_data = [match.raw_data for match in matches if match.raw_data]
+        # User's side of each match, extracted once from raw_data
+        team_records = TeamMatchRecord.for_matches(matches)
 
         # Analyze pass variety
-        analysis = PassVarietyAnalyzer.analyze_pass_variety(matches_data)
+        analysis = PassVarietyAnalyzer.analyze_pass_variety(team_records)
 
         response_data = {
             'matchtype': matchtype,
@@ -1302,6 +1392,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/shooting-quality')
+    @use_replica
     def shooting_quality_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/shooting-quality/
@@ -1331,11 +1422,11 @@ class UserViewSet(viewsets.ModelViewSet):
                 'error': 'No matches found'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # Extract raw_data from matches
-        matches_data = [match.raw_data for match in matches if match.raw_data]
+        # User's side of each match, extracted once from raw_data
+        team_records = TeamMatchRecord.for_matches(matches)
 
         # Analyze shooting quality
-        analysis = ShootingQualityAnalyzer.analyze_shooting_quality(matches_data)
+        analysis = ShootingQualityAnalyzer.analyze_shooting_quality(team_records)
 
         response_data = {
             'matchtype': matchtype,
@@ -1349,6 +1440,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/skill-gap')
+    @use_replica
     def skill_gap_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/skill-gap/?matchtype=50&limit=20
@@ -1365,19 +1457,18 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(cached)
 
         user = get_object_or_404(User, ouid=ouid)
-        matches = self._ensure_matches(user, matchtype, limit, defer_raw_data=True)
+        self._ensure_matches(user, matchtype, limit, materialize=False)
+        window = MatchWindow(user, matchtype, limit)
+        match_count = window.count()
 
-        if not matches:
+        if not match_count:
             return Response({'error': 'No matches found'}, status=status.HTTP_404_NOT_FOUND)
 
+        from .analyzers.skill_gap_analyzer import SkillGapAnalyzer
+        plan = FetchPlan(SkillGapAnalyzer)
+
         # Group PlayerPerformance by spid
-        all_performances = PlayerPerformance.objects.filter(
-            match__in=matches, user_ouid=user
-        ).exclude(position=28).values(
-            'spid', 'player_name', 'position', 'rating', 'goals', 'assists',
-            'shots', 'shots_on_target', 'pass_attempts', 'pass_success',
-            'dribble_attempts', 'dribble_success', 'tackle_success', 'blocks'
-        )
+        all_performances = plan.performance_rows(window)
 
         from collections import defaultdict
         perf_by_spid = defaultdict(list)
@@ -1391,10 +1482,9 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({
                 'player_gaps': [],
                 'insights': ['5경기 이상 플레이한 선수가 없습니다. 더 많은 경기를 분석하세요.'],
-                'matches_analyzed': len(matches),
+                'matches_analyzed': match_count,
             })
 
-        from .analyzers.skill_gap_analyzer import SkillGapAnalyzer
         client = NexonAPIClient()
 
         # Batch ranker API call (single request instead of up to 10)
@@ -1402,7 +1492,8 @@ class UserViewSet(viewsets.ModelViewSet):
         players_query = [{'id': spid, 'po': perfs[0]['position']} for spid, perfs in top_eligible]
         ranker_by_spid = {}
         try:
-            ranker_data = client.get_ranker_stats(matchtype=matchtype, players=players_query)
+            # Nightly snapshots for popular cards, live (per-player cached) calls for the rest
+            ranker_data = RankerBenchmarks.stats(matchtype, players_query, client=client)
             if ranker_data and isinstance(ranker_data, list):
                 for entry in ranker_data:
                     entry_spid = entry.get('spId')
@@ -1440,7 +1531,7 @@ class UserViewSet(viewsets.ModelViewSet):
         insights = SkillGapAnalyzer.generate_overall_insights(player_gaps)
 
         response_data = {
-            'matches_analyzed': len(matches),
+            'matches_analyzed': match_count,
             'players_analyzed': len(player_gaps),
             'player_gaps': player_gaps,
             'insights': insights,
@@ -1450,6 +1541,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/player-contribution')
+    @use_replica
     def player_contribution_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/player-contribution/?matchtype=50&limit=30
@@ -1466,47 +1558,44 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(cached)
 
         user = get_object_or_404(User, ouid=ouid)
-        matches = self._ensure_matches(user, matchtype, limit, defer_raw_data=True)
+        self._ensure_matches(user, matchtype, limit, materialize=False)
+        window = MatchWindow(user, matchtype, limit)
+        match_count = window.count()
 
-        if not matches:
+        if not match_count:
             return Response({'error': 'No matches found'}, status=status.HTTP_404_NOT_FOUND)
 
-        # Fetch trade history (buy trades only) — 전체 내역 페이지네이션
-        try:
-            client = NexonAPIClient()
-            trade_history = []
-            offset = 0
-            page_size = 100
-            max_pages = 20  # 최대 2000건 (과도한 API 호출 방지)
-            for _ in range(max_pages):
-                batch = client.get_user_trade(
-                    user.ouid, tradetype='buy', offset=offset, limit=page_size
-                )
-                if not isinstance(batch, list) or not batch:
-                    break
-                trade_history.extend(batch)
-                if len(batch) < page_size:
-                    break  # 마지막 페이지
-                offset += page_size
-        except Exception as e:
-            logger.warning(f"Trade history failed: {e}")
-            trade_history = []
+        from .analyzers.roi_analyzer import ROIAnalyzer
+        plan = FetchPlan(ROIAnalyzer)
 
-        # Group performances by spid
-        all_performances = PlayerPerformance.objects.filter(
-            match__in=matches, user_ouid=user
-        ).exclude(position=28).values(
-            'spid', 'player_name', 'position', 'grade', 'rating', 'goals', 'assists',
-            'shots', 'shots_on_target', 'pass_attempts', 'pass_success',
-            'dribble_attempts', 'dribble_success', 'tackle_success', 'blocks'
-        )
+        # Trade history (buy trades only) — 전체 내역 페이지네이션, 분석기가 읽을 때만
+        trade_history = []
+        if plan.needs('user_trade'):
+            try:
+                client = NexonAPIClient()
+                offset = 0
+                page_size = 100
+                max_pages = 20  # 최대 2000건 (과도한 API 호출 방지)
+                for _ in range(max_pages):
+                    batch = client.get_user_trade(
+                        user.ouid, tradetype='buy', offset=offset, limit=page_size
+                    )
+                    if not isinstance(batch, list) or not batch:
+                        break
+                    trade_history.extend(batch)
+                    if len(batch) < page_size:
+                        break  # 마지막 페이지
+                    offset += page_size
+            except Exception as e:
+                logger.warning(f"Trade history failed: {e}")
+                trade_history = []
 
+        # Group performances by spid
         from collections import defaultdict
         perf_by_spid = defaultdict(list)
-        for p in all_performances:
-            perf_by_spid[p['spid']].append(dict(p))
+        for p in plan.performance_rows(window):
+            perf_by_spid[p['spid']].append(p)
 
-        from .analyzers.roi_analyzer import ROIAnalyzer
         result = ROIAnalyzer.calculate_squad_roi(
             trade_history=trade_history,
             player_performances_by_spid=perf_by_spid,
@@ -1514,7 +1603,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
         response_data = {
             'matchtype': matchtype,
-            'matches_analyzed': len(matches),
+            'matches_analyzed': match_count,
             'trade_history_count': len(trade_history),
             **result,
         }
@@ -1523,40 +1612,53 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/form-cycle')
+    @use_replica
     def form_cycle_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/form-cycle/?matchtype=50&limit=50
 
         B4. 폼 사이클 분석기
         핫 스트릭/슬럼프 주기 탐지 + 세션 최적화 분석.
+        limit=all: 저장된 전체 이력을 DB 윈도 함수로 요약 (일 단위 타임라인).
         """
         matchtype = int(request.query_params.get('matchtype', 50))
-        limit = min(int(request.query_params.get('limit', 50)), 200)
+        full_history = request.query_params.get('limit') == 'all'
+        limit = 'all' if full_history else min(int(request.query_params.get('limit', 50)), 200)
 
         cache_key = f'form_cycle_{ouid}_{matchtype}_{limit}'
         cached = cache.get(cache_key)
         if cached:
             return Response(cached)
 
+        from .analyzers.form_cycle_analyzer import FormCycleAnalyzer
+        plan = FetchPlan(FormCycleAnalyzer)
+
         user = get_object_or_404(User, ouid=ouid)
-        matches = self._ensure_matches(user, matchtype, limit)
 
-        if not matches:
+        if full_history:
+            from .utils.form_history import FormHistory
+            # Sync the latest page; older matches are whatever is already stored
+            self._ensure_matches(user, matchtype, 50, materialize=False)
+            result = FormCycleAnalyzer.analyze_form_history(FormHistory(user, matchtype).summarize())
+            if not result['total_matches']:
+                return Response({'error': 'No matches found'}, status=status.HTTP_404_NOT_FOUND)
+
+            response_data = {'matchtype': matchtype, 'matches_requested': limit, **result}
+            cache.set(cache_key, response_data, 900)
+            return Response(response_data)
+
+        self._ensure_matches(user, matchtype, limit, materialize=False)
+        # Only the columns FormCycleAnalyzer declares; raw_data is never loaded
+        match_data = list(plan.match_rows(MatchWindow(user, matchtype, limit)))
+
+        if not match_data:
             return Response({'error': 'No matches found'}, status=status.HTTP_404_NOT_FOUND)
 
-        match_data = [{
-            'match_date': str(m.match_date),
-            'result': m.result,
-            'goals_for': m.goals_for,
-            'goals_against': m.goals_against,
-            'possession': m.possession,
-            'shots': m.shots,
-            'shots_on_target': m.shots_on_target,
-            'pass_success_rate': float(m.pass_success_rate or 70),
-            'raw_data': m.raw_data,
-        } for m in matches]
+        for m in match_data:
+            # Local time, so sessions are grouped by the player's (KST) day
+            m['match_date'] = str(timezone.localtime(m['match_date']))
+            m['pass_success_rate'] = float(m['pass_success_rate'] or 70)
 
-        from .analyzers.form_cycle_analyzer import FormCycleAnalyzer
         result = FormCycleAnalyzer.analyze_form_cycle(match_data)
 
         response_data = {
@@ -1569,6 +1671,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/ranker-gap')
+    @use_replica
     def ranker_gap_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/ranker-gap/?matchtype=50&limit=20
@@ -1585,33 +1688,27 @@ class UserViewSet(viewsets.ModelViewSet):
         if cached:
             return Response(cached)
 
+        from .analyzers.ranker_gap_analyzer import RankerGapAnalyzer
+        plan = FetchPlan(RankerGapAnalyzer)
+
         user = get_object_or_404(User, ouid=ouid)
-        matches = self._ensure_matches(user, matchtype, limit, defer_raw_data=True)
+        self._ensure_matches(user, matchtype, limit, materialize=False)
+        window = MatchWindow(user, matchtype, limit)
+        # Only the columns RankerGapAnalyzer declares; raw_data is never loaded
+        match_data = list(plan.match_rows(window))
 
-        if not matches:
+        if not match_data:
             return Response({'error': 'No matches found'}, status=status.HTTP_404_NOT_FOUND)
 
-        match_data = [{
-            'result': m.result,
-            'goals_for': m.goals_for,
-            'goals_against': m.goals_against,
-            'possession': m.possession,
-            'shots': m.shots,
-            'shots_on_target': m.shots_on_target,
-            'pass_success_rate': float(m.pass_success_rate or 0),
-        } for m in matches]
+        for m in match_data:
+            m['pass_success_rate'] = float(m['pass_success_rate'] or 0)
 
         # Single query for all fields (eliminates duplicate DB query)
         from collections import Counter
-        all_perf_raw = list(PlayerPerformance.objects.filter(
-            match__in=matches, user_ouid=user
-        ).exclude(position=28).values(
-            'spid', 'position', 'rating', 'goals', 'assists',
-            'dribble_attempts', 'dribble_success'
-        ))
+        all_perf_raw = list(plan.performance_rows(window))
 
         all_performances = [
-            {k: p[k] for k in ('rating', 'goals', 'assists', 'dribble_attempts', 'dribble_success')}
+            {k: p[k] for k in ('rating', 'dribble_attempts', 'dribble_success')}
             for p in all_perf_raw
         ]
 
@@ -1631,7 +1728,7 @@ class UserViewSet(viewsets.ModelViewSet):
                 for spid, _ in top_spids:
                     players_query.append({'id': spid, 'po': spid_positions.get(spid, 18)})
 
-                raw = client.get_ranker_stats(matchtype=matchtype, players=players_query)
+                raw = RankerBenchmarks.stats(matchtype, players_query, client=client)
                 if isinstance(raw, list):
                     ranker_api_data = raw
             except Exception as e:
@@ -1640,7 +1737,6 @@ class UserViewSet(viewsets.ModelViewSet):
         # Get user's division
         division = user.max_division or 300
 
-        from .analyzers.ranker_gap_analyzer import RankerGapAnalyzer
         result = RankerGapAnalyzer.calculate_ranker_gap(
             matches=match_data,
             player_performances=all_performances,
@@ -1650,7 +1746,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
         response_data = {
             'matchtype': matchtype,
-            'matches_analyzed': len(matches),
+            'matches_analyzed': len(match_data),
             **result,
         }
 
@@ -1658,6 +1754,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/habit-loop')
+    @use_replica
     def habit_loop_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/habit-loop/?matchtype=50&limit=30
@@ -1679,24 +1776,37 @@ class UserViewSet(viewsets.ModelViewSet):
         if not matches:
             return Response({'error': 'No matches found'}, status=status.HTTP_404_NOT_FOUND)
 
-        matches_raw = [m.raw_data for m in matches if m.raw_data]
+        team_records = TeamMatchRecord.for_matches(matches)
         match_dicts = [{
             'result': m.result,
             'goals_for': m.goals_for,
             'goals_against': m.goals_against,
             'possession': m.possession,
             'pass_success_rate': float(m.pass_success_rate or 0),
-            'raw_data': m.raw_data,
+            'record': TeamMatchRecord.for_match(m),
         } for m in matches]
 
-        shot_details = list(ShotDetail.objects.filter(match__in=matches).values('x', 'y', 'result'))
+        shot_grid = MatchGrids.window(MatchWindow(user, matchtype, limit), 'shots')
+
+        # Pass/shot sequences come from the stored habit counts (full history),
+        # built once from the stored matches under the sync lock; while a sync
+        # holds it the analyzer counts this window instead. `sequence_scope`
+        # tells which one the sequence fields describe
+        habit_counts = HabitStore.load(user, matchtype)
+        if habit_counts is None:
+            lock_key = f"ensure_lock:{user.ouid}:{matchtype}"
+            if cache.add(lock_key, "1", timeout=120):
+                try:
+                    habit_counts = HabitStore.rebuild(user, matchtype)
+                finally:
+                    cache.delete(lock_key)
 
         from .analyzers.habit_loop_analyzer import HabitLoopAnalyzer
         result = HabitLoopAnalyzer.analyze_habit_loops(
-            matches_raw=matches_raw,
-            user_ouid=user.ouid,
-            shot_details=shot_details,
+            records=team_records,
+            shot_grid=shot_grid,
             matches=match_dicts,
+            habit_counts=habit_counts,
         )
 
         response_data = {
@@ -1705,10 +1815,13 @@ class UserViewSet(viewsets.ModelViewSet):
             **result,
         }
 
-        cache.set(cache_key, response_data, 1800)
+        # A window fallback is not cached: the next request reads the stored counts
+        if result.get('sequence_scope') != 'window':
+            cache.set(cache_key, response_data, 1800)
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/opponent-types')
+    @use_replica
     def opponent_types_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/opponent-types/?matchtype=50&limit=50
@@ -1734,14 +1847,11 @@ class UserViewSet(viewsets.ModelViewSet):
             'result': m.result,
             'goals_for': m.goals_for,
             'goals_against': m.goals_against,
-            'raw_data': m.raw_data,
+            'record': TeamMatchRecord.for_match(m),
         } for m in matches if m.raw_data]
 
         from .analyzers.opponent_classifier import OpponentClassifier
-        result = OpponentClassifier.classify_opponents(
-            matches=match_dicts,
-            user_ouid=user.ouid,
-        )
+        result = OpponentClassifier.classify_opponents(matches=match_dicts)
 
         response_data = {
             'matchtype': matchtype,
@@ -1753,6 +1863,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=True, methods=['get'], url_path='analysis/controller')
+    @use_replica
     def controller_analysis(self, request, ouid=None):
         """
         GET /api/users/{ouid}/analysis/controller/
@@ -1785,7 +1896,8 @@ class UserViewSet(viewsets.ModelViewSet):
         # Convert to serializable format with all needed fields
         matches_data = []
         for match in matches:
-            if not match.raw_data:
+            record = TeamMatchRecord.for_match(match)
+            if record is None:
                 continue
 
             matches_data.append({
@@ -1797,12 +1909,12 @@ class UserViewSet(viewsets.ModelViewSet):
                 'shots': match.shots,
                 'shots_on_target': match.shots_on_target,
                 'pass_success_rate': match.pass_success_rate,
-                'raw_data': match.raw_data
+                'record': record,
             })
 
         # Analyze controller performance
         from api.analyzers.controller_analyzer import ControllerAnalyzer
-        analysis = ControllerAnalyzer.analyze_controller_performance(matches_data, ouid=ouid)
+        analysis = ControllerAnalyzer.analyze_controller_performance(matches_data)
 
         response_data = {
             'matchtype': matchtype,
@@ -1870,10 +1982,21 @@ class MatchViewSet(viewsets.ReadOnlyModelViewSet):
 
         Query params:
         - ouid (optional): User's OUID to get their perspective of the match
+        - bins (optional): NxM with N, M dividing 100 (e.g. 20x10), returns binned density / xG grids instead of every shot
+        - points (optional): with bins, sample up to this many shots (max 500)
         """
         user_ouid = request.query_params.get('ouid')
+        try:
+            bins, points = _heatmap_params(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         match = self._get_match_safely(match_id, user_ouid)
+        if bins is not None:
+            grids = MatchGrids.for_matches([match.id], ('shots', 'xg'))
+            shots = ShotDetail.objects.filter(match=match).values('x', 'y', 'result', 'shot_type') if points else ()
+            return Response(MatchGrids.heatmap(grids, bins, shots, points))
+
         shot_details = ShotDetail.objects.filter(match=match)
 
         serializer = ShotDetailSerializer(shot_details, many=True)
@@ -2506,10 +2629,8 @@ def opponent_dna(request):
                     battle_prediction = BattlePredictor.predict(
                         my_indices=my_dna['indices'],
                         opp_indices=opp_result['indices'],
-                        my_matches_raw=my_matches_raw,
-                        opp_matches_raw=opponent_matches_raw,
-                        my_ouid=my_ouid,
-                        opp_ouid=opponent_ouid,
+                        my_records=TeamMatchRecord.from_raw_list(my_matches_raw, my_ouid),
+                        opp_records=TeamMatchRecord.from_raw_list(opponent_matches_raw, opponent_ouid),
                         my_nickname=my_nickname,
                         opp_nickname=opponent_nickname,
                     )
@@ -2598,23 +2719,69 @@ Sent via FC Strategy Buy Me a Coffee feature
         )
 
 
+def _visitor_fingerprint(request):
+    """Anonymous visitor id for the unique-visitor estimate (client IP + user agent hash)"""
+    import hashlib
+
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    ip = forwarded.split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')
+    agent = request.META.get('HTTP_USER_AGENT', '')
+    return hashlib.sha1(f"{ip}|{agent}".encode('utf-8')).hexdigest()[:16]
+
+
 @api_view(['GET', 'POST'])
 def visitor_count(request):
     """
     GET  /api/visitor-count/ → total_visits만 반환
-    POST /api/visitor-count/ → SiteVisit 1건 생성 + total_visits 반환
+    POST /api/visitor-count/ → 방문 1건 카운트 (Redis INCR, DB는 주기적 일괄 반영) + total_visits 반환
     """
+    from .utils.visit_counter import VisitCounter
+
     if request.method == 'POST':
-        SiteVisit.objects.create()
-        try:
-            cache.incr('visitor_total')
-        except ValueError:
-            cache.set('visitor_total', SiteVisit.objects.count(), 3600)
-        total_visits = cache.get('visitor_total')
+        total_visits = VisitCounter.record(_visitor_fingerprint(request))
     else:
-        total_visits = cache.get('visitor_total')
-        if total_visits is None:
-            total_visits = SiteVisit.objects.count()
-            cache.set('visitor_total', total_visits, 3600)
+        total_visits = VisitCounter.total()
+
+    return Response({
+        'total_visits': total_visits,
+        'unique_visitors_today': VisitCounter.unique_visitors(),
+    })
+
+
+def _metrics_authorized(request):
+    from django.conf import settings
+    from django.utils.crypto import constant_time_compare
+
+    token = request.headers.get('X-Metrics-Token', '')
+    return bool(settings.METRICS_TOKEN) and constant_time_compare(token, settings.METRICS_TOKEN)
+
+
+@api_view(['GET'])
+def db_pool_stats(request):
+    """
+    GET /api/internal/db-pool/ (X-Metrics-Token header)
+
+    Connection pool and ingestion budget metrics of the worker serving the request.
+    """
+    from .utils.db_pool import pool_stats
+
+    if not _metrics_authorized(request):
+        return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(pool_stats())
+
+
+@api_view(['GET'])
+def upstream_stats(request):
+    """
+    GET /api/internal/upstream/ (X-Metrics-Token header)
+
+    Negative cache hits/stores per error class and match fetch backoff
+    counters of the worker serving the request.
+    """
+    from nexon_api.negative_cache import upstream_stats as negative_cache_stats
+
+    if not _metrics_authorized(request):
+        return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    return Response({'total_visits': total_visits})
+    return Response(negative_cache_stats())
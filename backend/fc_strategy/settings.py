@@ -82,6 +82,43 @@ DATABASES = {
     }
 }
 
+# Connection pooling (psycopg 3 pool, sized per worker process; see api.utils.db_pool).
+# Keep workers x (DB_POOL_MAX_SIZE [+ replica pool]) below Postgres max_connections.
+# DB_POOL_MAX_SIZE=0 falls back to persistent connections (CONN_MAX_AGE).
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=20, cast=int)
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=2, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10.0, cast=float)
+# Connections ingestion greenlets may hold at once, out of DB_POOL_MAX_SIZE
+DB_INGEST_MAX_CONNECTIONS = config('DB_INGEST_MAX_CONNECTIONS', default=4, cast=int)
+if DB_POOL_MAX_SIZE:
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # pooling replaces persistent connections
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+        },
+    }
+
+# Token for GET /api/internal/db-pool/ and /api/internal/upstream/ (metrics); unset disables them
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Read replica for analysis endpoints (api.utils.db_routing); enabled by DB_REPLICA_HOST
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+if DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.utils.db_routing.ReplicaRouter']
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=5.0, cast=float)
+REPLICA_LAG_CHECK_SECONDS = config('REPLICA_LAG_CHECK_SECONDS', default=2.0, cast=float)
+# Read a user's data from the primary this long after their matches were synced
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=30, cast=int)
+
 
 
 
@@ -134,6 +171,49 @@ REST_FRAMEWORK = {
 # Nexon API Settings
 NEXON_API_KEY = config('NEXON_API_KEY', default='')
 NEXON_API_BASE_URL = 'https://open.api.nexon.com'
+# Decode match-detail with orjson, keeping only the fields analyzers read
+NEXON_PROJECTED_DECODE = config('NEXON_PROJECTED_DECODE', default=False, cast=bool)
+# Negative cache TTLs (seconds) for failed cached reads, per error class
+NEXON_NEGATIVE_TTL_NOT_FOUND = config('NEXON_NEGATIVE_TTL_NOT_FOUND', default=600, cast=int)
+NEXON_NEGATIVE_TTL_SERVER_ERROR = config('NEXON_NEGATIVE_TTL_SERVER_ERROR', default=30, cast=int)
+NEXON_NEGATIVE_TTL_TIMEOUT = config('NEXON_NEGATIVE_TTL_TIMEOUT', default=15, cast=int)
+# Failed match-detail fetches are retried after BASE * 2^(failures-1) seconds, capped at MAX
+MATCH_FETCH_BACKOFF_BASE = config('MATCH_FETCH_BACKOFF_BASE', default=60, cast=int)
+MATCH_FETCH_BACKOFF_MAX = config('MATCH_FETCH_BACKOFF_MAX', default=6 * 3600, cast=int)
+
+# Prebuilt binary metadata index (`manage.py build_metadata_index`)
+METADATA_INDEX_PATH = config('METADATA_INDEX_PATH', default=str(BASE_DIR / 'static_data' / 'metadata.idx'))
+
+# Opponent archetype centroids fitted by `manage.py fit_opponent_centroids`;
+# used by OpponentClassifier when OPPONENT_LEARNED_CENTROIDS is on (domain defaults otherwise)
+OPPONENT_CENTROIDS_PATH = config('OPPONENT_CENTROIDS_PATH', default=str(BASE_DIR / 'static_data' / 'opponent_centroids.json'))
+OPPONENT_LEARNED_CENTROIDS = config('OPPONENT_LEARNED_CENTROIDS', default=False, cast=bool)
+
+# Population percentiles (metric_distributions): sketch size, how often ingested values
+# are merged into the stored sketches, how long workers reuse a loaded snapshot, and the
+# sample count below which analyzers keep their fixed-distribution fallback. Power scores are
+# observed at most once per (user, player) per DISTRIBUTION_OBSERVE_SECONDS; per-player
+# averages are sketched for players with DISTRIBUTION_PLAYER_MIN_APPEARANCES stored matches
+DISTRIBUTION_SKETCH_K = config('DISTRIBUTION_SKETCH_K', default=200, cast=int)
+DISTRIBUTION_FLUSH_SECONDS = config('DISTRIBUTION_FLUSH_SECONDS', default=60, cast=int)
+DISTRIBUTION_REFRESH_SECONDS = config('DISTRIBUTION_REFRESH_SECONDS', default=300, cast=int)
+DISTRIBUTION_MIN_SAMPLES = config('DISTRIBUTION_MIN_SAMPLES', default=200, cast=int)
+DISTRIBUTION_OBSERVE_SECONDS = config('DISTRIBUTION_OBSERVE_SECONDS', default=86400, cast=int)
+DISTRIBUTION_PLAYER_MIN_APPEARANCES = config('DISTRIBUTION_PLAYER_MIN_APPEARANCES', default=5, cast=int)
+
+# Ranker stats snapshots (`manage.py snapshot_ranker_benchmarks`, nightly) older than
+# this are ignored and the card is fetched live
+RANKER_BENCHMARK_MAX_AGE_DAYS = config('RANKER_BENCHMARK_MAX_AGE_DAYS', default=3, cast=int)
+
+# Visit counter: Redis counts flushed to daily_visit_counts at most this often
+VISIT_FLUSH_SECONDS = config('VISIT_FLUSH_SECONDS', default=60, cast=int)
+
+# Match data retention (`manage.py archive_matches`): matches older than
+# MATCH_RETENTION_MONTHS and outside each user's most recent
+# MATCH_RETENTION_KEEP_RECENT matches per match type are archived and deleted
+MATCH_RETENTION_MONTHS = config('MATCH_RETENTION_MONTHS', default=12, cast=int)
+MATCH_RETENTION_KEEP_RECENT = config('MATCH_RETENTION_KEEP_RECENT', default=200, cast=int)
+MATCH_ARCHIVE_DIR = config('MATCH_ARCHIVE_DIR', default=str(BASE_DIR / 'archive'))
 
 # Cache Settings (Redis)
 CACHES = {
@@ -8,6 +8,8 @@ class NexonApiConfig(AppConfig):
     def ready(self):
         from nexon_api.metadata import MetadataLoader
         try:
+            if MetadataLoader._get_index() is not None:
+                return
             MetadataLoader.load_metadata('spid')
             MetadataLoader.load_metadata('seasonid')
         except Exception:
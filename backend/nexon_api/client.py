@@ -3,7 +3,10 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from django.conf import settings
 from django.core.cache import cache
-from .exceptions import NexonAPIException, UserNotFoundException
+from .exceptions import NexonAPIException, UpstreamTimeoutException, UserNotFoundException
+from .negative_cache import NegativeCache
+from .projection import decode_match_detail
+from .single_flight import SingleFlight
 
 
 class NexonAPIClient:
@@ -14,6 +17,9 @@ class NexonAPIClient:
     # Shared session with connection pooling (one per process)
     _session = None
 
+    # Concurrent identical reads share one upstream call (one per process)
+    _single_flight = SingleFlight()
+
     def __init__(self):
         self.api_key = settings.NEXON_API_KEY
         self.headers = {
@@ -40,24 +46,49 @@ class NexonAPIClient:
             cls._session.mount("http://", adapter)
         return cls._session
 
-    def _make_request(self, endpoint, params=None, cache_key=None, cache_timeout=3600):
-        """Make API request with caching support"""
-        if cache_key:
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                return cached_data
+    def _make_request(self, endpoint, params=None, cache_key=None, cache_timeout=3600, decoder=None,
+                      empty_cache_timeout=None):
+        """
+        Make API request with caching support
+
+        Cache misses are single-flight: concurrent callers of the same
+        cache_key (across greenlets and processes) share one upstream call.
+        Uncached requests are still coalesced within the process.
+
+        Failures of cached reads (not found, 5xx, timeout) are negative-cached
+        for a short TTL per error class and re-raised without calling the API.
 
+        decoder, when given, replaces response.json() and receives the raw
+        response body (e.g. projected match-detail decoding).
+
+        Empty responses are cached only with empty_cache_timeout.
+        """
+        def fetch():
+            return self._fetch(endpoint, params, decoder)
+
+        if cache_key:
+            NegativeCache.check(cache_key)
+            try:
+                return self._single_flight.load(cache_key, fetch, cache_timeout, empty_cache_timeout)
+            except NexonAPIException as e:
+                NegativeCache.record(cache_key, e)
+                raise
+        flight_key = f"{endpoint}?{sorted((params or {}).items())}"
+        return self._single_flight.load(flight_key, fetch)
+
+    def _fetch(self, endpoint, params=None, decoder=None):
+        """Single upstream GET, with Nexon error mapping"""
         url = f"{self.BASE_URL}{endpoint}"
         session = self._get_session()
         try:
             response = session.get(url, headers=self.headers, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
-
-            if cache_key:
-                cache.set(cache_key, data, cache_timeout)
-
-            return data
+            return decoder(response.content) if decoder else response.json()
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            raise UpstreamTimeoutException(f"API request failed: {e}")
+        except requests.exceptions.RetryError as e:
+            # Retries exhausted on a status in the retry list (429 / 5xx)
+            raise NexonAPIException(f"API request failed: {e}", status_code=503)
         except requests.exceptions.RequestException as e:
             # Log response body for debugging
             error_detail = str(e)
@@ -87,25 +118,24 @@ class NexonAPIClient:
                     raise
                 except Exception:
                     pass
-            raise NexonAPIException(f"API request failed: {error_detail}")
+            status_code = e.response.status_code if getattr(e, 'response', None) is not None else None
+            raise NexonAPIException(f"API request failed: {error_detail}", status_code=status_code)
 
-    def search_user(self, nickname):
-        """Search user by nickname, returns full response dict"""
-        session = self._get_session()
-        url = f"{self.BASE_URL}/fconline/v1/id?nickname={nickname}"
-        response = session.get(url, headers=self.headers, timeout=10)
+    def _get_json(self, url):
+        response = self._get_session().get(url, headers=self.headers, timeout=10)
         if response.status_code >= 400:
             raise NexonAPIException(f"API request failed: {response.status_code}")
         return response.json()
 
+    def search_user(self, nickname):
+        """Search user by nickname, returns full response dict"""
+        url = f"{self.BASE_URL}/fconline/v1/id?nickname={nickname}"
+        return self._single_flight.load(url, lambda: self._get_json(url))
+
     def get_user_info(self, ouid):
         """Get user info by ouid, returns full response dict"""
-        session = self._get_session()
         url = f"{self.BASE_URL}/fconline/v1/user/basic?ouid={ouid}"
-        response = session.get(url, headers=self.headers, timeout=10)
-        if response.status_code >= 400:
-            raise NexonAPIException(f"API request failed: {response.status_code}")
-        return response.json()
+        return self._single_flight.load(url, lambda: self._get_json(url))
 
     def get_user_ouid(self, nickname):
         """Get user OUID by nickname"""
@@ -129,7 +159,8 @@ class NexonAPIClient:
             f"/fconline/v1/user/maxdivision",
             params={"ouid": ouid},
             cache_key=cache_key,
-            cache_timeout=1800  # 30 minutes
+            cache_timeout=1800,  # 30 minutes
+            empty_cache_timeout=300,  # users without a division yet
         )
 
         return data
@@ -163,6 +194,7 @@ class NexonAPIClient:
             params=params,
             cache_key=cache_key,
             cache_timeout=86400,  # 24 hours (match data is immutable)
+            decoder=decode_match_detail if settings.NEXON_PROJECTED_DECODE else None,
         )
 
         return data
@@ -184,30 +216,79 @@ class NexonAPIClient:
 
         return data
 
+    # Ranker stats are cached per player; players the rankers don't use are cached
+    # as empty entries for a shorter time
+    RANKER_STATS_TIMEOUT = 3600
+    RANKER_STATS_EMPTY_TIMEOUT = 600
+
+    @staticmethod
+    def _ranker_stats_key(matchtype, spid, position):
+        """Per-player key: the same in every process and batch containing the player"""
+        return f"ranker_stats:{matchtype}:{spid}:{position}"
+
     def get_ranker_stats(self, matchtype, players):
         """Get ranker stats for specific players
 
+        Entries are cached per (matchtype, spid, position), so batches share
+        players across users; only the players not cached are requested
+        upstream, in one call.
+
         Args:
             matchtype: Match type (50=공식경기, 52=감독모드, etc.)
             players: List of dicts with 'id' (spid) and 'po' (position)
                     Example: [{"id": 826250959, "po": 18}]
 
         Returns:
-            List of player stats from TOP 10,000 rankers
+            List of player stats from TOP 10,000 rankers, in request order
+            (players without ranker data are omitted)
         """
+        wanted = list(dict.fromkeys((int(p['id']), int(p['po'])) for p in players))
+        keys = {pair: self._ranker_stats_key(matchtype, *pair) for pair in wanted}
+        entries = cache.get_many(list(keys.values()))
+
+        missing = [pair for pair in wanted if keys[pair] not in entries]
+        if missing:
+            fetched = self._fetch_ranker_stats(matchtype, missing)
+            found = {keys[pair]: fetched[pair] for pair in missing if fetched.get(pair)}
+            empty = {keys[pair]: {} for pair in missing if not fetched.get(pair)}
+            cache.set_many(found, self.RANKER_STATS_TIMEOUT)
+            cache.set_many(empty, self.RANKER_STATS_EMPTY_TIMEOUT)
+            entries.update(found)
+            entries.update(empty)
+
+        return [entries[keys[pair]] for pair in wanted if entries.get(keys[pair])]
+
+    def _fetch_ranker_stats(self, matchtype, pairs):
+        """One upstream ranker-stats call for (spid, position) pairs, entries by pair"""
+        import hashlib
         import json
 
-        cache_key = f"ranker_stats:{matchtype}:{hash(json.dumps(players, sort_keys=True))}"
+        # Stable digest of the batch for single-flight and the negative cache
+        digest = hashlib.sha1(json.dumps(sorted(pairs)).encode()).hexdigest()[:16]
+        batch_key = f"ranker_stats_batch:{matchtype}:{digest}"
+        endpoint = "/fconline/v1/ranker-stats"
         params = {
             "matchtype": matchtype,
-            "players": json.dumps(players, separators=(',', ':'))  # No spaces
+            "players": json.dumps([{"id": spid, "po": po} for spid, po in pairs], separators=(',', ':'))  # No spaces
         }
 
-        data = self._make_request(
-            "/fconline/v1/ranker-stats",
-            params=params,
-            cache_key=cache_key,
-            cache_timeout=3600  # 1 hour
-        )
-
-        return data
+        NegativeCache.check(batch_key)
+        try:
+            data = self._single_flight.load(batch_key, lambda: self._fetch(endpoint, params))
+        except NexonAPIException as e:
+            NegativeCache.record(batch_key, e)
+            raise
+
+        positions = {}
+        for spid, po in pairs:
+            positions.setdefault(spid, []).append(po)
+
+        fetched = {}
+        for entry in data if isinstance(data, list) else []:
+            spid = entry.get('spId')
+            po = entry.get('spPosition')
+            if po is None and len(positions.get(spid, [])) == 1:
+                po = positions[spid][0]
+                entry = {**entry, 'spPosition': po}
+            fetched[(spid, po)] = entry
+        return fetched
@@ -1,6 +1,9 @@
 class NexonAPIException(Exception):
     """Base exception for Nexon API errors"""
-    pass
+
+    def __init__(self, message='', status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class UserNotFoundException(NexonAPIException):
@@ -13,6 +16,11 @@ class MatchNotFoundException(NexonAPIException):
     pass
 
 
+class UpstreamTimeoutException(NexonAPIException):
+    """Raised when the API times out or the connection fails"""
+    pass
+
+
 class RateLimitException(NexonAPIException):
     """Raised when API rate limit is exceeded"""
     pass
@@ -1,10 +1,15 @@
 import requests
+import hashlib
 import json
 import os
+import time
 from pathlib import Path
+from django.conf import settings
 from django.core.cache import cache
 from typing import Dict, Optional
 
+from .metadata_index import MetadataIndex
+
 
 class MetadataLoader:
     """Loader for FC Online static metadata"""
@@ -28,6 +33,133 @@ class MetadataLoader:
     _matchtype_lookup: Optional[Dict[int, str]] = None
     _division_lookup: Optional[Dict[int, str]] = None
 
+    # Memory-mapped binary index (False = looked up and unavailable; looked up
+    # again after VERSION_CHECK_INTERVAL, in case a stale file has been rebuilt)
+    _index = None
+    _index_checked_at: float = 0.0
+
+    # Snapshot versioning: a version key in Redis is bumped by `refresh_metadata`;
+    # each process polls it at most every VERSION_CHECK_INTERVAL seconds and drops
+    # its lookups when it changes, so new-season players appear without a restart.
+    VERSION_KEY = 'metadata:version'
+    ETAG_KEY = 'metadata:etag:{}'
+    VERSION_CHECK_INTERVAL = 30
+    _version: Optional[str] = None
+    _version_checked_at: float = 0.0
+
+    @classmethod
+    def _check_version(cls):
+        """Swap out this process's lookups if a newer snapshot has been published"""
+        now = time.monotonic()
+        if now - cls._version_checked_at < cls.VERSION_CHECK_INTERVAL:
+            return
+        cls._version_checked_at = now
+
+        try:
+            version = cache.get(cls.VERSION_KEY)
+        except Exception:
+            return
+
+        if version != cls._version:
+            cls._reset_snapshot()
+            cls._version = version
+
+    @classmethod
+    def _reset_snapshot(cls):
+        """Drop all per-process lookups; they rebuild lazily from the new snapshot.
+
+        No I/O happens between these assignments, so under gevent no other
+        greenlet can observe a half-swapped state. The previous index is
+        closed so every version bump doesn't leak a mapping per worker.
+        """
+        previous_index = cls._index
+        cls._spid_lookup = None
+        cls._season_lookup = None
+        cls._matchtype_lookup = None
+        cls._division_lookup = None
+        cls._index = None
+        if previous_index:
+            previous_index.close()
+
+    @classmethod
+    def publish_snapshot(cls, metadata_types=('spid', 'seasonid'), force=False) -> Optional[str]:
+        """
+        Fetch metadata from the Nexon static API and publish it as a new snapshot.
+
+        Uses If-None-Match with the last stored ETag so an unchanged upstream costs
+        one 304. On change, the new payloads are written to cache and the version
+        key is bumped so every worker reloads on its next version check.
+
+        Returns:
+            The new version string, or None if nothing changed
+        """
+        changed = False
+        etags = []
+
+        for metadata_type in metadata_types:
+            filename = cls.METADATA_FILES[metadata_type]
+            etag_key = cls.ETAG_KEY.format(metadata_type)
+            headers = {}
+            previous_etag = cache.get(etag_key)
+            if previous_etag and not force:
+                headers['If-None-Match'] = previous_etag
+
+            response = requests.get(f"{cls.METADATA_BASE_URL}{filename}", headers=headers, timeout=30)
+            if response.status_code == 304:
+                etags.append(previous_etag)
+                continue
+            response.raise_for_status()
+
+            data = response.json()
+            etag = response.headers.get('ETag') or hashlib.sha1(response.content).hexdigest()
+            cache.set(f"metadata:{metadata_type}", data, None)
+            cache.set(etag_key, etag, None)
+            etags.append(etag)
+            changed = True
+
+        if not changed:
+            return None
+
+        version = hashlib.sha1('|'.join(etags).encode('utf-8')).hexdigest()[:16]
+        cache.set(cls.VERSION_KEY, version, None)
+        cls._reset_snapshot()
+        cls._version = version
+        return version
+
+    @classmethod
+    def published_version(cls) -> Optional[str]:
+        """Current `metadata:version`, or None when nothing was published (or the cache is down)"""
+        try:
+            return cache.get(cls.VERSION_KEY)
+        except Exception:
+            return None
+
+    @classmethod
+    def _get_index(cls) -> Optional[MetadataIndex]:
+        """
+        Open the prebuilt metadata index once per snapshot version, if one exists.
+
+        An index built from another snapshot than the published one (the image's
+        file after a refresh ran on another host) is not used: lookups go to the
+        dicts, which load the published snapshot, until the file is rebuilt.
+        """
+        cls._check_version()
+        now = time.monotonic()
+        if cls._index is None or (cls._index is False and now - cls._index_checked_at >= cls.VERSION_CHECK_INTERVAL):
+            cls._index = False
+            cls._index_checked_at = now
+            path = getattr(settings, 'METADATA_INDEX_PATH', None)
+            if path and Path(path).exists():
+                try:
+                    index = MetadataIndex.open(path)
+                except (OSError, ValueError):
+                    index = None
+                if index is not None and cls._version and index.snapshot_version != cls._version:
+                    index.close()
+                elif index is not None:
+                    cls._index = index
+        return cls._index if cls._index is not False else None
+
     @classmethod
     def load_metadata(cls, metadata_type: str) -> Optional[Dict]:
         """Load metadata from cache, local file, or API (in that order)"""
@@ -81,6 +213,7 @@ class MetadataLoader:
     @classmethod
     def _get_spid_lookup(cls) -> Dict[int, str]:
         """Build and cache {spid: name} lookup dict"""
+        cls._check_version()
         if cls._spid_lookup is None:
             spid_data = cls.load_metadata('spid')
             cls._spid_lookup = {
@@ -92,6 +225,7 @@ class MetadataLoader:
     @classmethod
     def _get_season_lookup(cls) -> Dict[int, dict]:
         """Build and cache {seasonId: {className, seasonImg}} lookup dict"""
+        cls._check_version()
         if cls._season_lookup is None:
             season_data = cls.load_metadata('seasonid')
             cls._season_lookup = {
@@ -103,6 +237,7 @@ class MetadataLoader:
     @classmethod
     def _get_matchtype_lookup(cls) -> Dict[int, str]:
         """Build and cache {matchtype: desc} lookup dict"""
+        cls._check_version()
         if cls._matchtype_lookup is None:
             matchtype_data = cls.load_metadata('matchtype')
             cls._matchtype_lookup = {
@@ -114,6 +249,7 @@ class MetadataLoader:
     @classmethod
     def _get_division_lookup(cls) -> Dict[int, str]:
         """Build and cache {divisionId: divisionName} lookup dict"""
+        cls._check_version()
         if cls._division_lookup is None:
             division_data = cls.load_metadata('division')
             cls._division_lookup = {
@@ -124,15 +260,26 @@ class MetadataLoader:
 
     @classmethod
     def get_player_name(cls, spid: int) -> str:
-        """Get player name from SPID — O(1) lookup"""
-        lookup = cls._get_spid_lookup()
-        return lookup.get(spid, f"Unknown Player ({spid})")
+        """Get player name from SPID — mmap index or O(1) dict lookup"""
+        index = cls._get_index()
+        if index is not None:
+            name = index.get_player_name(spid)
+        else:
+            name = cls._get_spid_lookup().get(spid)
+        return name if name is not None else f"Unknown Player ({spid})"
+
+    @classmethod
+    def _get_season(cls, season_id: int) -> Optional[dict]:
+        """Season entry from the mmap index, or the dict lookup when no index is built"""
+        index = cls._get_index()
+        if index is not None:
+            return index.get_season(season_id)
+        return cls._get_season_lookup().get(season_id)
 
     @classmethod
     def get_season_name(cls, season_id: int) -> str:
         """Get season name from season ID — O(1) lookup"""
-        lookup = cls._get_season_lookup()
-        season = lookup.get(season_id)
+        season = cls._get_season(season_id)
         if season:
             return season.get('className', f"Unknown Season ({season_id})")
         return f"Unknown Season ({season_id})"
@@ -140,8 +287,7 @@ class MetadataLoader:
     @classmethod
     def get_season_img(cls, season_id: int) -> str:
         """Get season badge image URL from season ID — O(1) lookup"""
-        lookup = cls._get_season_lookup()
-        season = lookup.get(season_id)
+        season = cls._get_season(season_id)
         if season:
             return season.get('seasonImg', '')
         return ''
@@ -149,8 +295,7 @@ class MetadataLoader:
     @classmethod
     def get_season_info(cls, season_id: int) -> dict:
         """Get full season info (name + image URL) from season ID — O(1) lookup"""
-        lookup = cls._get_season_lookup()
-        season = lookup.get(season_id)
+        season = cls._get_season(season_id)
         if season:
             class_name = season.get('className', '')
             short_name = class_name.split('(')[0].strip() if '(' in class_name else class_name
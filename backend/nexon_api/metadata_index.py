@@ -0,0 +1,178 @@
+"""
+Compact binary metadata index
+
+Prebuilt, mmap-able replacement for the per-process spid/season lookup dicts.
+Built once by `manage.py build_metadata_index`; every gunicorn worker maps the
+same file read-only, so the pages are shared and startup skips JSON parsing.
+
+File layout (little-endian, every section 8-byte aligned):
+
+    header          magic b'FCMI', version u32, n_players u32, n_seasons u32,
+                    snapshot version 16 bytes (ASCII, NUL-padded; empty when
+                    built from the static JSON without a published snapshot)
+    spids           int64[n_players]       sorted ascending
+    name_offsets    uint32[n_players + 1]  into name blob
+    season_ids      int64[n_seasons]       sorted ascending
+    class_offsets   uint32[n_seasons + 1]  into className blob
+    img_offsets     uint32[n_seasons + 1]  into seasonImg blob
+    name blob       UTF-8
+    class blob      UTF-8
+    img blob        UTF-8
+"""
+import mmap
+import struct
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+MAGIC = b'FCMI'
+VERSION = 2
+HEADER = struct.Struct('<4sIII16s')
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _string_table(keys: List[int], values: List[str]) -> Tuple[np.ndarray, np.ndarray, bytes]:
+    """Encode parallel key/value lists as (int64 keys, uint32 offsets, blob)."""
+    encoded = [v.encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+    if encoded:
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.asarray(keys, dtype='<i8'), offsets, b''.join(encoded)
+
+
+def build_index(spid_data: Iterable[dict], season_data: Iterable[dict], snapshot_version: str = '') -> bytes:
+    """
+    Serialize Nexon spid/seasonid metadata into the binary index format.
+
+    Args:
+        spid_data: spid.json entries ({'id': int, 'name': str})
+        season_data: seasonid.json entries ({'seasonId', 'className', 'seasonImg'})
+        snapshot_version: `metadata:version` the data was read from ('' if none)
+
+    Returns:
+        The complete index file contents
+    """
+    players = {}
+    for p in spid_data or []:
+        if 'id' in p:
+            players[int(p['id'])] = p.get('name', '') or ''
+    seasons = {}
+    for s in season_data or []:
+        if 'seasonId' in s:
+            seasons[int(s['seasonId'])] = s
+
+    spids = sorted(players)
+    season_ids = sorted(seasons)
+
+    spid_arr, name_offsets, name_blob = _string_table(spids, [players[k] for k in spids])
+    season_arr, class_offsets, class_blob = _string_table(
+        season_ids, [seasons[k].get('className', '') or '' for k in season_ids]
+    )
+    _, img_offsets, img_blob = _string_table(
+        season_ids, [seasons[k].get('seasonImg', '') or '' for k in season_ids]
+    )
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, len(spids), len(season_ids), snapshot_version.encode('ascii')))
+    for section in (spid_arr, name_offsets, season_arr, class_offsets, img_offsets):
+        out.extend(b'\0' * (_align(len(out)) - len(out)))
+        out.extend(section.tobytes())
+    out.extend(name_blob)
+    out.extend(class_blob)
+    out.extend(img_blob)
+    return bytes(out)
+
+
+class MetadataIndex:
+    """Read-only view over a memory-mapped metadata index file"""
+
+    def __init__(self, buffer):
+        if len(buffer) < HEADER.size:
+            raise ValueError('Truncated metadata index')
+        magic, version, n_players, n_seasons, snapshot = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported metadata index (magic={magic!r}, version={version})")
+
+        self._buffer = buffer
+        self.snapshot_version = snapshot.rstrip(b'\0').decode('ascii')
+        offset = HEADER.size
+
+        def take(dtype, count):
+            nonlocal offset
+            offset = _align(offset)
+            arr = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            offset += arr.nbytes
+            return arr
+
+        self.spids = take('<i8', n_players)
+        self._name_offsets = take('<u4', n_players + 1)
+        self.season_ids = take('<i8', n_seasons)
+        self._class_offsets = take('<u4', n_seasons + 1)
+        self._img_offsets = take('<u4', n_seasons + 1)
+
+        self._name_base = offset
+        self._class_base = self._name_base + int(self._name_offsets[-1])
+        self._img_base = self._class_base + int(self._class_offsets[-1])
+
+    @classmethod
+    def open(cls, path) -> 'MetadataIndex':
+        """Map the index file read-only; pages are shared across processes."""
+        with open(Path(path), 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped)
+
+    def close(self) -> None:
+        """Release the mapping (the index is unusable afterwards)"""
+        buffer = self._buffer
+        # The arrays are views into the mapping; it can only close once they are gone
+        self.spids = self.season_ids = None
+        self._name_offsets = self._class_offsets = self._img_offsets = None
+        self._buffer = None
+        if isinstance(buffer, mmap.mmap):
+            try:
+                buffer.close()
+            except BufferError:
+                # A caller still holds a view; the mapping is released with it
+                pass
+
+    @staticmethod
+    def _find(keys: np.ndarray, key: int) -> int:
+        pos = int(np.searchsorted(keys, key))
+        if pos < len(keys) and keys[pos] == key:
+            return pos
+        return -1
+
+    def _read(self, base: int, offsets: np.ndarray, pos: int) -> str:
+        start = base + int(offsets[pos])
+        end = base + int(offsets[pos + 1])
+        return bytes(self._buffer[start:end]).decode('utf-8')
+
+    def __len__(self) -> int:
+        return len(self.spids)
+
+    def get_player_name(self, spid: int) -> Optional[str]:
+        """Player name for spid, or None if absent — O(log n)"""
+        pos = self._find(self.spids, spid)
+        if pos < 0:
+            return None
+        return self._read(self._name_base, self._name_offsets, pos)
+
+    def get_season(self, season_id: int) -> Optional[dict]:
+        """{'seasonId', 'className', 'seasonImg'} for season_id, or None if absent"""
+        pos = self._find(self.season_ids, season_id)
+        if pos < 0:
+            return None
+        return {
+            'seasonId': season_id,
+            'className': self._read(self._class_base, self._class_offsets, pos),
+            'seasonImg': self._read(self._img_base, self._img_offsets, pos),
+        }
+
+    def iter_players(self):
+        """Yield (spid, name) pairs in spid order"""
+        for pos in range(len(self.spids)):
+            yield int(self.spids[pos]), self._read(self._name_base, self._name_offsets, pos)
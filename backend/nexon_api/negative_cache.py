@@ -0,0 +1,149 @@
+"""
+Negative caching for failed Nexon API reads
+
+Successful reads are cached by `NexonAPIClient._make_request`; failures were
+not, so a mistyped nickname or a match the API keeps rejecting was requested
+again on every page load. Two bounds on upstream calls from bad inputs:
+
+- `NegativeCache`: a failed cached read stores its error under
+  `neg:<cache_key>` for a TTL chosen by error class (not found, 5xx,
+  timeout); until it expires the error is re-raised without calling the API.
+- `MatchFetchBackoff`: a per-match-id failure counter. After the n-th failed
+  fetch the id is skipped for MATCH_FETCH_BACKOFF_BASE * 2^(n-1) seconds
+  (capped at MATCH_FETCH_BACKOFF_MAX); a successful fetch resets it.
+
+Counters (hits, stores, skips) are per worker process, like the ingestion
+budget stats, and exposed by `upstream_stats()`.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .exceptions import NexonAPIException, UpstreamTimeoutException, UserNotFoundException
+
+logger = logging.getLogger(__name__)
+
+NOT_FOUND = 'not_found'
+SERVER_ERROR = 'server_error'
+TIMEOUT = 'timeout'
+
+_EXCEPTIONS = {
+    NOT_FOUND: UserNotFoundException,
+    SERVER_ERROR: NexonAPIException,
+    TIMEOUT: UpstreamTimeoutException,
+}
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+def classify(error: Exception) -> Optional[str]:
+    """Error class of a failed read, None for errors that are not cached"""
+    if isinstance(error, UserNotFoundException):
+        return NOT_FOUND
+    if isinstance(error, UpstreamTimeoutException):
+        return TIMEOUT
+    if isinstance(error, NexonAPIException) and (getattr(error, 'status_code', None) or 0) >= 500:
+        return SERVER_ERROR
+    return None
+
+
+class NegativeCache:
+    """Short-lived cache of failed reads, keyed by the read's cache key"""
+
+    @staticmethod
+    def _key(cache_key: str) -> str:
+        return f"neg:{cache_key}"
+
+    @staticmethod
+    def ttl(kind: str) -> int:
+        return {
+            NOT_FOUND: settings.NEXON_NEGATIVE_TTL_NOT_FOUND,
+            SERVER_ERROR: settings.NEXON_NEGATIVE_TTL_SERVER_ERROR,
+            TIMEOUT: settings.NEXON_NEGATIVE_TTL_TIMEOUT,
+        }[kind]
+
+    @classmethod
+    def check(cls, cache_key: str) -> None:
+        """Re-raise the cached error for `cache_key`, if any"""
+        entry = cache.get(cls._key(cache_key))
+        if entry is None:
+            return
+        kind, message = entry
+        _count(f"hits.{kind}")
+        raise _EXCEPTIONS[kind](message)
+
+    @classmethod
+    def record(cls, cache_key: str, error: Exception) -> Optional[str]:
+        """Cache `error` for its class TTL; returns the class (None if not cached)"""
+        kind = classify(error)
+        if kind is None:
+            return None
+        cache.set(cls._key(cache_key), (kind, str(error)), cls.ttl(kind))
+        _count(f"stores.{kind}")
+        return kind
+
+    @classmethod
+    def clear(cls, cache_key: str) -> None:
+        cache.delete(cls._key(cache_key))
+
+
+class MatchFetchBackoff:
+    """Exponential backoff for match ids whose detail fetch keeps failing"""
+
+    @staticmethod
+    def _key(match_id: str) -> str:
+        return f"match_fail:{match_id}"
+
+    @staticmethod
+    def delay(failures: int) -> int:
+        """Seconds to skip a match after `failures` consecutive failures"""
+        base = settings.MATCH_FETCH_BACKOFF_BASE
+        return min(base * 2 ** (failures - 1), settings.MATCH_FETCH_BACKOFF_MAX)
+
+    @classmethod
+    def split(cls, match_ids: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """(ids to fetch, ids still backing off)"""
+        match_ids = list(match_ids)
+        keys = {cls._key(mid): mid for mid in match_ids}
+        now = time.time()
+        waiting = {
+            keys[key] for key, (failures, retry_at) in cache.get_many(list(keys)).items()
+            if retry_at > now
+        }
+        if waiting:
+            _count('backoff.skipped', len(waiting))
+        return [m for m in match_ids if m not in waiting], [m for m in match_ids if m in waiting]
+
+    @classmethod
+    def failed(cls, match_id: str) -> int:
+        """Record a failed fetch; returns the backoff in seconds"""
+        entry = cache.get(cls._key(match_id))
+        failures = (entry[0] if entry else 0) + 1
+        delay = cls.delay(failures)
+        # Keep the counter past the backoff so the next failure doubles it
+        cache.set(cls._key(match_id), (failures, time.time() + delay), delay * 2)
+        _count('backoff.failures')
+        if failures > 1:
+            logger.info(f"Match {match_id} failed {failures} times, retrying in {delay}s")
+        return delay
+
+    @classmethod
+    def succeeded(cls, match_id: str) -> None:
+        cache.delete(cls._key(match_id))
+
+
+def upstream_stats() -> Dict[str, int]:
+    """Negative cache and backoff counters of this worker process"""
+    with _stats_lock:
+        return dict(_stats)
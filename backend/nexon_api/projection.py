@@ -0,0 +1,71 @@
+"""
+Projected match-detail decoding
+
+Match-detail payloads are cached in Redis and stored in Match.raw_data, but
+consumers only read a fixed subset of fields. `decode_match_detail` parses the
+response body with orjson (stdlib json when orjson is not installed) and keeps
+only the whitelisted fields in the same pass that copies the result, so the
+cached / stored structure is slim and has the same shape extractors and
+analyzers already expect.
+
+Enabled by settings.NEXON_PROJECTED_DECODE; see `manage.py bench_match_decode`
+for CPU / memory numbers against the full decode.
+"""
+import json
+from typing import Any, Dict, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+# Field whitelist: True keeps the value as-is, a dict projects a nested object
+# (or each object of a list) onto its keys.
+MATCH_DETAIL_FIELDS: Dict[str, Any] = {
+    'matchId': True,
+    'matchDate': True,
+    'matchType': True,
+    'matchInfo': {
+        'ouid': True,
+        'nickname': True,
+        'matchDetail': True,
+        'shoot': True,
+        'pass': True,
+        'defence': True,
+        'shootDetail': True,
+        'player': {
+            'spId': True,
+            'spPosition': True,
+            'spGrade': True,
+            'status': True,
+        },
+    },
+}
+
+
+def loads(content: Union[bytes, str]) -> Any:
+    """Decode JSON with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def project(value: Any, fields: Dict[str, Any]) -> Any:
+    """Keep only whitelisted keys of a dict, or of every dict in a list"""
+    if isinstance(value, list):
+        return [project(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    projected = {}
+    for key, spec in fields.items():
+        if key not in value:
+            continue
+        projected[key] = value[key] if spec is True else project(value[key], spec)
+    return projected
+
+
+def decode_match_detail(content: Union[bytes, str]) -> Dict[str, Any]:
+    """Decode a match-detail response body into the slim whitelisted structure"""
+    return project(loads(content), MATCH_DETAIL_FIELDS)
@@ -0,0 +1,125 @@
+"""
+Single-flight cache loads
+
+When a cached Nexon response expires (or a nickname starts trending), every
+concurrent request would miss the cache and call the API. `SingleFlight`
+makes each cache key load once:
+
+- within a process, the first greenlet becomes the leader and the others wait
+  on a gevent Event for its result (or its exception);
+- across processes, the leader takes a short Redis lock (cache.add); leaders
+  in other processes poll the cache for the value instead of calling the API,
+  and load it themselves only if the lock holder gives up or times out.
+
+Only truthy results are cached, as before, unless the caller gives an
+`empty_timeout` for falsy results (e.g. a user without divisions). Waiting
+greenlets get a deep copy of the leader's result, so callers may mutate it.
+"""
+import copy
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from django.core.cache import cache
+import gevent
+from gevent.event import Event
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent loads of the same key"""
+
+    def __init__(self, lock_timeout: int = 15, wait_timeout: float = 10.0, poll_interval: float = 0.05):
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: str, loader: Callable[[], Any], timeout: Optional[int] = None,
+             empty_timeout: Optional[int] = None) -> Any:
+        """
+        Cached value for `key`, calling `loader` at most once per concurrent miss.
+
+        With timeout=None the result is not cached; only concurrent calls in
+        this process are coalesced. Falsy results are cached only for
+        `empty_timeout` seconds, when given.
+        """
+        if timeout is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+
+        if not leader:
+            if not flight.event.wait(self.wait_timeout):
+                logger.warning(f"Single-flight wait timed out for {key}, loading directly")
+                return self._load_and_cache(key, loader, timeout, empty_timeout)
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            if timeout is None:
+                flight.result = loader()
+            else:
+                flight.result = self._load_across_processes(key, loader, timeout, empty_timeout)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                shared = flight.waiters > 0
+            flight.event.set()
+        # Waiters copy the shared result when they wake; the leader keeps its own
+        return copy.deepcopy(flight.result) if shared else flight.result
+
+    def _load_across_processes(self, key: str, loader: Callable[[], Any], timeout: int,
+                               empty_timeout: Optional[int]) -> Any:
+        lock_key = f"sf_lock:{key}"
+        if cache.add(lock_key, 1, self.lock_timeout):
+            try:
+                return self._load_and_cache(key, loader, timeout, empty_timeout)
+            finally:
+                cache.delete(lock_key)
+
+        # Another process is loading: wait for its value while it holds the lock
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            gevent.sleep(self.poll_interval)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            if cache.get(lock_key) is None:
+                break
+        return self._load_and_cache(key, loader, timeout, empty_timeout)
+
+    @staticmethod
+    def _load_and_cache(key: str, loader: Callable[[], Any], timeout: Optional[int],
+                        empty_timeout: Optional[int] = None) -> Any:
+        data = loader()
+        if timeout is not None and data:
+            cache.set(key, data, timeout)
+        elif timeout is not None and empty_timeout and data is not None:
+            cache.set(key, data, empty_timeout)
+        return data